@@ -0,0 +1,160 @@
+"""
+Shared store for downloaded artifacts such as server and Forge jars
+"""
+
+import logging
+import os
+import os.path
+import shutil
+import threading
+
+class ArtifactStore(object):
+    """
+    A content addressed store of downloaded files, keyed by their SHA1. Files
+    are hardlinked into server directories when possible so servers running
+    the same version share a single copy on disk. When the artifacts that
+    only the store is keeping grow past its maximum size the least recently
+    used of them are removed.
+    """
+
+    DEFAULT_MAX_SIZE = 2 * 1024 * 1024 * 1024
+
+    def __init__(self, path, max_size = None):
+        if max_size is None:
+            max_size = ArtifactStore.DEFAULT_MAX_SIZE
+
+        self.path     = path
+        self.max_size = max_size
+
+        # Artifacts are fetched from executor threads
+        self._lock       = threading.Lock()
+        self._sha1_locks = {}
+
+    def contains(self, sha1):
+        """
+        Check if an artifact is in the store
+        """
+
+        return os.path.exists(self._artifact_path(sha1))
+
+    def fetch(self, sha1, dest, download):
+        """
+        Put the artifact with the given SHA1 at dest. If the artifact isn't in
+        the store yet then download is called with a path to save it to and
+        the result is added to the store.
+        """
+
+        # Servers created at the same time wait for a single download of
+        # their shared artifact instead of each fetching their own
+        with self._get_sha1_lock(sha1):
+            if self.link(sha1, dest):
+                logging.info('Using stored artifact %s', sha1)
+
+                return dest
+
+            download(dest)
+            self.add(sha1, dest)
+
+        return dest
+
+    def link(self, sha1, dest):
+        """
+        Link an artifact from the store to dest. Returns False if the artifact
+        isn't in the store.
+        """
+
+        with self._lock:
+            artifact_path = self._artifact_path(sha1)
+            if not os.path.exists(artifact_path):
+                return False
+
+            # The modification time doubles as the last time it was used
+            os.utime(artifact_path)
+
+            _link_or_copy(artifact_path, dest)
+
+        return True
+
+    def add(self, sha1, src):
+        """
+        Add a file to the store under the given SHA1
+        """
+
+        with self._lock:
+            artifact_path = self._artifact_path(sha1)
+            if os.path.exists(artifact_path):
+                return
+
+            os.makedirs(os.path.dirname(artifact_path), exist_ok = True)
+
+            tmp_path = artifact_path + '.tmp'
+            _link_or_copy(src, tmp_path)
+            os.replace(tmp_path, artifact_path)
+
+            self._evict()
+
+    @property
+    def size(self):
+        """
+        The total size of the artifacts that only the store is keeping. Ones
+        that are also linked into a server take no extra space.
+        """
+
+        return sum(size for _, size, _ in self._get_artifacts())
+
+    def _get_sha1_lock(self, sha1):
+        with self._lock:
+            return self._sha1_locks.setdefault(sha1.lower(), threading.Lock())
+
+    def _evict(self):
+        artifacts = sorted(self._get_artifacts())
+        total     = sum(size for _, size, _ in artifacts)
+
+        for _, size, artifact_path in artifacts:
+            if total <= self.max_size:
+                break
+
+            logging.info('Evicting stored artifact %s', artifact_path)
+            os.remove(artifact_path)
+            total -= size
+
+    def _get_artifacts(self):
+        if not os.path.isdir(self.path):
+            return []
+
+        artifacts = []
+        for prefix in os.listdir(self.path):
+            prefix_path = os.path.join(self.path, prefix)
+            if not os.path.isdir(prefix_path):
+                continue
+
+            for name in os.listdir(prefix_path):
+                if name.endswith('.tmp'):
+                    continue
+
+                artifact_path = os.path.join(prefix_path, name)
+                stat          = os.stat(artifact_path)
+
+                # Removing an artifact that's linked into a server frees
+                # nothing so those are left alone
+                if stat.st_nlink > 1:
+                    continue
+
+                artifacts.append((stat.st_mtime, stat.st_size, artifact_path))
+
+        return artifacts
+
+    def _artifact_path(self, sha1):
+        sha1 = sha1.lower()
+
+        return os.path.join(self.path, sha1[:2], sha1)
+
+def _link_or_copy(src, dest):
+    if os.path.exists(dest):
+        os.remove(dest)
+
+    try:
+        os.link(src, dest)
+    except OSError:
+        # Probably on different file systems
+        shutil.copyfile(src, dest)
@@ -0,0 +1,649 @@
+"""
+Incremental backups of Minecraft worlds
+"""
+
+import errno
+import hashlib
+import json
+import logging
+import os
+import os.path
+import shutil
+import time
+
+from . import errors, regions
+
+NAME_FORMAT = '%Y%m%dT%H%M%SZ'
+
+class RetentionPolicy(object):
+    """
+    Decides which backups to keep. The most recent keep_last backups are kept
+    along with the newest backup from each of the most recent keep_hourly
+    hours, keep_daily days and keep_weekly weeks. Without any limits every
+    backup is kept.
+    """
+
+    PERIODS = [
+        ('keep_hourly', '%Y%m%d%H'),
+        ('keep_daily',  '%Y%m%d'),
+        ('keep_weekly', '%G%V'),
+    ]
+
+    def __init__(self, keep_last = None, keep_hourly = None, keep_daily = None,
+                 keep_weekly = None):
+        self.keep_last   = keep_last
+        self.keep_hourly = keep_hourly
+        self.keep_daily  = keep_daily
+        self.keep_weekly = keep_weekly
+
+    @classmethod
+    def from_settings(cls, settings):
+        """
+        Create a policy from a server's settings
+        """
+
+        limits = {}
+        for name in ('keep_last', 'keep_hourly', 'keep_daily', 'keep_weekly'):
+            limit = settings.get('backup_' + name)
+            if limit is None:
+                continue
+
+            if isinstance(limit, bool) or not isinstance(limit, int) or \
+               limit < 0:
+                raise errors.ServerSettingsError(
+                    'backup_{} must be a positive integer',
+                    name,
+                )
+
+            limits[name] = limit
+
+        return cls(**limits)
+
+    @property
+    def keeps_all(self):
+        """
+        Check if the policy never removes any backups
+        """
+
+        return all(
+            getattr(self, name) is None
+            for name in ('keep_last', 'keep_hourly', 'keep_daily', 'keep_weekly')
+        )
+
+    def select(self, names):
+        """
+        Get the set of backups to keep out of a list of backup names
+        """
+
+        if self.keeps_all:
+            return set(names)
+
+        newest_first = sorted(names, reverse = True)
+
+        keep = set(newest_first[:self.keep_last or 0])
+
+        for limit_name, period_format in RetentionPolicy.PERIODS:
+            limit = getattr(self, limit_name)
+            if not limit:
+                continue
+
+            periods = set()
+            for name in newest_first:
+                period = time.strftime(period_format, backup_time(name))
+                if period in periods:
+                    continue
+
+                if len(periods) >= limit:
+                    break
+
+                periods.add(period)
+                keep.add(name)
+
+        return keep
+
+class BackupStore(object):
+    """
+    A series of backups of a server's worlds. Each backup is a complete copy of
+    the world directories but files that haven't changed since the previous
+    backup are hard links to the previous copy, like rsync's --link-dest. Only
+    region files that the server has written to are copied, so frequent
+    backups of a large world are cheap in both disk space and IO.
+
+    A file is considered unchanged if its size and modification time match the
+    previous copy. The world files themselves are never linked into a backup
+    since the server changes them in place.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def list(self):
+        """
+        Get the names of the backups, oldest first
+        """
+
+        try:
+            entries = os.scandir(self.path)
+        except FileNotFoundError:
+            return []
+
+        return sorted(
+            entry.name
+            for entry in entries
+            if not entry.name.startswith('.') and entry.is_dir()
+        )
+
+    def create(self, source, paths, now = None):
+        """
+        Back up the listed directories of source as a new backup. Returns the
+        name of the backup along with how many files were copied and linked.
+        """
+
+        os.makedirs(self.path, exist_ok = True)
+        self._remove_partial()
+
+        previous = self.list()
+        previous = os.path.join(self.path, previous[-1]) if previous else None
+
+        name    = _new_name(self.path, '', now)
+        partial = os.path.join(self.path, '.' + name + '.partial')
+        result  = {
+            'name':         name,
+            'files':        0,
+            'copied':       0,
+            'linked':       0,
+            'bytes_copied': 0,
+        }
+
+        # Build the backup off to the side so a failed backup is never used
+        # as the base of the next one
+        try:
+            os.mkdir(partial)
+            for path in paths:
+                self._copy_tree(
+                    os.path.join(source, path),
+                    os.path.join(partial, path),
+                    os.path.join(previous, path) if previous else None,
+                    result,
+                )
+
+            os.rename(partial, os.path.join(self.path, name))
+        except Exception:
+            shutil.rmtree(partial, ignore_errors = True)
+            raise
+
+        logging.info(
+            'Created backup %s with %d files, %d copied',
+            name,
+            result['files'],
+            result['copied'],
+        )
+
+        return result
+
+    def prune(self, policy):
+        """
+        Remove the backups that the retention policy doesn't keep. Returns the
+        names of the removed backups.
+        """
+
+        names = self.list()
+        keep  = policy.select(names)
+
+        removed = [name for name in names if name not in keep]
+        for name in removed:
+            logging.info('Removing backup %s', name)
+            shutil.rmtree(os.path.join(self.path, name))
+
+        return removed
+
+    def restore(self, name, dest):
+        """
+        Copy the worlds in a backup into dest. Returns the names of the world
+        directories that were restored.
+        """
+
+        if name not in self.list():
+            raise errors.BackupError('Backup {} does not exist', name)
+
+        backup_path = os.path.join(self.path, name)
+        paths       = sorted(os.listdir(backup_path))
+
+        # Copied rather than linked since the server changes its world files
+        # in place, which would change the backup too
+        for path in paths:
+            shutil.copytree(
+                os.path.join(backup_path, path),
+                os.path.join(dest, path),
+            )
+
+        return paths
+
+    def _remove_partial(self):
+        # Left behind if the management process died part way through
+        for name in os.listdir(self.path):
+            if name.startswith('.') and name.endswith('.partial'):
+                logging.warning('Removing incomplete backup %s', name)
+                shutil.rmtree(
+                    os.path.join(self.path, name),
+                    ignore_errors = True,
+                )
+
+    def _copy_tree(self, source, dest, previous, result):
+        os.mkdir(dest)
+
+        for entry in os.scandir(source):
+            dest_path     = os.path.join(dest, entry.name)
+            previous_path = os.path.join(previous, entry.name) \
+                if previous else None
+
+            if entry.is_dir(follow_symlinks = False):
+                self._copy_tree(entry.path, dest_path, previous_path, result)
+            elif entry.is_file(follow_symlinks = False):
+                result['files'] += 1
+
+                stat = entry.stat(follow_symlinks = False)
+                if _is_unchanged(stat, previous_path) and \
+                   _link(previous_path, dest_path):
+                    result['linked'] += 1
+                else:
+                    shutil.copy2(entry.path, dest_path)
+                    result['copied']       += 1
+                    result['bytes_copied'] += stat.st_size
+
+class ChunkStore(object):
+    """
+    A series of backups of a server's worlds kept in a content addressed store.
+    Region files are split into the chunks they hold and each chunk is stored
+    once under the hash of its contents. A backup only writes the chunks the
+    server has saved since an earlier backup instead of whole region files,
+    and chunks that haven't changed are shared by every backup. Other files
+    are stored whole in the same way.
+
+    Each backup is a manifest listing the files and chunks needed to rebuild
+    the worlds. Files with the same size and modification time as in the
+    previous backup are taken from its manifest without being read.
+    """
+
+    OBJECTS_DIR = '.chunks'
+    EXTENSION   = '.json'
+    BLOCK_SIZE  = 1024 * 1024
+
+    def __init__(self, path):
+        self.path         = path
+        self.objects_path = os.path.join(path, ChunkStore.OBJECTS_DIR)
+
+    def list(self):
+        """
+        Get the names of the backups, oldest first
+        """
+
+        try:
+            names = os.listdir(self.path)
+        except FileNotFoundError:
+            return []
+
+        return sorted(
+            name[:-len(ChunkStore.EXTENSION)]
+            for name in names
+            if not name.startswith('.') and name.endswith(ChunkStore.EXTENSION)
+        )
+
+    def create(self, source, paths, now = None):
+        """
+        Back up the listed directories of source as a new backup. Returns the
+        name of the backup along with how many files were read and how many
+        new chunks and files had to be stored.
+        """
+
+        os.makedirs(self.objects_path, exist_ok = True)
+
+        previous = self.list()
+        previous = self._load(previous[-1])['files'] if previous else {}
+
+        name     = _new_name(self.path, ChunkStore.EXTENSION, now)
+        manifest = {
+            'paths': list(paths),
+            'dirs':  [],
+            'files': {},
+        }
+        result   = {
+            'name':            name,
+            'files':           0,
+            'unchanged':       0,
+            'chunks':          0,
+            'objects_written': 0,
+            'bytes_written':   0,
+        }
+
+        manifest_path = self._manifest_path(name)
+        tmp_path      = manifest_path + '.tmp'
+
+        try:
+            for path in paths:
+                self._add_tree(source, path, manifest, previous, result)
+
+            # The manifest is written last so the backup only shows up once
+            # everything it refers to has been stored
+            with open(tmp_path, 'w') as manifest_file:
+                json.dump(manifest, manifest_file)
+
+            os.replace(tmp_path, manifest_path)
+        except Exception:
+            # Nothing refers to the objects stored so far
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+            self._collect_garbage()
+
+            raise
+
+        logging.info(
+            'Created backup %s with %d files, %d new objects',
+            name,
+            result['files'],
+            result['objects_written'],
+        )
+
+        return result
+
+    def prune(self, policy):
+        """
+        Remove the backups that the retention policy doesn't keep along with
+        any chunks and files that only they used. Returns the names of the
+        removed backups.
+        """
+
+        names = self.list()
+        keep  = policy.select(names)
+
+        removed = [name for name in names if name not in keep]
+        for name in removed:
+            logging.info('Removing backup %s', name)
+            os.remove(self._manifest_path(name))
+
+        # Also picks up objects left behind by a backup that didn't finish
+        self._collect_garbage()
+
+        return removed
+
+    def restore(self, name, dest):
+        """
+        Rebuild the worlds in a backup into dest. Returns the names of the
+        world directories that were restored.
+        """
+
+        if name not in self.list():
+            raise errors.BackupError('Backup {} does not exist', name)
+
+        manifest = self._load(name)
+
+        for path in manifest['dirs']:
+            os.makedirs(os.path.join(dest, path), exist_ok = True)
+
+        for path, entry in sorted(manifest['files'].items()):
+            file_path = os.path.join(dest, path)
+            with open(file_path, 'wb') as file_handle:
+                if 'chunks' in entry:
+                    regions.write_region(
+                        file_handle,
+                        [
+                            (index, timestamp, self._read_object(digest))
+                            for index, timestamp, digest in entry['chunks']
+                        ],
+                    )
+                else:
+                    file_handle.write(self._read_object(entry['object']))
+
+            os.utime(file_path, ns = (entry['mtime_ns'], entry['mtime_ns']))
+
+        return manifest['paths']
+
+    def _add_tree(self, source, path, manifest, previous, result):
+        manifest['dirs'].append(path)
+
+        for entry in os.scandir(os.path.join(source, path)):
+            entry_path = os.path.join(path, entry.name)
+
+            if entry.is_dir(follow_symlinks = False):
+                self._add_tree(source, entry_path, manifest, previous, result)
+            elif entry.is_file(follow_symlinks = False):
+                result['files'] += 1
+
+                stat      = entry.stat(follow_symlinks = False)
+                unchanged = previous.get(entry_path)
+                if unchanged is not None and \
+                   unchanged['size'] == stat.st_size and \
+                   unchanged['mtime_ns'] == stat.st_mtime_ns:
+                    manifest['files'][entry_path] = unchanged
+                    result['unchanged'] += 1
+                    continue
+
+                file_entry = {
+                    'size':     stat.st_size,
+                    'mtime_ns': stat.st_mtime_ns,
+                }
+
+                chunks = self._read_chunks(entry.path)
+                if chunks is not None:
+                    file_entry['chunks'] = [
+                        [index, timestamp, self._put_object(stored, result)]
+                        for index, timestamp, stored in chunks
+                    ]
+                    result['chunks'] += len(chunks)
+                else:
+                    file_entry['object'] = self._put_file(entry.path, result)
+
+                manifest['files'][entry_path] = file_entry
+
+    @staticmethod
+    def _read_chunks(path):
+        if not regions.is_region_file(path):
+            return None
+
+        with open(path, 'rb') as region_file:
+            data = region_file.read()
+
+        # Minecraft leaves empty region files around and a damaged one is
+        # still worth backing up as it is
+        if not data:
+            return None
+
+        try:
+            return regions.read_chunks(data)
+        except errors.RegionFileError as ex:
+            logging.warning(
+                'Storing %s as a whole file: %s',
+                path,
+                ex.message,
+            )
+
+            return None
+
+    def _put_object(self, data, result):
+        digest      = hashlib.sha256(data).hexdigest()
+        object_path = self._object_path(digest)
+
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok = True)
+
+            tmp_path = object_path + '.tmp'
+            with open(tmp_path, 'wb') as object_file:
+                object_file.write(data)
+
+            os.replace(tmp_path, object_path)
+
+            result['objects_written'] += 1
+            result['bytes_written']   += len(data)
+
+        return digest
+
+    def _put_file(self, path, result):
+        # Hash first so large files that are already stored aren't written
+        file_hash = hashlib.sha256()
+        with open(path, 'rb') as file_handle:
+            for block in iter(lambda: file_handle.read(ChunkStore.BLOCK_SIZE), b''):
+                file_hash.update(block)
+
+        digest      = file_hash.hexdigest()
+        object_path = self._object_path(digest)
+
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok = True)
+
+            tmp_path = object_path + '.tmp'
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, object_path)
+
+            result['objects_written'] += 1
+            result['bytes_written']   += os.path.getsize(object_path)
+
+        return digest
+
+    def _read_object(self, digest):
+        try:
+            with open(self._object_path(digest), 'rb') as object_file:
+                data = object_file.read()
+        except FileNotFoundError:
+            raise errors.BackupError('Backup object {} is missing', digest)
+
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise errors.BackupError('Backup object {} is corrupt', digest)
+
+        return data
+
+    def _collect_garbage(self):
+        used = set()
+        for name in self.list():
+            for entry in self._load(name)['files'].values():
+                if 'chunks' in entry:
+                    used.update(chunk[2] for chunk in entry['chunks'])
+                else:
+                    used.add(entry['object'])
+
+        if not os.path.isdir(self.objects_path):
+            return
+
+        for prefix in os.listdir(self.objects_path):
+            prefix_path = os.path.join(self.objects_path, prefix)
+            for digest in os.listdir(prefix_path):
+                if digest not in used:
+                    os.remove(os.path.join(prefix_path, digest))
+
+    def _load(self, name):
+        try:
+            with open(self._manifest_path(name), 'r') as manifest_file:
+                return json.load(manifest_file)
+        except FileNotFoundError:
+            raise errors.BackupError('Backup {} does not exist', name)
+
+    def _manifest_path(self, name):
+        return os.path.join(self.path, name + ChunkStore.EXTENSION)
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_path, digest[:2], digest)
+
+ENGINES = {
+    'link':   BackupStore,
+    'chunks': ChunkStore,
+}
+
+DEFAULT_ENGINE = 'link'
+
+def open_store(path, settings):
+    """
+    Get the backup store for a server using the engine in its settings
+    """
+
+    engine = settings.get('backup_engine', DEFAULT_ENGINE)
+    if engine not in ENGINES:
+        raise errors.ServerSettingsError(
+            'backup_engine must be one of {}',
+            ', '.join(sorted(ENGINES.keys())),
+        )
+
+    return ENGINES[engine](path)
+
+def restore_worlds(store, name, server_path):
+    """
+    Replace a server's worlds with the ones in a backup. The backup is rebuilt
+    next to the worlds first so they're only replaced once it has been fully
+    restored. Returns the names of the restored world directories.
+    """
+
+    staging = os.path.join(server_path, '.restore')
+    shutil.rmtree(staging, ignore_errors = True)
+    os.mkdir(staging)
+
+    try:
+        paths = store.restore(name, staging)
+
+        replaced = []
+        try:
+            for path in paths:
+                target = os.path.join(server_path, path)
+                if os.path.exists(target):
+                    os.rename(target, os.path.join(staging, path + '.old'))
+
+                replaced.append(path)
+                os.rename(os.path.join(staging, path), target)
+        except OSError:
+            # Put back the worlds that were moved out of the way
+            for path in replaced:
+                old_path = os.path.join(staging, path + '.old')
+                if os.path.exists(old_path):
+                    target = os.path.join(server_path, path)
+                    shutil.rmtree(target, ignore_errors = True)
+                    os.rename(old_path, target)
+
+            raise
+    finally:
+        shutil.rmtree(staging, ignore_errors = True)
+
+    return paths
+
+def backup_time(name):
+    """
+    Get the time a backup was made from its name
+    """
+
+    return time.strptime(name.split('.')[0], NAME_FORMAT)
+
+def _new_name(path, extension, now = None):
+    if now is None:
+        now = time.time()
+
+    base = time.strftime(NAME_FORMAT, time.gmtime(now))
+    name = base
+
+    suffix = 0
+    while os.path.exists(os.path.join(path, name + extension)):
+        suffix += 1
+        name    = '{}.{}'.format(base, suffix)
+
+    return name
+
+def _is_unchanged(stat, previous_path):
+    if previous_path is None:
+        return False
+
+    try:
+        previous = os.stat(previous_path)
+    except FileNotFoundError:
+        return False
+
+    return previous.st_size == stat.st_size and \
+        previous.st_mtime_ns == stat.st_mtime_ns
+
+def _link(source, dest):
+    try:
+        os.link(source, dest)
+    except OSError as ex:
+        # A file that's unchanged across many backups can run into the file
+        # system's limit on links, in which case it's copied again
+        if ex.errno != errno.EMLINK:
+            raise
+
+        return False
+
+    return True
@@ -0,0 +1,189 @@
+"""
+Caching for JSON documents fetched over HTTP, such as the Minecraft version
+manifest
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import os.path
+import threading
+import time
+
+import requests
+
+from . import errors
+
+DEFAULT_PATH = os.path.expanduser(
+    os.path.expandvars(
+        os.path.join('~', '.cache', 'mymcadmin')
+    )
+)
+
+class JsonCache(object):
+    """
+    An in memory and on disk cache of JSON documents. Documents are served
+    from the cache until their TTL runs out after which they're revalidated
+    with the server using their ETag or Last-Modified headers. If the server
+    can't be reached then the stale copy is used instead. In offline mode the
+    network is never used.
+    """
+
+    DEFAULT_TTL = 60 * 60
+
+    def __init__(self, path = None, ttl = None, offline = False):
+        if ttl is None:
+            ttl = JsonCache.DEFAULT_TTL
+
+        self.path    = path
+        self.ttl     = ttl
+        self.offline = offline
+
+        self._entries = {}
+        self._lock    = threading.Lock()
+
+    def get(self, url):
+        """
+        Get a JSON document, using the cached copy when possible
+        """
+
+        with self._lock:
+            entry = self._get_entry(url)
+
+        if entry is not None:
+            age = time.time() - entry['fetched']
+            if self.offline or age < self.ttl:
+                return copy.deepcopy(entry['data'])
+
+        if self.offline:
+            raise errors.DownloadError(
+                'No cached copy of {} is available offline',
+                url,
+            )
+
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            resp = requests.get(url, headers = headers)
+        except requests.RequestException as ex:
+            return self._get_stale(url, entry, str(ex))
+
+        if resp.status_code == 304 and entry is not None:
+            entry['fetched'] = time.time()
+        elif resp.ok:
+            entry = {
+                'url':           url,
+                'etag':          resp.headers.get('ETag'),
+                'last_modified': resp.headers.get('Last-Modified'),
+                'fetched':       time.time(),
+                'data':          resp.json(),
+            }
+        else:
+            return self._get_stale(
+                url,
+                entry,
+                'HTTP status {}'.format(resp.status_code),
+            )
+
+        with self._lock:
+            self._put_entry(url, entry)
+
+        return copy.deepcopy(entry['data'])
+
+    def clear(self):
+        """
+        Remove everything from the cache
+        """
+
+        with self._lock:
+            self._entries = {}
+
+            if self.path is None or not os.path.isdir(self.path):
+                return
+
+            for name in os.listdir(self.path):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.path, name))
+
+    @staticmethod
+    def _get_stale(url, entry, reason):
+        if entry is None:
+            raise errors.DownloadError(
+                'Unable to retrieve {}: {}',
+                url,
+                reason,
+            )
+
+        logging.warning('Using stale copy of %s: %s', url, reason)
+
+        return copy.deepcopy(entry['data'])
+
+    def _get_entry(self, url):
+        if url in self._entries:
+            return self._entries[url]
+
+        if self.path is None:
+            return None
+
+        try:
+            with open(self._entry_path(url), 'r') as entry_file:
+                entry = json.load(entry_file)
+        except (OSError, ValueError):
+            return None
+
+        self._entries[url] = entry
+
+        return entry
+
+    def _put_entry(self, url, entry):
+        self._entries[url] = entry
+
+        if self.path is None:
+            return
+
+        try:
+            os.makedirs(self.path, exist_ok = True)
+
+            entry_path = self._entry_path(url)
+            tmp_path   = entry_path + '.tmp'
+            with open(tmp_path, 'w') as entry_file:
+                json.dump(entry, entry_file)
+
+            os.replace(tmp_path, entry_path)
+        except OSError as ex:
+            logging.warning('Unable to save cached copy of %s: %s', url, ex)
+
+    def _entry_path(self, url):
+        name = hashlib.sha1(url.encode()).hexdigest()
+
+        return os.path.join(self.path, name + '.json')
+
+_DEFAULT_CACHE = JsonCache()
+
+def configure(path = None, ttl = None, offline = False):
+    """
+    Replace the default cache used for JSON documents
+    """
+
+    # pylint: disable=global-statement
+    global _DEFAULT_CACHE
+    # pylint: enable=global-statement
+
+    _DEFAULT_CACHE = JsonCache(path = path, ttl = ttl, offline = offline)
+
+    return _DEFAULT_CACHE
+
+def get_json(url):
+    """
+    Get a JSON document through the default cache
+    """
+
+    return _DEFAULT_CACHE.get(url)
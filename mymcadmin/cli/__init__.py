@@ -3,14 +3,7 @@ Command Line Interface
 """
 
 from .base import mymcadmin
-from .commands.create import create
-from .commands.list import list_servers, list_versions
-from .commands.start import start, start_daemon, start_all
-from .commands.stop import stop, stop_all
-from .commands.restart import restart, restart_all
-from .commands.shutdown import shutdown
 
 __all__ = [
     'mymcadmin',
 ]
-
@@ -3,12 +3,64 @@ Base command handling
 """
 
 import functools
+import importlib
 
 import click
 
 from .. import config
 
-@click.group()
+COMMAND_MODULES = {
+    'backup':        'mymcadmin.cli.commands.backup',
+    'backups':       'mymcadmin.cli.commands.backup',
+    'create':        'mymcadmin.cli.commands.create',
+    'list_servers':  'mymcadmin.cli.commands.list',
+    'list_versions': 'mymcadmin.cli.commands.list',
+    'restart':       'mymcadmin.cli.commands.restart',
+    'restart_all':   'mymcadmin.cli.commands.restart',
+    'restore':       'mymcadmin.cli.commands.backup',
+    'shutdown':      'mymcadmin.cli.commands.shutdown',
+    'start':         'mymcadmin.cli.commands.start',
+    'start_all':     'mymcadmin.cli.commands.start',
+    'start_daemon':  'mymcadmin.cli.commands.start',
+    'stop':          'mymcadmin.cli.commands.stop',
+    'stop_all':      'mymcadmin.cli.commands.stop',
+}
+
+class LazyGroup(click.Group):
+    """
+    A command group that only imports the module a command is defined in when
+    that command is used. Commands register themselves with the group when
+    their module is imported.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.command_modules = kwargs.pop('command_modules', {})
+
+        super(LazyGroup, self).__init__(*args, **kwargs)
+
+    def list_commands(self, ctx):
+        """
+        Import every command module so all of the commands can be listed
+        """
+
+        for module in set(self.command_modules.values()):
+            importlib.import_module(module)
+
+        return super(LazyGroup, self).list_commands(ctx)
+
+    def get_command(self, ctx, cmd_name):
+        """
+        Import the module that defines a command before looking it up
+        """
+
+        # Newer versions of click name commands with dashes
+        module = self.command_modules.get(cmd_name.replace('-', '_'))
+        if module is not None:
+            importlib.import_module(module)
+
+        return super(LazyGroup, self).get_command(ctx, cmd_name)
+
+@click.group(cls = LazyGroup, command_modules = COMMAND_MODULES)
 @click.pass_context
 @click.option(
     '--conf',
@@ -48,10 +100,26 @@ def rpc_command(command):
         type    = click.INT,
         default = None,
         help    = 'The port to connect to')
+    @click.option(
+        '--socket',
+        'socket_path',
+        type    = click.Path(dir_okay = False),
+        default = None,
+        help    = 'The Unix socket to connect to')
     @click.pass_context
-    def _wrapper(ctx, host, port, *args, **kwargs):
+    def _wrapper(ctx, host, port, socket_path, *args, **kwargs):
         rpc_config = ctx.obj['config'].rpc or {}
 
+        # A host or port on the command line overrides a configured socket
+        if socket_path is None and host is None and port is None:
+            socket_path = rpc_config.get('socket')
+
+        if socket_path is not None:
+            # RPC clients take a socket path in place of the host
+            kwargs['rpc_conn'] = (socket_path, None)
+
+            return ctx.invoke(command, *args, **kwargs)
+
         if host is None:
             host = rpc_config.get('host', 'localhost')
 
@@ -64,6 +132,54 @@ def rpc_command(command):
 
     return functools.update_wrapper(_wrapper, command)
 
+def server_selectors(server_ids, tags):
+    """
+    Get the selectors for the servers a command should act on. Returns None
+    if a single server was given by its ID.
+    """
+
+    selectors = list(server_ids) + ['tag:' + tag for tag in tags]
+
+    if not selectors:
+        raise click.UsageError('No servers were given')
+
+    if len(selectors) == 1 and not any(c in selectors[0] for c in '*?['):
+        if not selectors[0].startswith('tag:'):
+            return None
+
+    return selectors
+
+def result_table(result, done, skipped, details = None):
+    """
+    Show the result of acting on several servers as a table with a row for
+    each server. The done and skipped arguments describe what happened to the
+    successful and skipped servers, details can override them per server.
+    """
+
+    if details is None:
+        details = {}
+
+    rows = []
+    for server_id in result.get('success', []):
+        status = details.get(server_id, done)
+        rows.append((server_id, status, success if status == done else warn))
+
+    for server_id in result.get('failure', []):
+        rows.append((server_id, 'failed', error))
+
+    for server_id in result.get('skipped', []):
+        rows.append((server_id, skipped, info))
+
+    if not rows:
+        warn('No servers matched')
+        return
+
+    width = max(len('SERVER'), max(len(row[0]) for row in rows))
+
+    click.echo('{:<{width}}  {}'.format('SERVER', 'RESULT', width = width))
+    for server_id, status, output in sorted(rows, key = lambda row: row[0]):
+        output('{:<{width}}  {}'.format(server_id, status, width = width))
+
 def success(message, **formatting):
     """
     Return a success message to the command line
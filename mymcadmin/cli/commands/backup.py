@@ -0,0 +1,102 @@
+"""
+Backup commands for Minecraft servers
+"""
+
+import click
+
+from ..base import mymcadmin, cli_command, rpc_command, info, success
+from ... import rpc
+
+@mymcadmin.command()
+@click.argument('server_id')
+@click.option(
+    '--timeout',
+    type    = click.FLOAT,
+    default = None,
+    help    = 'Seconds to wait for a running server to save its world')
+@cli_command
+@rpc_command
+def backup(rpc_conn, server_id, timeout):
+    """
+    Back up the worlds of a Minecraft server
+    """
+
+    click.echo('Attempting to back up {}'.format(server_id), nl = False)
+
+    with rpc.RpcClient(*rpc_conn) as rpc_client:
+        result = rpc_client.server_backup(server_id, timeout = timeout)
+
+    success('Success')
+
+    if 'chunks' in result:
+        click.echo(
+            'Backup {}: {} files, {} unchanged, {} chunks, {} new objects ({} bytes)'.format(
+                result['name'],
+                result['files'],
+                result['unchanged'],
+                result['chunks'],
+                result['objects_written'],
+                result['bytes_written'],
+            )
+        )
+    else:
+        click.echo(
+            'Backup {}: {} files, {} copied ({} bytes), {} unchanged'.format(
+                result['name'],
+                result['files'],
+                result['copied'],
+                result['bytes_copied'],
+                result['linked'],
+            )
+        )
+
+    for name in result['pruned']:
+        info('Removed old backup {}'.format(name))
+
+@mymcadmin.command()
+@click.argument('server_id')
+@cli_command
+@rpc_command
+def backups(rpc_conn, server_id):
+    """
+    List the backups of a Minecraft server
+    """
+
+    with rpc.RpcClient(*rpc_conn) as rpc_client:
+        names = rpc_client.server_backups(server_id)
+
+    for name in names:
+        click.echo(name)
+
+@mymcadmin.command()
+@click.argument('server_id')
+@click.argument('name')
+@click.option(
+    '--yes',
+    is_flag = True,
+    help    = 'Replace the worlds without asking first')
+@cli_command
+@rpc_command
+def restore(rpc_conn, server_id, name, yes):
+    """
+    Replace the worlds of a stopped Minecraft server with a backup
+    """
+
+    if not yes:
+        click.confirm(
+            'The current worlds of {} will be lost. Continue?'.format(server_id),
+            abort = True,
+        )
+
+    click.echo(
+        'Attempting to restore {} from {}'.format(server_id, name),
+        nl = False,
+    )
+
+    with rpc.RpcClient(*rpc_conn) as rpc_client:
+        result = rpc_client.server_restore(server_id, name)
+
+    success('Success')
+
+    for world in result['worlds']:
+        info('Restored {}'.format(world))
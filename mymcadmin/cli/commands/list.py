@@ -7,7 +7,7 @@ import os.path
 import click
 
 from ..base import mymcadmin, cli_command, rpc_command, info
-from ... import rpc, server
+from ... import rpc
 
 @mymcadmin.command()
 @cli_command
@@ -41,19 +41,33 @@ def list_servers(rpc_conn):
     '--alphas/--no-alphas',
     default = True,
     help    = 'Include alphas')
+@click.option(
+    '--offline/--online',
+    default = None,
+    help    = 'Only use cached version information')
 @cli_command
-def list_versions(snapshots, releases, betas, alphas):
+@click.pass_context
+def list_versions(ctx, offline, **version_types):
     """
     List possible server download versions
     """
 
-    versions = server.Server.list_versions(
-        snapshots = snapshots,
-        releases  = releases,
-        betas     = betas,
-        alphas    = alphas
+    # Imported here so the RPC commands don't have to load requests
+    from ... import cache, server
+
+    cache_config = ctx.obj['config'].cache or {}
+    if offline is None:
+        offline = cache_config.get('offline', False)
+
+    cache.configure(
+        path    = cache_config.get('path', cache.DEFAULT_PATH),
+        ttl     = cache_config.get('ttl'),
+        offline = offline,
     )
 
+    # The snapshots, releases, betas and alphas flags
+    versions = server.Server.list_versions(**version_types)
+
     latest       = versions['latest']
     all_versions = versions['versions']
 
@@ -4,24 +4,49 @@ Restart commands for Minecraft servers
 
 import click
 
-from ..base import mymcadmin, cli_command, rpc_command, error, success
+from ..base import (
+    mymcadmin,
+    cli_command,
+    rpc_command,
+    error,
+    result_table,
+    server_selectors,
+    success,
+)
 from ... import rpc
 
 @mymcadmin.command()
-@click.argument('server_id')
+@click.argument('server_ids', nargs = -1)
+@click.option(
+    '--tag',
+    'tags',
+    multiple = True,
+    help     = 'Also act on the servers with this tag')
 @cli_command
 @rpc_command
-def restart(rpc_conn, server_id):
+def restart(rpc_conn, server_ids, tags):
     """
-    Restart a Minecraft server
+    Restart Minecraft servers by ID, glob pattern (such as "lobby-*") or tag
     """
 
-    click.echo('Attempting to restart {}'.format(server_id), nl = False)
+    selectors = server_selectors(server_ids, tags)
+
+    if selectors is None:
+        server_id = server_ids[0]
+
+        click.echo('Attempting to restart {}'.format(server_id), nl = False)
+
+        with rpc.RpcClient(*rpc_conn) as rpc_client:
+            rpc_client.server_restart(server_id)
+
+        success('Success')
+
+        return
 
     with rpc.RpcClient(*rpc_conn) as rpc_client:
-        rpc_client.server_restart(server_id)
+        result = rpc_client.server_restart_all(selectors)
 
-    success('Success')
+    result_table(result, 'restarted', 'not running')
 
 @mymcadmin.command()
 @cli_command
@@ -15,8 +15,12 @@ def shutdown(rpc_conn):
     Shutdown the management server and any Minecraft servers running on it
     """
 
+    host, port = rpc_conn
+    if port is not None:
+        host = '{}:{}'.format(host, port)
+
     click.echo(
-        'Attempting to shutdown management server at {}:{}'.format(*rpc_conn),
+        'Attempting to shutdown management server at {}'.format(host),
         nl = False,
     )
 
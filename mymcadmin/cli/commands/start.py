@@ -9,33 +9,69 @@ import os.path
 import pwd
 
 import click
-import daemon
-import daemon.pidfile
 
 from .. import params
-from ..base import mymcadmin, cli_command, rpc_command, error, success
-from ... import (
-    errors,
-    manager,
-    rpc,
-    utils,
+from ..base import (
+    mymcadmin,
+    cli_command,
+    rpc_command,
+    error,
+    result_table,
+    server_selectors,
+    success,
 )
+from ... import config, errors, rpc, utils
+
+# Settings in the daemon section of the config file that tune the daemon
+DAEMON_OPTIONS = [
+    'max_parallel_ops',
+    'max_concurrent_requests',
+    'artifact_cache_size',
+    'autostart_concurrency',
+    'autostart_timeout',
+    'stats_interval',
+    'stats_history',
+    'metrics_host',
+    'metrics_port',
+    'slow_rpc_threshold',
+]
 
 @mymcadmin.command()
-@click.argument('server_id')
+@click.argument('server_ids', nargs = -1)
+@click.option(
+    '--tag',
+    'tags',
+    multiple = True,
+    help     = 'Also act on the servers with this tag')
+@click.option(
+    '--wait/--no-wait',
+    default = False,
+    help    = 'Wait for the servers to finish loading')
 @cli_command
 @rpc_command
-def start(rpc_conn, server_id):
+def start(rpc_conn, server_ids, tags, wait):
     """
-    Start a Minecraft server
+    Start Minecraft servers by ID, glob pattern (such as "lobby-*") or tag
     """
 
-    click.echo('Starting {}...'.format(server_id), nl = False)
+    selectors = server_selectors(server_ids, tags)
+
+    if selectors is None:
+        server_id = server_ids[0]
+
+        click.echo('Starting {}...'.format(server_id), nl = False)
+
+        with rpc.RpcClient(*rpc_conn) as rpc_client:
+            rpc_client.server_start(server_id, wait = wait)
+
+        success('Success')
+
+        return
 
     with rpc.RpcClient(*rpc_conn) as rpc_client:
-        rpc_client.server_start(server_id)
+        result = rpc_client.server_start_all(selectors, wait = wait)
 
-    success('Success')
+    result_table(result, 'started', 'already running')
 
 @mymcadmin.command()
 @cli_command
@@ -66,6 +102,11 @@ def start_all(rpc_conn):
     type    = click.INT,
     default = None,
     help    = 'The port to listen on')
+@click.option(
+    '--socket',
+    type    = click.Path(dir_okay = False),
+    default = None,
+    help    = 'A Unix socket to listen on as well')
 @click.option(
     '--user',
     type    = params.User(),
@@ -115,22 +156,6 @@ def start_daemon(ctx, **kwargs):
 
         return value
 
-    def _convert_user(user):
-        if isinstance(user, int):
-            pwd.getpwuid(user)
-
-            return user
-        else:
-            return pwd.getpwnam(user).pw_uid
-
-    def _convert_group(group):
-        if isinstance(group, int):
-            grp.getgrgid(group)
-
-            return group
-        else:
-            return grp.getgrnam(group).gr_gid
-
     host  = _get_option('host', 'localhost')
     port  = _get_option('port', 2323)
     user  = _get_option('user', os.getuid(), convert = _convert_user)
@@ -144,6 +169,15 @@ def start_daemon(ctx, **kwargs):
     pid = _get_option('pid', os.path.join(root, 'daemon.pid'))
     log = _get_option('log', os.path.join(root, 'mymcadmin.log'))
 
+    options = config.DaemonOptions(
+        {
+            name: daemon_config.get(name)
+            for name in DAEMON_OPTIONS
+        },
+        socket_path = _get_option('socket', None),
+        socket_mode = _convert_mode(daemon_config.get('socket_mode')),
+    )
+
     click.echo(
         'Starting daemon as {} {} on {}:{}...'.format(
             user,
@@ -167,6 +201,9 @@ def start_daemon(ctx, **kwargs):
             'root':  root,
             'pid':   pid,
             'log':   log,
+
+            'options': options,
+            'cache':   ctx.obj['config'].cache,
         },
     )
 
@@ -175,11 +212,46 @@ def start_daemon(ctx, **kwargs):
 
     success('Success')
 
+def _convert_user(user):
+    if isinstance(user, int):
+        pwd.getpwuid(user)
+
+        return user
+    else:
+        return pwd.getpwnam(user).pw_uid
+
+def _convert_group(group):
+    if isinstance(group, int):
+        grp.getgrgid(group)
+
+        return group
+    else:
+        return grp.getgrnam(group).gr_gid
+
+def _convert_mode(mode):
+    # JSON has no octal numbers so modes can be given as strings like "0660"
+    if not isinstance(mode, str):
+        return mode
+
+    try:
+        return int(mode, 8)
+    except ValueError:
+        raise click.ClickException(
+            'Configuration value is not valid. socket_mode: {}'.format(mode)
+        )
+
 def start_management_daemon(**kwargs):
     """
     Start the management daemon
     """
 
+    # The daemon's dependencies are only needed here so they're imported here
+    # to keep the other commands quick to start
+    import daemon
+    import daemon.pidfile
+
+    from ... import cache, manager
+
     daemon_log = open(kwargs['log'], 'a')
 
     with daemon.DaemonContext(
@@ -193,10 +265,21 @@ def start_management_daemon(**kwargs):
         ):
         utils.setup_logging()
 
+        cache_config = kwargs.get('cache') or {}
+        cache.configure(
+            path    = cache_config.get(
+                'path',
+                os.path.join(kwargs['root'], '.cache'),
+            ),
+            ttl     = cache_config.get('ttl'),
+            offline = cache_config.get('offline', False),
+        )
+
         proc = manager.Manager(
             kwargs['host'],
             kwargs['port'],
             kwargs['root'],
+            options = kwargs.get('options'),
         )
         proc.run()
 
@@ -4,24 +4,55 @@ CLI commands for stopping Minecraft servers
 
 import click
 
-from ..base import mymcadmin, cli_command, rpc_command, error, success
+from ..base import (
+    mymcadmin,
+    cli_command,
+    rpc_command,
+    error,
+    result_table,
+    server_selectors,
+    success,
+    warn,
+)
 from ... import rpc
 
 @mymcadmin.command()
-@click.argument('server_id')
+@click.argument('server_ids', nargs = -1)
+@click.option(
+    '--tag',
+    'tags',
+    multiple = True,
+    help     = 'Also act on the servers with this tag')
 @cli_command
 @rpc_command
-def stop(rpc_conn, server_id):
+def stop(rpc_conn, server_ids, tags):
     """
-    Stop a Minecraft server
+    Stop Minecraft servers by ID, glob pattern (such as "lobby-*") or tag
     """
 
-    click.echo('Attempting to stop {}...'.format(server_id), nl = False)
+    selectors = server_selectors(server_ids, tags)
+
+    if selectors is None:
+        server_id = server_ids[0]
+
+        click.echo('Attempting to stop {}...'.format(server_id), nl = False)
+
+        with rpc.RpcClient(*rpc_conn) as rpc_client:
+            rpc_client.server_stop(server_id)
+
+        success('Success')
+
+        return
 
     with rpc.RpcClient(*rpc_conn) as rpc_client:
-        rpc_client.server_stop(server_id)
+        result = rpc_client.server_stop_all(selectors)
 
-    success('Success')
+    result_table(
+        result,
+        'stopped',
+        'not running',
+        details = result.get('terminations'),
+    )
 
 @mymcadmin.command()
 @cli_command
@@ -34,13 +65,21 @@ def stop_all(rpc_conn):
     with rpc.RpcClient(*rpc_conn) as rpc_client:
         result = rpc_client.server_stop_all()
 
-        successful = result['success']
-        failure    = result['failure']
+        successful   = result['success']
+        failure      = result['failure']
+        terminations = result.get('terminations', {})
 
     click.echo('Stopping all servers...')
 
     for server_id in successful:
-        success('{} successfully stopped'.format(server_id))
+        termination = terminations.get(server_id, 'stopped')
+        if termination == 'stopped':
+            success('{} successfully stopped'.format(server_id))
+        else:
+            warn('{} did not stop in time and was {}'.format(
+                server_id,
+                termination,
+            ))
 
     for server_id in failure:
         error('{} did not stop properly'.format(server_id))
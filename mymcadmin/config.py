@@ -38,3 +38,44 @@ class Config(object):
         return self._config.get(name)
 # pylint: enable=too-few-public-methods
 
+class DaemonOptions(object):
+    """
+    Options for tuning the management daemon, such as those from the daemon
+    section of the config file. Options that weren't given are None.
+    """
+
+    def __init__(self, options = None, **kwargs):
+        self._options = {
+            name: value
+            for name, value in dict(options or {}, **kwargs).items()
+            if value is not None
+        }
+
+    def __getattr__(self, name):
+        # Keeps copying and pickling from looking up missing internals here
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        return self._options.get(name)
+
+    def __eq__(self, other):
+        return isinstance(other, DaemonOptions) and \
+            self._options == other._options
+
+    def __repr__(self):
+        return 'DaemonOptions({!r})'.format(self._options)
+
+    def with_defaults(self, defaults):
+        """
+        Get a copy of the options using the defaults for any that weren't
+        given
+        """
+
+        return DaemonOptions(dict(defaults, **self._options))
+
+    def replace(self, **kwargs):
+        """
+        Get a copy of the options with some of them changed
+        """
+
+        return DaemonOptions(self._options, **kwargs)
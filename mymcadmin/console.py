@@ -0,0 +1,200 @@
+"""
+Console handling for Minecraft server processes
+"""
+
+import asyncio
+import collections
+import logging
+import re
+import time
+
+from . import errors
+
+# Start of a message logged by the server itself rather than repeated from a
+# player. Forge adds the name of the logger before the colon.
+SERVER_MESSAGE_PREFIX = r'\[Server thread/INFO\](?: \[[^\]]*\])?: '
+
+# Logged by the server once it has finished loading the world
+READY_PATTERN = re.compile(SERVER_MESSAGE_PREFIX + r'Done \(\d+(\.\d+)?s\)!')
+
+# Logged by the server once save-all has finished writing the world
+SAVED_PATTERN = re.compile(SERVER_MESSAGE_PREFIX + r'Saved the (game|world)')
+
+class OutputBuffer(object):
+    """
+    A bounded ring buffer of console output from a server. The buffer is capped
+    both by the number of lines and by the total size of the lines it holds so
+    that a chatty server can't eat all of the management process's memory.
+    """
+
+    DEFAULT_MAX_LINES = 1000
+    DEFAULT_MAX_BYTES = 256 * 1024
+
+    def __init__(self, max_lines = None, max_bytes = None):
+        if max_lines is None:
+            max_lines = OutputBuffer.DEFAULT_MAX_LINES
+
+        if max_bytes is None:
+            max_bytes = OutputBuffer.DEFAULT_MAX_BYTES
+
+        if max_lines < 1:
+            raise ValueError('Output buffer must hold at least one line')
+
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.size      = 0
+
+        self._lines     = collections.deque()
+        self._listeners = []
+
+    def subscribe(self, listener):
+        """
+        Register a function to be called with the stream name and line for
+        every line added to the buffer
+        """
+
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """
+        Stop calling a function registered with subscribe
+        """
+
+        self._listeners.remove(listener)
+
+    def append(self, stream, line):
+        """
+        Add a line of output to the buffer, evicting the oldest lines if the
+        buffer is full
+        """
+
+        for listener in list(self._listeners):
+            listener(stream, line)
+
+        # Don't let a single huge line push everything else out of the buffer
+        if len(line) > self.max_bytes:
+            line = line[:self.max_bytes]
+
+        self._lines.append((time.time(), stream, line))
+        self.size += len(line)
+
+        while len(self._lines) > self.max_lines or self.size > self.max_bytes:
+            _, _, old_line = self._lines.popleft()
+            self.size -= len(old_line)
+
+    def tail(self, count = None):
+        """
+        Get the most recent lines of output
+        """
+
+        lines = list(self._lines)
+        if count is not None:
+            lines = lines[-count:] if count > 0 else []
+
+        return [
+            {
+                'time':   timestamp,
+                'stream': stream,
+                'line':   line,
+            }
+            for timestamp, stream, line in lines
+        ]
+
+    def __len__(self):
+        return len(self._lines)
+
+class CommandWriter(object):
+    """
+    A persistent channel for sending console commands to a server. Commands
+    are queued and written by a single writer task which batches everything
+    that was queued while it was waiting on the pipe into a single write.
+    """
+
+    DEFAULT_MAX_QUEUED = 1000
+
+    def __init__(self, stream, max_queued = None):
+        if max_queued is None:
+            max_queued = CommandWriter.DEFAULT_MAX_QUEUED
+
+        self.stream     = stream
+        self.max_queued = max_queued
+
+        self._pending = []
+        self._closed  = False
+        self._wakeup  = asyncio.Event()
+
+    def send(self, command):
+        """
+        Queue a command to be sent to the server. This returns immediately, the
+        command will be written by the writer task.
+        """
+
+        if self._closed:
+            raise errors.ServerError('Server console is closed')
+
+        if '\n' in command or '\r' in command:
+            raise errors.ServerError('Console commands must be a single line')
+
+        if len(self._pending) >= self.max_queued:
+            raise errors.ServerError(
+                'Too many console commands are waiting to be sent',
+            )
+
+        self._pending.append(command)
+        self._wakeup.set()
+
+    def close(self):
+        """
+        Stop accepting commands. The writer task will exit once any queued
+        commands have been written.
+        """
+
+        self._closed = True
+        self._wakeup.set()
+
+    async def run(self):
+        """
+        Write queued commands to the stream until the writer is closed
+        """
+
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            if self._pending:
+                data = ''.join(
+                    command + '\n'
+                    for command in self._pending
+                )
+                self._pending = []
+
+                try:
+                    self.stream.write(data.encode())
+                    await self.stream.drain()
+                except (BrokenPipeError, ConnectionResetError):
+                    logging.warning('Server console closed unexpectedly')
+                    self._closed = True
+
+            if self._closed:
+                break
+
+async def drain_stream(stream, output, name):
+    """
+    Continuously read lines from a process stream into an output buffer until
+    the stream is closed. Keeping the pipe empty prevents the server from
+    blocking when the OS pipe buffer fills up.
+    """
+
+    while True:
+        try:
+            line = await stream.readline()
+        except ValueError:
+            # The line was longer than the stream's buffer limit. The stream
+            # discards the oversized data so we just note that it happened.
+            logging.warning('Discarding overly long line from %s', name)
+            continue
+
+        if not line:
+            break
+
+        output.append(name, line.decode('utf-8', 'replace').rstrip('\r\n'))
@@ -0,0 +1,366 @@
+"""
+Download engine for large files such as server jars
+"""
+
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import os.path
+import threading
+
+import requests
+
+from . import errors
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_SEGMENTS   = 4
+
+PART_SUFFIX     = '.part'
+SEGMENTS_SUFFIX = '.segments'
+
+def download_file(url, path, sha1 = None, segments = 1, chunk_size = None):
+    """
+    Download a file and save it at the specified path. The file is written to
+    a ".part" file next to the destination and only moved into place once it
+    has been completely downloaded and its SHA1 verified.
+
+    A partial file left behind by an earlier attempt is resumed using an HTTP
+    Range request when the server supports it. If segments is more than one
+    and the server supports ranges then the file is split into that many
+    pieces which are downloaded in parallel. How much of each piece has been
+    written is kept in a ".segments" file next to the partial file so that
+    those can be resumed too.
+    """
+
+    if chunk_size is None:
+        chunk_size = DEFAULT_CHUNK_SIZE
+
+    part_path     = path + PART_SUFFIX
+    segments_path = part_path + SEGMENTS_SUFFIX
+
+    # A partial file from a single stream can only be resumed as one
+    if os.path.exists(part_path) and not os.path.exists(segments_path):
+        segments = 1
+
+    size = None
+    if segments > 1:
+        size = _get_ranged_size(url)
+
+    try:
+        if size is not None and size >= segments * chunk_size:
+            file_sha = _download_segments(
+                url,
+                part_path,
+                size,
+                segments,
+                chunk_size,
+            )
+        else:
+            # The pieces of a segmented download have gaps between them
+            if os.path.exists(segments_path):
+                _remove(part_path)
+                _remove(segments_path)
+
+            file_sha = _download_stream(url, part_path, chunk_size)
+    except requests.RequestException as ex:
+        raise errors.DownloadError(
+            'Unable to download {}: {}',
+            url,
+            str(ex),
+        )
+    except IOError as ex:
+        raise errors.DownloadError(
+            'There was a problem saving a file: {}',
+            str(ex),
+        )
+
+    if sha1 is not None and file_sha != sha1.lower():
+        _remove(part_path)
+        _remove(segments_path)
+
+        raise errors.DownloadError(
+            'Downloaded file\'s SHA1 did not match expected' +
+            ' Was {}, should be {}',
+            file_sha,
+            sha1,
+        )
+
+    os.replace(part_path, path)
+
+    return path
+
+def _download_stream(url, part_path, chunk_size):
+    file_sha = hashlib.sha1()
+    offset   = _hash_file(part_path, file_sha, chunk_size)
+
+    headers = {}
+    if offset:
+        logging.info('Resuming download of %s at byte %d', url, offset)
+        headers['Range'] = 'bytes={}-'.format(offset)
+
+    resp = requests.get(url, headers = headers, stream = True)
+    try:
+        if offset and resp.status_code == 416:
+            # We already have the whole file
+            return file_sha.hexdigest()
+
+        if not resp.ok:
+            raise errors.DownloadError(
+                'Unable to download {}: HTTP status {}',
+                url,
+                resp.status_code,
+            )
+
+        mode = 'ab'
+        if resp.status_code != 206:
+            # The server ignored the range so start over
+            file_sha = hashlib.sha1()
+            mode     = 'wb'
+
+        with open(part_path, mode) as file_handle:
+            for chunk in resp.iter_content(chunk_size = chunk_size):
+                # Ignore keep-alive chunks
+                if not chunk:
+                    continue
+
+                file_handle.write(chunk)
+                file_sha.update(chunk)
+    finally:
+        resp.close()
+
+    return file_sha.hexdigest()
+
+def _download_segments(url, part_path, size, segments, chunk_size):
+    segments_path = part_path + SEGMENTS_SUFFIX
+
+    ranges  = _load_segments(segments_path, part_path, size)
+    resumed = ranges is not None
+
+    if resumed:
+        logging.info('Resuming segmented download of %s', url)
+    else:
+        segment_size = -(-size // segments)
+        ranges       = [
+            {
+                'start':  start,
+                'end':    min(start + segment_size, size),
+                'offset': start,
+            }
+            for start in range(0, size, segment_size)
+        ]
+
+    progress = _SegmentProgress(part_path, segments_path, ranges)
+
+    # The segments are recorded first so the file is never mistaken for a
+    # partial single stream
+    progress.save()
+
+    if not resumed:
+        with open(part_path, 'wb') as file_handle:
+            file_handle.truncate(size)
+
+    with concurrent.futures.ThreadPoolExecutor(len(ranges)) as executor:
+        futures = [
+            executor.submit(
+                _download_segment,
+                url,
+                part_path,
+                segment,
+                progress,
+                chunk_size,
+            )
+            for segment in ranges
+            if segment['offset'] < segment['end']
+        ]
+
+        for future in futures:
+            future.result()
+
+    _remove(segments_path)
+
+    return progress.hexdigest()
+
+def _download_segment(url, part_path, segment, progress, chunk_size):
+    start = segment['offset']
+    end   = segment['end'] - 1
+
+    headers = {'Range': 'bytes={}-{}'.format(start, end)}
+
+    resp = requests.get(url, headers = headers, stream = True)
+    try:
+        if resp.status_code != 206:
+            raise errors.DownloadError(
+                'Unable to download bytes {}-{} of {}: HTTP status {}',
+                start,
+                end,
+                url,
+                resp.status_code,
+            )
+
+        with open(part_path, 'r+b') as file_handle:
+            file_handle.seek(start)
+
+            for chunk in resp.iter_content(chunk_size = chunk_size):
+                if not chunk:
+                    continue
+
+                file_handle.write(chunk)
+                file_handle.flush()
+
+                progress.written(segment, chunk)
+
+        if segment['offset'] != segment['end']:
+            raise errors.DownloadError(
+                'Download of bytes {}-{} of {} was incomplete',
+                start,
+                end,
+                url,
+            )
+    finally:
+        resp.close()
+
+def _load_segments(segments_path, part_path, size):
+    """
+    Get the segments of an earlier download of the file if it can be resumed
+    """
+
+    try:
+        with open(segments_path, 'r') as file_handle:
+            progress = json.load(file_handle)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(progress, dict) or progress.get('size') != size:
+        return None
+
+    if not os.path.exists(part_path) or os.path.getsize(part_path) != size:
+        return None
+
+    return progress.get('segments')
+
+class _SegmentProgress(object):
+    """
+    Tracks how much of each segment has been written and hashes the file in
+    order as it arrives. A chunk that comes next in the file is hashed as
+    it's written, anything written ahead of that is read back from the file
+    once everything before it has been hashed.
+    """
+
+    def __init__(self, part_path, segments_path, segments):
+        self.part_path     = part_path
+        self.segments_path = segments_path
+        self.segments      = sorted(segments, key = lambda seg: seg['start'])
+        self.file_sha      = hashlib.sha1()
+        self.hashed        = 0
+        self.lock          = threading.Lock()
+
+        with self.lock:
+            self._catch_up()
+
+    def written(self, segment, chunk):
+        """
+        Record a chunk that was written at the end of a segment
+        """
+
+        with self.lock:
+            if segment['offset'] == self.hashed:
+                self.file_sha.update(chunk)
+                self.hashed += len(chunk)
+
+            segment['offset'] += len(chunk)
+
+            self._catch_up()
+            self.save()
+
+    def save(self):
+        """
+        Save the progress of the segments so the download can be resumed
+        """
+
+        temp_path = self.segments_path + '.tmp'
+
+        with open(temp_path, 'w') as file_handle:
+            json.dump(
+                {
+                    'size':     self.segments[-1]['end'],
+                    'segments': self.segments,
+                },
+                file_handle,
+            )
+
+        os.replace(temp_path, self.segments_path)
+
+    def hexdigest(self):
+        """
+        Get the SHA1 of the file once every segment has been written
+        """
+
+        return self.file_sha.hexdigest()
+
+    def _catch_up(self):
+        for segment in self.segments:
+            if segment['end'] <= self.hashed:
+                continue
+
+            if segment['offset'] > self.hashed:
+                self._hash_range(self.hashed, segment['offset'])
+
+            if segment['offset'] < segment['end']:
+                break
+
+    def _hash_range(self, start, end):
+        with open(self.part_path, 'rb') as file_handle:
+            file_handle.seek(start)
+
+            while start < end:
+                chunk = file_handle.read(min(DEFAULT_CHUNK_SIZE, end - start))
+                if not chunk:
+                    break
+
+                self.file_sha.update(chunk)
+                start += len(chunk)
+
+        self.hashed = start
+
+def _get_ranged_size(url):
+    """
+    Get the size of a file if the server supports downloading it in ranges
+    """
+
+    try:
+        resp = requests.head(url, allow_redirects = True)
+    except requests.RequestException:
+        return None
+
+    if not resp.ok or resp.headers.get('Accept-Ranges') != 'bytes':
+        return None
+
+    try:
+        return int(resp.headers['Content-Length'])
+    except (KeyError, ValueError):
+        return None
+
+def _hash_file(path, file_sha, chunk_size):
+    """
+    Feed the contents of a file into a hash, returning the number of bytes
+    read
+    """
+
+    if not os.path.exists(path):
+        return 0
+
+    size = 0
+    with open(path, 'rb') as file_handle:
+        for chunk in iter(lambda: file_handle.read(chunk_size), b''):
+            file_sha.update(chunk)
+            size += len(chunk)
+
+    return size
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
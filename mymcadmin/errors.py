@@ -64,6 +64,11 @@ class ServerSettingsError(ServerError):
     An error in the MyMCAdmin settings for the server
     """
 
+class ServerPropertiesError(ServerError):
+    """
+    An error in a change to the Minecraft server properties
+    """
+
 class VersionDoesNotExistError(ManagerError):
     """
     Version does not exist
@@ -80,3 +85,12 @@ class ForgeError(MyMCAdminError):
     A general error when working with Forge
     """
 
+class BackupError(MyMCAdminError):
+    """
+    An error when making or restoring a server backup
+    """
+
+class RegionFileError(MyMCAdminError):
+    """
+    Raised when a Minecraft region file can't be read
+    """
@@ -0,0 +1,91 @@
+"""
+Caching for files that are parsed on the local disk, such as the server
+settings and properties
+"""
+
+import os
+import threading
+
+class FileCache(object):
+    """
+    An in memory cache of parsed files keyed by their path. Each read checks
+    the file with a stat and the cached copy is used as long as the file's
+    modification time, size and inode haven't changed, so a file that hasn't
+    changed is never parsed twice.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock    = threading.Lock()
+
+    def get(self, path, parse):
+        """
+        Get the parsed contents of a file, calling parse with the path if the
+        file has changed since it was last read. Raises FileNotFoundError if
+        the file doesn't exist.
+        """
+
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.invalidate(path)
+            raise
+
+        key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+        with self._lock:
+            entry = self._entries.get(path)
+
+        if entry is not None and entry[0] == key:
+            return entry[1]
+
+        # The stat is taken before the file is read so a change made while
+        # parsing is picked up by the next read
+        value = parse(path)
+
+        with self._lock:
+            self._entries[path] = (key, value)
+
+        return value
+
+    def invalidate(self, path):
+        """
+        Forget the cached copy of a file
+        """
+
+        with self._lock:
+            self._entries.pop(path, None)
+
+    def clear(self):
+        """
+        Remove everything from the cache
+        """
+
+        with self._lock:
+            self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+_DEFAULT_CACHE = FileCache()
+
+def get(path, parse):
+    """
+    Get the parsed contents of a file through the default cache
+    """
+
+    return _DEFAULT_CACHE.get(path, parse)
+
+def invalidate(path):
+    """
+    Forget the cached copy of a file in the default cache
+    """
+
+    _DEFAULT_CACHE.invalidate(path)
+
+def clear():
+    """
+    Remove everything from the default cache
+    """
+
+    _DEFAULT_CACHE.clear()
@@ -9,7 +9,7 @@ import urllib.parse
 import bs4
 import requests
 
-from . import errors, utils
+from . import download, errors
 
 FORGE_MC_VERSION_URL = \
     'http://files.minecraftforge.net/maven/net/minecraftforge/forge/index_{}.html'
@@ -39,11 +39,12 @@ def get_forge_mc_versions():
         for v in versions
     ]
 
-def get_forge_version(mc_version, forge_version, path = None):
+def get_forge_version(mc_version, forge_version, path = None, store = None):
     """
     Download Forge by a specific Forge version. Optionally
     you can specify a specific location to store the download
-    otherwise defaults to the current directory.
+    otherwise defaults to the current directory. If an artifact
+    store is given then previously downloaded jars are reused.
     """
 
     minecraft_versions = get_forge_mc_versions()
@@ -76,20 +77,21 @@ def get_forge_version(mc_version, forge_version, path = None):
         version = release.find('td').text.strip()
 
         if version == forge_version:
-            return _get_forge_build(path, release)
+            return _get_forge_build(path, release, store)
 
     raise errors.ForgeError(
         'Could not find Forge version {}',
         forge_version,
     )
 
-def get_forge_for_mc_version(version_id, path = None):
+def get_forge_for_mc_version(version_id, path = None, store = None):
     """
     Download Forge for a specific Minecraft version. This will
     be the latest recommended release for the given Minecraft
     version. Optionally you can specify a specific location to
     store the download otherwise defaults to the current
-    directory.
+    directory. If an artifact store is given then previously
+    downloaded jars are reused.
     """
 
     minecraft_versions = get_forge_mc_versions()
@@ -120,12 +122,12 @@ def get_forge_for_mc_version(version_id, path = None):
     # Try getting the recommended build
     build = downloads.find(class_ = 'promo-RECOMMENDED')
     if build is not None:
-        return _get_forge_build(path, build)
+        return _get_forge_build(path, build, store)
 
     # Try getting the latest build
     build = downloads.find(class_ = 'promo-LATEST')
     if build is not None:
-        return _get_forge_build(path, build)
+        return _get_forge_build(path, build, store)
 
     raise errors.ForgeError('No builds viable Forge version found')
 
@@ -158,24 +160,39 @@ def _get_forge_build_info(tag):
 
     return (inst_url, inst_sha, inst_jar, uni_url, uni_sha, uni_jar)
 
-def _get_forge_build(path, promo_tag):
+def _get_forge_build(path, promo_tag, store = None):
     inst_url, inst_sha, inst_jar, uni_url, uni_sha, uni_jar = \
             _get_forge_build_info(promo_tag)
 
     inst_jar = os.path.join(path, inst_jar)
     uni_jar  = os.path.join(path, uni_jar)
 
-    resp = requests.get(inst_url, stream = True)
-    if not resp.ok:
-        raise errors.ForgeError('Could not download Forge installer')
-
-    utils.download_file(resp, inst_jar, inst_sha)
-
-    resp = requests.get(uni_url, stream = True)
-    if not resp.ok:
-        raise errors.ForgeError('Could not download Forge jar')
+    _download_forge_jar(
+        inst_url,
+        inst_sha,
+        inst_jar,
+        store,
+        'Could not download Forge installer',
+    )
 
-    utils.download_file(resp, uni_jar, uni_sha)
+    _download_forge_jar(
+        uni_url,
+        uni_sha,
+        uni_jar,
+        store,
+        'Could not download Forge jar',
+    )
 
     return (inst_jar, uni_jar)
 
+def _download_forge_jar(url, sha, path, store, error_message):
+    def _download(dest):
+        try:
+            download.download_file(url, dest, sha1 = sha)
+        except errors.DownloadError:
+            raise errors.ForgeError(error_message)
+
+    if store is None:
+        _download(path)
+    else:
+        store.fetch(sha, path, _download)
@@ -4,30 +4,97 @@ Management process for Minecraft servers.
 
 import asyncio
 import asyncio.subprocess
+import functools
 import logging
 import os.path
-
-from . import errors, forge as forge_utils, rpc, server
+import time
+
+from . import (
+    artifacts,
+    config,
+    console,
+    errors,
+    forge as forge_utils,
+    manager_backups,
+    manager_groups,
+    manager_state,
+    metrics,
+    procstats,
+    properties as properties_utils,
+    registry,
+    rpc,
+    server,
+    supervisor,
+)
 from .rpc import errors as rpc_errors
 
-class Manager(object):
+class Manager(manager_backups.BackupCommandsMixin, manager_groups.GroupCommandsMixin):
     """
     Minecraft server management system.
     """
 
-    def __init__(self, host, port, root, event_loop = None):
+    ARTIFACTS_DIR             = '.artifacts'
+    DEFAULT_MAX_PARALLEL_OPS  = 8
+    DEFAULT_STOP_TIMEOUT      = 60
+    DEFAULT_TERMINATE_TIMEOUT = 10
+    DEFAULT_AUTOSTART_TIMEOUT = 5 * 60
+    DEFAULT_SOCKET_MODE       = 0o660
+
+    STATE_STARTING = 'starting'
+    STATE_READY    = 'ready'
+    STATE_STOPPING = 'stopping'
+    STATE_STOPPED  = 'stopped'
+    STATE_CRASHED  = 'crashed'
+
+    BOOT_TIME_BUCKETS = [5, 10, 15, 30, 45, 60, 90, 120, 180, 300, 600]
+
+    STATES = [
+        STATE_STARTING,
+        STATE_READY,
+        STATE_STOPPING,
+        STATE_STOPPED,
+        STATE_CRASHED,
+    ]
+
+    def __init__(self, host, port, root, event_loop = None, options = None):
         logging.info('Setting up event loop')
 
         if event_loop is None:
             event_loop = asyncio.get_event_loop()
 
-        self.host           = host
-        self.port           = port
-        self.root           = root
-        self.event_loop     = event_loop
-        self.instances      = {}
-        self.network_task   = None
-        self.rpc_dispatcher = rpc.Dispatcher()
+        if options is None:
+            options = config.DaemonOptions()
+
+        self.event_loop = event_loop
+        self.options    = options.with_defaults(
+            {
+                'max_parallel_ops':      Manager.DEFAULT_MAX_PARALLEL_OPS,
+                # Booting servers is CPU heavy so leave room for the ones
+                # already running
+                'autostart_concurrency': max(1, (os.cpu_count() or 1) // 2),
+                'autostart_timeout':     Manager.DEFAULT_AUTOSTART_TIMEOUT,
+                'metrics_host':          host,
+                'socket_mode':           Manager.DEFAULT_SOCKET_MODE,
+            }
+        ).replace(host = host, port = port)
+
+        self.servers    = registry.ServerRegistry(root)
+        self.artifacts  = artifacts.ArtifactStore(
+            os.path.join(root, Manager.ARTIFACTS_DIR),
+            max_size = self.options.artifact_cache_size,
+        )
+        self.rpc_server = rpc.RpcServer(
+            rpc.Dispatcher(),
+            rpc.RpcStats(slow_threshold = self.options.slow_rpc_threshold),
+            max_concurrent_requests = self.options.max_concurrent_requests,
+        )
+        self.procs      = manager_state.ServerProcesses(
+            procstats.ProcessSampler(
+                interval = self.options.stats_interval,
+                history  = self.options.stats_history,
+            )
+        )
+        self.status     = manager_state.ServerStatus()
 
         self._setup_rpc_handlers()
 
@@ -36,29 +103,66 @@ class Manager(object):
         Start and run the management process
         """
 
+        # Refuse to start before anything else is set up if another daemon is
+        # already using the socket
+        if self.options.socket_path is not None:
+            rpc.RpcServer.remove_stale_socket(self.options.socket_path)
+
         logging.info('Setting up network connection')
-        self.network_task = self.event_loop.create_task(
-            asyncio.start_server(
-                self.handle_network_connection,
-                self.host,
-                self.port,
+        self.event_loop.create_task(
+            self.rpc_server.start_server(
+                self.options.host,
+                self.options.port,
                 loop = self.event_loop,
             )
         )
 
-        logging.info('Auto starting servers')
-        for server_path in self._get_all_server_paths():
-            server_instance = server.Server(server_path)
-            autostart = server_instance.settings.get('autostart', False)
+        if self.options.socket_path is not None:
+            logging.info('Listening on socket %s', self.options.socket_path)
+            self.event_loop.create_task(
+                self.rpc_server.start_unix_server(
+                    self.options.socket_path,
+                    self.options.socket_mode,
+                    loop = self.event_loop,
+                )
+            )
 
-            if not autostart:
-                continue
+        if self.options.metrics_port is not None:
+            logging.info(
+                'Serving metrics on %s:%s',
+                self.options.metrics_host,
+                self.options.metrics_port,
+            )
 
-            logging.info('Starting server %s', server_instance.server_id)
             self.event_loop.create_task(
-                self.start_server_proc(server_instance)
+                asyncio.start_server(
+                    functools.partial(
+                        metrics.handle_connection,
+                        render = self._collect_metrics,
+                    ),
+                    self.options.metrics_host,
+                    self.options.metrics_port,
+                    loop = self.event_loop,
+                )
             )
 
+        logging.info('Auto starting servers')
+        self.servers.refresh(force = True)
+
+        autostart_servers = []
+        for server_instance in self.servers.servers():
+            autostart = server_instance.settings.get('autostart', False)
+
+            if autostart:
+                autostart_servers.append(server_instance)
+
+        self.procs.autostart = self.event_loop.create_task(
+            self.autostart_servers(autostart_servers)
+        )
+
+        logging.info('Starting resource usage sampler')
+        self.event_loop.create_task(self.procs.sampler.run(self.procs.instances))
+
         logging.info('Management process running')
         try:
             self.event_loop.run_forever()
@@ -68,22 +172,36 @@ class Manager(object):
             self.event_loop.run_until_complete(asyncio.gather(*remaining_tasks))
             logging.info('Shutting down management process')
             self.event_loop.close()
+
+            if self.options.socket_path is not None:
+                rpc.RpcServer.remove_socket(self.options.socket_path)
+
             logging.info('Management process terminated')
 
     def _setup_rpc_handlers(self):
         logging.info('Setting up JSON RPC handlers')
 
-        self.rpc_dispatcher.add_dict(
+        self.rpc_server.dispatcher.add_dict(
             {
-                'list_servers':       self.rpc_command_list_servers,
-                'server_create':      self.rpc_command_server_create,
-                'server_restart':     self.rpc_command_server_restart,
-                'server_restart_all': self.rpc_command_server_restart_all,
-                'server_start':       self.rpc_command_server_start,
-                'server_start_all':   self.rpc_command_server_start_all,
-                'server_stop':        self.rpc_command_server_stop,
-                'server_stop_all':    self.rpc_command_server_stop_all,
-                'shutdown':           self.rpc_command_shutdown,
+                'list_servers':          self.rpc_command_list_servers,
+                'rpc_stats':             self.rpc_command_rpc_stats,
+                'server_backup':         self.rpc_command_server_backup,
+                'server_backups':        self.rpc_command_server_backups,
+                'server_command':        self.rpc_command_server_command,
+                'server_create':         self.rpc_command_server_create,
+                'server_logs':           self.rpc_command_server_logs,
+                'server_properties_get': self.rpc_command_properties_get,
+                'server_properties_set': self.rpc_command_properties_set,
+                'server_restore':        self.rpc_command_server_restore,
+                'server_restart':        self.rpc_command_server_restart,
+                'server_restart_all':    self.rpc_command_server_restart_all,
+                'server_start':          self.rpc_command_server_start,
+                'server_start_all':      self.rpc_command_server_start_all,
+                'server_stats':          self.rpc_command_server_stats,
+                'server_status':         self.rpc_command_server_status,
+                'server_stop':           self.rpc_command_server_stop,
+                'server_stop_all':       self.rpc_command_server_stop_all,
+                'shutdown':              self.rpc_command_shutdown,
             }
         )
 
@@ -92,10 +210,33 @@ class Manager(object):
         Handle RPC command: listServers
         """
 
-        return [
-            os.path.basename(server_path)
-            for server_path in self._get_all_server_paths()
-        ]
+        return self.servers.server_ids()
+
+    async def rpc_command_rpc_stats(self):
+        """
+        Handle RPC command: rpc_stats
+        """
+
+        return self.rpc_server.stats.as_dict()
+
+    @rpc.required_param('server_id')
+    @rpc.required_param('command')
+    async def rpc_command_server_command(self, server_id, command):
+        """
+        Handle RPC command: server_command
+        """
+
+        if self._get_proc_by_id(server_id) is None:
+            raise rpc_errors.JsonRpcInvalidRequestError(
+                'Server {} was not running',
+                server_id,
+            )
+
+        logging.info('Sending command "%s" to server %s', command, server_id)
+
+        self._send_to_server(server_id, command)
+
+        return server_id
 
     @rpc.required_param('server_id')
     async def rpc_command_server_create(self, server_id, version = None, forge = None):
@@ -105,7 +246,7 @@ class Manager(object):
 
         logging.info('Preparing to create server %s', server_id)
 
-        server_path = os.path.join(self.root, server_id)
+        server_path = os.path.join(self.servers.root, server_id)
 
         if os.path.exists(server_path):
             raise errors.ServerExistsError(server_id)
@@ -114,10 +255,16 @@ class Manager(object):
         os.mkdir(server_path)
 
         logging.info('Downloading server jar')
-        jar = server.Server.download_server_jar(version, path = server_path)
+        jar = await self._run_in_executor(
+            server.Server.download_server_jar,
+            version,
+            path  = server_path,
+            store = self.artifacts,
+        )
 
         logging.info('Generating a default settings file')
-        server.Server.generate_default_settings(
+        await self._run_in_executor(
+            server.Server.generate_default_settings,
             path = server_path,
             jar  = jar,
         )
@@ -126,11 +273,15 @@ class Manager(object):
         srv  = server.Server(server_path)
         proc = await srv.start()
 
-        await proc.wait()
+        # Use communicate so the server's output is drained while we wait
+        await proc.communicate()
         logging.info('Server stopped')
 
         logging.info('Marking EULA as accepted')
-        server.Server.agree_to_eula(path = server_path)
+        await self._run_in_executor(
+            server.Server.agree_to_eula,
+            path = server_path,
+        )
 
         if forge is not None:
             logging.info('Setting up Forge')
@@ -140,9 +291,11 @@ class Manager(object):
                     version,
                 )
 
-                installer, jar_path = forge_utils.get_forge_for_mc_version(
+                installer, jar_path = await self._run_in_executor(
+                    forge_utils.get_forge_for_mc_version,
                     version,
-                    path = server_path,
+                    path  = server_path,
+                    store = self.artifacts,
                 )
             elif isinstance(forge, str):
                 logging.info(
@@ -150,10 +303,12 @@ class Manager(object):
                     forge,
                 )
 
-                installer, jar_path = forge_utils.get_forge_version(
+                installer, jar_path = await self._run_in_executor(
+                    forge_utils.get_forge_version,
                     version,
                     forge,
-                    path = server_path,
+                    path  = server_path,
+                    store = self.artifacts,
                 )
 
             logging.info('Installing Forge dependencies')
@@ -168,16 +323,91 @@ class Manager(object):
                 stderr = asyncio.subprocess.PIPE,
             )
 
-            await proc.wait()
+            await proc.communicate()
 
             logging.info('Configuring server to use Forge')
             srv.settings['jar'] = os.path.basename(jar_path)
-            srv.save_settings()
+            await self._run_in_executor(srv.save_settings)
+
+        self.servers.add(srv)
 
         logging.info('Server %s successfully created', server_id)
 
         return server_id
 
+    @rpc.required_param('server_id')
+    async def rpc_command_server_logs(self, server_id, lines = None):
+        """
+        Handle RPC command: server_logs
+        """
+
+        self._get_server_by_id(server_id)
+
+        output = self.procs.logs.get(server_id)
+        if output is None:
+            return []
+
+        return output.tail(lines)
+
+    @rpc.required_param('server_id')
+    async def rpc_command_properties_get(self, server_id, keys = None):
+        """
+        Handle RPC command: server_properties_get
+        """
+
+        srv = self._get_server_by_id(server_id)
+
+        props = srv.properties
+        if keys is None:
+            return dict(props)
+
+        return {
+            key: props[key]
+            for key in keys
+            if key in props
+        }
+
+    @rpc.required_param('servers')
+    async def rpc_command_properties_set(self, servers, properties = None,
+                                         remove = None):
+        """
+        Handle RPC command: server_properties_set
+        """
+
+        if not isinstance(properties, (dict, type(None))) or \
+           not isinstance(remove, (list, type(None))):
+            raise rpc_errors.JsonRpcInvalidRequestError(
+                'Properties must be an object and remove must be a list',
+            )
+
+        try:
+            properties_utils.PropertiesDocument.validate(properties, remove)
+        except errors.ServerPropertiesError as ex:
+            raise rpc_errors.JsonRpcInvalidRequestError('{}', ex.message)
+
+        server_ids = await self._select_servers(servers)
+        changed    = set()
+
+        async def _update(server_id):
+            srv = self._get_server_by_id(server_id)
+
+            logging.info('Updating the properties of server %s', server_id)
+            if await self._run_in_executor(
+                    srv.update_properties,
+                    properties,
+                    remove):
+                changed.add(server_id)
+
+        result = await self._run_all(server_ids, _update, 'updating')
+
+        result['unchanged'] = [
+            server_id
+            for server_id in result['success']
+            if server_id not in changed
+        ]
+
+        return result
+
     @rpc.required_param('server_id')
     async def rpc_command_server_restart(self, server_id):
         """
@@ -191,77 +421,81 @@ class Manager(object):
 
         return server_id
 
-    async def rpc_command_server_restart_all(self):
+    @rpc.required_param('server_id')
+    async def rpc_command_server_start(self, server_id, wait = False,
+                                       timeout = None):
         """
-        Handle RPC command: server_restart_all
+        Handle RPC command: server_start
         """
 
-        logging.info('Restarting all servers...')
+        srv = self._get_server_by_id(server_id)
 
-        success = []
-        failure = []
-        for server_id in self.instances.keys():
-            # pylint: disable=broad-except
-            try:
-                result = await self.rpc_command_server_restart(server_id)
-
-                success.append(result)
-            except Exception as ex:
-                logging.exception(
-                    'There was an error when restarting server %s: %s',
-                    server_id,
-                    str(ex),
-                )
-                failure.append(server_id)
-            # pylint: enable=broad-except
+        job = self.status.backup_jobs.get(server_id)
+        if job == manager_backups.BackupCommandsMixin.JOB_RESTORE:
+            raise rpc_errors.JsonRpcInvalidRequestError(
+                'Server {} is being restored from a backup',
+                server_id,
+            )
+
+        # Starting a server by hand gives it a clean slate
+        self._cancel_restart(server_id)
+        self.status.restart_policies.pop(server_id, None)
 
-        return {'success': success, 'failure': failure}
+        logging.info('Starting Minecraft server %s', server_id)
+
+        proc_task = self._start_proc_task(srv)
+
+        if wait:
+            if timeout is None:
+                timeout = self.options.autostart_timeout
+
+            await self._wait_until_ready(srv, proc_task, timeout)
+
+        return server_id
 
     @rpc.required_param('server_id')
-    async def rpc_command_server_start(self, server_id):
+    async def rpc_command_server_stats(self, server_id, samples = None):
         """
-        Handle RPC command: server_start
+        Handle RPC command: server_stats
         """
 
-        srv = self._get_server_by_id(server_id)
+        self._get_server_by_id(server_id)
 
-        logging.info('Starting Minecraft server %s', server_id)
-
-        self.event_loop.create_task(self.start_server_proc(srv))
+        series = self.procs.sampler.series.get(server_id)
+        if series is None:
+            series = procstats.TimeSeries(1)
 
-        return server_id
+        return {
+            'server_id': server_id,
+            'interval':  self.procs.sampler.interval,
+            'samples':   series.as_dict(samples),
+        }
 
-    async def rpc_command_server_start_all(self):
+    @rpc.required_param('server_id')
+    async def rpc_command_server_status(self, server_id):
         """
-        Handle RPC command: server_start_all
+        Handle RPC command: server_status
         """
 
-        server_ids  = await self.rpc_command_list_servers()
-        running_ids = self.instances.keys()
-        server_ids  = [
-            server_id
-            for server_id in server_ids
-            if server_id not in running_ids
-        ]
+        self._get_server_by_id(server_id)
 
-        success = []
-        failure = []
-        for server_id in server_ids:
-            # pylint: disable=broad-except
-            try:
-                server_id = await self.rpc_command_server_start(server_id)
-
-                success.append(server_id)
-            except Exception as ex:
-                logging.exception(
-                    'There was an error when starting server %s: %s',
-                    server_id,
-                    str(ex),
-                )
-                failure.append(server_id)
-            # pylint: enable=broad-except
+        status = self.status.states.get(
+            server_id,
+            {
+                'state': Manager.STATE_STOPPED,
+                'since': None,
+            },
+        )
+
+        boot_times = self.status.boot_times.get(server_id)
 
-        return {'success': success, 'failure': failure}
+        return {
+            'server_id':  server_id,
+            'state':      status['state'],
+            'since':      status['since'],
+            'boot_time':  status.get('boot_time'),
+            'boot_times': boot_times.as_dict() if boot_times else None,
+        }
 
     @rpc.required_param('server_id')
     async def rpc_command_server_stop(self, server_id):
@@ -271,139 +505,432 @@ class Manager(object):
 
         proc = self._get_proc_by_id(server_id)
         if proc is None:
+            # Stopping a server that's waiting to be restarted cancels it
+            if self._cancel_restart(server_id):
+                return server_id
+
             raise rpc_errors.JsonRpcInvalidRequestError(
                 'Server {} was not running',
                 server_id,
             )
 
-        logging.info('Sending stop command to server %s', server_id)
+        srv = self._get_server_by_id(server_id)
+
+        self._set_state(server_id, Manager.STATE_STOPPING)
+        self.procs.terminations[server_id] = await self._stop_proc(srv, proc)
 
-        await self._send_to_server(proc, 'stop')
+        # The process has exited but its task may still be cleaning up, which
+        # has to finish before the server can be started again
+        proc_task = self.procs.tasks.pop(server_id, None)
+        if proc_task is not None:
+            await asyncio.wait([proc_task])
 
         return server_id
 
-    async def rpc_command_server_stop_all(self):
+    async def rpc_command_shutdown(self):
         """
-        Handle RPC command: server_stop_all
+        Handle RPC command: shutdown
         """
 
-        server_ids = self.instances.keys()
+        logging.info('Shutting down...')
 
-        success = []
-        failure = []
-        for server_id in server_ids:
-            # pylint: disable=broad-except
-            try:
-                result = await self.rpc_command_server_stop(server_id)
-
-                success.append(result)
-            except Exception as ex:
-                logging.exception(
-                    'There was an error stopping server %s: %s',
-                    server_id,
-                    str(ex),
-                )
-                failure.append(server_id)
-            # pylint: enable=broad-except
+        # Servers still waiting to be auto started would outlive the stop
+        if self.procs.autostart is not None:
+            self.procs.autostart.cancel()
 
-        return {'success': success, 'failure': failure}
+        for server_id in list(self.status.pending_restarts.keys()):
+            self._cancel_restart(server_id)
 
-    async def rpc_command_shutdown(self):
+        result = await self._run_all(
+            list(self.procs.instances.keys()),
+            self.rpc_command_server_stop,
+            'stopping',
+        )
+
+        # Idle clients would otherwise keep their connections, and the
+        # management process, open
+        self.rpc_server.close()
+
+        self.procs.sampler.stop()
+        self.event_loop.stop()
+
+        return result['success']
+
+    async def autostart_servers(self, servers):
         """
-        Handle RPC command: shutdown
+        Start servers in waves by their autostart_priority setting, highest
+        first. At most autostart_concurrency servers boot at once and each wave
+        waits for its servers to finish loading, or to give up trying, before
+        the next wave starts.
         """
 
-        logging.info('Shutting down...')
+        waves = {}
+        for srv in servers:
+            priority = srv.settings.get('autostart_priority', 0)
+            waves.setdefault(priority, []).append(srv)
 
-        stopped_instances = []
-        if self.instances:
-            for server_id in list(self.instances.keys()):
-                # pylint: disable=broad-except
-                try:
-                    stopped_instances.append(
-                        await self.rpc_command_server_stop(server_id = server_id)
-                    )
-                except Exception as ex:
-                    logging.exception(str(ex))
-                # pylint: enable=broad-except
+        semaphore = asyncio.Semaphore(self.options.autostart_concurrency)
 
-        self.event_loop.stop()
+        for priority in sorted(waves.keys(), reverse = True):
+            logging.info(
+                'Auto starting servers with priority %s: %s',
+                priority,
+                ', '.join(srv.server_id for srv in waves[priority]),
+            )
 
-        return stopped_instances
+            await asyncio.gather(
+                *[
+                    self._autostart_server(srv, semaphore)
+                    for srv in waves[priority]
+                ]
+            )
 
-    async def handle_network_connection(self, reader, writer):
+    async def start_server_proc(self, srv):
         """
-        Handle network connections
+        Handle process management
         """
 
-        data    = await reader.read()
-        message = data.decode()
+        ready = self._get_ready_event(srv.server_id)
+        ready.clear()
 
-        address = writer.get_extra_info('peername')
-        logging.info(
-            'Recieved "%s" from client %s',
-            message.strip(),
-            address,
+        if srv.server_id not in self.status.restart_policies:
+            self.status.restart_policies[srv.server_id] = \
+                self._get_restart_policy(srv)
+
+        policy = self.status.restart_policies[srv.server_id]
+
+        self._set_state(srv.server_id, Manager.STATE_STARTING)
+        started = time.monotonic()
+
+        try:
+            proc = await srv.start()
+        except Exception:
+            self._set_state(srv.server_id, Manager.STATE_CRASHED)
+            raise
+
+        policy.record_start()
+
+        output = console.OutputBuffer(
+            max_lines = srv.settings.get('log_max_lines'),
+            max_bytes = srv.settings.get('log_max_bytes'),
+        )
+
+        commands = console.CommandWriter(
+            proc.stdin,
+            max_queued = srv.settings.get('console_max_queued'),
         )
 
-        json_response = await rpc.JsonRpcResponseManager.handle(
-            data,
-            self.rpc_dispatcher,
+        def _check_ready(_, line):
+            if ready.is_set() or not console.READY_PATTERN.search(line):
+                return
+
+            # A server that is already being stopped isn't going to be ready
+            if self._get_state(srv.server_id) != Manager.STATE_STARTING:
+                return
+
+            boot_time = time.monotonic() - started
+            logging.info(
+                'Server %s is ready after %.3f seconds',
+                srv.server_id,
+                boot_time,
+            )
+
+            self._record_boot_time(srv.server_id, boot_time)
+            self._set_state(
+                srv.server_id,
+                Manager.STATE_READY,
+                boot_time = boot_time,
+            )
+
+            ready.set()
+
+        output.subscribe(_check_ready)
+
+        self.procs.instances[srv.server_id] = proc
+        self.procs.consoles[srv.server_id]  = commands
+        self.procs.logs[srv.server_id]      = output
+
+        commands_task = asyncio.ensure_future(commands.run())
+
+        await asyncio.gather(
+            proc.wait(),
+            console.drain_stream(proc.stdout, output, 'stdout'),
+            console.drain_stream(proc.stderr, output, 'stderr'),
         )
 
-        response_data = json_response.json
+        commands.close()
+        await commands_task
+
+        output.unsubscribe(_check_ready)
+        ready.clear()
+
+        if proc.returncode != 0:
+            logging.error('Server %s ran into an error', srv.server_id)
+
+        if self.procs.instances.get(srv.server_id) is not proc:
+            # The server has already been started again so leave it be
+            return
+
+        del self.procs.instances[srv.server_id]
+        del self.procs.consoles[srv.server_id]
+
+        stopping = self._get_state(srv.server_id) == Manager.STATE_STOPPING
+
+        if stopping or proc.returncode == 0:
+            self._set_state(srv.server_id, Manager.STATE_STOPPED)
+        else:
+            self._set_state(srv.server_id, Manager.STATE_CRASHED)
+
+        if stopping:
+            # Stopped on purpose so leave it down
+            return
+
+        delay = policy.record_exit(proc.returncode)
+        if delay is None:
+            if policy.parked:
+                logging.error(
+                    'Server %s keeps crashing, it will not be restarted ' +
+                    'until it is started manually',
+                    srv.server_id,
+                )
+
+            return
 
         logging.info(
-            'Sending response back to %s:\n%s',
-            address,
-            response_data,
+            'Restarting server %s in %s seconds',
+            srv.server_id,
+            delay,
         )
-        writer.write(response_data.encode())
-        writer.write_eof()
-        await writer.drain()
 
-        writer.close()
+        self.status.pending_restarts[srv.server_id] = self.event_loop.call_later(
+            delay,
+            self._restart_server,
+            srv,
+        )
 
-    async def start_server_proc(self, srv):
+    async def _autostart_server(self, srv, semaphore):
+        async with semaphore:
+            logging.info('Starting server %s', srv.server_id)
+
+            proc_task = self._start_proc_task(srv)
+
+            try:
+                await self._wait_until_ready(
+                    srv,
+                    proc_task,
+                    self.options.autostart_timeout,
+                )
+            except errors.ServerError as ex:
+                logging.warning(str(ex))
+
+    async def _wait_until_ready(self, srv, proc_task, timeout):
         """
-        Handle process management
+        Wait for a server that was just started to finish loading. Raises an
+        error if the server exits or isn't ready within the timeout.
         """
 
-        proc = await srv.start()
+        ready      = self._get_ready_event(srv.server_id)
+        ready_task = asyncio.ensure_future(ready.wait())
+
+        done, _ = await asyncio.wait(
+            [proc_task, ready_task],
+            timeout     = timeout,
+            return_when = asyncio.FIRST_COMPLETED,
+        )
+
+        ready_task.cancel()
+
+        if ready.is_set():
+            return
+
+        if proc_task not in done:
+            raise errors.ServerError(
+                'Server {} was not ready after {} seconds',
+                srv.server_id,
+                timeout,
+            )
+
+        if proc_task.exception() is not None:
+            raise errors.ServerError(
+                'Server {} could not be started: {}',
+                srv.server_id,
+                str(proc_task.exception()),
+            )
+
+        raise errors.ServerError(
+            'Server {} exited before it was ready',
+            srv.server_id,
+        )
+
+    def _set_state(self, server_id, state, **details):
+        logging.info('Server %s is now %s', server_id, state)
+
+        self.status.states[server_id] = dict(
+            details,
+            state = state,
+            since = time.time(),
+        )
+
+    def _get_state(self, server_id):
+        return self.status.states.get(server_id, {}).get('state')
+
+    def _record_boot_time(self, server_id, boot_time):
+        if server_id not in self.status.boot_times:
+            self.status.boot_times[server_id] = metrics.Histogram(
+                Manager.BOOT_TIME_BUCKETS,
+            )
+
+        self.status.boot_times[server_id].observe(boot_time)
+
+    def _get_ready_event(self, server_id):
+        if server_id not in self.status.ready:
+            self.status.ready[server_id] = asyncio.Event()
+
+        return self.status.ready[server_id]
+
+    async def _stop_proc(self, srv, proc):
+        """
+        Stop a server process, escalating from the stop command to SIGTERM and
+        then SIGKILL if the server doesn't exit within its grace periods.
+        Returns how the server was stopped.
+        """
+
+        stop_timeout = srv.settings.get(
+            'stop_timeout',
+            Manager.DEFAULT_STOP_TIMEOUT,
+        )
 
-        self.instances[srv.server_id] = proc
+        terminate_timeout = srv.settings.get(
+            'terminate_timeout',
+            Manager.DEFAULT_TERMINATE_TIMEOUT,
+        )
+
+        logging.info('Sending stop command to server %s', srv.server_id)
+
+        try:
+            self._send_to_server(srv.server_id, 'stop')
+        except errors.ServerError as ex:
+            logging.warning(
+                'Unable to send stop command to server %s: %s',
+                srv.server_id,
+                str(ex),
+            )
+        else:
+            if await self._wait_for_exit(proc, stop_timeout):
+                return 'stopped'
+
+        logging.warning('Terminating server %s', srv.server_id)
+
+        try:
+            proc.terminate()
+        except ProcessLookupError:
+            pass
+
+        if await self._wait_for_exit(proc, terminate_timeout):
+            return 'terminated'
+
+        logging.error('Killing server %s', srv.server_id)
+
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
 
         await proc.wait()
 
-        if proc.returncode != 0:
-            logging.error('Server %s ran into an error', srv.server_id)
+        return 'killed'
+
+    @staticmethod
+    async def _wait_for_exit(proc, timeout):
+        try:
+            await asyncio.wait_for(proc.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
 
-        del self.instances[srv.server_id]
+        return True
 
-    def _get_all_server_paths(self):
-        server_paths = [
-            os.path.join(self.root, server_path)
-            for server_path in os.listdir(self.root)
-            if os.path.isdir(os.path.join(self.root, server_path))
-        ]
+    def _restart_server(self, srv):
+        del self.status.pending_restarts[srv.server_id]
 
-        return server_paths
+        # Someone may have beaten us to it
+        if srv.server_id in self.procs.instances:
+            return
 
-    def _get_server_by_id(self, server_id):
-        server_path = os.path.join(self.root, server_id)
-        if not os.path.exists(server_path):
-            raise errors.ServerDoesNotExistError(server_id)
+        logging.info('Restarting server %s', srv.server_id)
+        self.status.restart_counts[srv.server_id] = \
+            self.status.restart_counts.get(srv.server_id, 0) + 1
 
-        return server.Server(server_path)
+        self._start_proc_task(srv)
 
-    def _get_proc_by_id(self, server_id):
-        server_path = os.path.join(self.root, server_id)
-        if not os.path.exists(server_path):
-            raise errors.ServerDoesNotExistError(server_id)
+    def _start_proc_task(self, srv):
+        proc_task = self.event_loop.create_task(self.start_server_proc(srv))
+        self.procs.tasks[srv.server_id] = proc_task
+
+        return proc_task
+
+    def _cancel_restart(self, server_id):
+        handle = self.status.pending_restarts.pop(server_id, None)
+        if handle is None:
+            return False
+
+        logging.info('Cancelling restart of server %s', server_id)
+        handle.cancel()
 
-        return self.instances.get(server_id, None)
+        return True
 
     @staticmethod
-    async def _send_to_server(proc, message):
-        return await proc.communicate(message.encode())
+    def _get_restart_policy(srv):
+        try:
+            return supervisor.RestartPolicy.from_settings(srv.settings)
+        except errors.ServerSettingsError as ex:
+            logging.error(
+                'Server %s will not be restarted automatically: %s',
+                srv.server_id,
+                str(ex),
+            )
+
+            return supervisor.RestartPolicy()
+
+    def _run_in_executor(self, func, *args, **kwargs):
+        """
+        Run a blocking function in the default executor so it doesn't hold up
+        the event loop
+        """
+
+        return self.event_loop.run_in_executor(
+            None,
+            functools.partial(func, *args, **kwargs),
+        )
+
+    def _collect_metrics(self):
+        """
+        Get the management process's metrics in the Prometheus text format
+        """
+
+        page = metrics.Exposition()
+
+        self.rpc_server.stats.add_metrics(page)
+
+        metrics.add_server_metrics(
+            page,
+            Manager.STATES,
+            self.status.states,
+            self.status.restart_counts,
+            self.status.boot_times,
+        )
+
+        # Only report resource usage for servers that are still running
+        self.procs.sampler.add_metrics(page, self.procs.instances.keys())
+
+        return page.render()
+
+    def _get_server_by_id(self, server_id):
+        return self.servers.get(server_id)
+
+    def _get_proc_by_id(self, server_id):
+        self.servers.get(server_id)
+
+        return self.procs.instances.get(server_id, None)
 
+    def _send_to_server(self, server_id, message):
+        self.procs.consoles[server_id].send(message)
@@ -0,0 +1,210 @@
+"""
+Backup and restore RPC commands for the management process.
+"""
+
+import asyncio
+import logging
+import os.path
+import time
+
+from . import backup, console, errors, rpc
+from .rpc import errors as rpc_errors
+
+class BackupCommandsMixin(object):
+    """
+    RPC commands for backing up and restoring a Minecraft server's worlds. This
+    is mixed into the management process.
+    """
+
+    BACKUPS_DIR          = '.backups'
+    DEFAULT_SAVE_TIMEOUT = 60
+
+    JOB_BACKUP  = 'backup'
+    JOB_RESTORE = 'restore'
+
+    @rpc.required_param('server_id')
+    async def rpc_command_server_backup(self, server_id, timeout = None):
+        """
+        Handle RPC command: server_backup
+        """
+
+        srv = self._get_server_by_id(server_id)
+
+        # Check the settings before the server is touched
+        policy = backup.RetentionPolicy.from_settings(srv.settings)
+        worlds = srv.worlds
+        if not worlds:
+            raise rpc_errors.JsonRpcInvalidRequestError(
+                'Server {} does not have a world to back up',
+                server_id,
+            )
+
+        store = self._get_backup_store(srv)
+
+        self._start_backup_job(server_id, BackupCommandsMixin.JOB_BACKUP)
+
+        try:
+            started = time.monotonic()
+
+            paused = await self._pause_saving(server_id, timeout)
+            try:
+                result = await self._run_in_executor(
+                    store.create,
+                    srv.path,
+                    worlds,
+                )
+            finally:
+                if paused:
+                    self._resume_saving(server_id)
+
+            result['save_paused'] = time.monotonic() - started \
+                if paused else None
+            result['pruned'] = await self._run_in_executor(
+                store.prune,
+                policy,
+            )
+        finally:
+            del self.status.backup_jobs[server_id]
+
+        result['engine']   = srv.settings.get('backup_engine', backup.DEFAULT_ENGINE)
+        result['duration'] = time.monotonic() - started
+
+        return result
+
+    @rpc.required_param('server_id')
+    async def rpc_command_server_backups(self, server_id):
+        """
+        Handle RPC command: server_backups
+        """
+
+        srv = self._get_server_by_id(server_id)
+
+        return await self._run_in_executor(self._get_backup_store(srv).list)
+
+    @rpc.required_param('server_id')
+    @rpc.required_param('name')
+    async def rpc_command_server_restore(self, server_id, name):
+        """
+        Handle RPC command: server_restore
+        """
+
+        srv = self._get_server_by_id(server_id)
+
+        if self._get_proc_by_id(server_id) is not None or \
+           server_id in self.status.pending_restarts:
+            raise rpc_errors.JsonRpcInvalidRequestError(
+                'Server {} must be stopped before it can be restored',
+                server_id,
+            )
+
+        store = self._get_backup_store(srv)
+
+        self._start_backup_job(server_id, BackupCommandsMixin.JOB_RESTORE)
+
+        logging.info('Restoring server %s from backup %s', server_id, name)
+
+        try:
+            worlds = await self._run_in_executor(
+                backup.restore_worlds,
+                store,
+                name,
+                srv.path,
+            )
+        finally:
+            del self.status.backup_jobs[server_id]
+
+        return {
+            'name':   name,
+            'worlds': worlds,
+        }
+
+    async def _pause_saving(self, server_id, timeout = None):
+        """
+        Stop a running server from writing to its world and wait for it to
+        flush everything it has in memory to disk. Returns whether the server
+        was running.
+        """
+
+        state = self.status.states.get(server_id, {}).get('state')
+
+        # A server that is about to be restarted isn't stopped for long
+        stopped = server_id not in self.procs.instances and \
+            server_id not in self.status.pending_restarts
+
+        if stopped and state in (None, self.STATE_STOPPED, self.STATE_CRASHED):
+            return False
+
+        if state != self.STATE_READY or server_id not in self.procs.consoles:
+            raise rpc_errors.JsonRpcInvalidRequestError(
+                'Server {} is {}, wait for it to be ready or stopped',
+                server_id,
+                state,
+            )
+
+        if timeout is None:
+            timeout = BackupCommandsMixin.DEFAULT_SAVE_TIMEOUT
+
+        saved = asyncio.Event()
+
+        def _check_saved(_, line):
+            if console.SAVED_PATTERN.search(line):
+                saved.set()
+
+        output = self.procs.logs[server_id]
+        output.subscribe(_check_saved)
+
+        try:
+            logging.info('Pausing saving on server %s', server_id)
+
+            self._send_to_server(server_id, 'save-off')
+            self._send_to_server(server_id, 'save-all flush')
+
+            try:
+                await asyncio.wait_for(saved.wait(), timeout)
+            except asyncio.TimeoutError:
+                self._resume_saving(server_id)
+
+                raise errors.ServerError(
+                    'Server {} did not finish saving after {} seconds',
+                    server_id,
+                    timeout,
+                )
+        finally:
+            output.unsubscribe(_check_saved)
+
+        return True
+
+    def _start_backup_job(self, server_id, job):
+        """
+        Note that a server is being backed up or restored. Only one of these
+        can run against a server at once.
+        """
+
+        if server_id in self.status.backup_jobs:
+            raise rpc_errors.JsonRpcInvalidRequestError(
+                'A backup of server {} is already running',
+                server_id,
+            )
+
+        self.status.backup_jobs[server_id] = job
+
+    def _resume_saving(self, server_id):
+        if server_id not in self.procs.consoles:
+            return
+
+        logging.info('Resuming saving on server %s', server_id)
+
+        try:
+            self._send_to_server(server_id, 'save-on')
+        except errors.ServerError as ex:
+            logging.warning(
+                'Unable to resume saving on server %s: %s',
+                server_id,
+                str(ex),
+            )
+
+    def _get_backup_store(self, srv):
+        return backup.open_store(
+            os.path.join(self.servers.root, BackupCommandsMixin.BACKUPS_DIR, srv.server_id),
+            srv.settings,
+        )
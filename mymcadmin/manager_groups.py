@@ -0,0 +1,212 @@
+"""
+RPC commands for working with groups of servers in the management process.
+"""
+
+import asyncio
+import fnmatch
+import functools
+import logging
+
+from . import errors
+
+class GroupCommandsMixin(object):
+    """
+    RPC commands that act on a selection of servers at once. This is mixed
+    into the management process.
+    """
+
+    TAG_PREFIX = 'tag:'
+
+    async def rpc_command_server_restart_all(self, servers = None):
+        """
+        Handle RPC command: server_restart_all
+        """
+
+        logging.info('Restarting all servers...')
+
+        server_ids, skipped = await self._select_running_servers(servers)
+
+        result = await self._run_all(
+            server_ids,
+            self.rpc_command_server_restart,
+            'restarting',
+        )
+
+        result['skipped'] = skipped
+
+        return result
+
+    async def rpc_command_server_start_all(self, servers = None, wait = False,
+                                           timeout = None):
+        """
+        Handle RPC command: server_start_all
+        """
+
+        selected    = await self._select_servers(servers)
+        running_ids = self.procs.instances.keys()
+        server_ids  = [
+            server_id
+            for server_id in selected
+            if server_id not in running_ids
+        ]
+
+        action = self.rpc_command_server_start
+        if wait:
+            action = functools.partial(action, wait = wait, timeout = timeout)
+
+        result = await self._run_all(server_ids, action, 'starting')
+
+        result['skipped'] = [
+            server_id
+            for server_id in selected
+            if server_id in running_ids
+        ]
+
+        return result
+
+    async def rpc_command_server_stop_all(self, servers = None):
+        """
+        Handle RPC command: server_stop_all
+        """
+
+        server_ids, skipped = await self._select_running_servers(servers)
+
+        result = await self._run_all(
+            server_ids,
+            self.rpc_command_server_stop,
+            'stopping',
+        )
+
+        result['skipped'] = skipped
+
+        result['terminations'] = {
+            server_id: self.procs.terminations.get(server_id)
+            for server_id in result['success']
+        }
+
+        return result
+
+    async def _select_servers(self, selectors = None):
+        """
+        Get the IDs of the servers matching any of the selectors, in order. A
+        selector is a server ID, a glob pattern such as "lobby-*" or a tag from
+        the servers' tags setting such as "tag:lobby". Without any selectors
+        every server is selected.
+        """
+
+        server_ids = sorted(await self.rpc_command_list_servers())
+
+        if selectors is None:
+            return server_ids
+
+        if isinstance(selectors, str):
+            selectors = [selectors]
+
+        selected = set()
+        for selector in selectors:
+            if selector.startswith(GroupCommandsMixin.TAG_PREFIX):
+                tag = selector[len(GroupCommandsMixin.TAG_PREFIX):]
+                selected.update(
+                    server_id
+                    for server_id in server_ids
+                    if tag in self._get_server_tags(server_id)
+                )
+            elif any(char in selector for char in '*?['):
+                selected.update(fnmatch.filter(server_ids, selector))
+            elif selector in server_ids:
+                selected.add(selector)
+            else:
+                raise errors.ServerDoesNotExistError(selector)
+
+        return [
+            server_id
+            for server_id in server_ids
+            if server_id in selected
+        ]
+
+    async def _select_running_servers(self, selectors = None):
+        """
+        Get the IDs of the running servers matching the selectors and the IDs
+        of the selected servers that aren't running
+        """
+
+        if selectors is None:
+            return list(self.procs.instances.keys()), []
+
+        selected = await self._select_servers(selectors)
+
+        running = [
+            server_id
+            for server_id in selected
+            if server_id in self.procs.instances
+        ]
+
+        stopped = [
+            server_id
+            for server_id in selected
+            if server_id not in self.procs.instances
+        ]
+
+        return running, stopped
+
+    def _get_server_tags(self, server_id):
+        try:
+            tags = self._get_server_by_id(server_id).settings.get('tags', [])
+        except errors.MyMCAdminError as ex:
+            logging.warning(
+                'Unable to read the tags of server %s: %s',
+                server_id,
+                str(ex),
+            )
+
+            return []
+
+        if isinstance(tags, str):
+            tags = [tags]
+
+        return tags
+
+    async def _run_all(self, server_ids, action, description):
+        """
+        Run an action against a group of servers concurrently, with at most
+        max_parallel_ops running at once
+        """
+
+        semaphore = asyncio.Semaphore(self.options.max_parallel_ops)
+
+        async def _run(server_id):
+            async with semaphore:
+                # pylint: disable=broad-except
+                try:
+                    await action(server_id = server_id)
+                except Exception as ex:
+                    logging.exception(
+                        'There was an error when %s server %s: %s',
+                        description,
+                        server_id,
+                        str(ex),
+                    )
+
+                    return False
+                # pylint: enable=broad-except
+
+            logging.info('Finished %s server %s', description, server_id)
+
+            return True
+
+        results = await asyncio.gather(
+            *[_run(server_id) for server_id in server_ids]
+        )
+
+        return {
+            'success': [
+                server_id
+                for server_id, result in zip(server_ids, results)
+                if result
+            ],
+            'failure': [
+                server_id
+                for server_id, result in zip(server_ids, results)
+                if not result
+            ],
+        }
@@ -0,0 +1,34 @@
+"""
+Bookkeeping for the servers run by the management process.
+"""
+
+# pylint: disable=too-few-public-methods
+class ServerProcesses(object):
+    """
+    The running server processes and what is attached to each of them, keyed
+    by server ID
+    """
+
+    def __init__(self, sampler):
+        self.instances    = {}
+        self.tasks        = {}
+        self.consoles     = {}
+        self.logs         = {}
+        self.terminations = {}
+        self.sampler      = sampler
+        self.autostart    = None
+
+class ServerStatus(object):
+    """
+    The state of each server and what is being done to it, keyed by server ID
+    """
+
+    def __init__(self):
+        self.states           = {}
+        self.ready            = {}
+        self.boot_times       = {}
+        self.restart_counts   = {}
+        self.restart_policies = {}
+        self.pending_restarts = {}
+        self.backup_jobs      = {}
+# pylint: enable=too-few-public-methods
@@ -0,0 +1,230 @@
+"""
+Lightweight metrics for the management process
+"""
+
+import bisect
+
+class Histogram(object):
+    """
+    A histogram with fixed bucket boundaries. Each observation is counted in
+    the first bucket whose upper bound it doesn't exceed, or in an overflow
+    bucket if it's larger than all of them.
+    """
+
+    def __init__(self, buckets):
+        if not buckets:
+            raise ValueError('Histogram must have at least one bucket')
+
+        self.buckets = sorted(buckets)
+        self.counts  = [0] * (len(self.buckets) + 1)
+        self.count   = 0
+        self.sum     = 0
+
+    def observe(self, value):
+        """
+        Record a value in the histogram
+        """
+
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum   += value
+
+    def cumulative(self):
+        """
+        Get the cumulative count for each bucket's upper bound, ending with
+        the total count for an infinite upper bound
+        """
+
+        total  = 0
+        result = []
+        for bound, count in zip(self.buckets + [float('inf')], self.counts):
+            total += count
+            result.append((bound, total))
+
+        return result
+
+    def as_dict(self):
+        """
+        Get the contents of the histogram in a JSON friendly form
+        """
+
+        return {
+            'buckets': [
+                {'le': bound, 'count': count}
+                for bound, count in self.cumulative()[:-1]
+            ],
+            'count':   self.count,
+            'sum':     self.sum,
+        }
+
+class Exposition(object):
+    """
+    Builds a page of metrics in the Prometheus text exposition format
+    """
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self):
+        self.lines = []
+
+    def add(self, name, metric_type, description, samples):
+        """
+        Add a metric family. Samples are a list of label dictionaries and
+        their values.
+        """
+
+        self._add_header(name, metric_type, description)
+
+        for labels, value in samples:
+            self._add_sample(name, labels, value)
+
+    def add_histograms(self, name, description, histograms):
+        """
+        Add a histogram metric family. Histograms are a list of label
+        dictionaries and their Histogram.
+        """
+
+        self._add_header(name, 'histogram', description)
+
+        for labels, histogram in histograms:
+            for bound, count in histogram.cumulative():
+                self._add_sample(
+                    name + '_bucket',
+                    dict(labels, le = _format_value(bound)),
+                    count,
+                )
+
+            self._add_sample(name + '_sum', labels, histogram.sum)
+            self._add_sample(name + '_count', labels, histogram.count)
+
+    def render(self):
+        """
+        Get the page as text
+        """
+
+        return ''.join(line + '\n' for line in self.lines)
+
+    def _add_header(self, name, metric_type, description):
+        self.lines.append('# HELP {} {}'.format(name, description))
+        self.lines.append('# TYPE {} {}'.format(name, metric_type))
+
+    def _add_sample(self, name, labels, value):
+        if labels:
+            label_str = '{' + ','.join(
+                '{}="{}"'.format(key, _escape_label(labels[key]))
+                for key in sorted(labels.keys())
+            ) + '}'
+        else:
+            label_str = ''
+
+        self.lines.append(
+            '{}{} {}'.format(name, label_str, _format_value(value))
+        )
+
+def add_server_metrics(page, state_names, states, restart_counts,
+                       boot_times):
+    """
+    Add the state, automatic restarts and boot times of each server to a page
+    of metrics
+    """
+
+    page.add(
+        'mymcadmin_server_state',
+        'gauge',
+        'The current state of each server',
+        [
+            (
+                {'server_id': server_id, 'state': state},
+                1 if status['state'] == state else 0,
+            )
+            for server_id, status in sorted(states.items())
+            for state in state_names
+        ],
+    )
+
+    page.add(
+        'mymcadmin_server_restarts_total',
+        'counter',
+        'Automatic restarts of each server',
+        [
+            ({'server_id': server_id}, count)
+            for server_id, count in sorted(restart_counts.items())
+        ],
+    )
+
+    page.add_histograms(
+        'mymcadmin_server_boot_duration_seconds',
+        'Time taken for each server to finish loading',
+        [
+            ({'server_id': server_id}, histogram)
+            for server_id, histogram in sorted(boot_times.items())
+        ],
+    )
+
+async def handle_connection(reader, writer, render):
+    """
+    Handle a HTTP request for the metrics page. Only GET /metrics is supported
+    and the connection is closed after the response is sent. The page is
+    built by calling render.
+    """
+
+    try:
+        request_line = await reader.readline()
+
+        # Headers are read and ignored
+        while True:
+            line = await reader.readline()
+            if not line.strip():
+                break
+    except (ConnectionError, ValueError):
+        writer.close()
+        return
+
+    parts = request_line.decode('latin-1').split()
+
+    if len(parts) < 2 or parts[1].split('?')[0] != '/metrics':
+        status       = '404 Not Found'
+        content_type = 'text/plain; charset=utf-8'
+        body         = b'Not found\n'
+    elif parts[0] not in ('GET', 'HEAD'):
+        status       = '405 Method Not Allowed'
+        content_type = 'text/plain; charset=utf-8'
+        body         = b'Method not allowed\n'
+    else:
+        status       = '200 OK'
+        content_type = Exposition.CONTENT_TYPE
+        body         = render().encode('utf-8')
+
+    headers = (
+        'HTTP/1.0 {}\r\n'
+        'Content-Type: {}\r\n'
+        'Content-Length: {}\r\n'
+        'Connection: close\r\n'
+        '\r\n'
+    ).format(status, content_type, len(body))
+
+    try:
+        writer.write(headers.encode('latin-1'))
+        if parts[:1] != ['HEAD']:
+            writer.write(body)
+
+        await writer.drain()
+    except ConnectionError:
+        pass
+
+    writer.close()
+
+def _escape_label(value):
+    return str(value) \
+        .replace('\\', '\\\\') \
+        .replace('\n', '\\n') \
+        .replace('"', '\\"')
+
+def _format_value(value):
+    if value is None:
+        return 'NaN'
+
+    if value == float('inf'):
+        return '+Inf'
+
+    return repr(value) if isinstance(value, float) else str(value)
@@ -0,0 +1,261 @@
+"""
+Resource usage sampling for server processes using /proc
+"""
+
+import array
+import asyncio
+import logging
+import math
+import os
+import time
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+
+class TimeSeries(object):
+    """
+    A fixed size series of resource usage samples. Each field is stored in its
+    own array of doubles which is used as a ring buffer so a long running
+    server's history takes a constant amount of memory.
+    """
+
+    FIELDS = (
+        'time',
+        'cpu',
+        'rss',
+        'swap',
+        'threads',
+        'read_bytes',
+        'write_bytes',
+    )
+
+    def __init__(self, size):
+        if size < 1:
+            raise ValueError('Time series must hold at least one sample')
+
+        self.size = size
+
+        self._fields = {
+            field: array.array('d', [math.nan]) * size
+            for field in TimeSeries.FIELDS
+        }
+        self._next  = 0
+        self._count = 0
+
+    def append(self, sample):
+        """
+        Add a sample, overwriting the oldest one if the series is full. Fields
+        missing from the sample are recorded as unknown.
+        """
+
+        for field, values in self._fields.items():
+            value = sample.get(field)
+            values[self._next] = math.nan if value is None else value
+
+        self._next  = (self._next + 1) % self.size
+        self._count = min(self._count + 1, self.size)
+
+    def as_dict(self, count = None):
+        """
+        Get the most recent samples, oldest first, as a list of values for each
+        field. Unknown values are returned as None.
+        """
+
+        if count is None or count > self._count:
+            count = self._count
+
+        start   = (self._next - count) % self.size
+        indexes = [(start + i) % self.size for i in range(count)]
+
+        return {
+            field: [
+                None if math.isnan(values[index]) else values[index]
+                for index in indexes
+            ]
+            for field, values in self._fields.items()
+        }
+
+    def __len__(self):
+        return self._count
+
+class ProcessSampler(object):
+    """
+    Periodically samples the CPU, memory, thread and IO usage of every running
+    server from /proc and keeps a time series for each one
+    """
+
+    DEFAULT_INTERVAL = 10
+    DEFAULT_HISTORY  = 360
+
+    RESOURCE_METRICS = [
+        (
+            'cpu',
+            'mymcadmin_server_cpu_percent',
+            'CPU usage of each server as a percentage of one core',
+        ),
+        (
+            'rss',
+            'mymcadmin_server_resident_memory_bytes',
+            'Resident memory of each server',
+        ),
+        (
+            'swap',
+            'mymcadmin_server_swap_bytes',
+            'Swapped out memory of each server',
+        ),
+        (
+            'threads',
+            'mymcadmin_server_threads',
+            'Threads running in each server',
+        ),
+    ]
+
+    def __init__(self, interval = None, history = None, proc_root = '/proc'):
+        if interval is None:
+            interval = ProcessSampler.DEFAULT_INTERVAL
+
+        if history is None:
+            history = ProcessSampler.DEFAULT_HISTORY
+
+        self.interval  = interval
+        self.history   = history
+        self.proc_root = proc_root
+        self.series    = {}
+
+        self._cpu_times = {}
+        self._stopped   = asyncio.Event()
+
+    def sample(self, instances):
+        """
+        Take a sample of every process in a dictionary of server IDs to
+        processes
+        """
+
+        now = time.time()
+        for server_id, proc in list(instances.items()):
+            try:
+                sample = self._read_sample(proc.pid)
+            except (OSError, ValueError, IndexError) as ex:
+                logging.debug(
+                    'Unable to sample server %s: %s',
+                    server_id,
+                    str(ex),
+                )
+
+                continue
+
+            sample['time'] = now
+            sample['cpu']  = self._get_cpu_usage(
+                server_id,
+                proc.pid,
+                now,
+                sample.pop('cpu_time'),
+            )
+
+            if server_id not in self.series:
+                self.series[server_id] = TimeSeries(self.history)
+
+            self.series[server_id].append(sample)
+
+        # Forget the CPU times of servers that have stopped
+        for server_id in list(self._cpu_times.keys()):
+            if server_id not in instances:
+                del self._cpu_times[server_id]
+
+    async def run(self, instances):
+        """
+        Sample the processes in instances every interval until stopped
+        """
+
+        while not self._stopped.is_set():
+            self.sample(instances)
+
+            try:
+                await asyncio.wait_for(self._stopped.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self):
+        """
+        Stop the sampling loop
+        """
+
+        self._stopped.set()
+
+    def add_metrics(self, page, server_ids):
+        """
+        Add the latest resource usage of the given servers to a page of
+        metrics
+        """
+
+        latest = {
+            server_id: self.series[server_id].as_dict(1)
+            for server_id in sorted(server_ids)
+            if server_id in self.series
+        }
+
+        for field, name, description in ProcessSampler.RESOURCE_METRICS:
+            page.add(
+                name,
+                'gauge',
+                description,
+                [
+                    ({'server_id': server_id}, samples[field][-1])
+                    for server_id, samples in sorted(latest.items())
+                    if samples[field] and samples[field][-1] is not None
+                ],
+            )
+
+    def _get_cpu_usage(self, server_id, pid, now, cpu_time):
+        last = self._cpu_times.get(server_id)
+        self._cpu_times[server_id] = (pid, now, cpu_time)
+
+        # The first sample of a process has nothing to compare against
+        if last is None or last[0] != pid or now <= last[1]:
+            return None
+
+        return (cpu_time - last[2]) / (now - last[1]) * 100
+
+    def _read_sample(self, pid):
+        proc_path = os.path.join(self.proc_root, str(pid))
+
+        with open(os.path.join(proc_path, 'stat'), 'r') as stat_file:
+            stat = stat_file.read()
+
+        # The command name can contain spaces so skip past it
+        fields = stat[stat.rindex(')') + 2:].split()
+
+        sample = {
+            'cpu_time': (int(fields[11]) + int(fields[12])) / CLOCK_TICKS,
+            'threads':  int(fields[17]),
+        }
+
+        status = _read_key_values(os.path.join(proc_path, 'status'))
+        sample['rss']  = _parse_kb(status.get('VmRSS'))
+        sample['swap'] = _parse_kb(status.get('VmSwap'))
+
+        # IO counters aren't readable for processes owned by other users
+        try:
+            io_stats = _read_key_values(os.path.join(proc_path, 'io'))
+        except PermissionError:
+            io_stats = {}
+
+        for field in ('read_bytes', 'write_bytes'):
+            value = io_stats.get(field)
+            sample[field] = int(value) if value is not None else None
+
+        return sample
+
+def _read_key_values(path):
+    values = {}
+    with open(path, 'r') as values_file:
+        for line in values_file:
+            key, _, value = line.partition(':')
+            values[key.strip()] = value.strip()
+
+    return values
+
+def _parse_kb(value):
+    if value is None:
+        return None
+
+    return int(value.split()[0]) * 1024
@@ -0,0 +1,190 @@
+"""
+Reading and editing of Minecraft server.properties files
+"""
+
+import os
+import re
+
+from . import errors
+
+class PropertiesDocument(object):
+    """
+    A server.properties file that can be changed and written back without
+    losing its comments, blank lines or the order of its properties
+    """
+
+    LINE_REGEX = re.compile(r'^([a-zA-Z0-9\-.]+)=([^#]*?)( *#.*)?$')
+    KEY_REGEX  = re.compile(r'^[a-zA-Z0-9\-.]+$')
+
+    def __init__(self, lines = None):
+        # Each line is kept as [key, value, comment, text] where the key is
+        # None for lines that aren't properties
+        self._lines = [
+            PropertiesDocument._parse_line(line)
+            for line in lines or []
+        ]
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a properties file
+        """
+
+        with open(path, 'r') as props_file:
+            return cls(props_file.read().splitlines())
+
+    def get(self, key, default = None):
+        """
+        Get the raw value of a property
+        """
+
+        return dict(self.items()).get(key, default)
+
+    def items(self):
+        """
+        Get the raw name and value of each property in the order they appear
+        """
+
+        return [
+            (line[0], line[1])
+            for line in self._lines
+            if line[0] is not None
+        ]
+
+    def set(self, key, value):
+        """
+        Set a property, adding it to the end of the file if it's new. Returns
+        whether the file was changed.
+        """
+
+        value   = PropertiesDocument.format_value(key, value)
+        changed = False
+        found   = False
+
+        for line in self._lines:
+            if line[0] != key:
+                continue
+
+            found = True
+            if line[1] != value:
+                line[1] = value
+                line[3] = key + '=' + value + line[2]
+                changed = True
+
+        if not found:
+            self._lines.append([key, value, '', key + '=' + value])
+            changed = True
+
+        return changed
+
+    def unset(self, key):
+        """
+        Remove a property. Returns whether the file was changed.
+        """
+
+        count       = len(self._lines)
+        self._lines = [line for line in self._lines if line[0] != key]
+
+        return len(self._lines) != count
+
+    def update(self, properties = None, remove = None):
+        """
+        Set and remove many properties at once. Returns whether the file was
+        changed.
+        """
+
+        PropertiesDocument.validate(properties, remove)
+
+        changed = False
+        for key, value in sorted((properties or {}).items()):
+            changed = self.set(key, value) or changed
+
+        for key in remove or []:
+            changed = self.unset(key) or changed
+
+        return changed
+
+    def render(self):
+        """
+        Get the contents of the file as text
+        """
+
+        return ''.join(line[3] + '\n' for line in self._lines)
+
+    def save(self, path):
+        """
+        Write the file to disk. The file is replaced in one step so the server
+        never sees a partially written file.
+        """
+
+        tmp_file = path + '.tmp'
+        with open(tmp_file, 'w') as file_handle:
+            file_handle.write(self.render())
+
+        os.replace(tmp_file, path)
+
+    @classmethod
+    def validate(cls, properties = None, remove = None):
+        """
+        Check a set of changes without applying them
+        """
+
+        for key, value in (properties or {}).items():
+            cls.format_value(key, value)
+
+        for key in remove or []:
+            cls._check_key(key)
+
+        overlap = set(properties or {}) & set(remove or [])
+        if overlap:
+            raise errors.ServerPropertiesError(
+                'Properties can not be both set and removed: {}',
+                ', '.join(sorted(overlap)),
+            )
+
+    @classmethod
+    def format_value(cls, key, value):
+        """
+        Convert a value to how it's written in the properties file
+        """
+
+        cls._check_key(key)
+
+        if value is None:
+            return ''
+        elif isinstance(value, bool):
+            return 'true' if value else 'false'
+        elif isinstance(value, (int, float)):
+            return str(value)
+        elif not isinstance(value, str):
+            raise errors.ServerPropertiesError(
+                'Property {} must be a string, number, boolean or null',
+                key,
+            )
+
+        # Neither can be read back by the parser
+        if any(char in value for char in '\r\n#'):
+            raise errors.ServerPropertiesError(
+                'Property {} can not contain line breaks or #',
+                key,
+            )
+
+        return value
+
+    @classmethod
+    def _check_key(cls, key):
+        if not isinstance(key, str) or not cls.KEY_REGEX.match(key):
+            raise errors.ServerPropertiesError(
+                'Invalid property name {}',
+                key,
+            )
+
+    @classmethod
+    def _parse_line(cls, line):
+        match = cls.LINE_REGEX.match(line.strip())
+        if not match:
+            return [None, None, '', line]
+
+        key, value, comment = match.groups()
+
+        return [key, value, comment or '', line]
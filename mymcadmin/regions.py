@@ -0,0 +1,88 @@
+"""
+Reading and writing of Minecraft region files
+"""
+
+import struct
+
+from . import errors
+
+SECTOR_SIZE = 4096
+CHUNKS      = 1024
+HEADER_SIZE = 2 * SECTOR_SIZE
+MAX_SECTORS = 255
+EXTENSIONS  = ('.mca', '.mcr')
+
+def is_region_file(path):
+    """
+    Check if a file is a region file by its name
+    """
+
+    return path.endswith(EXTENSIONS)
+
+def read_chunks(data):
+    """
+    Split the contents of a region file into its chunks. Returns a list of the
+    index, timestamp and stored data of each chunk in the order they appear in
+    the header. The stored data is the chunk exactly as it's kept in the file:
+    its length, compression type and compressed data without the padding to a
+    whole sector.
+    """
+
+    if len(data) < HEADER_SIZE:
+        raise errors.RegionFileError('Region file is missing its header')
+
+    locations  = struct.unpack_from('>{}I'.format(CHUNKS), data, 0)
+    timestamps = struct.unpack_from('>{}I'.format(CHUNKS), data, SECTOR_SIZE)
+
+    chunks = []
+    for index, location in enumerate(locations):
+        if location == 0:
+            continue
+
+        offset  = location >> 8
+        sectors = location & 0xff
+        start   = offset * SECTOR_SIZE
+        if offset < 2 or sectors == 0 or start + 5 > len(data):
+            raise errors.RegionFileError(
+                'Chunk {} has an invalid location',
+                index,
+            )
+
+        length = struct.unpack_from('>I', data, start)[0]
+        end    = start + 4 + length
+        if length == 0 or end > len(data) or \
+           end > start + sectors * SECTOR_SIZE:
+            raise errors.RegionFileError(
+                'Chunk {} has an invalid length',
+                index,
+            )
+
+        chunks.append((index, timestamps[index], data[start:end]))
+
+    return chunks
+
+def write_region(file_handle, chunks):
+    """
+    Write a region file from a list of the index, timestamp and stored data of
+    its chunks. The chunks are packed one after another with no free sectors
+    between them.
+    """
+
+    header = bytearray(HEADER_SIZE)
+    sector = HEADER_SIZE // SECTOR_SIZE
+
+    chunks = sorted(chunks, key = lambda chunk: chunk[0])
+    for index, timestamp, stored in chunks:
+        sectors = -(-len(stored) // SECTOR_SIZE)
+        if sectors > MAX_SECTORS:
+            raise errors.RegionFileError('Chunk {} is too large', index)
+
+        struct.pack_into('>I', header, index * 4, sector << 8 | sectors)
+        struct.pack_into('>I', header, SECTOR_SIZE + index * 4, timestamp)
+        sector += sectors
+
+    file_handle.write(header)
+
+    for _, _, stored in chunks:
+        file_handle.write(stored)
+        file_handle.write(b'\0' * (-len(stored) % SECTOR_SIZE))
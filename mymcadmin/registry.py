@@ -0,0 +1,140 @@
+"""
+In memory index of the servers in the management root
+"""
+
+import logging
+import os
+import os.path
+import time
+
+from . import errors, server
+
+class ServerRegistry(object):
+    """
+    Keeps a Server for every server directory in the root so looking up and
+    listing servers doesn't touch the disk. The root's modification time is
+    checked at most once per poll interval and the root is only rescanned when
+    it has changed, which happens whenever a server directory is added or
+    removed.
+    """
+
+    DEFAULT_POLL_INTERVAL = 2
+
+    def __init__(self, root, poll_interval = None):
+        if poll_interval is None:
+            poll_interval = ServerRegistry.DEFAULT_POLL_INTERVAL
+
+        self.root          = root
+        self.poll_interval = poll_interval
+
+        self._servers = {}
+        self._mtime   = None
+        self._checked = None
+
+    def get(self, server_id):
+        """
+        Get the Server for a server ID
+        """
+
+        self.refresh()
+
+        srv = self._servers.get(server_id)
+        if srv is None:
+            # The server may have been created since the root was last checked
+            srv = self._add_if_exists(server_id)
+
+        if srv is None:
+            raise errors.ServerDoesNotExistError(server_id)
+
+        return srv
+
+    def server_ids(self):
+        """
+        Get the IDs of all of the servers in sorted order
+        """
+
+        self.refresh()
+
+        return sorted(self._servers.keys())
+
+    def servers(self):
+        """
+        Get the Server for each of the servers in order of their IDs
+        """
+
+        return [self._servers[server_id] for server_id in self.server_ids()]
+
+    def add(self, srv):
+        """
+        Add a newly created server without waiting for the next poll
+        """
+
+        self._servers[srv.server_id] = srv
+
+    def refresh(self, force = False):
+        """
+        Rescan the root if it has changed. Unless forced the root is checked at
+        most once per poll interval.
+        """
+
+        now = time.monotonic()
+        if not force and self._checked is not None and \
+           now - self._checked < self.poll_interval:
+            return
+
+        self._checked = now
+
+        try:
+            mtime = os.stat(self.root).st_mtime_ns
+        except OSError as ex:
+            logging.warning('Unable to check server root: %s', str(ex))
+            return
+
+        if mtime == self._mtime and not force:
+            return
+
+        self._mtime = mtime
+        self._scan()
+
+    def __contains__(self, server_id):
+        self.refresh()
+
+        return server_id in self._servers
+
+    def __len__(self):
+        self.refresh()
+
+        return len(self._servers)
+
+    def _scan(self):
+        logging.debug('Scanning %s for servers', self.root)
+
+        # Hidden directories are used by the manager itself
+        server_ids = set(
+            entry.name
+            for entry in os.scandir(self.root)
+            if not entry.name.startswith('.') and entry.is_dir()
+        )
+
+        for server_id in set(self._servers.keys()) - server_ids:
+            logging.info('Server %s was removed', server_id)
+            del self._servers[server_id]
+
+        for server_id in server_ids - set(self._servers.keys()):
+            self._servers[server_id] = server.Server(
+                os.path.join(self.root, server_id)
+            )
+
+    def _add_if_exists(self, server_id):
+        if not server_id or server_id.startswith('.') or \
+           os.sep in server_id:
+            return None
+
+        server_path = os.path.join(self.root, server_id)
+        if not os.path.exists(server_path):
+            return None
+
+        srv = server.Server(server_path)
+        self._servers[server_id] = srv
+
+        return srv
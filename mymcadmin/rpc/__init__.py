@@ -2,14 +2,18 @@
 JSON RPC interface
 """
 
-from .client import RpcClient
+from .client import AsyncRpcClient, BaseRpcClient, RpcClient
 from .decorators import required_param
 from .dispatcher import Dispatcher
 from .manager import JsonRpcResponseManager
 from .response import JsonRpcBatchResponse, JsonRpcResponse
+from .server import RpcServer
+from .stats import RpcStats
 from .errors import JsonRpcError
 
 __all__ = [
+    'AsyncRpcClient',
+    'BaseRpcClient',
     'Dispatcher',
     'JsonRpcError',
     'JsonRpcBatchResponse',
@@ -17,5 +21,7 @@ __all__ = [
     'JsonRpcResponseManager',
     'required_param',
     'RpcClient',
+    'RpcServer',
+    'RpcStats',
 ]
 
@@ -5,6 +5,10 @@ Base implementations for JSON RPC
 import abc
 import json
 
+# The longest line, and so the largest request or response, that can be sent
+# over a connection
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
 class JsonSerializable(object):
     """
     An object that is JSON serializable
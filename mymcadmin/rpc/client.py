@@ -1,59 +1,57 @@
 """
-JSON RPC client
+JSON RPC clients
 """
 
+import abc
 import asyncio
 import json
 import logging
 
-from . import errors, request
+from . import base, errors, request
+from .response import JsonRpcParseErrorResponse
 from .. import utils
 
-class RpcClient(object):
+class BaseRpcClient(object, metaclass = abc.ABCMeta):
     """
-    JSON RPC client
+    The methods of the management process's JSON RPC interface. Subclasses
+    decide how requests are sent by implementing execute_rpc_method. If port
+    is None then host is the path of a Unix socket to connect to instead.
     """
 
-    def __init__(self, host, port, event_loop = None):
-        if event_loop is None:
-            event_loop = asyncio.get_event_loop()
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
 
-        self.event_loop = event_loop
-        self.host       = host
-        self.port       = port
-        self.reader     = None
-        self.writer     = None
-
-    def start(self):
+    def list_servers(self):
         """
-        Start the JSON RPC client
+        Get the list of available servers
         """
 
-        utils.setup_logging()
-
-        logging.info('Setting up network connection')
-        self.event_loop.run_until_complete(self._connect())
+        return self.execute_rpc_method('list_servers')
 
-    def stop(self):
+    def rpc_stats(self):
         """
-        Stop the JSON RPC client
+        Get the request statistics of the management process
         """
 
-        self.event_loop.close()
+        return self.execute_rpc_method('rpc_stats')
 
-    def list_servers(self):
+    def shutdown(self):
         """
-        Get the list of available servers
+        Ask the management process to stop
         """
 
-        return self.execute_rpc_method('list_servers')
+        return self.execute_rpc_method('shutdown')
 
-    def shutdown(self):
+    def server_command(self, server_id, command):
         """
-        Ask the management process to stop
+        Send a console command to a running Minecraft server
         """
 
-        return self.execute_rpc_method('shutdown')
+        return self.execute_rpc_method(
+            'server_command',
+            {'server_id': server_id, 'command': command},
+        )
 
     def server_create(self, server_id, version = None, forge = None):
         """
@@ -75,19 +73,154 @@ class RpcClient(object):
             params,
         )
 
-    def server_start(self, server_id):
+    def server_backup(self, server_id, timeout = None):
+        """
+        Ask the management process to back up the worlds of a Minecraft server
+        """
+
+        params = {
+            'server_id': server_id,
+        }
+
+        if timeout is not None:
+            params['timeout'] = timeout
+
+        return self.execute_rpc_method('server_backup', params)
+
+    def server_backups(self, server_id):
+        """
+        Get the names of the backups of a Minecraft server
+        """
+
+        return self.execute_rpc_method(
+            'server_backups',
+            {'server_id': server_id},
+        )
+
+    def server_logs(self, server_id, lines = None):
+        """
+        Get the most recent console output of a Minecraft server
+        """
+
+        params = {
+            'server_id': server_id,
+        }
+
+        if lines is not None:
+            params['lines'] = lines
+
+        return self.execute_rpc_method('server_logs', params)
+
+    def server_properties_get(self, server_id, keys = None):
+        """
+        Get the Minecraft server properties of a server, or just the listed
+        ones
+        """
+
+        params = {
+            'server_id': server_id,
+        }
+
+        if keys is not None:
+            params['keys'] = keys
+
+        return self.execute_rpc_method('server_properties_get', params)
+
+    def server_properties_set(self, servers, properties = None, remove = None):
+        """
+        Change and remove the Minecraft server properties of the servers
+        matching a list of IDs, glob patterns and tags
+        """
+
+        params = {
+            'servers': servers,
+        }
+
+        if properties is not None:
+            params['properties'] = properties
+
+        if remove is not None:
+            params['remove'] = remove
+
+        return self.execute_rpc_method('server_properties_set', params)
+
+    def server_restore(self, server_id, name):
+        """
+        Ask the management process to replace the worlds of a stopped
+        Minecraft server with a backup
+        """
+
+        return self.execute_rpc_method(
+            'server_restore',
+            {
+                'server_id': server_id,
+                'name':      name,
+            },
+        )
+
+    def server_start(self, server_id, wait = False, timeout = None):
         """
-        Ask the management process to start a Minecraft server
+        Ask the management process to start a Minecraft server. If wait is
+        set then this doesn't return until the server has finished loading.
         """
 
-        return self.execute_rpc_method('server_start', {'server_id': server_id})
+        params = {
+            'server_id': server_id,
+        }
+
+        if wait:
+            params['wait'] = wait
 
-    def server_start_all(self):
+        if timeout is not None:
+            params['timeout'] = timeout
+
+        return self.execute_rpc_method('server_start', params)
+
+    def server_start_all(self, servers = None, wait = False, timeout = None):
+        """
+        Ask the management process to start all the Minecraft servers, or the
+        ones matching a list of IDs, glob patterns and tags
+        """
+
+        params = {}
+
+        if servers is not None:
+            params['servers'] = list(servers)
+
+        if wait:
+            params['wait'] = wait
+
+        if timeout is not None:
+            params['timeout'] = timeout
+
+        if not params:
+            return self.execute_rpc_method('server_start_all')
+
+        return self.execute_rpc_method('server_start_all', params)
+
+    def server_stats(self, server_id, samples = None):
         """
-        Ask the management process to start all the Minecraft servers
+        Get the recent resource usage of a Minecraft server
         """
 
-        return self.execute_rpc_method('server_start_all')
+        params = {
+            'server_id': server_id,
+        }
+
+        if samples is not None:
+            params['samples'] = samples
+
+        return self.execute_rpc_method('server_stats', params)
+
+    def server_status(self, server_id):
+        """
+        Get the state of a Minecraft server and how long it takes to boot
+        """
+
+        return self.execute_rpc_method(
+            'server_status',
+            {'server_id': server_id},
+        )
 
     def server_stop(self, server_id):
         """
@@ -96,12 +229,19 @@ class RpcClient(object):
 
         return self.execute_rpc_method('server_stop', {'server_id': server_id})
 
-    def server_stop_all(self):
+    def server_stop_all(self, servers = None):
         """
-        Ask the management process to stop all the Minecraft servers
+        Ask the management process to stop all the Minecraft servers, or the
+        ones matching a list of IDs, glob patterns and tags
         """
 
-        return self.execute_rpc_method('server_stop_all')
+        if servers is None:
+            return self.execute_rpc_method('server_stop_all')
+
+        return self.execute_rpc_method(
+            'server_stop_all',
+            {'servers': list(servers)},
+        )
 
     def server_restart(self, server_id):
         """
@@ -110,20 +250,107 @@ class RpcClient(object):
 
         return self.execute_rpc_method('server_restart', {'server_id': server_id})
 
-    def server_restart_all(self):
+    def server_restart_all(self, servers = None):
+        """
+        Ask the management process to restart all the Minecraft servers, or
+        the ones matching a list of IDs, glob patterns and tags
+        """
+
+        if servers is None:
+            return self.execute_rpc_method('server_restart_all')
+
+        return self.execute_rpc_method(
+            'server_restart_all',
+            {'servers': list(servers)},
+        )
+
+    @abc.abstractmethod
+    def execute_rpc_method(self, method, params = None):
+        """
+        Execute a JSON RPC method on the management server
+        """
+
+    async def _open_connection(self, event_loop):
+        if self.port is None:
+            return await asyncio.open_unix_connection(
+                self.host,
+                limit = base.MAX_MESSAGE_SIZE,
+                loop  = event_loop,
+            )
+
+        return await asyncio.open_connection(
+            self.host,
+            self.port,
+            limit = base.MAX_MESSAGE_SIZE,
+            loop  = event_loop,
+        )
+
+    @staticmethod
+    def _get_result(response, request_id):
+        if 'error' in response:
+            raise errors.JsonRpcError(
+                'RPC error: {}',
+                response['error']['message'],
+            )
+
+        if response.get('id') != request_id:
+            raise errors.JsonRpcError(
+                'Received a response for request {}, expected {}',
+                response.get('id'),
+                request_id,
+            )
+
+        return response['result']
+
+class RpcClient(BaseRpcClient):
+    """
+    Blocking JSON RPC client that runs its own event loop
+    """
+
+    def __init__(self, host, port, event_loop = None):
+        super(RpcClient, self).__init__(host, port)
+
+        if event_loop is None:
+            event_loop = asyncio.get_event_loop()
+
+        self.event_loop = event_loop
+        self.reader     = None
+        self.writer     = None
+
+        self._next_id = 1
+
+    def start(self):
+        """
+        Start the JSON RPC client
+        """
+
+        utils.setup_logging()
+
+        logging.info('Setting up network connection')
+        self.event_loop.run_until_complete(self._connect())
+
+    def stop(self):
         """
-        Ask the management process to restart all the Minecraft servers
+        Stop the JSON RPC client
         """
 
-        return self.execute_rpc_method('server_restart_all')
+        if self.writer is not None:
+            self.writer.close()
+
+        self.event_loop.close()
 
     def execute_rpc_method(self, method, params = None):
         """
-        Execute a JSON RPC command on the management server
+        Execute a JSON RPC command on the management server. The connection
+        is reused so any number of methods can be executed between start and
+        stop.
         """
 
+        request_id     = self._next_id
+        self._next_id += 1
+
         return self.event_loop.run_until_complete(
-            self._send(method, params)
+            self._send(method, params, request_id)
         )
 
     def __enter__(self):
@@ -135,11 +362,7 @@ class RpcClient(object):
         self.stop()
 
     async def _connect(self):
-        self.reader, self.writer = await asyncio.open_connection(
-            self.host,
-            self.port,
-            loop = self.event_loop,
-        )
+        self.reader, self.writer = await self._open_connection(self.event_loop)
 
     async def _send(self, method, params, request_id = 1):
         data = request.JsonRpcRequest(
@@ -149,21 +372,264 @@ class RpcClient(object):
         ).json
 
         logging.info('Sending "%s" to server', data)
-        self.writer.write(data.encode())
-        self.writer.write_eof()
+        self.writer.write(data.encode() + b'\n')
         await self.writer.drain()
 
         logging.info('Waiting for server response')
         response = await self.reader.readline()
+        if not response:
+            raise errors.JsonRpcError('Connection closed by the server')
+
         response = response.decode()
         logging.info('Received "%s" from the server', response)
         response = json.loads(response)
 
-        if 'error' in response:
-            raise errors.JsonRpcError(
-                'RPC error: {}',
-                response['error']['message'],
+        return self._get_result(response, request_id)
+
+class _PendingRequests(object):
+    """
+    The requests of a client that are waiting for a response, keyed by ID
+    """
+
+    def __init__(self, event_loop):
+        self.event_loop  = event_loop
+        self.futures     = {}
+        self.next_id     = 1
+        self.closed_with = None
+
+    def add(self):
+        """
+        Start waiting for the response to a new request. Returns the ID for
+        the request and the future that gets its result.
+        """
+
+        if self.closed_with is not None:
+            raise self.closed_with
+
+        request_id    = self.next_id
+        self.next_id += 1
+
+        future = asyncio.Future(loop = self.event_loop)
+        self.futures[request_id] = future
+
+        return request_id, future
+
+    def get(self, request_id):
+        """
+        Get the future for a request that's still waiting for its response
+        """
+
+        future = self.futures.get(request_id)
+        if future is None or future.done():
+            return None
+
+        return future
+
+    def remove(self, request_id):
+        """
+        Stop waiting for the response to a request
+        """
+
+        self.futures.pop(request_id, None)
+
+    def reject(self, exception):
+        """
+        Fail every request that's waiting for a response
+        """
+
+        for future in self.futures.values():
+            if not future.done():
+                future.set_exception(exception)
+
+        self.futures.clear()
+
+    def close(self, exception):
+        """
+        Fail every request that's waiting for a response along with any that
+        are made later
+        """
+
+        self.closed_with = exception
+
+        self.reject(exception)
+
+class AsyncRpcClient(BaseRpcClient):
+    """
+    JSON RPC client for use from asyncio code. Every method is a coroutine.
+    Requests share a single connection and any number of them can be in
+    flight at once, their responses are matched up by ID as they arrive.
+
+    If a timeout is given then methods that don't get a response in that many
+    seconds raise asyncio.TimeoutError. A method that times out or is
+    cancelled doesn't affect the others.
+    """
+
+    def __init__(self, host, port, event_loop = None, timeout = None):
+        super(AsyncRpcClient, self).__init__(host, port)
+
+        if event_loop is None:
+            event_loop = asyncio.get_event_loop()
+
+        self.event_loop = event_loop
+        self.timeout    = timeout
+        self.reader     = None
+        self.writer     = None
+
+        self._requests   = _PendingRequests(event_loop)
+        self._read_task  = None
+        self._write_lock = asyncio.Lock()
+
+    async def start(self):
+        """
+        Connect to the management process
+        """
+
+        logging.info('Setting up network connection')
+        self.reader, self.writer = await self._open_connection(self.event_loop)
+
+        self._requests.closed_with = None
+
+        self._read_task = asyncio.ensure_future(
+            self._read_responses(),
+            loop = self.event_loop,
+        )
+
+    async def stop(self):
+        """
+        Close the connection. Methods still waiting for a response raise an
+        error.
+        """
+
+        if self.writer is not None:
+            self.writer.close()
+
+        if self._read_task is not None:
+            self._read_task.cancel()
+
+            try:
+                await self._read_task
+            except asyncio.CancelledError:
+                pass
+
+            self._read_task = None
+
+        self._requests.close(errors.JsonRpcError('Connection closed'))
+
+    # The RPC methods return what this returns, which makes them coroutines
+    # pylint: disable=invalid-overridden-method
+    async def execute_rpc_method(self, method, params = None, timeout = None):
+        """
+        Execute a JSON RPC method on the management server and wait for its
+        response. The timeout overrides the client's timeout for this method.
+        """
+
+        if self.writer is None:
+            raise errors.JsonRpcError('Client is not connected')
+
+        if timeout is None:
+            timeout = self.timeout
+
+        request_id, response = self._requests.add()
+
+        data = request.JsonRpcRequest(
+            method     = method,
+            params     = params,
+            request_id = request_id,
+        ).json
+
+        try:
+            logging.info('Sending "%s" to server', data)
+
+            # Only one coroutine can wait on drain at a time
+            async with self._write_lock:
+                self.writer.write(data.encode() + b'\n')
+                await self.writer.drain()
+
+            return await asyncio.wait_for(response, timeout)
+        finally:
+            self._requests.remove(request_id)
+    # pylint: enable=invalid-overridden-method
+
+    async def __aenter__(self):
+        await self.start()
+
+        return self
+
+    async def __aexit__(self, exception_type, exception_value, traceback):
+        await self.stop()
+
+    async def _read_responses(self):
+        # pylint: disable=broad-except
+        try:
+            while True:
+                data = await self.reader.readline()
+                if not data:
+                    break
+
+                self._handle_response(data)
+        except Exception as ex:
+            if isinstance(ex, asyncio.CancelledError):
+                raise
+
+            logging.exception('Lost connection to the server: %s', str(ex))
+        # pylint: enable=broad-except
+
+        self._requests.close(
+            errors.JsonRpcError('Connection closed by the server')
+        )
+
+    def _handle_response(self, data):
+        data = data.decode()
+        logging.info('Received "%s" from the server', data)
+
+        try:
+            response = json.loads(data)
+        except ValueError:
+            logging.error('Received an invalid response: %s', data)
+            return
+
+        # Batch requests get a list of responses back
+        if isinstance(response, list):
+            for item in response:
+                self._resolve_response(item)
+        else:
+            self._resolve_response(response)
+
+    def _resolve_response(self, response):
+        if not isinstance(response, dict):
+            logging.error('Received an invalid response: %s', response)
+            return
+
+        request_id = response.get('id')
+
+        # The server couldn't parse what was sent so it can't say which
+        # request failed, and none of them can succeed
+        if request_id is None and self._is_parse_error(response):
+            try:
+                self._get_result(response, request_id)
+            except errors.JsonRpcError as ex:
+                self._requests.reject(ex)
+
+            return
+
+        # Requests that timed out or were cancelled are no longer pending
+        future = self._requests.get(request_id)
+        if future is None:
+            logging.warning(
+                'Received a response for unknown request %s',
+                request_id,
             )
 
-        return response['result']
+            return
+
+        try:
+            future.set_result(self._get_result(response, request_id))
+        except errors.JsonRpcError as ex:
+            future.set_exception(ex)
+
+    @staticmethod
+    def _is_parse_error(response):
+        error = response.get('error')
 
+        return isinstance(error, dict) and \
+            error.get('code') == JsonRpcParseErrorResponse.CODE
@@ -21,6 +21,16 @@ class JsonRpcError(errors.MyMCAdminError):
 
         return getattr(self, 'RESPONSE_TYPE')()
 
+    def response_for(self, request_id):
+        """
+        Get a JSON RPC response for this error as the answer to a request
+        """
+
+        return getattr(self, 'RESPONSE_TYPE')(
+            request_id = request_id,
+            message    = self.message,
+        )
+
 class JsonRpcParseRequestError(JsonRpcError):
     """
     Throw when there's a proble parsing the JSON RPC request
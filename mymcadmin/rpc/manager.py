@@ -2,7 +2,9 @@
 JSON RPC response manager for handling requests
 """
 
+import asyncio
 import logging
+import time
 
 from . import errors, request, response
 
@@ -12,9 +14,12 @@ class JsonRpcResponseManager(object):
     """
 
     @classmethod
-    async def handle(cls, request_str, dispatcher):
+    async def handle(cls, request_str, dispatcher, limiter = None,
+                     stats = None):
         """
-        Handle a JSON RPC request
+        Handle a JSON RPC request. If a limiter (such as a semaphore) is given
+        then it's held while each request is being worked on. If stats (an
+        RpcStats) are given then each call to a method is recorded in them.
         """
 
         if isinstance(request_str, bytes):
@@ -27,10 +32,11 @@ class JsonRpcResponseManager(object):
 
             return ex.response
 
-        return await cls.handle_request(req, dispatcher)
+        return await cls.handle_request(req, dispatcher, limiter, stats)
 
     @classmethod
-    async def handle_request(cls, rpc_request, dispatcher):
+    async def handle_request(cls, rpc_request, dispatcher, limiter = None,
+                             stats = None):
         """
         Backend handling of a request
         """
@@ -38,7 +44,12 @@ class JsonRpcResponseManager(object):
         if not isinstance(rpc_request, request.JsonRpcBatchRequest):
             rpc_request = [rpc_request]
 
-        responses = await cls._get_responses(rpc_request, dispatcher)
+        responses = await cls._get_responses(
+            rpc_request,
+            dispatcher,
+            limiter,
+            stats,
+        )
         responses = [resp for resp in responses if resp is not None]
 
         # Happens when we recieve a batch of notifications
@@ -51,46 +62,79 @@ class JsonRpcResponseManager(object):
             return responses[0]
 
     @classmethod
-    async def _get_responses(cls, requests, dispatcher):
-        responses = []
+    async def _get_responses(cls, requests, dispatcher, limiter = None,
+                             stats = None):
+        # Batch members are run concurrently but gather keeps the responses in
+        # the same order as the requests
+        responses = await asyncio.gather(
+            *[
+                cls._get_response(req, dispatcher, limiter, stats)
+                for req in requests
+            ]
+        )
+
+        return [
+            resp
+            for req, resp in zip(requests, responses)
+            if not req.is_notification
+        ]
+
+    @classmethod
+    async def _get_response(cls, req, dispatcher, limiter = None,
+                            stats = None):
+        if limiter is None:
+            return await cls._execute(req, dispatcher, stats)
+
+        queued = time.monotonic()
+
+        async with limiter:
+            queued = time.monotonic() - queued
+
+            return await cls._execute(req, dispatcher, stats, queued)
+
+    @classmethod
+    async def _execute(cls, req, dispatcher, stats = None, queued = 0):
+        method = None
+        start  = time.monotonic()
 
         # pylint: disable=broad-except
-        for req in requests:
+        try:
             try:
-                try:
-                    method = dispatcher[req.method]
-                except KeyError:
-                    raise errors.JsonRpcMethodNotFoundError(
-                        req.request_id,
-                        'Unknown method: {}',
-                        req.method,
-                    )
-
-                result = await method(*req.args, **req.kwargs)
-                resp   = response.JsonRpcResponse(
-                    response_id = req.request_id,
-                    result      = result,
+                method = dispatcher[req.method]
+            except KeyError:
+                raise errors.JsonRpcMethodNotFoundError(
+                    req.request_id,
+                    'Unknown method: {}',
+                    req.method,
                 )
 
-                if not req.is_notification:
-                    responses.append(resp)
-            except errors.JsonRpcError as ex:
-                logging.exception(ex.message, exc_info = True)
+            result = await method(*req.args, **req.kwargs)
 
-                resp = ex.response
-                if not req.is_notification:
-                    responses.append(resp)
-            except Exception as ex:
-                logging.exception(str(ex), exc_info = True)
+            resp = response.JsonRpcResponse(
+                response_id = req.request_id,
+                result      = result,
+            )
+        except errors.JsonRpcError as ex:
+            logging.exception(ex.message, exc_info = True)
 
-                resp = errors.JsonRpcServerError(
-                    req.request_id,
-                    str(ex),
-                ).response
+            resp = ex.response_for(req.request_id)
+        except Exception as ex:
+            logging.exception(str(ex), exc_info = True)
 
-                if not req.is_notification:
-                    responses.append(resp)
+            resp = errors.JsonRpcServerError(
+                req.request_id,
+                str(ex),
+            ).response
         # pylint: enable=broad-except
 
-        return responses
-
+        # Unknown methods aren't recorded so clients can't add to the stats
+        if stats is not None and method is not None:
+            stats.record(
+                req.method,
+                time.monotonic() - start,
+                success = resp.error is None,
+                queued  = queued,
+                params  = req.params,
+            )
+
+        return resp
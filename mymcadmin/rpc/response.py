@@ -144,10 +144,13 @@ class JsonRpcParseErrorResponse(JsonRpcErrorResponse):
     A JSON RPC error response for invalid JSON formatting
     """
 
-    def __init__(self):
+    CODE = -32700
+
+    def __init__(self, request_id = None, message = 'Parse error'):
         super(JsonRpcParseErrorResponse, self).__init__(
-            -32700,
-            'Parse error',
+            self.CODE,
+            message,
+            request_id = request_id,
         )
 
 class JsonRpcInvalidRequestResponse(JsonRpcErrorResponse):
@@ -155,10 +158,12 @@ class JsonRpcInvalidRequestResponse(JsonRpcErrorResponse):
     A JSON RPC error response for an invalid request
     """
 
-    def __init__(self, request_id = None):
+    CODE = -32600
+
+    def __init__(self, request_id = None, message = 'Invalid Request'):
         super(JsonRpcInvalidRequestResponse, self).__init__(
-            -32600,
-            'Invalid Request',
+            self.CODE,
+            message,
             request_id = request_id,
         )
 
@@ -167,10 +172,12 @@ class JsonRpcMethodNotFoundResponse(JsonRpcErrorResponse):
     A JSON RPC error response for a request for a non-existant method
     """
 
-    def __init__(self, request_id):
+    CODE = -32601
+
+    def __init__(self, request_id, message = 'Method not found'):
         super(JsonRpcMethodNotFoundResponse, self).__init__(
-            -32601,
-            'Method not found',
+            self.CODE,
+            message,
             request_id = request_id,
         )
 
@@ -179,10 +186,12 @@ class JsonRpcServerErrorResponse(JsonRpcErrorResponse):
     A JSON RPC error response for a general server error
     """
 
-    def __init__(self, request_id):
+    CODE = -32000
+
+    def __init__(self, request_id, message = 'Server error'):
         super(JsonRpcServerErrorResponse, self).__init__(
-            -32000,
-            'Server error',
+            self.CODE,
+            message,
             request_id = request_id,
         )
 
@@ -0,0 +1,243 @@
+"""
+Serving the JSON RPC interface to connected clients
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import stat
+import time
+
+from . import base, response
+from .manager import JsonRpcResponseManager
+from .. import errors
+
+class RpcServer(object):
+    """
+    Handles JSON RPC clients connected over TCP or a Unix socket
+    """
+
+    def __init__(self, dispatcher, stats, max_concurrent_requests = None):
+        self.dispatcher              = dispatcher
+        self.stats                   = stats
+        self.max_concurrent_requests = max_concurrent_requests
+        self.listeners               = []
+        self.connections             = set()
+
+    async def handle_connection(self, reader, writer):
+        """
+        Handle a client connection. Each line sent by the client is a JSON RPC
+        request (or batch) and each response is sent back as a single line.
+        Requests are handled as they arrive so a client can have several in
+        flight at once and match up the responses by their ID. The connection
+        stays open until the client closes its end or the server is closed.
+        """
+
+        address    = writer.get_extra_info('peername')
+        write_lock = asyncio.Lock()
+        pending    = set()
+
+        if self.max_concurrent_requests:
+            limiter = asyncio.Semaphore(self.max_concurrent_requests)
+        else:
+            limiter = None
+
+        self.connections.add(reader)
+
+        while True:
+            try:
+                data = await reader.readline()
+            except ValueError:
+                logging.error('Request from client %s was too large', address)
+
+                # The rest of the request is still to come so there's no
+                # telling where the next one starts
+                await self._send_response(
+                    response.JsonRpcParseErrorResponse(
+                        message = 'Request is too large',
+                    ),
+                    writer,
+                    address,
+                    write_lock,
+                )
+
+                break
+            except ConnectionError:
+                logging.info('Lost connection to client %s', address)
+                break
+
+            if not data:
+                break
+
+            if not data.strip():
+                continue
+
+            task = asyncio.ensure_future(
+                self._handle_message(
+                    data,
+                    writer,
+                    address,
+                    write_lock,
+                    limiter,
+                )
+            )
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        self.connections.discard(reader)
+
+        if pending:
+            await asyncio.wait(pending)
+
+        writer.close()
+
+    def close(self):
+        """
+        Stop listening for connections and end the connections of clients
+        that are still connected. Requests that were already received are
+        still answered before their connection is closed.
+        """
+
+        for listener in self.listeners:
+            listener.close()
+
+        self.listeners = []
+
+        for reader in self.connections:
+            reader.feed_eof()
+
+    async def start_server(self, host, port, loop = None):
+        """
+        Listen for connections on a TCP port
+        """
+
+        listener = await asyncio.start_server(
+            self.handle_connection,
+            host,
+            port,
+            limit = base.MAX_MESSAGE_SIZE,
+            loop  = loop,
+        )
+
+        self.listeners.append(listener)
+
+        return listener
+
+    async def start_unix_server(self, path, mode, loop = None):
+        """
+        Listen for connections on a Unix socket. The socket's permissions
+        decide who can connect so it's created with the mode already applied
+        instead of being changed after it starts accepting connections.
+        """
+
+        RpcServer.remove_stale_socket(path)
+
+        old_umask = os.umask(0o777 & ~mode)
+        try:
+            listener = await asyncio.start_unix_server(
+                self.handle_connection,
+                path  = path,
+                limit = base.MAX_MESSAGE_SIZE,
+                loop  = loop,
+            )
+        finally:
+            os.umask(old_umask)
+
+        self.listeners.append(listener)
+
+        return listener
+
+    @staticmethod
+    def remove_stale_socket(path):
+        """
+        Remove a Unix socket left behind by a daemon that didn't shut down
+        cleanly. A socket that something is still listening on is left alone.
+        """
+
+        try:
+            mode = os.stat(path).st_mode
+        except FileNotFoundError:
+            return
+
+        if not stat.S_ISSOCK(mode):
+            raise errors.ManagerError(
+                '{} already exists and is not a socket',
+                path,
+            )
+
+        probe = socket.socket(socket.AF_UNIX)
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+            return
+        except OSError as ex:
+            raise errors.ManagerError(
+                'Unable to check if {} is in use: {}',
+                path,
+                str(ex),
+            )
+        finally:
+            probe.close()
+
+        raise errors.ManagerError(
+            'Another management daemon is already listening on {}',
+            path,
+        )
+
+    @staticmethod
+    def remove_socket(path):
+        """
+        Remove the Unix socket once the server has stopped listening on it
+        """
+
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    async def _handle_message(self, data, writer, address, write_lock,
+                              limiter):
+        message = data.decode()
+
+        logging.info(
+            'Recieved "%s" from client %s',
+            message.strip(),
+            address,
+        )
+
+        json_response = await JsonRpcResponseManager.handle(
+            data,
+            self.dispatcher,
+            limiter = limiter,
+            stats   = self.stats,
+        )
+
+        # Notifications don't get a response
+        if json_response is None:
+            return
+
+        await self._send_response(json_response, writer, address, write_lock)
+
+    async def _send_response(self, json_response, writer, address,
+                             write_lock):
+        response_data = json_response.json
+
+        logging.info(
+            'Sending response back to %s:\n%s',
+            address,
+            response_data,
+        )
+
+        async with write_lock:
+            start = time.monotonic()
+
+            try:
+                writer.write(response_data.encode() + b'\n')
+                await writer.drain()
+            except ConnectionError:
+                logging.info('Lost connection to client %s', address)
+                return
+
+            self.stats.record_write(time.monotonic() - start)
@@ -0,0 +1,177 @@
+"""
+Request statistics for the JSON RPC interface
+"""
+
+import json
+import logging
+
+from .. import metrics
+
+class RpcStats(object):
+    """
+    Counts the requests made to each RPC method and how many of them failed.
+    For each method it keeps a histogram of how long requests waited for a
+    free slot before being worked on and how long the handler took, and for
+    the whole process how long it took to write the responses back to the
+    clients. Together these show whether slow requests come from the
+    dispatcher, the handlers or the network.
+
+    Calls that take at least slow_threshold seconds are logged.
+    """
+
+    DEFAULT_SLOW_THRESHOLD = 1
+
+    LATENCY_BUCKETS = [
+        0.001,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1,
+        2.5,
+        5,
+        10,
+        30,
+        60,
+    ]
+
+    def __init__(self, slow_threshold = None):
+        if slow_threshold is None:
+            slow_threshold = RpcStats.DEFAULT_SLOW_THRESHOLD
+
+        self.slow_threshold = slow_threshold
+
+        self.requests    = {}
+        self.errors      = {}
+        self.slow        = {}
+        self.latencies   = {}
+        self.queue_times = {}
+        self.write_times = metrics.Histogram(RpcStats.LATENCY_BUCKETS)
+
+    def record(self, method, duration, success = True, queued = 0,
+               params = None):
+        """
+        Record a finished call to a method. The duration is the time spent in
+        the handler and queued is the time spent waiting to be handled. The
+        params are only used to log the size of slow calls.
+        """
+
+        if method not in self.latencies:
+            self.requests[method]    = 0
+            self.errors[method]      = 0
+            self.slow[method]        = 0
+            self.latencies[method]   = metrics.Histogram(
+                RpcStats.LATENCY_BUCKETS,
+            )
+            self.queue_times[method] = metrics.Histogram(
+                RpcStats.LATENCY_BUCKETS,
+            )
+
+        self.requests[method] += 1
+        if not success:
+            self.errors[method] += 1
+
+        self.latencies[method].observe(duration)
+        self.queue_times[method].observe(queued)
+
+        if duration + queued >= self.slow_threshold:
+            self.slow[method] += 1
+
+            logging.warning(
+                'Slow RPC call to %s with %s bytes of params took %.3f ' +
+                'seconds (%.3f seconds handling, %.3f seconds queued)',
+                method,
+                len(json.dumps(params)) if params else 0,
+                duration + queued,
+                duration,
+                queued,
+            )
+
+    def record_write(self, duration):
+        """
+        Record the time taken to send a response to a client
+        """
+
+        self.write_times.observe(duration)
+
+    def as_dict(self):
+        """
+        Get the statistics in a JSON friendly form
+        """
+
+        return {
+            'slow_threshold': self.slow_threshold,
+            'methods':        {
+                method: {
+                    'requests':   self.requests[method],
+                    'errors':     self.errors[method],
+                    'slow':       self.slow[method],
+                    'latency':    self.latencies[method].as_dict(),
+                    'queue_time': self.queue_times[method].as_dict(),
+                }
+                for method in self.latencies
+            },
+            'write_time':     self.write_times.as_dict(),
+        }
+
+    def add_metrics(self, page):
+        """
+        Add the statistics to a page of metrics
+        """
+
+        page.add(
+            'mymcadmin_rpc_requests_total',
+            'counter',
+            'RPC requests handled by method',
+            [
+                ({'method': method}, count)
+                for method, count in sorted(self.requests.items())
+            ],
+        )
+
+        page.add(
+            'mymcadmin_rpc_errors_total',
+            'counter',
+            'RPC requests that returned an error by method',
+            [
+                ({'method': method}, count)
+                for method, count in sorted(self.errors.items())
+            ],
+        )
+
+        page.add_histograms(
+            'mymcadmin_rpc_request_duration_seconds',
+            'Time taken to handle RPC requests by method',
+            [
+                ({'method': method}, histogram)
+                for method, histogram in sorted(self.latencies.items())
+            ],
+        )
+
+        page.add_histograms(
+            'mymcadmin_rpc_queue_duration_seconds',
+            'Time RPC requests waited before being handled by method',
+            [
+                ({'method': method}, histogram)
+                for method, histogram in sorted(self.queue_times.items())
+            ],
+        )
+
+        page.add(
+            'mymcadmin_rpc_slow_requests_total',
+            'counter',
+            'RPC requests slower than the slow request threshold by method',
+            [
+                ({'method': method}, count)
+                for method, count in sorted(self.slow.items())
+            ],
+        )
+
+        page.add_histograms(
+            'mymcadmin_rpc_response_write_duration_seconds',
+            'Time taken to send RPC responses to clients',
+            [({}, self.write_times)],
+        )
@@ -5,25 +5,23 @@ Minecraft server instance representation
 import asyncio
 import fileinput
 import glob
-import hashlib
 import json
 import logging
 import os
 import os.path
 import re
 import shlex
+import threading
 
-import requests
-
-from . import errors
+from . import cache, download, errors, filecache, properties
 
 class Server(object):
     """
     A Minecraft server instance
     """
 
+    DEFAULT_LEVEL_NAME    = 'world'
     PROPERTIES_FILE       = 'server.properties'
-    PROPERTIES_REGEX      = re.compile(r'^([a-zA-Z0-9\-]+)=([^#]*)( *#.*)?$')
     PROPERTIES_BOOL_REGEX = re.compile(r'^(true|false)$', re.IGNORECASE)
     PROPERTIES_INT_REGEX  = re.compile(r'^([0-9]+)$')
     SETTINGS_FILE         = 'mymcadmin.settings'
@@ -39,9 +37,8 @@ class Server(object):
         self._path            = path
         self._cache           = {}
         self._properties_file = os.path.join(path, Server.PROPERTIES_FILE)
-        self._properties      = None
         self._settings_file   = os.path.join(path, Server.SETTINGS_FILE)
-        self._settings        = None
+        self._properties_lock = threading.Lock()
 
     @property
     def path(self):
@@ -65,10 +62,7 @@ class Server(object):
         Get the Java binary to use
         """
 
-        if 'java' not in self._cache:
-            self._cache['java'] = self.settings.get('java', 'java')
-
-        return self._cache['java']
+        return self.settings.get('java', 'java')
 
     @property
     def jar(self):
@@ -76,8 +70,9 @@ class Server(object):
         Get the server Jar to run
         """
 
-        if 'jar' not in self._cache and 'jar' in self.settings:
-            self._cache['jar'] = self.settings['jar']
+        # The settings can change on disk so only the search is cached
+        if 'jar' in self.settings:
+            return self.settings['jar']
 
         if 'jar' not in self._cache:
             jars = glob.glob(os.path.join(self._path, '*.jar'))
@@ -114,48 +109,55 @@ class Server(object):
     def properties(self):
         """
         Get the Minecraft server properties defined in the server.properties
-        file
+        file. The file is only parsed again after it changes.
         """
 
-        if not self._properties:
-            try:
-                with open(self._properties_file, 'r') as props_file:
-                    props = props_file.readlines()
-            except FileNotFoundError:
-                raise errors.ServerError(
-                    'Server properties file could not be found. ' +
-                    'Try starting the server first to generate one.'
-                )
+        try:
+            return filecache.get(
+                self._properties_file,
+                Server._load_properties,
+            )
+        except FileNotFoundError:
+            raise Server._missing_properties_error()
 
-            self._properties = {}
-            for line in props:
-                match = Server.PROPERTIES_REGEX.match(line.strip())
-                if not match:
-                    continue
+    @property
+    def worlds(self):
+        """
+        Get the names of the server's world directories. The main world is
+        named by the level-name property and servers such as Bukkit keep the
+        Nether and the End in directories next to it.
+        """
 
-                name, value, _ = match.groups()
-                self._properties[name] = Server._convert_property_value(value)
+        try:
+            level_name = self.properties.get('level-name')
+        except errors.ServerError:
+            level_name = None
 
-        return self._properties
+        level_name = str(level_name or Server.DEFAULT_LEVEL_NAME)
+        if not os.path.isdir(os.path.join(self._path, level_name)):
+            return []
+
+        return [level_name] + [
+            name
+            for name in [level_name + '_nether', level_name + '_the_end']
+            if os.path.isdir(os.path.join(self._path, name))
+        ]
 
     @property
     def settings(self):
         """
         Get the MyMCAdmin settings for this server that are defined in the
-        mymcadmin.settings file
+        mymcadmin.settings file. The file is only parsed again after it
+        changes.
         """
 
-        if not self._settings:
-            try:
-                with open(self._settings_file, 'r') as settings_file:
-                    self._settings = json.load(settings_file)
-            except FileNotFoundError:
-                raise errors.ServerSettingsError(
-                    'Server settings file (mymcadmin.settings) could not be ' +
-                    'found.'
-                )
-
-        return self._settings
+        try:
+            return filecache.get(self._settings_file, Server._load_settings)
+        except FileNotFoundError:
+            raise errors.ServerSettingsError(
+                'Server settings file (mymcadmin.settings) could not be ' +
+                'found.'
+            )
 
     def start(self):
         """
@@ -189,9 +191,35 @@ class Server(object):
             )
 
         os.replace(tmp_file, self._settings_file)
+        filecache.invalidate(self._settings_file)
 
         logging.info('Settings successfully saved')
 
+    def update_properties(self, changes = None, remove = None):
+        """
+        Change and remove Minecraft server properties with a single write to
+        the server.properties file. Comments and the order of the properties
+        are kept. Returns whether the file was changed.
+        """
+
+        with self._properties_lock:
+            try:
+                document = properties.PropertiesDocument.load(
+                    self._properties_file,
+                )
+            except FileNotFoundError:
+                raise Server._missing_properties_error()
+
+            if not document.update(changes, remove):
+                return False
+
+            logging.info('Saving properties for %s to disk', self.server_id)
+
+            document.save(self._properties_file)
+            filecache.invalidate(self._properties_file)
+
+        return True
+
     @classmethod
     def list_versions(
             cls,
@@ -200,7 +228,8 @@ class Server(object):
             betas     = True,
             alphas    = True):
         """
-        List all available server versions
+        List all available server versions. The version list is cached, see
+        mymcadmin.cache for how it's refreshed.
         """
 
         def type_filter(version_filter, versions):
@@ -213,12 +242,11 @@ class Server(object):
                 if v.get('type') != version_filter
             ]
 
-        resp = requests.get(cls.VERSION_URL)
-
-        if not resp.ok:
+        try:
+            versions = cache.get_json(cls.VERSION_URL)
+        except errors.DownloadError:
             raise errors.MyMCAdminError('Unable to retrieve version list')
 
-        versions     = resp.json()
         latest       = versions['latest']
         all_versions = versions['versions']
 
@@ -263,19 +291,20 @@ class Server(object):
         version     = versions[0]
         version_url = version['url']
 
-        resp = requests.get(version_url)
-        if not resp.ok:
+        try:
+            return cache.get_json(version_url)
+        except errors.DownloadError:
             raise errors.MyMCAdminError(
                 'Unable to retrieve version information for {}',
                 version,
             )
 
-        return resp.json()
-
     @classmethod
-    def download_server_jar(cls, version_id = None, path = None):
+    def download_server_jar(cls, version_id = None, path = None, store = None):
         """
-        Download a server Jar based on its version ID
+        Download a server Jar based on its version ID. If an artifact store is
+        given then the jar is taken from the store when it's already been
+        downloaded.
         """
 
         if path is None:
@@ -299,29 +328,19 @@ class Server(object):
         dl_url  = dl_info['url']
         dl_sha1 = dl_info['sha1']
 
-        jar_resp = requests.get(dl_url, stream = True)
-        if not jar_resp.ok:
-            raise errors.MyMCAdminError('Unable to download server jar')
-
-        sha1 = hashlib.sha1()
-        with open(jar_path, 'wb') as jar_file:
-            for chunk in jar_resp.iter_content(chunk_size = 1024):
-                # Ignore keep-alive chunks
-                if not chunk:
-                    continue
-
-                jar_file.write(chunk)
-                sha1.update(chunk)
-
-        jar_sha1 = sha1.hexdigest()
-        if jar_sha1 != dl_sha1:
-            raise errors.MyMCAdminError(
-                'Downloaded server jar\'s sha1 did not match the expected value. ' +
-                'Was {}, should be {}.',
-                jar_sha1,
-                dl_sha1,
+        def _download(dest):
+            download.download_file(
+                dl_url,
+                dest,
+                sha1     = dl_sha1,
+                segments = download.DEFAULT_SEGMENTS,
             )
 
+        if store is None:
+            _download(jar_path)
+        else:
+            store.fetch(dl_sha1, jar_path, _download)
+
         return jar_path
 
     @classmethod
@@ -375,6 +394,25 @@ class Server(object):
                 indent = '\t',
             )
 
+    @classmethod
+    def _load_properties(cls, path):
+        return {
+            name: cls._convert_property_value(value)
+            for name, value in properties.PropertiesDocument.load(path).items()
+        }
+
+    @staticmethod
+    def _missing_properties_error():
+        return errors.ServerError(
+            'Server properties file could not be found. ' +
+            'Try starting the server first to generate one.'
+        )
+
+    @staticmethod
+    def _load_settings(path):
+        with open(path, 'r') as settings_file:
+            return json.load(settings_file)
+
     @classmethod
     def _convert_property_value(cls, value):
         """
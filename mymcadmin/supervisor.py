@@ -0,0 +1,207 @@
+"""
+Restart policies for Minecraft server processes
+"""
+
+import collections
+import time
+
+from . import errors
+
+class RestartPolicy(object):
+    """
+    Decides whether a server should be restarted after its process exits and
+    how long to wait before doing so. Restarts back off exponentially and a
+    server that keeps crashing is parked until someone starts it by hand.
+
+    The policy is configured through the server's mymcadmin.settings file:
+
+    * restart: one of "never", "on-failure" or "always"
+    * restart_max_retries: restarts allowed before giving up
+    * restart_backoff: seconds to wait before the first restart
+    * restart_max_backoff: longest time to wait between restarts
+    * crash_loop_limit: crashes within the crash loop window that park a server
+    * crash_loop_window: seconds to look back when counting crashes
+    """
+
+    NEVER      = 'never'
+    ON_FAILURE = 'on-failure'
+    ALWAYS     = 'always'
+
+    MODES = (NEVER, ON_FAILURE, ALWAYS)
+
+    def __init__(self, mode = None, backoff = None, crash_loop = None):
+        if mode is None:
+            mode = RestartPolicy.NEVER
+
+        if mode not in RestartPolicy.MODES:
+            raise errors.ServerSettingsError(
+                'Invalid restart policy "{}", must be one of {}',
+                mode,
+                ', '.join(RestartPolicy.MODES),
+            )
+
+        if backoff is None:
+            backoff = Backoff()
+
+        if crash_loop is None:
+            crash_loop = CrashLoop()
+
+        self.mode       = mode
+        self.backoff    = backoff
+        self.crash_loop = crash_loop
+        self.parked     = False
+
+        self._started = None
+
+    @classmethod
+    def from_settings(cls, settings):
+        """
+        Create a restart policy from a server's settings
+        """
+
+        return cls(
+            mode       = settings.get('restart'),
+            backoff    = Backoff(
+                initial     = settings.get('restart_backoff'),
+                maximum     = settings.get('restart_max_backoff'),
+                max_retries = settings.get('restart_max_retries'),
+            ),
+            crash_loop = CrashLoop(
+                limit  = settings.get('crash_loop_limit'),
+                window = settings.get('crash_loop_window'),
+            ),
+        )
+
+    def record_start(self, now = None):
+        """
+        Note that the server process was started
+        """
+
+        if now is None:
+            now = time.monotonic()
+
+        self._started = now
+
+    def record_exit(self, returncode, now = None):
+        """
+        Note that the server process exited. Returns the number of seconds to
+        wait before restarting the server or None if it shouldn't be restarted.
+        """
+
+        if now is None:
+            now = time.monotonic()
+
+        failed = returncode != 0
+
+        # A server that stayed up for a whole window has recovered
+        if self._started is not None and \
+                now - self._started >= self.crash_loop.window:
+            self.backoff.reset()
+
+        if failed:
+            self.crash_loop.record_crash(now)
+
+        if self.mode == RestartPolicy.NEVER:
+            return None
+
+        if self.mode == RestartPolicy.ON_FAILURE and not failed:
+            return None
+
+        if self.crash_loop.is_looping(now) or self.backoff.exhausted:
+            self.parked = True
+
+            return None
+
+        return self.backoff.next_delay()
+
+class Backoff(object):
+    """
+    Exponentially growing delays between restarts, starting at initial
+    seconds and growing up to maximum. After max_retries restarts there are
+    no more retries until the backoff is reset.
+    """
+
+    DEFAULT_INITIAL     = 1
+    DEFAULT_MAXIMUM     = 60
+    DEFAULT_MAX_RETRIES = 10
+
+    def __init__(self, initial = None, maximum = None, max_retries = None):
+        if initial is None:
+            initial = Backoff.DEFAULT_INITIAL
+
+        if maximum is None:
+            maximum = Backoff.DEFAULT_MAXIMUM
+
+        if max_retries is None:
+            max_retries = Backoff.DEFAULT_MAX_RETRIES
+
+        self.initial     = initial
+        self.maximum     = maximum
+        self.max_retries = max_retries
+        self.retries     = 0
+
+    @property
+    def exhausted(self):
+        """
+        Check if every retry has been used up
+        """
+
+        return self.retries >= self.max_retries
+
+    def next_delay(self):
+        """
+        Use up a retry, returning the number of seconds to wait before it
+        """
+
+        delay = min(self.initial * 2 ** self.retries, self.maximum)
+        self.retries += 1
+
+        return delay
+
+    def reset(self):
+        """
+        Start backing off from the initial delay again
+        """
+
+        self.retries = 0
+
+class CrashLoop(object):
+    """
+    Spots a server crashing at least limit times within window seconds
+    """
+
+    DEFAULT_LIMIT  = 5
+    DEFAULT_WINDOW = 5 * 60
+
+    def __init__(self, limit = None, window = None):
+        if limit is None:
+            limit = CrashLoop.DEFAULT_LIMIT
+
+        if window is None:
+            window = CrashLoop.DEFAULT_WINDOW
+
+        self.limit  = limit
+        self.window = window
+
+        self._crashes = collections.deque()
+
+    def record_crash(self, now):
+        """
+        Note that the server crashed
+        """
+
+        self._forget(now)
+        self._crashes.append(now)
+
+    def is_looping(self, now):
+        """
+        Check if the server has crashed too often within the window
+        """
+
+        self._forget(now)
+
+        return len(self._crashes) >= self.limit
+
+    def _forget(self, now):
+        while self._crashes and now - self._crashes[0] > self.window:
+            self._crashes.popleft()
@@ -0,0 +1,410 @@
+"""
+Tests for the download engine against a local HTTP server
+"""
+
+import hashlib
+import http.server
+import json
+import os
+import os.path
+import re
+import shutil
+import tempfile
+import threading
+import unittest
+
+import nose
+
+from mymcadmin import download
+from mymcadmin.errors import DownloadError
+
+CONTENT = bytes(range(256)) * 1024
+
+CONTENT_SHA = hashlib.sha1(CONTENT).hexdigest()
+
+class RangeRequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serves CONTENT with support for single HTTP Range requests
+    """
+
+    supports_ranges = True
+
+    def do_HEAD(self):
+        # pylint: disable=invalid-name
+        """
+        Send the headers for the file
+        """
+
+        self.send_response(200)
+        self._send_headers(len(CONTENT))
+
+    def do_GET(self):
+        # pylint: disable=invalid-name
+        """
+        Send the file or the requested range of it
+        """
+
+        if self.path != '/server.jar':
+            self.send_response(404)
+            self._send_headers(0)
+            return
+
+        self.server.requests.append(self.headers.get('Range'))
+
+        match = re.match(
+            r'bytes=(\d+)-(\d*)$',
+            self.headers.get('Range') or '',
+        )
+
+        if match is None or not self.supports_ranges:
+            self.send_response(200)
+            self._send_headers(len(CONTENT))
+            self.wfile.write(CONTENT)
+            return
+
+        start = int(match.group(1))
+        end   = int(match.group(2) or len(CONTENT) - 1)
+
+        if start >= len(CONTENT):
+            self.send_response(416)
+            self._send_headers(0)
+            return
+
+        body = CONTENT[start:end + 1]
+
+        self.send_response(206)
+        self.send_header(
+            'Content-Range',
+            'bytes {}-{}/{}'.format(start, end, len(CONTENT)),
+        )
+        self._send_headers(len(body))
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        # pylint: disable=arguments-differ
+        pass
+
+    def _send_headers(self, length):
+        if self.supports_ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+
+        self.send_header('Content-Length', str(length))
+        self.end_headers()
+
+class NoRangeRequestHandler(RangeRequestHandler):
+    """
+    Serves CONTENT while ignoring Range requests
+    """
+
+    supports_ranges = False
+
+class TestDownloadFile(unittest.TestCase):
+    """
+    Tests for the download_file function
+    """
+
+    handler = RangeRequestHandler
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, 'server.jar')
+
+        self.server = http.server.HTTPServer(('127.0.0.1', 0), self.handler)
+        self.server.requests = []
+
+        self.server_thread = threading.Thread(
+            target = self.server.serve_forever,
+            kwargs = {'poll_interval': 0.05},
+        )
+        self.server_thread.start()
+
+        self.url = 'http://127.0.0.1:{}/server.jar'.format(
+            self.server.server_port,
+        )
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.server_thread.join()
+
+        shutil.rmtree(self.root)
+
+    def test_download(self):
+        """
+        Tests that we can download a file in a single stream
+        """
+
+        path = download.download_file(self.url, self.path, sha1 = CONTENT_SHA)
+
+        self.assertEqual(self.path, path, 'Download path did not match')
+        self._assert_downloaded()
+
+    def test_download_no_sha(self):
+        """
+        Tests that the SHA1 check is optional
+        """
+
+        download.download_file(self.url, self.path)
+
+        self._assert_downloaded()
+
+    @nose.tools.raises(DownloadError)
+    def test_download_bad_sha(self):
+        """
+        Tests that a file with the wrong SHA1 is rejected
+        """
+
+        try:
+            download.download_file(self.url, self.path, sha1 = 'deadbeef')
+        finally:
+            self.assertFalse(
+                os.path.exists(self.path),
+                'Bad download was moved into place',
+            )
+
+            self.assertFalse(
+                os.path.exists(self.path + download.PART_SUFFIX),
+                'Bad partial download was not removed',
+            )
+
+    @nose.tools.raises(DownloadError)
+    def test_download_missing(self):
+        """
+        Tests that HTTP errors are reported
+        """
+
+        download.download_file(self.url + '.missing', self.path)
+
+    def test_download_resume(self):
+        """
+        Tests that a partial download is resumed where it left off
+        """
+
+        with open(self.path + download.PART_SUFFIX, 'wb') as part_file:
+            part_file.write(CONTENT[:1000])
+
+        download.download_file(self.url, self.path, sha1 = CONTENT_SHA)
+
+        self._assert_downloaded()
+
+        self.assertListEqual(
+            ['bytes=1000-'],
+            self.server.requests,
+            'Download was not resumed',
+        )
+
+    def test_download_resume_complete(self):
+        """
+        Tests that a partial download that is already complete is kept
+        """
+
+        with open(self.path + download.PART_SUFFIX, 'wb') as part_file:
+            part_file.write(CONTENT)
+
+        download.download_file(self.url, self.path, sha1 = CONTENT_SHA)
+
+        self._assert_downloaded()
+
+    def test_download_segments(self):
+        """
+        Tests that a file can be downloaded in parallel segments
+        """
+
+        download.download_file(
+            self.url,
+            self.path,
+            sha1       = CONTENT_SHA,
+            segments   = 4,
+            chunk_size = 1024,
+        )
+
+        self._assert_downloaded()
+
+        self.assertCountEqual(
+            [
+                'bytes=0-65535',
+                'bytes=65536-131071',
+                'bytes=131072-196607',
+                'bytes=196608-262143',
+            ],
+            self.server.requests,
+            'File was not downloaded in segments',
+        )
+
+    def test_download_segments_resume(self):
+        """
+        Tests that an interrupted segmented download picks up each segment
+        where it left off
+        """
+
+        self._write_segments(
+            [
+                (0, 65536, 65536),
+                (65536, 131072, 70000),
+                (131072, 196608, 131072),
+                (196608, 262144, 200000),
+            ]
+        )
+
+        download.download_file(
+            self.url,
+            self.path,
+            sha1       = CONTENT_SHA,
+            segments   = 4,
+            chunk_size = 1024,
+        )
+
+        self._assert_downloaded()
+
+        self.assertCountEqual(
+            [
+                'bytes=70000-131071',
+                'bytes=131072-196607',
+                'bytes=200000-262143',
+            ],
+            self.server.requests,
+            'Segments were not resumed',
+        )
+
+    def test_download_segments_small(self):
+        """
+        Tests that small files aren't split into segments
+        """
+
+        download.download_file(
+            self.url,
+            self.path,
+            sha1     = CONTENT_SHA,
+            segments = 4,
+        )
+
+        self._assert_downloaded()
+
+        self.assertListEqual(
+            [None],
+            self.server.requests,
+            'Small file should be downloaded in a single stream',
+        )
+
+    def _assert_downloaded(self):
+        with open(self.path, 'rb') as file_handle:
+            self.assertEqual(
+                CONTENT,
+                file_handle.read(),
+                'Downloaded file did not match',
+            )
+
+        part_path = self.path + download.PART_SUFFIX
+
+        self.assertFalse(
+            os.path.exists(part_path),
+            'Partial download was left behind',
+        )
+
+        self.assertFalse(
+            os.path.exists(part_path + download.SEGMENTS_SUFFIX),
+            'Segments of the download were left behind',
+        )
+
+    def _write_segments(self, segments):
+        part_path = self.path + download.PART_SUFFIX
+
+        with open(part_path, 'wb') as part_file:
+            part_file.truncate(len(CONTENT))
+
+            for start, _, offset in segments:
+                part_file.seek(start)
+                part_file.write(CONTENT[start:offset])
+
+        with open(part_path + download.SEGMENTS_SUFFIX, 'w') as segments_file:
+            json.dump(
+                {
+                    'size':     len(CONTENT),
+                    'segments': [
+                        {'start': start, 'end': end, 'offset': offset}
+                        for start, end, offset in segments
+                    ],
+                },
+                segments_file,
+            )
+
+class TestDownloadFileNoRanges(TestDownloadFile):
+    """
+    Tests for the download_file function with a server that doesn't support
+    ranges
+    """
+
+    handler = NoRangeRequestHandler
+
+    def test_download_resume(self):
+        """
+        Tests that a partial download is restarted when ranges aren't supported
+        """
+
+        with open(self.path + download.PART_SUFFIX, 'wb') as part_file:
+            part_file.write(b'garbage')
+
+        download.download_file(self.url, self.path, sha1 = CONTENT_SHA)
+
+        self._assert_downloaded()
+
+    def test_download_resume_complete(self):
+        """
+        Tests that a complete partial download is replaced when ranges aren't
+        supported
+        """
+
+        self.test_download_resume()
+
+    def test_download_segments_resume(self):
+        """
+        Tests that an interrupted segmented download is restarted as a single
+        stream when ranges aren't supported
+        """
+
+        self._write_segments(
+            [
+                (0, 131072, 1000),
+                (131072, 262144, 140000),
+            ]
+        )
+
+        download.download_file(
+            self.url,
+            self.path,
+            sha1       = CONTENT_SHA,
+            segments   = 4,
+            chunk_size = 1024,
+        )
+
+        self._assert_downloaded()
+
+        self.assertListEqual(
+            [None],
+            self.server.requests,
+            'Download should have been restarted',
+        )
+
+    def test_download_segments(self):
+        """
+        Tests that we fall back to a single stream when ranges aren't supported
+        """
+
+        download.download_file(
+            self.url,
+            self.path,
+            sha1       = CONTENT_SHA,
+            segments   = 4,
+            chunk_size = 1024,
+        )
+
+        self._assert_downloaded()
+
+        self.assertListEqual(
+            [None],
+            self.server.requests,
+            'Download should not have been split into segments',
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+"""
+Tests for the CLI backup command
+"""
+
+import unittest
+import unittest.mock
+
+from .... import utils
+
+from mymcadmin.cli import mymcadmin as mma_command
+
+class TestBackup(utils.CliRunnerMixin, unittest.TestCase):
+    """
+    Tests for the backup command
+    """
+
+    @unittest.mock.patch('mymcadmin.config.Config')
+    def test_command_defaults(self, config):
+        """
+        Tests that the command works properly with defaults
+        """
+
+        config.return_value = config
+        config.rpc = None
+
+        self._run_test('localhost', 2323)
+
+    @unittest.mock.patch('mymcadmin.config.Config')
+    def test_command_options(self, config):
+        """
+        Tests that the command works with the command options
+        """
+
+        config.return_value = config
+        config.rpc = None
+
+        self._run_test(
+            'example.com',
+            8080,
+            ['--host', 'example.com', '--port', 8080, '--timeout', 30],
+            timeout = 30,
+        )
+
+    @unittest.mock.patch('mymcadmin.rpc.RpcClient')
+    @unittest.mock.patch('mymcadmin.config.Config')
+    def test_command_fail(self, config, rpc_client):
+        """
+        Tests that the command handles backup failures
+        """
+
+        config.return_value = config
+        config.rpc = None
+
+        rpc_client.return_value = rpc_client
+        rpc_client.__enter__.return_value = rpc_client
+        rpc_client.server_backup.side_effect = RuntimeError
+
+        result = self.cli_runner.invoke(mma_command, ['backup', 'test'])
+
+        self.assertEqual(
+            1,
+            result.exit_code,
+            'Command did not terminate successfully',
+        )
+
+    def _run_test(self, expected_host, expected_port, params = None,
+                  timeout = None):
+        if params is None:
+            params = []
+
+        with unittest.mock.patch('mymcadmin.rpc.RpcClient') as rpc_client:
+            rpc_client.return_value = rpc_client
+            rpc_client.__enter__.return_value = rpc_client
+            rpc_client.server_backup.return_value = {
+                'name':         '20161016T120000Z',
+                'files':        12,
+                'copied':       2,
+                'linked':       10,
+                'bytes_copied': 8192,
+                'pruned':       ['20161015T120000Z'],
+            }
+
+            result = self.cli_runner.invoke(
+                mma_command,
+                ['backup', 'test'] + params,
+            )
+
+            if result.exit_code != 0:
+                print(result.output)
+
+            self.assertEqual(
+                0,
+                result.exit_code,
+                'Command did not terminate successfully',
+            )
+
+            rpc_client.assert_called_with(
+                expected_host,
+                expected_port,
+            )
+
+            rpc_client.server_backup.assert_called_with(
+                'test',
+                timeout = timeout,
+            )
+
+            self.assertIn(
+                'Backup 20161016T120000Z: 12 files, 2 copied',
+                result.output,
+                'Backup summary was not shown',
+            )
+
+            self.assertIn(
+                'Removed old backup 20161015T120000Z',
+                result.output,
+                'Pruned backups were not shown',
+            )
+
+class TestBackups(utils.CliRunnerMixin, unittest.TestCase):
+    """
+    Tests for the backups command
+    """
+
+    @unittest.mock.patch('mymcadmin.rpc.RpcClient')
+    @unittest.mock.patch('mymcadmin.config.Config')
+    def test_command(self, config, rpc_client):
+        """
+        Tests that the backups of a server are listed
+        """
+
+        config.return_value = config
+        config.rpc = None
+
+        rpc_client.return_value = rpc_client
+        rpc_client.__enter__.return_value = rpc_client
+        rpc_client.server_backups.return_value = [
+            '20161015T120000Z',
+            '20161016T120000Z',
+        ]
+
+        result = self.cli_runner.invoke(mma_command, ['backups', 'test'])
+
+        self.assertEqual(
+            0,
+            result.exit_code,
+            'Command did not terminate successfully',
+        )
+
+        rpc_client.server_backups.assert_called_with('test')
+
+        self.assertEqual(
+            '20161015T120000Z\n20161016T120000Z\n',
+            result.output,
+            'Backups were not listed',
+        )
+
+class TestRestore(utils.CliRunnerMixin, unittest.TestCase):
+    """
+    Tests for the restore command
+    """
+
+    @unittest.mock.patch('mymcadmin.rpc.RpcClient')
+    @unittest.mock.patch('mymcadmin.config.Config')
+    def test_command(self, config, rpc_client):
+        """
+        Tests that a server is restored once the user confirms
+        """
+
+        config.return_value = config
+        config.rpc = None
+
+        rpc_client.return_value = rpc_client
+        rpc_client.__enter__.return_value = rpc_client
+        rpc_client.server_restore.return_value = {
+            'name':   '20161016T120000Z',
+            'worlds': ['world', 'world_nether'],
+        }
+
+        result = self.cli_runner.invoke(
+            mma_command,
+            ['restore', 'test', '20161016T120000Z'],
+            input = 'y\n',
+        )
+
+        self.assertEqual(
+            0,
+            result.exit_code,
+            'Command did not terminate successfully',
+        )
+
+        rpc_client.server_restore.assert_called_with('test', '20161016T120000Z')
+
+        self.assertIn(
+            'Restored world_nether',
+            result.output,
+            'Restored worlds were not shown',
+        )
+
+    @unittest.mock.patch('mymcadmin.rpc.RpcClient')
+    @unittest.mock.patch('mymcadmin.config.Config')
+    def test_command_abort(self, config, rpc_client):
+        """
+        Tests that nothing is restored if the user doesn't confirm
+        """
+
+        config.return_value = config
+        config.rpc = None
+
+        result = self.cli_runner.invoke(
+            mma_command,
+            ['restore', 'test', '20161016T120000Z'],
+            input = 'n\n',
+        )
+
+        self.assertEqual(1, result.exit_code, 'Command should have aborted')
+        self.assertFalse(rpc_client.called, 'Server should not be restored')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -85,6 +85,48 @@ class TestRestart(utils.CliRunnerMixin, unittest.TestCase):
             'Command did not terminate successfully',
         )
 
+    @unittest.mock.patch('mymcadmin.rpc.RpcClient')
+    @unittest.mock.patch('mymcadmin.config.Config')
+    def test_command_multiple(self, config, rpc_client):
+        """
+        Tests that several servers can be given by ID, pattern and tag
+        """
+
+        config.return_value = config
+        config.rpc = None
+
+        rpc_client.return_value = rpc_client
+        rpc_client.__enter__.return_value = rpc_client
+        rpc_client.server_restart_all.return_value = {
+            'success': ['lobby-1'],
+            'failure': ['lobby-2'],
+            'skipped': [],
+        }
+
+        result = self.cli_runner.invoke(
+            mma_command,
+            ['restart', 'lobby-*', 'creative', '--tag', 'games'],
+        )
+
+        if result.exit_code != 0:
+            print(result.output)
+
+        self.assertEqual(
+            0,
+            result.exit_code,
+            'Command did not terminate properly',
+        )
+
+        rpc_client.server_restart_all.assert_called_with(
+            ['lobby-*', 'creative', 'tag:games'],
+        )
+
+        self.assertIn(
+            'lobby-1  restarted',
+            result.output,
+            'Result table was not shown',
+        )
+
     def _run_test(self, expected_host, expected_port, params = None):
         if params is None:
             params = []
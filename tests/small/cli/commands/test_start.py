@@ -10,6 +10,7 @@ from .... import utils
 
 from mymcadmin.cli import mymcadmin as mma_command
 from mymcadmin.cli.commands.start import start_management_daemon
+from mymcadmin.config import DaemonOptions
 
 class TestStart(utils.CliRunnerMixin, unittest.TestCase):
     """
@@ -59,6 +60,17 @@ class TestStart(utils.CliRunnerMixin, unittest.TestCase):
             ],
         )
 
+    @unittest.mock.patch('mymcadmin.config.Config')
+    def test_command_wait(self, config):
+        """
+        Tests that the command can wait for the server to be ready
+        """
+
+        config.return_value = config
+        config.rpc          = None
+
+        self._run_test('localhost', 2323, ['--wait'])
+
     @unittest.mock.patch('mymcadmin.rpc.RpcClient')
     @unittest.mock.patch('mymcadmin.config.Config')
     def test_command_fail(self, config, rpc_client):
@@ -84,6 +96,48 @@ class TestStart(utils.CliRunnerMixin, unittest.TestCase):
             'Command did not terminate properly',
         )
 
+    @unittest.mock.patch('mymcadmin.rpc.RpcClient')
+    @unittest.mock.patch('mymcadmin.config.Config')
+    def test_command_multiple(self, config, rpc_client):
+        """
+        Tests that several servers can be given by ID, pattern and tag
+        """
+
+        config.return_value = config
+        config.rpc = None
+
+        rpc_client.return_value = rpc_client
+        rpc_client.__enter__.return_value = rpc_client
+        rpc_client.server_start_all.return_value = {
+            'success': ['lobby-1'],
+            'failure': ['lobby-2'],
+            'skipped': [],
+        }
+
+        result = self.cli_runner.invoke(
+            mma_command,
+            ['start', 'lobby-*', 'creative', '--tag', 'games', '--wait'],
+        )
+
+        if result.exit_code != 0:
+            print(result.output)
+
+        self.assertEqual(
+            0,
+            result.exit_code,
+            'Command did not terminate properly',
+        )
+
+        rpc_client.server_start_all.assert_called_with(
+            ['lobby-*', 'creative', 'tag:games'], wait = True,
+        )
+
+        self.assertIn(
+            'lobby-1  started',
+            result.output,
+            'Result table was not shown',
+        )
+
     def _run_test(self, expected_host, expected_port, params = None):
         if params is None:
             params = []
@@ -108,7 +162,10 @@ class TestStart(utils.CliRunnerMixin, unittest.TestCase):
 
             rpc_client.assert_called_with(expected_host, expected_port)
 
-            rpc_client.server_start.assert_called_with('test')
+            rpc_client.server_start.assert_called_with(
+                'test',
+                wait = '--wait' in params,
+            )
 
 class TestStartAll(utils.CliRunnerMixin, unittest.TestCase):
     """
@@ -289,7 +346,32 @@ class TestStartDaemon(utils.CliRunnerMixin, unittest.TestCase):
                 'root':  root,
                 'pid':   pid,
                 'log':   log,
+
+                'socket':                  'mymcadmin.sock',
+                'socket_mode':             '0600',
+                'max_parallel_ops':        16,
+                'max_concurrent_requests': 4,
+                'artifact_cache_size':     1024,
+                'autostart_concurrency':   3,
+                'autostart_timeout':       120,
+                'stats_interval':          5,
+                'stats_history':           100,
+                'metrics_host':            '0.0.0.0',
+                'metrics_port':            9323,
+                'slow_rpc_threshold':      0.5,
             },
+            socket                  = 'mymcadmin.sock',
+            socket_mode             = 0o600,
+            max_parallel_ops        = 16,
+            max_concurrent_requests = 4,
+            artifact_cache_size     = 1024,
+            autostart_concurrency   = 3,
+            autostart_timeout       = 120,
+            stats_interval          = 5,
+            stats_history           = 100,
+            metrics_host            = '0.0.0.0',
+            metrics_port            = 9323,
+            slow_rpc_threshold      = 0.5,
         )
 
     def test_command_config_convert(self):
@@ -328,6 +410,7 @@ class TestStartDaemon(utils.CliRunnerMixin, unittest.TestCase):
             root  = 'test',
             pid   = 'test.pid',
             log   = 'test.log',
+            socket = 'test.sock',
             params = [
                 '--host',  'example.com',
                 '--port',  8080,
@@ -336,6 +419,7 @@ class TestStartDaemon(utils.CliRunnerMixin, unittest.TestCase):
                 '--root',  'test',
                 '--pid',   'test.pid',
                 '--log',   'test.log',
+                '--socket', 'test.sock',
             ],
         )
 
@@ -366,6 +450,29 @@ class TestStartDaemon(utils.CliRunnerMixin, unittest.TestCase):
             'Command did not terminate properly',
         )
 
+    @unittest.mock.patch('mymcadmin.config.Config')
+    @utils.apply_mock('multiprocessing.Process')
+    def test_command_socket_mode_invalid(self, config):
+        """
+        Tests that the command returns an exit code for an invalid socket mode
+        """
+
+        config.return_value = config
+        config.daemon       = {
+            'socket_mode': 'rw-rw----',
+        }
+
+        result = self.cli_runner.invoke(mma_command, ['start_daemon'])
+
+        if result.exit_code != 1:
+            print(result.output)
+
+        self.assertEqual(
+            1,
+            result.exit_code,
+            'Command did not terminate properly',
+        )
+
     @unittest.mock.patch('mymcadmin.config.Config')
     @utils.apply_mock('multiprocessing.Process')
     def test_command_user_invalid_str(self, config):
@@ -459,11 +566,13 @@ class TestStartDaemon(utils.CliRunnerMixin, unittest.TestCase):
         )
 
     # pylint: disable=no-self-use
+    @unittest.mock.patch('mymcadmin.cache.configure')
     @unittest.mock.patch('mymcadmin.manager.Manager')
     @unittest.mock.patch('daemon.pidfile.PIDLockFile')
     @unittest.mock.patch('daemon.DaemonContext')
     @unittest.mock.patch('builtins.open')
-    def test_start_management_daemon(self, mock_open, daemon, pidlockfile, manager):
+    def test_start_management_daemon(self, mock_open, daemon, pidlockfile,
+                                     manager, configure):
         """
         Tests that the daemon process is started properly
         """
@@ -476,6 +585,21 @@ class TestStartDaemon(utils.CliRunnerMixin, unittest.TestCase):
 
         manager.return_value = manager
 
+        options = DaemonOptions(
+            socket_path             = 'mymcadmin.sock',
+            socket_mode             = 0o600,
+            max_parallel_ops        = 16,
+            max_concurrent_requests = 4,
+            artifact_cache_size     = 1024,
+            autostart_concurrency   = 3,
+            autostart_timeout       = 120,
+            stats_interval          = 5,
+            stats_history           = 100,
+            metrics_host            = '0.0.0.0',
+            metrics_port            = 9323,
+            slow_rpc_threshold      = 0.5,
+        )
+
         start_management_daemon(
             host  = 'example.com',
             port  = 8080,
@@ -484,6 +608,8 @@ class TestStartDaemon(utils.CliRunnerMixin, unittest.TestCase):
             root  = 'home',
             pid   = 'daemon.pid',
             log   = 'mymcadmin.log',
+
+            options = options,
         )
 
         mock_open.assert_called_with('mymcadmin.log', 'a')
@@ -498,9 +624,20 @@ class TestStartDaemon(utils.CliRunnerMixin, unittest.TestCase):
             working_directory = 'home',
         )
 
-        manager.assert_called_with('example.com', 8080, 'home')
+        manager.assert_called_with(
+            'example.com',
+            8080,
+            'home',
+            options = options,
+        )
         manager.run.assert_called_with()
 
+        configure.assert_called_with(
+            path    = os.path.join('home', '.cache'),
+            ttl     = None,
+            offline = False,
+        )
+
         mock_open.close.assert_called_with()
     # pylint: enable=no-self-use
 
@@ -568,6 +705,22 @@ class TestStartDaemon(utils.CliRunnerMixin, unittest.TestCase):
                     'root':  root,
                     'pid':   pid,
                     'log':   log,
+
+                    'options': DaemonOptions(
+                        socket_path             = kwargs.get('socket'),
+                        socket_mode             = kwargs.get('socket_mode'),
+                        max_parallel_ops        = kwargs.get('max_parallel_ops'),
+                        max_concurrent_requests = kwargs.get('max_concurrent_requests'),
+                        artifact_cache_size     = kwargs.get('artifact_cache_size'),
+                        autostart_concurrency   = kwargs.get('autostart_concurrency'),
+                        autostart_timeout       = kwargs.get('autostart_timeout'),
+                        stats_interval          = kwargs.get('stats_interval'),
+                        stats_history           = kwargs.get('stats_history'),
+                        metrics_host            = kwargs.get('metrics_host'),
+                        metrics_port            = kwargs.get('metrics_port'),
+                        slow_rpc_threshold      = kwargs.get('slow_rpc_threshold'),
+                    ),
+                    'cache':   config.cache,
                 },
             )
 
@@ -79,6 +79,48 @@ class TestStop(utils.CliRunnerMixin, unittest.TestCase):
             'Command did not terminate properly',
         )
 
+    @unittest.mock.patch('mymcadmin.rpc.RpcClient')
+    @unittest.mock.patch('mymcadmin.config.Config')
+    def test_command_multiple(self, config, rpc_client):
+        """
+        Tests that several servers can be given by ID, pattern and tag
+        """
+
+        config.return_value = config
+        config.rpc = None
+
+        rpc_client.return_value = rpc_client
+        rpc_client.__enter__.return_value = rpc_client
+        rpc_client.server_stop_all.return_value = {
+            'success': ['lobby-1'],
+            'failure': ['lobby-2'],
+            'skipped': [],
+        }
+
+        result = self.cli_runner.invoke(
+            mma_command,
+            ['stop', 'lobby-*', 'creative', '--tag', 'games'],
+        )
+
+        if result.exit_code != 0:
+            print(result.output)
+
+        self.assertEqual(
+            0,
+            result.exit_code,
+            'Command did not terminate properly',
+        )
+
+        rpc_client.server_stop_all.assert_called_with(
+            ['lobby-*', 'creative', 'tag:games'],
+        )
+
+        self.assertIn(
+            'lobby-1  stopped',
+            result.output,
+            'Result table was not shown',
+        )
+
     def _run_test(self, expected_host, expected_port, params = None):
         if params is None:
             params = []
@@ -195,14 +237,23 @@ class TestStopAll(utils.CliRunnerMixin, unittest.TestCase):
             'error1',
         ]
 
+        killed_ids = [
+            'killed0',
+        ]
+
         with unittest.mock.patch('mymcadmin.rpc.RpcClient') as rpc_client, \
              unittest.mock.patch('mymcadmin.cli.commands.stop.success') as success, \
+             unittest.mock.patch('mymcadmin.cli.commands.stop.warn') as warn, \
              unittest.mock.patch('mymcadmin.cli.commands.stop.error') as error:
             rpc_client.return_value = rpc_client
             rpc_client.__enter__.return_value = rpc_client
             rpc_client.server_stop_all.return_value = {
-                'success': success_ids,
-                'failure': error_ids,
+                'success':      success_ids + killed_ids,
+                'failure':      error_ids,
+                'terminations': {
+                    server_id: 'killed'
+                    for server_id in killed_ids
+                },
             }
 
             result = self.cli_runner.invoke(
@@ -237,6 +288,15 @@ class TestStopAll(utils.CliRunnerMixin, unittest.TestCase):
                 ]
             )
 
+            warn.assert_has_calls(
+                [
+                    unittest.mock.call(
+                        '{} did not stop in time and was killed'.format(server_id),
+                    )
+                    for server_id in killed_ids
+                ]
+            )
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -7,10 +7,13 @@ import unittest.mock
 
 import click
 import click.testing
+import nose
 
 from mymcadmin.cli.base import (
     mymcadmin,
+    result_table,
     rpc_command,
+    server_selectors,
     success,
     info,
     warn,
@@ -102,6 +105,55 @@ class TestMyMCAdmin(unittest.TestCase):
             ],
         )
 
+    @unittest.mock.patch('mymcadmin.config.Config')
+    def test_rpc_command_socket_config(self, config):
+        """
+        Tests that the rpc_command decorator uses a socket from the config
+        """
+
+        config.return_value = config
+        config.rpc          = {
+            'host':   'example.com',
+            'socket': 'mymcadmin.sock',
+        }
+
+        self._do_rpc_command('mymcadmin.sock', None)
+
+    @unittest.mock.patch('mymcadmin.config.Config')
+    def test_rpc_command_socket_option(self, config):
+        """
+        Tests that the rpc_command decorator uses the socket CLI option
+        """
+
+        config.return_value = config
+        config.rpc          = {
+            'host': 'example.com',
+            'port': 8080,
+        }
+
+        self._do_rpc_command(
+            'test.sock',
+            None,
+            params = ['--socket', 'test.sock'],
+        )
+
+    @unittest.mock.patch('mymcadmin.config.Config')
+    def test_rpc_command_socket_host_option(self, config):
+        """
+        Tests that a host CLI option overrides a socket in the config
+        """
+
+        config.return_value = config
+        config.rpc          = {
+            'socket': 'mymcadmin.sock',
+        }
+
+        self._do_rpc_command(
+            'example.com',
+            2323,
+            params = ['--host', 'example.com'],
+        )
+
     @unittest.mock.patch('mymcadmin.config.Config')
     def test_rpc_command_cli_first(self, config):
         """
@@ -157,6 +209,65 @@ class TestMyMCAdmin(unittest.TestCase):
             'RPC connection details did not match expected',
         )
 
+def test_server_selectors_single():
+    """
+    Tests that a single server ID isn't a selector
+    """
+
+    nose.tools.assert_is_none(server_selectors(('test',), ()))
+
+def test_server_selectors():
+    """
+    Tests that IDs, patterns and tags are turned into selectors
+    """
+
+    nose.tools.assert_list_equal(
+        ['lobby-*', 'tag:games'],
+        server_selectors(('lobby-*',), ('games',)),
+    )
+
+    nose.tools.assert_list_equal(
+        ['lobby-1', 'lobby-2'],
+        server_selectors(('lobby-1', 'lobby-2'), ()),
+    )
+
+@nose.tools.raises(click.UsageError)
+def test_server_selectors_empty():
+    """
+    Tests that at least one server must be given
+    """
+
+    server_selectors((), ())
+
+@unittest.mock.patch('click.secho')
+@unittest.mock.patch('click.echo')
+def test_result_table(echo, secho):
+    """
+    Tests that results are shown with a row per server
+    """
+
+    result_table(
+        {
+            'success': ['lobby-2', 'survival'],
+            'failure': ['lobby-1'],
+            'skipped': ['creative'],
+        },
+        'stopped',
+        'not running',
+        details = {'lobby-2': 'stopped', 'survival': 'killed'},
+    )
+
+    echo.assert_called_with('SERVER    RESULT')
+
+    secho.assert_has_calls(
+        [
+            unittest.mock.call('creative  not running', fg = 'blue'),
+            unittest.mock.call('lobby-1   failed', fg = 'red'),
+            unittest.mock.call('lobby-2   stopped', fg = 'green'),
+            unittest.mock.call('survival  killed', fg = 'yellow'),
+        ]
+    )
+
 @unittest.mock.patch('click.secho')
 def test_success(secho):
     """
@@ -0,0 +1,149 @@
+"""
+Tests that the CLI only imports what a command needs
+"""
+
+import json
+import os.path
+import subprocess
+import sys
+import textwrap
+import unittest
+
+import click
+
+import mymcadmin
+from mymcadmin.cli import mymcadmin as mma_command
+from mymcadmin.cli.base import COMMAND_MODULES
+
+class TestLazyImports(unittest.TestCase):
+    """
+    Tests that the CLI loads commands and their dependencies lazily
+    """
+
+    HEAVY_MODULES = [
+        'bs4',
+        'daemon',
+        'html5lib',
+        'mymcadmin.forge',
+        'mymcadmin.manager',
+        'mymcadmin.server',
+        'requests',
+    ]
+
+    RPC_COMMANDS = [
+        'create',
+        'list_servers',
+        'restart',
+        'restart_all',
+        'shutdown',
+        'start',
+        'start_all',
+        'stop',
+        'stop_all',
+    ]
+
+    # Generous enough not to fail on a slow machine, importing everything
+    # used to take several times longer than this
+    MAX_IMPORT_TIME = 1.0
+
+    def test_rpc_commands(self):
+        """
+        Tests that RPC commands don't import the heavy dependencies
+        """
+
+        for command in TestLazyImports.RPC_COMMANDS:
+            modules, _ = self._load_command(command)
+
+            loaded = [
+                module
+                for module in TestLazyImports.HEAVY_MODULES
+                if module in modules
+            ]
+
+            self.assertListEqual(
+                [],
+                loaded,
+                'Command {} imported heavy modules'.format(command),
+            )
+
+    def test_import_time(self):
+        """
+        Tests that loading an RPC command is quick
+        """
+
+        _, import_time = self._load_command('stop')
+
+        self.assertLess(
+            import_time,
+            TestLazyImports.MAX_IMPORT_TIME,
+            'Loading the stop command took too long',
+        )
+
+    def test_all_commands(self):
+        """
+        Tests that every command is listed and can be found
+        """
+
+        ctx = click.Context(mma_command)
+
+        for command in COMMAND_MODULES:
+            self.assertIsNotNone(
+                mma_command.get_command(ctx, command) or
+                mma_command.get_command(ctx, command.replace('_', '-')),
+                'Command {} was not found'.format(command),
+            )
+
+        for command in mma_command.list_commands(ctx):
+            module = mma_command.get_command(ctx, command).callback.__module__
+
+            # Tests can add their own commands to the group
+            if not module.startswith('mymcadmin.'):
+                continue
+
+            self.assertIn(
+                command.replace('-', '_'),
+                COMMAND_MODULES,
+                'Command {} is missing from the command modules'.format(
+                    command,
+                ),
+            )
+
+    @staticmethod
+    def _load_command(command):
+        script = textwrap.dedent(
+            """
+            import json
+            import sys
+            import time
+
+            start = time.perf_counter()
+
+            import click
+            from mymcadmin.cli import mymcadmin
+
+            ctx = click.Context(mymcadmin)
+            cmd = mymcadmin.get_command(ctx, {command!r})
+            cmd = cmd or mymcadmin.get_command(ctx, {command!r}.replace('_', '-'))
+            assert cmd is not None
+
+            json.dump(
+                {{
+                    'modules': sorted(sys.modules.keys()),
+                    'time':    time.perf_counter() - start,
+                }},
+                sys.stdout,
+            )
+            """
+        ).format(command = command)
+
+        output = subprocess.check_output(
+            [sys.executable, '-c', script],
+            cwd = os.path.dirname(os.path.dirname(mymcadmin.__file__)),
+        )
+
+        result = json.loads(output.decode())
+
+        return result['modules'], result['time']
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,36 +2,43 @@
 Tests for the list_servers JSON RPC method
 """
 
+import os
 import os.path
+import shutil
+import tempfile
 import unittest
 
-import asynctest
-
 from .... import utils
 
+from mymcadmin.registry import ServerRegistry
+
 class TestListServers(utils.ManagerMixin, unittest.TestCase):
     """
     Tests for the list_servers JSON RPC method
     """
 
-    @asynctest.patch('os.path.isdir')
-    @asynctest.patch('os.listdir')
+    def setUp(self):
+        super(TestListServers, self).setUp()
+
+        self.server_root     = tempfile.mkdtemp()
+        self.manager.servers = ServerRegistry(self.server_root)
+
+    def tearDown(self):
+        shutil.rmtree(self.server_root)
+
+        super(TestListServers, self).tearDown()
+
     @utils.run_async
-    async def test_method(self, listdir, isdir):
+    async def test_method(self):
         """
         Tests that the method runs properly
         """
 
-        listdir.return_value = [
-            'server0',
-            'server1',
-            'server2',
-            'settings.file',
-        ]
+        for server_id in ['server2', 'server0', 'server1', '.artifacts']:
+            os.mkdir(os.path.join(self.server_root, server_id))
 
-        dir_path = os.path.join(self.root, 'server')
-
-        isdir.side_effect = lambda p: p.startswith(dir_path)
+        with open(os.path.join(self.server_root, 'settings.file'), 'w'):
+            pass
 
         result = await self.manager.rpc_command_list_servers()
 
@@ -43,4 +50,3 @@ class TestListServers(utils.ManagerMixin, unittest.TestCase):
 
 if __name__ == '__main__':
     unittest.main()
-
@@ -0,0 +1,53 @@
+"""
+Tests for the rpc_stats JSON RPC method
+"""
+
+import unittest
+
+from .... import utils
+
+class TestRpcStats(utils.ManagerMixin, unittest.TestCase):
+    """
+    Tests for the rpc_stats JSON RPC method
+    """
+
+    @utils.run_async
+    async def test_method(self):
+        """
+        Tests that the method returns the request statistics
+        """
+
+        self.manager.rpc_server.stats.record('server_start', 0.2, queued = 0.1)
+
+        result = await self.manager.rpc_command_rpc_stats()
+
+        self.assertEqual(
+            self.manager.rpc_server.stats.slow_threshold,
+            result['slow_threshold'],
+            'Slow threshold did not match',
+        )
+
+        self.assertListEqual(
+            ['server_start'],
+            list(result['methods'].keys()),
+            'Methods did not match',
+        )
+
+        method_stats = result['methods']['server_start']
+
+        self.assertEqual(1, method_stats['requests'], 'Requests did not match')
+        self.assertEqual(0, method_stats['errors'], 'Errors did not match')
+        self.assertEqual(0, method_stats['slow'], 'Slow calls did not match')
+        self.assertEqual(
+            0.2,
+            method_stats['latency']['sum'],
+            'Latency did not match',
+        )
+        self.assertEqual(
+            0.1,
+            method_stats['queue_time']['sum'],
+            'Queue time did not match',
+        )
+
+if __name__ == '__main__':
+    unittest.main()
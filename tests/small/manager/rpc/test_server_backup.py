@@ -0,0 +1,341 @@
+"""
+Tests for the server_backup JSON RPC method
+"""
+
+import json
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+import nose
+
+from .... import utils
+
+from mymcadmin.console import OutputBuffer
+from mymcadmin.errors import (
+    ServerDoesNotExistError,
+    ServerError,
+    ServerSettingsError,
+)
+from mymcadmin.manager import Manager
+from mymcadmin.registry import ServerRegistry
+from mymcadmin.rpc import JsonRpcResponseManager
+from mymcadmin.rpc.errors import JsonRpcInvalidRequestError
+from mymcadmin.server import Server
+
+class TestServerBackup(utils.ManagerMixin, unittest.TestCase):
+    """
+    Tests for the server_backup JSON RPC method
+    """
+
+    def setUp(self):
+        super(TestServerBackup, self).setUp()
+
+        self.server_root        = tempfile.mkdtemp()
+        self.manager.servers    = ServerRegistry(self.server_root)
+        self.manager.event_loop = self.event_loop
+
+        self.server_id   = 'testification'
+        self.server_path = os.path.join(self.server_root, self.server_id)
+
+        self._write('world/level.dat', 'level')
+        self._write('world/region/r.0.0.mca', 'region')
+        self._write('world_nether/region/r.0.0.mca', 'nether')
+        self._write(Server.PROPERTIES_FILE, 'level-name=world\n')
+        self._write_settings({})
+
+        self.commands = []
+
+    def tearDown(self):
+        shutil.rmtree(self.server_root)
+
+        super(TestServerBackup, self).tearDown()
+
+    @utils.run_async
+    async def test_method(self):
+        """
+        Tests that a stopped server is backed up without touching its console
+        """
+
+        result = await self.manager.rpc_command_server_backup(
+            server_id = self.server_id,
+        )
+
+        self.assertEqual(3, result['files'], 'Wrong number of files')
+        self.assertEqual(3, result['copied'], 'Wrong number of copies')
+        self.assertIsNone(result['save_paused'], 'Saving was paused')
+        self.assertListEqual([], result['pruned'], 'Backups were removed')
+
+        self.assertTrue(
+            os.path.isfile(
+                os.path.join(
+                    self._backups_path(),
+                    result['name'],
+                    'world_nether',
+                    'region',
+                    'r.0.0.mca',
+                )
+            ),
+            'The Nether was not backed up',
+        )
+
+    @utils.run_async
+    async def test_method_running(self):
+        """
+        Tests that a running server is flushed to disk and resumed
+        """
+
+        output = self._start_server(saves = True)
+
+        result = await self.manager.rpc_command_server_backup(
+            server_id = self.server_id,
+        )
+
+        self.assertListEqual(
+            ['save-off', 'save-all flush', 'save-on'],
+            self.commands,
+            'Console commands did not match',
+        )
+
+        self.assertIsNotNone(result['save_paused'], 'Saving was not paused')
+        self.assertListEqual([], output._listeners, 'Listener was left behind')
+
+    @nose.tools.raises(ServerError)
+    @utils.run_async
+    async def test_method_save_timeout(self):
+        """
+        Tests that we give up if the server doesn't finish saving
+        """
+
+        self._start_server(saves = False)
+
+        try:
+            await self.manager.rpc_command_server_backup(
+                server_id = self.server_id,
+                timeout   = 0.01,
+            )
+        finally:
+            self.assertListEqual(
+                ['save-off', 'save-all flush', 'save-on'],
+                self.commands,
+                'Saving was not resumed',
+            )
+
+            self.assertFalse(
+                os.path.exists(self._backups_path()),
+                'Backup should not have been made',
+            )
+
+    @nose.tools.raises(JsonRpcInvalidRequestError)
+    @utils.run_async
+    async def test_method_not_ready(self):
+        """
+        Tests that servers that are still starting aren't backed up
+        """
+
+        self._start_server(saves = True)
+        self.manager._set_state(self.server_id, Manager.STATE_STARTING)
+
+        await self.manager.rpc_command_server_backup(
+            server_id = self.server_id,
+        )
+
+    @utils.run_async
+    async def test_method_launching(self):
+        """
+        Tests that servers that haven't got a console yet aren't treated as
+        stopped
+        """
+
+        self.manager.procs.instances[self.server_id] = unittest.mock.Mock()
+        self.manager._set_state(self.server_id, Manager.STATE_STARTING)
+
+        with self.assertRaises(JsonRpcInvalidRequestError):
+            await self.manager.rpc_command_server_backup(
+                server_id = self.server_id,
+            )
+
+        self.assertFalse(
+            os.path.exists(self._backups_path()),
+            'Backup should not have been made',
+        )
+
+    @nose.tools.raises(JsonRpcInvalidRequestError)
+    @utils.run_async
+    async def test_method_already_running(self):
+        """
+        Tests that only one backup of a server runs at a time
+        """
+
+        self.manager.status.backup_jobs[self.server_id] = 'backup'
+
+        await self.manager.rpc_command_server_backup(
+            server_id = self.server_id,
+        )
+
+    @utils.run_async
+    async def test_method_already_running_response(self):
+        """
+        Tests that clients are told why a backup couldn't be started
+        """
+
+        self.manager.status.backup_jobs[self.server_id] = 'backup'
+        self.manager._setup_rpc_handlers()
+
+        req = json.dumps(
+            {
+                'jsonrpc': '2.0',
+                'method':  'server_backup',
+                'params':  {'server_id': self.server_id},
+                'id':      7,
+            }
+        )
+
+        resp = await JsonRpcResponseManager.handle(
+            req,
+            self.manager.rpc_server.dispatcher,
+        )
+
+        self.assertEqual(
+            7,
+            resp.response_id,
+            'Error response was not for the request',
+        )
+
+        self.assertEqual(
+            'A backup of server {} is already running'.format(self.server_id),
+            resp.error['message'],
+            'Error response did not say why the backup failed',
+        )
+
+    @utils.run_async
+    async def test_method_retention(self):
+        """
+        Tests that old backups are removed by the retention settings
+        """
+
+        self._write_settings({'backup_keep_last': 1})
+
+        first = await self.manager.rpc_command_server_backup(
+            server_id = self.server_id,
+        )
+
+        second = await self.manager.rpc_command_server_backup(
+            server_id = self.server_id,
+        )
+
+        self.assertListEqual(
+            [first['name']],
+            second['pruned'],
+            'Old backup was not removed',
+        )
+
+        self.assertListEqual(
+            [second['name']],
+            os.listdir(self._backups_path()),
+            'Wrong backups were kept',
+        )
+
+    @utils.run_async
+    async def test_method_chunks(self):
+        """
+        Tests that the backup engine can be chosen in the server settings
+        """
+
+        self._write_settings({'backup_engine': 'chunks'})
+
+        result = await self.manager.rpc_command_server_backup(
+            server_id = self.server_id,
+        )
+
+        self.assertEqual('chunks', result['engine'], 'Wrong backup engine')
+        self.assertEqual(3, result['objects_written'], 'Wrong number stored')
+
+        self.assertIn(
+            result['name'] + '.json',
+            os.listdir(self._backups_path()),
+            'Backup manifest was not written',
+        )
+
+    @nose.tools.raises(ServerSettingsError)
+    @utils.run_async
+    async def test_method_bad_engine(self):
+        """
+        Tests that we reject unknown backup engines
+        """
+
+        self._write_settings({'backup_engine': 'tape'})
+
+        await self.manager.rpc_command_server_backup(
+            server_id = self.server_id,
+        )
+
+    @nose.tools.raises(JsonRpcInvalidRequestError)
+    @utils.run_async
+    async def test_method_no_world(self):
+        """
+        Tests that we report servers without a world
+        """
+
+        shutil.rmtree(os.path.join(self.server_path, 'world'))
+
+        await self.manager.rpc_command_server_backup(
+            server_id = self.server_id,
+        )
+
+    @nose.tools.raises(ServerDoesNotExistError)
+    @utils.run_async
+    async def test_method_bad_id(self):
+        """
+        Tests that we check for a valid server_id
+        """
+
+        await self.manager.rpc_command_server_backup(server_id = 'bad')
+
+    def _start_server(self, saves):
+        output = OutputBuffer()
+
+        def _send(command):
+            self.commands.append(command)
+
+            if saves and command == 'save-all flush':
+                output.append('stdout', '[Server thread/INFO]: Saved the game')
+
+        self.manager.procs.instances[self.server_id] = unittest.mock.Mock()
+        self.manager.procs.consoles[self.server_id]  = unittest.mock.Mock(
+            send = unittest.mock.Mock(side_effect = _send),
+        )
+        self.manager.procs.logs[self.server_id]      = output
+
+        self.manager._set_state(self.server_id, Manager.STATE_READY)
+
+        return output
+
+    def _backups_path(self):
+        return os.path.join(
+            self.server_root,
+            Manager.BACKUPS_DIR,
+            self.server_id,
+        )
+
+    def _write(self, path, contents):
+        path = os.path.join(self.server_path, path)
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+
+        with open(path, 'w') as file_handle:
+            file_handle.write(contents)
+
+    def _write_settings(self, settings):
+        self._write(Server.SETTINGS_FILE + '.tmp', json.dumps(settings))
+
+        # Replace the file so the settings cache sees the change
+        os.replace(
+            os.path.join(self.server_path, Server.SETTINGS_FILE + '.tmp'),
+            os.path.join(self.server_path, Server.SETTINGS_FILE),
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Tests for the server_backups JSON RPC method
+"""
+
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+
+import nose
+
+from .... import utils
+
+from mymcadmin.errors import ServerDoesNotExistError
+from mymcadmin.manager import Manager
+from mymcadmin.registry import ServerRegistry
+from mymcadmin.server import Server
+
+class TestServerBackups(utils.ManagerMixin, unittest.TestCase):
+    """
+    Tests for the server_backups JSON RPC method
+    """
+
+    def setUp(self):
+        super(TestServerBackups, self).setUp()
+
+        self.server_root        = tempfile.mkdtemp()
+        self.manager.servers    = ServerRegistry(self.server_root)
+        self.manager.event_loop = self.event_loop
+
+        self.server_id = 'testification'
+
+        server_path = os.path.join(self.server_root, self.server_id)
+        os.makedirs(os.path.join(server_path, 'world'))
+
+        with open(os.path.join(server_path, Server.SETTINGS_FILE), 'w') as settings:
+            settings.write('{}')
+
+    def tearDown(self):
+        shutil.rmtree(self.server_root)
+
+        super(TestServerBackups, self).tearDown()
+
+    @utils.run_async
+    async def test_method(self):
+        """
+        Tests that the backups of a server are listed oldest first
+        """
+
+        backups_path = os.path.join(
+            self.server_root,
+            Manager.BACKUPS_DIR,
+            self.server_id,
+        )
+
+        for name in ('20161016T120000Z', '20161015T120000Z', '.20161017T120000Z.partial'):
+            os.makedirs(os.path.join(backups_path, name))
+
+        result = await self.manager.rpc_command_server_backups(
+            server_id = self.server_id,
+        )
+
+        self.assertListEqual(
+            ['20161015T120000Z', '20161016T120000Z'],
+            result,
+            'Backups did not match',
+        )
+
+    @utils.run_async
+    async def test_method_none(self):
+        """
+        Tests that servers that were never backed up have no backups
+        """
+
+        result = await self.manager.rpc_command_server_backups(
+            server_id = self.server_id,
+        )
+
+        self.assertListEqual([], result, 'Server should not have backups')
+
+    @nose.tools.raises(ServerDoesNotExistError)
+    @utils.run_async
+    async def test_method_bad_id(self):
+        """
+        Tests that we check for a valid server_id
+        """
+
+        await self.manager.rpc_command_server_backups(server_id = 'bad')
+
+if __name__ == '__main__':
+    unittest.main()
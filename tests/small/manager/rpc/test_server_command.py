@@ -0,0 +1,77 @@
+"""
+Tests for the server_command JSON RPC method
+"""
+
+import asyncio
+import unittest
+import unittest.mock
+
+import asynctest
+import nose
+
+from .... import utils
+
+from mymcadmin.console import CommandWriter
+from mymcadmin.rpc.errors import JsonRpcInvalidRequestError
+
+class TestServerCommand(utils.ManagerMixin, unittest.TestCase):
+    """
+    Tests for the server_command JSON RPC method
+    """
+
+    @asynctest.patch('os.path.exists')
+    @utils.run_async
+    async def test_method(self, exists):
+        """
+        Tests that the command is queued on the server's console
+        """
+
+        exists.return_value = True
+
+        server_id    = 'testification'
+        mock_console = unittest.mock.Mock(spec = CommandWriter)
+
+        self.manager.procs.instances = {
+            server_id: asynctest.Mock(spec = asyncio.subprocess.Process),
+        }
+        self.manager.procs.consoles = {server_id: mock_console}
+
+        result = await self.manager.rpc_command_server_command(
+            server_id = server_id,
+            command   = 'save-all',
+        )
+
+        self.assertEqual(
+            server_id,
+            result,
+            'Method did not return the server ID',
+        )
+
+        mock_console.send.assert_called_with('save-all')
+
+    @nose.tools.raises(JsonRpcInvalidRequestError)
+    @asynctest.patch('os.path.exists')
+    @utils.run_async
+    async def test_method_not_running(self, exists):
+        """
+        Tests that we throw an error when the server isn't running
+        """
+
+        exists.return_value = True
+
+        await self.manager.rpc_command_server_command(
+            server_id = 'testification',
+            command   = 'save-all',
+        )
+
+    @nose.tools.raises(JsonRpcInvalidRequestError)
+    @utils.run_async
+    async def test_method_no_command(self):
+        """
+        Tests that the command parameter is required
+        """
+
+        await self.manager.rpc_command_server_command(server_id = 'testification')
+
+if __name__ == '__main__':
+    unittest.main()
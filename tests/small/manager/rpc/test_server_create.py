@@ -76,6 +76,10 @@ class TestServerCreate(utils.ManagerMixin, unittest.TestCase):
         server_id   = 'testification'
         server_path = os.path.join(self.root, server_id)
 
+        self.mock_event_loop.run_in_executor = asynctest.CoroutineMock(
+            side_effect = lambda executor, func: func(),
+        )
+
         with unittest.mock.patch('os.path.exists') as exists, \
              unittest.mock.patch('mymcadmin.server.Server') as server, \
              unittest.mock.patch('os.mkdir') as mkdir, \
@@ -126,22 +130,32 @@ class TestServerCreate(utils.ManagerMixin, unittest.TestCase):
 
             server.download_server_jar.assert_called_with(
                 version,
-                path = server_path,
+                path  = server_path,
+                store = self.manager.artifacts,
             )
 
             server.assert_called_with(server_path)
 
-            mock_proc.wait.assert_called_with()
+            mock_proc.communicate.assert_called_with()
 
             server.agree_to_eula.assert_called_with(
                 path = server_path,
             )
 
+            self.assertTrue(
+                all(
+                    call[0][0] is None
+                    for call in self.mock_event_loop.run_in_executor.call_args_list
+                ),
+                'Blocking calls were not run in the default executor',
+            )
+
             if forge_installer:
                 forge_installer.assert_called_with(
                     version,
                     *forge_args,
-                    path = server_path,
+                    path  = server_path,
+                    store = self.manager.artifacts,
                 )
 
                 subproc.assert_called_with(
@@ -155,7 +169,7 @@ class TestServerCreate(utils.ManagerMixin, unittest.TestCase):
                     stderr = asyncio.subprocess.PIPE,
                 )
 
-                subproc.wait.assert_called_with()
+                subproc.communicate.assert_called_with()
 
                 self.assertDictEqual(
                     {'jar': os.path.basename(forge_path)},
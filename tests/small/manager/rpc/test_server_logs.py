@@ -0,0 +1,71 @@
+"""
+Tests for the server_logs JSON RPC method
+"""
+
+import unittest
+
+import asynctest
+import nose
+
+from .... import utils
+
+from mymcadmin.console import OutputBuffer
+from mymcadmin.errors import ServerDoesNotExistError
+
+class TestServerLogs(utils.ManagerMixin, unittest.TestCase):
+    """
+    Tests for the server_logs JSON RPC method
+    """
+
+    @asynctest.patch('os.path.exists')
+    @utils.run_async
+    async def test_method(self, exists):
+        """
+        Tests that the method returns the tail of the server output
+        """
+
+        exists.return_value = True
+
+        output = OutputBuffer()
+        for i in range(3):
+            output.append('stdout', 'line{}'.format(i))
+
+        self.manager.procs.logs = {'testification': output}
+
+        result = await self.manager.rpc_command_server_logs(
+            server_id = 'testification',
+            lines     = 2,
+        )
+
+        self.assertListEqual(
+            ['line1', 'line2'],
+            [entry['line'] for entry in result],
+            'Method did not return the most recent lines',
+        )
+
+    @asynctest.patch('os.path.exists')
+    @utils.run_async
+    async def test_method_never_started(self, exists):
+        """
+        Tests that a server without any output returns an empty list
+        """
+
+        exists.return_value = True
+
+        result = await self.manager.rpc_command_server_logs(
+            server_id = 'testification',
+        )
+
+        self.assertListEqual([], result, 'Method should not return output')
+
+    @nose.tools.raises(ServerDoesNotExistError)
+    @utils.run_async
+    async def test_method_bad_id(self):
+        """
+        Tests that we check for a valid server_id
+        """
+
+        await self.manager.rpc_command_server_logs(server_id = 'bad')
+
+if __name__ == '__main__':
+    unittest.main()
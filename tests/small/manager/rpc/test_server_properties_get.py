@@ -0,0 +1,91 @@
+"""
+Tests for the server_properties_get JSON RPC method
+"""
+
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+
+import nose
+
+from .... import utils
+
+from mymcadmin.errors import ServerDoesNotExistError
+from mymcadmin.registry import ServerRegistry
+from mymcadmin.server import Server
+
+class TestServerPropertiesGet(utils.ManagerMixin, unittest.TestCase):
+    """
+    Tests for the server_properties_get JSON RPC method
+    """
+
+    def setUp(self):
+        super(TestServerPropertiesGet, self).setUp()
+
+        self.server_root     = tempfile.mkdtemp()
+        self.manager.servers = ServerRegistry(self.server_root)
+
+        server_path = os.path.join(self.server_root, 'testification')
+        os.mkdir(server_path)
+
+        with open(os.path.join(server_path, Server.PROPERTIES_FILE), 'w') as \
+                file_handle:
+            file_handle.write('motd=Hello\nview-distance=10\npvp=true\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.server_root)
+
+        super(TestServerPropertiesGet, self).tearDown()
+
+    @utils.run_async
+    async def test_method(self):
+        """
+        Tests that the method returns all of the properties
+        """
+
+        result = await self.manager.rpc_command_properties_get(
+            server_id = 'testification',
+        )
+
+        self.assertDictEqual(
+            {
+                'motd':          'Hello',
+                'view-distance': 10,
+                'pvp':           True,
+            },
+            result,
+            'Properties did not match',
+        )
+
+    @utils.run_async
+    async def test_method_keys(self):
+        """
+        Tests that the method can return just some of the properties
+        """
+
+        result = await self.manager.rpc_command_properties_get(
+            server_id = 'testification',
+            keys      = ['view-distance', 'missing'],
+        )
+
+        self.assertDictEqual(
+            {'view-distance': 10},
+            result,
+            'Properties did not match',
+        )
+
+    @nose.tools.raises(ServerDoesNotExistError)
+    @utils.run_async
+    async def test_method_bad_id(self):
+        """
+        Tests that we check for a valid server_id
+        """
+
+        await self.manager.rpc_command_properties_get(
+            server_id = 'bad',
+        )
+
+if __name__ == '__main__':
+    unittest.main()
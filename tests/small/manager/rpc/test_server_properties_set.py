@@ -0,0 +1,161 @@
+"""
+Tests for the server_properties_set JSON RPC method
+"""
+
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+
+import nose
+
+from .... import utils
+
+from mymcadmin.registry import ServerRegistry
+from mymcadmin.rpc.errors import JsonRpcInvalidRequestError
+from mymcadmin.server import Server
+
+class TestServerPropertiesSet(utils.ManagerMixin, unittest.TestCase):
+    """
+    Tests for the server_properties_set JSON RPC method
+    """
+
+    def setUp(self):
+        super(TestServerPropertiesSet, self).setUp()
+
+        self.server_root     = tempfile.mkdtemp()
+        self.manager.servers = ServerRegistry(self.server_root)
+
+        self.manager.event_loop = self.event_loop
+
+        for server_id, view_distance in [('lobby-1', 10), ('lobby-2', 6)]:
+            server_path = os.path.join(self.server_root, server_id)
+            os.mkdir(server_path)
+
+            self._write_properties(
+                server_id,
+                '#Comment\nview-distance={}\n'.format(view_distance),
+            )
+
+        # A server that hasn't been started yet has no properties
+        os.mkdir(os.path.join(self.server_root, 'lobby-3'))
+
+    def tearDown(self):
+        shutil.rmtree(self.server_root)
+
+        super(TestServerPropertiesSet, self).tearDown()
+
+    @utils.run_async
+    async def test_method(self):
+        """
+        Tests that the selected servers are updated in one call
+        """
+
+        result = await self.manager.rpc_command_properties_set(
+            servers    = ['lobby-*'],
+            properties = {'view-distance': 6, 'pvp': False},
+        )
+
+        self.assertListEqual(
+            ['lobby-1', 'lobby-2'],
+            result['success'],
+            'Wrong servers were updated',
+        )
+
+        self.assertListEqual(
+            ['lobby-3'],
+            result['failure'],
+            'Server without properties should have failed',
+        )
+
+        self.assertListEqual([], result['unchanged'])
+
+        for server_id in ('lobby-1', 'lobby-2'):
+            self.assertEqual(
+                '#Comment\nview-distance=6\npvp=false\n',
+                self._read_properties(server_id),
+                'Properties file did not match expected',
+            )
+
+    @utils.run_async
+    async def test_method_unchanged(self):
+        """
+        Tests that servers that already have the values aren't rewritten
+        """
+
+        result = await self.manager.rpc_command_properties_set(
+            servers    = ['lobby-1', 'lobby-2'],
+            properties = {'view-distance': 6},
+        )
+
+        self.assertListEqual(
+            ['lobby-2'],
+            result['unchanged'],
+            'Unchanged servers did not match',
+        )
+
+    @utils.run_async
+    async def test_method_remove(self):
+        """
+        Tests that properties can be removed
+        """
+
+        await self.manager.rpc_command_properties_set(
+            servers = 'lobby-1',
+            remove  = ['view-distance'],
+        )
+
+        self.assertEqual(
+            '#Comment\n',
+            self._read_properties('lobby-1'),
+            'Property was not removed',
+        )
+
+    @nose.tools.raises(JsonRpcInvalidRequestError)
+    @utils.run_async
+    async def test_method_invalid(self):
+        """
+        Tests that invalid changes are rejected before any file is touched
+        """
+
+        try:
+            await self.manager.rpc_command_properties_set(
+                servers    = ['lobby-*'],
+                properties = {'motd': 'line one\nline two'},
+            )
+        finally:
+            self.assertEqual(
+                '#Comment\nview-distance=10\n',
+                self._read_properties('lobby-1'),
+                'Properties file was changed',
+            )
+
+    @nose.tools.raises(JsonRpcInvalidRequestError)
+    @utils.run_async
+    async def test_method_missing_servers(self):
+        """
+        Tests that the servers to update are required
+        """
+
+        await self.manager.rpc_command_properties_set(
+            properties = {'view-distance': 6},
+        )
+
+    def _properties_file(self, server_id):
+        return os.path.join(
+            self.server_root,
+            server_id,
+            Server.PROPERTIES_FILE,
+        )
+
+    def _read_properties(self, server_id):
+        with open(self._properties_file(server_id), 'r') as file_handle:
+            return file_handle.read()
+
+    def _write_properties(self, server_id, contents):
+        with open(self._properties_file(server_id), 'w') as file_handle:
+            file_handle.write(contents)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -31,7 +31,7 @@ class TestRestartAll(utils.ManagerMixin, unittest.TestCase):
         mock_server_restart = asynctest.CoroutineMock()
         mock_server_restart.side_effect = server_ids
 
-        self.manager.instances = {
+        self.manager.procs.instances = {
             server_id: asynctest.Mock(spec = Server)
             for server_id in server_ids
         }
@@ -42,8 +42,8 @@ class TestRestartAll(utils.ManagerMixin, unittest.TestCase):
 
         mock_server_restart.assert_has_calls(
             [
-                unittest.mock.call(server_id)
-                for server_id in self.manager.instances.keys()
+                unittest.mock.call(server_id = server_id)
+                for server_id in self.manager.procs.instances.keys()
             ]
         )
 
@@ -70,7 +70,7 @@ class TestRestartAll(utils.ManagerMixin, unittest.TestCase):
 
         server_ids = success_ids + error_ids
 
-        self.manager.instances = {
+        self.manager.procs.instances = {
             server_id: asynctest.Mock(spec = Server)
             for server_id in server_ids
         }
@@ -91,7 +91,7 @@ class TestRestartAll(utils.ManagerMixin, unittest.TestCase):
         self.assertListEqual(
             [
                 server_id
-                for server_id in self.manager.instances.keys()
+                for server_id in self.manager.procs.instances.keys()
                 if server_id.startswith('success')
             ],
             result.get('success'),
@@ -101,13 +101,49 @@ class TestRestartAll(utils.ManagerMixin, unittest.TestCase):
         self.assertListEqual(
             [
                 server_id
-                for server_id in self.manager.instances.keys()
+                for server_id in self.manager.procs.instances.keys()
                 if not server_id.startswith('success')
             ],
             result.get('failure'),
             'The list of failures did not match the expected',
         )
 
+    @utils.run_async
+    async def test_method_selectors(self):
+        """
+        Tests that only the selected running servers are restarted
+        """
+
+        self.manager.rpc_command_list_servers = asynctest.CoroutineMock(
+            return_value = ['creative', 'lobby-1', 'lobby-2'],
+        )
+
+        mock_server_restart = asynctest.CoroutineMock()
+        self.manager.rpc_command_server_restart = mock_server_restart
+
+        self.manager.procs.instances = {
+            server_id: asynctest.Mock(spec = Server)
+            for server_id in ['creative', 'lobby-1']
+        }
+
+        result = await self.manager.rpc_command_server_restart_all(
+            servers = ['lobby-1', 'lobby-2'],
+        )
+
+        mock_server_restart.assert_called_once_with(server_id = 'lobby-1')
+
+        self.assertListEqual(
+            ['lobby-1'],
+            result.get('success'),
+            'Did not return the correct list of server IDs',
+        )
+
+        self.assertListEqual(
+            ['lobby-2'],
+            result.get('skipped'),
+            'Did not return the servers that were not running',
+        )
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,151 @@
+"""
+Tests for the server_restore JSON RPC method
+"""
+
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+import nose
+
+from .... import utils
+
+from mymcadmin.errors import BackupError, ServerDoesNotExistError
+from mymcadmin.registry import ServerRegistry
+from mymcadmin.rpc.errors import JsonRpcInvalidRequestError
+from mymcadmin.server import Server
+
+class TestServerRestore(utils.ManagerMixin, unittest.TestCase):
+    """
+    Tests for the server_restore JSON RPC method
+    """
+
+    def setUp(self):
+        super(TestServerRestore, self).setUp()
+
+        self.server_root        = tempfile.mkdtemp()
+        self.manager.servers    = ServerRegistry(self.server_root)
+        self.manager.event_loop = self.event_loop
+
+        self.server_id   = 'testification'
+        self.server_path = os.path.join(self.server_root, self.server_id)
+
+        self._write('world/level.dat', 'old level')
+        self._write(Server.PROPERTIES_FILE, 'level-name=world\n')
+        self._write(Server.SETTINGS_FILE, '{"backup_engine": "chunks"}')
+
+    def tearDown(self):
+        shutil.rmtree(self.server_root)
+
+        super(TestServerRestore, self).tearDown()
+
+    @utils.run_async
+    async def test_method(self):
+        """
+        Tests that the worlds of a stopped server are replaced by a backup
+        """
+
+        name = await self._backup()
+
+        self._write('world/level.dat', 'new level')
+
+        result = await self.manager.rpc_command_server_restore(
+            server_id = self.server_id,
+            name      = name,
+        )
+
+        self.assertDictEqual(
+            {'name': name, 'worlds': ['world']},
+            result,
+            'Result did not match',
+        )
+
+        self.assertEqual(
+            'old level',
+            self._read('world/level.dat'),
+            'World was not restored',
+        )
+
+        self.assertDictEqual({}, self.manager.status.backup_jobs)
+
+    @nose.tools.raises(JsonRpcInvalidRequestError)
+    @utils.run_async
+    async def test_method_running(self):
+        """
+        Tests that we won't replace the world of a running server
+        """
+
+        name = await self._backup()
+
+        self.manager.procs.instances[self.server_id] = unittest.mock.Mock()
+
+        await self.manager.rpc_command_server_restore(
+            server_id = self.server_id,
+            name      = name,
+        )
+
+    @nose.tools.raises(BackupError)
+    @utils.run_async
+    async def test_method_bad_backup(self):
+        """
+        Tests that we report backups that don't exist
+        """
+
+        try:
+            await self.manager.rpc_command_server_restore(
+                server_id = self.server_id,
+                name      = '20161016T120000Z',
+            )
+        finally:
+            self.assertEqual(
+                'old level',
+                self._read('world/level.dat'),
+                'World should not have been touched',
+            )
+
+    @nose.tools.raises(JsonRpcInvalidRequestError)
+    @utils.run_async
+    async def test_method_start_while_restoring(self):
+        """
+        Tests that servers can't be started while they're being restored
+        """
+
+        self.manager.status.backup_jobs[self.server_id] = 'restore'
+
+        await self.manager.rpc_command_server_start(server_id = self.server_id)
+
+    @nose.tools.raises(ServerDoesNotExistError)
+    @utils.run_async
+    async def test_method_bad_id(self):
+        """
+        Tests that we check for a valid server_id
+        """
+
+        await self.manager.rpc_command_server_restore(
+            server_id = 'bad',
+            name      = '20161016T120000Z',
+        )
+
+    async def _backup(self):
+        result = await self.manager.rpc_command_server_backup(
+            server_id = self.server_id,
+        )
+
+        return result['name']
+
+    def _write(self, path, contents):
+        path = os.path.join(self.server_path, path)
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+
+        with open(path, 'w') as file_handle:
+            file_handle.write(contents)
+
+    def _read(self, path):
+        with open(os.path.join(self.server_path, path), 'r') as file_handle:
+            return file_handle.read()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,7 +9,7 @@ import nose
 
 from .... import utils
 
-from mymcadmin.errors import ServerDoesNotExistError
+from mymcadmin.errors import ServerDoesNotExistError, ServerError
 
 class TestServerStart(utils.ManagerMixin, unittest.TestCase):
     """
@@ -44,6 +44,58 @@ class TestServerStart(utils.ManagerMixin, unittest.TestCase):
 
         mock_start_server_proc.assert_called_with(server)
 
+    @asynctest.patch('mymcadmin.server.Server')
+    @asynctest.patch('os.path.exists')
+    @utils.run_async
+    async def test_method_wait(self, exists, server):
+        """
+        Tests that the method can wait for the server to be ready
+        """
+
+        exists.return_value = True
+        server.return_value = server
+        server.server_id    = 'testification'
+
+        self.manager.event_loop = self.event_loop
+
+        async def _start_server_proc(srv):
+            self.manager.status.ready[srv.server_id].set()
+
+        self.manager.start_server_proc = _start_server_proc
+
+        result = await self.manager.rpc_command_server_start(
+            server_id = 'testification',
+            wait      = True,
+        )
+
+        self.assertEqual(
+            'testification',
+            result,
+            'Method did not return the correct server ID',
+        )
+
+    @nose.tools.raises(ServerError)
+    @asynctest.patch('mymcadmin.server.Server')
+    @asynctest.patch('os.path.exists')
+    @utils.run_async
+    async def test_method_wait_exited(self, exists, server):
+        """
+        Tests that we report a server that exits before it's ready
+        """
+
+        exists.return_value = True
+        server.return_value = server
+        server.server_id    = 'testification'
+
+        self.manager.event_loop = self.event_loop
+
+        self.manager.start_server_proc = asynctest.CoroutineMock()
+
+        await self.manager.rpc_command_server_start(
+            server_id = 'testification',
+            wait      = True,
+        )
+
     @nose.tools.raises(ServerDoesNotExistError)
     @utils.run_async
     async def test_method_bad_id(self):
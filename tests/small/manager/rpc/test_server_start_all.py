@@ -47,6 +47,54 @@ class TestServerStartAll(utils.ManagerMixin, unittest.TestCase):
             error_ids   = ['error0', 'error1', 'error2', 'error3'],
         )
 
+    @utils.run_async
+    async def test_method_selectors(self):
+        """
+        Tests that only the selected servers are started and that we can wait
+        for them to finish loading
+        """
+
+        self.manager.rpc_command_list_servers = asynctest.CoroutineMock(
+            return_value = ['creative', 'lobby-1', 'lobby-2', 'lobby-3'],
+        )
+
+        mock_server_start = asynctest.CoroutineMock()
+        self.manager.rpc_command_server_start = mock_server_start
+
+        self.manager.procs.instances = {
+            'lobby-2': asynctest.Mock(spec = asyncio.subprocess.Process),
+        }
+
+        result = await self.manager.rpc_command_server_start_all(
+            servers = ['lobby-*'],
+            wait    = True,
+            timeout = 60,
+        )
+
+        mock_server_start.assert_has_calls(
+            [
+                unittest.mock.call(
+                    server_id = server_id,
+                    wait      = True,
+                    timeout   = 60,
+                )
+                for server_id in ['lobby-1', 'lobby-3']
+            ],
+            any_order = True,
+        )
+
+        self.assertListEqual(
+            ['lobby-1', 'lobby-3'],
+            result.get('success'),
+            'The list of successful servers did not match the expected',
+        )
+
+        self.assertListEqual(
+            ['lobby-2'],
+            result.get('skipped'),
+            'The list of skipped servers did not match the expected',
+        )
+
     async def _run_test(self, success_ids = None, error_ids = None, running_ids = None):
         if success_ids is None:
             success_ids = []
@@ -74,7 +122,7 @@ class TestServerStartAll(utils.ManagerMixin, unittest.TestCase):
         self.manager.rpc_command_list_servers = mock_list_servers
         self.manager.rpc_command_server_start = mock_server_start
 
-        self.manager.instances = {
+        self.manager.procs.instances = {
             server_id: asynctest.Mock(spec = asyncio.subprocess.Process)
             for server_id  in running_ids
         }
@@ -83,7 +131,7 @@ class TestServerStartAll(utils.ManagerMixin, unittest.TestCase):
 
         mock_server_start.assert_has_calls(
             [
-                unittest.mock.call(server_id)
+                unittest.mock.call(server_id = server_id)
                 for server_id in success_ids
             ]
         )
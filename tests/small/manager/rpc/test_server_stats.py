@@ -0,0 +1,89 @@
+"""
+Tests for the server_stats JSON RPC method
+"""
+
+import unittest
+
+import asynctest
+import nose
+
+from .... import utils
+
+from mymcadmin.errors import ServerDoesNotExistError
+from mymcadmin.procstats import TimeSeries
+
+class TestServerStats(utils.ManagerMixin, unittest.TestCase):
+    """
+    Tests for the server_stats JSON RPC method
+    """
+
+    @asynctest.patch('os.path.exists')
+    @utils.run_async
+    async def test_method(self, exists):
+        """
+        Tests that the method returns the recent samples for the server
+        """
+
+        exists.return_value = True
+
+        series = TimeSeries(10)
+        for i in range(3):
+            series.append({'time': i, 'rss': i * 1024})
+
+        self.manager.procs.sampler.series = {'testification': series}
+
+        result = await self.manager.rpc_command_server_stats(
+            server_id = 'testification',
+            samples   = 2,
+        )
+
+        self.assertEqual(
+            'testification',
+            result['server_id'],
+            'Method did not return the server ID',
+        )
+
+        self.assertEqual(
+            self.manager.procs.sampler.interval,
+            result['interval'],
+            'Method did not return the sample interval',
+        )
+
+        self.assertListEqual(
+            [1024, 2048],
+            result['samples']['rss'],
+            'Method did not return the most recent samples',
+        )
+
+    @asynctest.patch('os.path.exists')
+    @utils.run_async
+    async def test_method_no_samples(self, exists):
+        """
+        Tests that a server that was never sampled has no samples
+        """
+
+        exists.return_value = True
+
+        result = await self.manager.rpc_command_server_stats(
+            server_id = 'testification',
+        )
+
+        self.assertListEqual(
+            [],
+            result['samples']['time'],
+            'Method should not return any samples',
+        )
+
+    @nose.tools.raises(ServerDoesNotExistError)
+    @utils.run_async
+    async def test_method_bad_id(self):
+        """
+        Tests that we check for a valid server_id
+        """
+
+        await self.manager.rpc_command_server_stats(
+            server_id = 'bad',
+        )
+
+if __name__ == '__main__':
+    unittest.main()
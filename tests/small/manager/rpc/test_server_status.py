@@ -0,0 +1,90 @@
+"""
+Tests for the server_status JSON RPC method
+"""
+
+import unittest
+
+import asynctest
+import nose
+
+from .... import utils
+
+from mymcadmin.errors import ServerDoesNotExistError
+from mymcadmin.manager import Manager
+
+class TestServerStatus(utils.ManagerMixin, unittest.TestCase):
+    """
+    Tests for the server_status JSON RPC method
+    """
+
+    @asynctest.patch('os.path.exists')
+    @utils.run_async
+    async def test_method(self, exists):
+        """
+        Tests that the method returns the server state and boot times
+        """
+
+        exists.return_value = True
+
+        server_id = 'testification'
+
+        self.manager._set_state(
+            server_id,
+            Manager.STATE_READY,
+            boot_time = 12.5,
+        )
+        self.manager._record_boot_time(server_id, 12.5)
+
+        result = await self.manager.rpc_command_server_status(
+            server_id = server_id,
+        )
+
+        self.assertEqual(server_id, result['server_id'], 'Wrong server ID')
+        self.assertEqual('ready', result['state'], 'Wrong server state')
+        self.assertEqual(12.5, result['boot_time'], 'Wrong boot time')
+        self.assertIsNotNone(result['since'], 'State change time was missing')
+
+        self.assertEqual(
+            1,
+            result['boot_times']['count'],
+            'Boot time was not recorded',
+        )
+
+    @asynctest.patch('os.path.exists')
+    @utils.run_async
+    async def test_method_never_started(self, exists):
+        """
+        Tests that a server that was never started is stopped
+        """
+
+        exists.return_value = True
+
+        result = await self.manager.rpc_command_server_status(
+            server_id = 'testification',
+        )
+
+        self.assertDictEqual(
+            {
+                'server_id':  'testification',
+                'state':      'stopped',
+                'since':      None,
+                'boot_time':  None,
+                'boot_times': None,
+            },
+            result,
+            'Method did not return the expected status',
+        )
+
+    @nose.tools.raises(ServerDoesNotExistError)
+    @utils.run_async
+    async def test_method_bad_id(self):
+        """
+        Tests that we check for a valid server_id
+        """
+
+        await self.manager.rpc_command_server_status(
+            server_id = 'bad',
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,12 +4,14 @@ Tests for the server_stop JSON RPC method
 
 import asyncio
 import unittest
+import unittest.mock
 
 import asynctest
 import nose
 
 from .... import utils
 
+from mymcadmin.console import CommandWriter
 from mymcadmin.errors import ServerDoesNotExistError
 from mymcadmin.rpc.errors import JsonRpcInvalidRequestError
 
@@ -28,14 +30,21 @@ class TestServerStop(utils.ManagerMixin, unittest.TestCase):
 
         exists.return_value = True
         server.return_value = server
+        server.settings     = {}
 
-        server_id = 'testification'
+        server_id        = 'testification'
+        server.server_id = server_id
         mock_proc = asynctest.Mock(spec = asyncio.subprocess.Process)
 
-        self.manager.instances = {
+        self.manager.procs.instances = {
             server_id: mock_proc
         }
 
+        mock_console = unittest.mock.Mock(spec = CommandWriter)
+        self.manager.procs.consoles = {
+            server_id: mock_console
+        }
+
         result = await self.manager.rpc_command_server_stop(
             server_id = server_id,
         )
@@ -46,7 +55,153 @@ class TestServerStop(utils.ManagerMixin, unittest.TestCase):
             'Method did not return the server ID',
         )
 
-        mock_proc.communicate.assert_called_with('stop'.encode())
+        mock_console.send.assert_called_with('stop')
+
+        self.assertEqual(
+            'stopping',
+            self.manager.status.states[server_id]['state'],
+            'Server was not marked as stopping',
+        )
+
+        mock_proc.wait.assert_called_with()
+        self.assertFalse(
+            mock_proc.terminate.called,
+            'Server should not have been terminated',
+        )
+
+        self.assertEqual(
+            'stopped',
+            self.manager.procs.terminations[server_id],
+            'Server was not stopped gracefully',
+        )
+
+    @asynctest.patch('mymcadmin.server.Server')
+    @asynctest.patch('os.path.exists')
+    @utils.run_async
+    async def test_method_escalate(self, exists, server):
+        """
+        Tests that we terminate and then kill a server that won't stop
+        """
+
+        exists.return_value = True
+        server.return_value = server
+        server.settings     = {
+            'stop_timeout':      0.01,
+            'terminate_timeout': 0.01,
+        }
+
+        server_id        = 'testification'
+        server.server_id = server_id
+        killed           = asyncio.Event()
+
+        async def _wait():
+            await killed.wait()
+
+        mock_proc = asynctest.Mock(spec = asyncio.subprocess.Process)
+        mock_proc.wait.side_effect = _wait
+        mock_proc.kill.side_effect = killed.set
+
+        self.manager.procs.instances = {
+            server_id: mock_proc
+        }
+
+        self.manager.procs.consoles = {
+            server_id: unittest.mock.Mock(spec = CommandWriter)
+        }
+
+        await self.manager.rpc_command_server_stop(server_id = server_id)
+
+        mock_proc.terminate.assert_called_with()
+        mock_proc.kill.assert_called_with()
+
+        self.assertEqual(
+            'killed',
+            self.manager.procs.terminations[server_id],
+            'Server was not killed',
+        )
+
+    @asynctest.patch('mymcadmin.server.Server')
+    @asynctest.patch('os.path.exists')
+    @utils.run_async
+    async def test_method_waits_for_cleanup(self, exists, server):
+        """
+        Tests that we wait for the process task to finish cleaning up
+        """
+
+        exists.return_value = True
+        server.return_value = server
+        server.settings     = {}
+
+        server_id        = 'testification'
+        server.server_id = server_id
+
+        self.manager.procs.instances = {
+            server_id: asynctest.Mock(spec = asyncio.subprocess.Process)
+        }
+
+        self.manager.procs.consoles = {
+            server_id: unittest.mock.Mock(spec = CommandWriter)
+        }
+
+        cleaned_up = []
+
+        async def _cleanup():
+            for _ in range(3):
+                await asyncio.sleep(0)
+
+            cleaned_up.append(server_id)
+
+        self.manager.procs.tasks = {
+            server_id: asyncio.ensure_future(_cleanup()),
+        }
+
+        await self.manager.rpc_command_server_stop(server_id = server_id)
+
+        self.assertListEqual(
+            [server_id],
+            cleaned_up,
+            'Stop returned before the process task finished',
+        )
+
+        self.assertDictEqual(
+            {},
+            self.manager.procs.tasks,
+            'Process task was not forgotten',
+        )
+
+    @asynctest.patch('os.path.exists')
+    @utils.run_async
+    async def test_method_pending_restart(self, exists):
+        """
+        Tests that stopping a server waiting to be restarted cancels it
+        """
+
+        exists.return_value = True
+
+        server_id = 'testification'
+        mock_handle = unittest.mock.Mock(spec = asyncio.Handle)
+
+        self.manager.status.pending_restarts = {
+            server_id: mock_handle,
+        }
+
+        result = await self.manager.rpc_command_server_stop(
+            server_id = server_id,
+        )
+
+        self.assertEqual(
+            server_id,
+            result,
+            'Method did not return the server ID',
+        )
+
+        mock_handle.cancel.assert_called_with()
+
+        self.assertDictEqual(
+            {},
+            self.manager.status.pending_restarts,
+            'Pending restart was not removed',
+        )
 
     @nose.tools.raises(ServerDoesNotExistError)
     @utils.run_async
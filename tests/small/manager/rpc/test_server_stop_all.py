@@ -7,9 +7,13 @@ import unittest
 import unittest.mock
 
 import asynctest
+import nose
 
 from .... import utils
 
+from mymcadmin.config import DaemonOptions
+from mymcadmin.errors import ServerDoesNotExistError
+
 class TestServerStopAll(utils.ManagerMixin, unittest.TestCase):
     """
     Tests for the stop_all JSON RPC method
@@ -36,6 +40,124 @@ class TestServerStopAll(utils.ManagerMixin, unittest.TestCase):
             error_ids   = ['error0', 'error1'],
         )
 
+    @utils.run_async
+    async def test_method_parallel(self):
+        """
+        Tests that servers are stopped concurrently up to the configured limit
+        """
+
+        server_ids = ['server{}'.format(i) for i in range(6)]
+
+        self.manager.options   = DaemonOptions(max_parallel_ops = 2)
+        self.manager.procs.instances = {
+            server_id: asynctest.Mock(spec = asyncio.subprocess.Process)
+            for server_id in server_ids
+        }
+
+        running     = set()
+        max_running = 0
+
+        async def _stop_func(server_id):
+            nonlocal max_running
+
+            running.add(server_id)
+            max_running = max(max_running, len(running))
+
+            await asyncio.sleep(0)
+
+            running.remove(server_id)
+
+            return server_id
+
+        self.manager.rpc_command_server_stop = _stop_func
+
+        result = await self.manager.rpc_command_server_stop_all()
+
+        self.assertEqual(
+            2,
+            max_running,
+            'Servers were not stopped concurrently within the limit',
+        )
+
+        self.assertListEqual(
+            server_ids,
+            result.get('success'),
+            'Method did not return the correct list of successful server IDs',
+        )
+
+    @utils.run_async
+    async def test_method_selectors(self):
+        """
+        Tests that servers can be selected by ID, glob pattern and tag
+        """
+
+        server_ids = [
+            'creative',
+            'lobby-1',
+            'lobby-2',
+            'minigames',
+            'survival',
+        ]
+
+        tags = {
+            'minigames': ['games'],
+            'survival':  ['games', 'hardcore'],
+        }
+
+        self.manager.rpc_command_list_servers = asynctest.CoroutineMock(
+            return_value = server_ids,
+        )
+
+        self.manager._get_server_by_id = lambda server_id: unittest.mock.Mock(
+            settings = {'tags': tags.get(server_id, [])},
+        )
+
+        self.manager.procs.instances = {
+            server_id: asynctest.Mock(spec = asyncio.subprocess.Process)
+            for server_id in ['creative', 'lobby-1', 'minigames']
+        }
+
+        mock_server_stop = asynctest.CoroutineMock()
+        self.manager.rpc_command_server_stop = mock_server_stop
+
+        result = await self.manager.rpc_command_server_stop_all(
+            servers = ['lobby-*', 'tag:games', 'lobby-1'],
+        )
+
+        self.assertListEqual(
+            ['lobby-1', 'minigames'],
+            sorted(
+                call[1]['server_id']
+                for call in mock_server_stop.call_args_list
+            ),
+            'The selected running servers were not stopped',
+        )
+
+        self.assertListEqual(
+            ['lobby-1', 'minigames'],
+            result.get('success'),
+            'Method did not return the correct list of successful server IDs',
+        )
+
+        self.assertListEqual(
+            ['lobby-2', 'survival'],
+            result.get('skipped'),
+            'Method did not return the selected servers that were not running',
+        )
+
+    @nose.tools.raises(ServerDoesNotExistError)
+    @utils.run_async
+    async def test_method_unknown_server(self):
+        """
+        Tests that selecting a server that doesn't exist is an error
+        """
+
+        self.manager.rpc_command_list_servers = asynctest.CoroutineMock(
+            return_value = ['lobby-1'],
+        )
+
+        await self.manager.rpc_command_server_stop_all(servers = ['lobby-2'])
+
     async def _run_test(self, success_ids = None, error_ids = None):
         if success_ids is None:
             success_ids = []
@@ -62,7 +184,7 @@ class TestServerStopAll(utils.ManagerMixin, unittest.TestCase):
         mock_server_stop = asynctest.CoroutineMock()
         mock_server_stop.side_effect = _stop_func
 
-        self.manager.instances = server_procs
+        self.manager.procs.instances = server_procs
 
         self.manager.rpc_command_list_servers = mock_list_servers
         self.manager.rpc_command_server_stop  = mock_server_stop
@@ -71,15 +193,15 @@ class TestServerStopAll(utils.ManagerMixin, unittest.TestCase):
 
         mock_server_stop.assert_has_calls(
             [
-                unittest.mock.call(server_id)
-                for server_id in self.manager.instances.keys()
+                unittest.mock.call(server_id = server_id)
+                for server_id in self.manager.procs.instances.keys()
             ]
         )
 
         self.assertListEqual(
             [
                 server_id
-                for server_id in self.manager.instances.keys()
+                for server_id in self.manager.procs.instances.keys()
                 if server_id in success_ids
             ],
             result.get('success'),
@@ -89,13 +211,19 @@ class TestServerStopAll(utils.ManagerMixin, unittest.TestCase):
         self.assertListEqual(
             [
                 server_id
-                for server_id in self.manager.instances.keys()
+                for server_id in self.manager.procs.instances.keys()
                 if server_id in error_ids
             ],
             result.get('failure'),
             'Method did not return the correct list of failed server IDs',
         )
 
+        self.assertListEqual(
+            sorted(result.get('success')),
+            sorted(result.get('terminations').keys()),
+            'Method did not report how each server was stopped',
+        )
+
 if __name__ == '__main__':
     unittest.main()
 
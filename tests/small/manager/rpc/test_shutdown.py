@@ -33,7 +33,9 @@ class TestShutdown(utils.ManagerMixin, unittest.TestCase):
             for server_id in instance_ids
         }
 
-        self.manager.instances = instances
+        self.manager.procs.instances = instances
+
+        self.manager.rpc_server.close = unittest.mock.Mock()
 
         mock_server_stop = asynctest.CoroutineMock()
         self.manager.rpc_command_server_stop = mock_server_stop
@@ -54,6 +56,34 @@ class TestShutdown(utils.ManagerMixin, unittest.TestCase):
             ]
         )
 
+        self.manager.rpc_server.close.assert_called_with()
+
+    @utils.run_async
+    async def test_method_autostart(self):
+        """
+        Tests that servers waiting to be auto started aren't started once
+        we've begun shutting down
+        """
+
+        started = asyncio.Event()
+
+        async def _autostart():
+            await asyncio.sleep(60)
+            started.set()
+
+        autostart = asyncio.ensure_future(_autostart())
+        self.manager.procs.autostart = autostart
+
+        await self.manager.rpc_command_shutdown()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await autostart
+
+        self.assertFalse(
+            started.is_set(),
+            'Auto start was not cancelled',
+        )
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -4,14 +4,21 @@ Tests for the mymcadmin.manager.Manager class
 
 import asyncio
 import asyncio.subprocess
-import json
+import os
+import os.path
+import socket
+import tempfile
 import unittest
 
 import asynctest
 
 from ... import utils
 
+from mymcadmin import metrics, procstats
+from mymcadmin.config import DaemonOptions
+from mymcadmin.errors import ManagerError
 from mymcadmin.manager import Manager
+from mymcadmin.registry import ServerRegistry
 from mymcadmin.server import Server
 
 class TestManager(utils.EventLoopMixin, unittest.TestCase):
@@ -28,12 +35,8 @@ class TestManager(utils.EventLoopMixin, unittest.TestCase):
 
     @asynctest.patch('asyncio.gather')
     @asynctest.patch('asyncio.Task.all_tasks')
-    @asynctest.patch('mymcadmin.server.Server')
-    @asynctest.patch('os.path.isdir')
-    @asynctest.patch('os.listdir')
-    @asynctest.patch('mymcadmin.manager.Manager.handle_network_connection')
-    @asynctest.patch('asyncio.start_server')
-    def test_run(self, start_server, handle_network, listdir, isdir, server, all_tasks, gather):
+    @asynctest.patch('mymcadmin.rpc.RpcServer.start_server')
+    def test_run(self, start_server, all_tasks, gather):
         """
         Check that the run function starts and stops the event loop
         """
@@ -47,10 +50,6 @@ class TestManager(utils.EventLoopMixin, unittest.TestCase):
 
         mock_event_loop = asynctest.Mock(asyncio.BaseEventLoop)
 
-        listdir.return_value = server_ids
-
-        isdir.return_value = True
-
         mock_servers = [
             unittest.mock.Mock(
                 spec      = Server,
@@ -62,14 +61,11 @@ class TestManager(utils.EventLoopMixin, unittest.TestCase):
             for server_id in server_ids
         ]
 
-        server.side_effect = mock_servers
-
         all_tasks.return_value = server_ids
 
         gather.return_value = gather
 
-        mock_start_server_proc = asynctest.CoroutineMock()
-        mock_start_server_proc.return_value = mock_start_server_proc
+        mock_autostart_servers = unittest.mock.Mock()
 
         manager = Manager(
             self.host,
@@ -77,25 +73,33 @@ class TestManager(utils.EventLoopMixin, unittest.TestCase):
             self.root,
             event_loop = mock_event_loop,
         )
-        manager.start_server_proc = mock_start_server_proc
+        manager.autostart_servers = mock_autostart_servers
+        manager.servers           = unittest.mock.Mock(spec = ServerRegistry)
+
+        manager.servers.servers.return_value = mock_servers
 
         manager.run()
 
+        manager.servers.refresh.assert_called_with(force = True)
+
         start_server.assert_called_with(
-            handle_network,
             self.host,
             self.port,
             loop = mock_event_loop,
         )
 
-        manager.start_server_proc.assert_has_calls(
+        mock_autostart_servers.assert_called_with(
             [
-                unittest.mock.call(mock_server)
+                mock_server
                 for mock_server in mock_servers
                 if mock_server.server_id.startswith('auto')
             ]
         )
 
+        mock_event_loop.create_task.assert_any_call(
+            mock_autostart_servers.return_value,
+        )
+
         mock_event_loop.run_forever.assert_called_with()
 
         all_tasks.assert_called_with()
@@ -104,73 +108,249 @@ class TestManager(utils.EventLoopMixin, unittest.TestCase):
 
         mock_event_loop.close.assert_called_with()
 
-    @asynctest.patch('mymcadmin.rpc.JsonRpcResponseManager')
-    @utils.run_async
-    async def test_handle_network_connection(self, response_manager):
+    @asynctest.patch('asyncio.gather')
+    @asynctest.patch('asyncio.Task.all_tasks')
+    @asynctest.patch('mymcadmin.registry.ServerRegistry.refresh')
+    @asynctest.patch('mymcadmin.rpc.RpcServer.start_server')
+    @asynctest.patch('asyncio.start_server')
+    def test_run_metrics(self, start_server, rpc_start_server, refresh,
+                         all_tasks, gather):
         """
-        Check that the network handling handles all of the commands properly
+        Check that the metrics listener is started when a port is given
         """
 
-        mock_response = unittest.mock.Mock()
-        mock_response.json = json.dumps(
-            {
-                'jsonrpc': '2.0',
-                'id':      1,
-                'result':  {'mission': 'complete'},
-            }
+        mock_event_loop = asynctest.Mock(asyncio.BaseEventLoop)
+
+        all_tasks.return_value = []
+
+        manager = Manager(
+            self.host,
+            self.port,
+            self.root,
+            event_loop = mock_event_loop,
+            options    = DaemonOptions(metrics_port = 9323),
+        )
+        manager.autostart_servers = unittest.mock.Mock()
+
+        manager.run()
+
+        rpc_start_server.assert_called_with(
+            self.host,
+            self.port,
+            loop = mock_event_loop,
+        )
+
+        metrics_calls = [
+            call
+            for call in start_server.call_args_list
+            if call[0][1:] == (self.host, 9323)
+        ]
+
+        self.assertEqual(1, len(metrics_calls), 'Metrics were not served')
+
+        handler = metrics_calls[0][0][0]
+        self.assertEqual(
+            metrics.handle_connection,
+            handler.func,
+            'Metrics handler did not match',
+        )
+        self.assertEqual(
+            manager._collect_metrics,
+            handler.keywords['render'],
+            'Metrics were not rendered by the manager',
+        )
+
+    @asynctest.patch('mymcadmin.rpc.RpcServer.start_server')
+    def test_run_socket_in_use(self, start_server):
+        """
+        Check that the manager won't start if another daemon has the socket
+        """
+
+        root        = tempfile.mkdtemp()
+        socket_path = os.path.join(root, 'mymcadmin.sock')
+
+        listener = socket.socket(socket.AF_UNIX)
+        listener.bind(socket_path)
+        listener.listen(1)
+
+        mock_event_loop = asynctest.Mock(asyncio.BaseEventLoop)
+
+        manager = Manager(
+            self.host,
+            self.port,
+            root,
+            event_loop = mock_event_loop,
+            options    = DaemonOptions(socket_path = socket_path),
+        )
+
+        try:
+            with self.assertRaises(ManagerError):
+                manager.run()
+        finally:
+            listener.close()
+
+        self.assertFalse(start_server.called, 'Manager was started')
+        self.assertFalse(
+            mock_event_loop.run_forever.called,
+            'Manager was started',
         )
 
-        response_manager.handle = asynctest.CoroutineMock()
-        response_manager.handle.return_value = mock_response
+        self.assertTrue(
+            os.path.exists(socket_path),
+            'Socket in use was removed',
+        )
+
+    def test_collect_metrics(self):
+        """
+        Check that the RPC, server state and resource metrics are exported
+        """
 
         mock_event_loop = asynctest.Mock(spec = asyncio.BaseEventLoop)
 
-        mock_reader = asynctest.Mock(spec = asyncio.StreamReader)
+        manager = Manager(
+            self.host,
+            self.port,
+            self.root,
+            event_loop = mock_event_loop,
+        )
 
-        mock_writer = asynctest.Mock(spec = asyncio.StreamWriter)
-        mock_writer.get_extra_info.return_value = '127.0.0.1'
+        manager.rpc_server.stats.record('server_start', 0.2)
+        manager.rpc_server.stats.record('server_start', 0.3, success = False)
 
-        response_future = asyncio.Future()
-        mock_writer.write.side_effect = response_future.set_result
+        manager.status.states['running'] = {'state': Manager.STATE_READY, 'since': 0}
+        manager.status.restart_counts['running'] = 2
+        manager._record_boot_time('running', 12)
 
-        req = json.dumps(
+        manager.procs.instances['running'] = unittest.mock.Mock(pid = 1234)
+        manager.procs.sampler.series['running'] = procstats.TimeSeries(2)
+        manager.procs.sampler.series['running'].append(
             {
-                'jsonrpc': '2.0',
-                'method':  'test',
-                'params':  {'im': 'a test'},
-                'id':      1,
+                'time':    100,
+                'cpu':     50.0,
+                'rss':     1024,
+                'swap':    0,
+                'threads': 30,
             }
-        ).encode()
-        mock_reader.read.return_value = req
+        )
+
+        lines = manager._collect_metrics().splitlines()
+
+        for expected in [
+                'mymcadmin_rpc_requests_total{method="server_start"} 2',
+                'mymcadmin_rpc_errors_total{method="server_start"} 1',
+                'mymcadmin_rpc_request_duration_seconds_count' +
+                '{method="server_start"} 2',
+                'mymcadmin_server_state{server_id="running",state="ready"} 1',
+                'mymcadmin_server_state{server_id="running",state="crashed"} 0',
+                'mymcadmin_server_restarts_total{server_id="running"} 2',
+                'mymcadmin_server_boot_duration_seconds_bucket' +
+                '{le="15",server_id="running"} 1',
+                'mymcadmin_server_cpu_percent{server_id="running"} 50.0',
+                'mymcadmin_server_resident_memory_bytes' +
+                '{server_id="running"} 1024.0',
+                'mymcadmin_server_threads{server_id="running"} 30.0',
+            ]:
+            self.assertIn(expected, lines, 'Metric was not exported')
+
+    @utils.run_async
+    async def test_autostart_servers(self):
+        """
+        Tests that servers are started in waves by priority
+        """
 
         manager = Manager(
             self.host,
             self.port,
             self.root,
-            event_loop = mock_event_loop,
+            event_loop = self.event_loop,
+            options    = DaemonOptions(
+                autostart_concurrency = 2,
+                autostart_timeout     = 1,
+            ),
         )
 
-        await manager.handle_network_connection(mock_reader, mock_writer)
+        servers = [
+            self._mock_autostart_server('low', 0),
+            self._mock_autostart_server('high0', 10),
+            self._mock_autostart_server('high1', 10),
+            self._mock_autostart_server('high2', 10),
+        ]
+
+        running     = set()
+        max_running = 0
+        started     = []
 
-        response_manager.handle.assert_called_with(req, manager.rpc_dispatcher)
+        async def _start_server_proc(srv):
+            nonlocal max_running
 
-        self.assertTrue(
-            response_future.done(),
-            'Response was never sent',
+            started.append(srv.server_id)
+            running.add(srv.server_id)
+            max_running = max(max_running, len(running))
+
+            await asyncio.sleep(0)
+
+            running.remove(srv.server_id)
+            manager.status.ready[srv.server_id].set()
+
+            # Keep running like a real server would
+            await asyncio.sleep(10)
+
+        manager.start_server_proc = _start_server_proc
+
+        await manager.autostart_servers(servers)
+
+        self.assertListEqual(
+            ['high0', 'high1', 'high2', 'low'],
+            started,
+            'Servers were not started in priority order',
         )
 
-        resp = json.loads(response_future.result().decode())
-        self.assertDictEqual(
-            {
-                'jsonrpc': '2.0',
-                'id':      1,
-                'result':  {'mission': 'complete'},
-            },
-            resp,
+        self.assertEqual(
+            2,
+            max_running,
+            'Too many servers were booting at once',
+        )
+
+        for task in asyncio.Task.all_tasks(self.event_loop):
+            if task is not asyncio.Task.current_task(self.event_loop):
+                task.cancel()
+
+    @unittest.mock.patch('logging.warning')
+    @utils.run_async
+    async def test_autostart_servers_timeout(self, mock_warning):
+        """
+        Tests that we move on when a server never becomes ready
+        """
+
+        manager = Manager(
+            self.host,
+            self.port,
+            self.root,
+            event_loop = self.event_loop,
+            options    = DaemonOptions(autostart_timeout = 0.01),
+        )
+
+        proc_started = asyncio.Event()
+
+        async def _start_server_proc(_):
+            proc_started.set()
+            await asyncio.sleep(10)
+
+        manager.start_server_proc = _start_server_proc
+
+        await manager.autostart_servers(
+            [self._mock_autostart_server('slow', 0)]
         )
 
-        mock_writer.write_eof.assert_called_with()
-        mock_writer.drain.assert_called_with()
+        self.assertTrue(proc_started.is_set(), 'Server was not started')
+
+        mock_warning.assert_called_with(
+            'Server slow was not ready after 0.01 seconds',
+        )
+
+        for task in asyncio.Task.all_tasks(self.event_loop):
+            if task is not asyncio.Task.current_task(self.event_loop):
+                task.cancel()
 
     @utils.run_async
     async def test_start_server_proc(self):
@@ -182,15 +362,19 @@ class TestManager(utils.EventLoopMixin, unittest.TestCase):
         mock_event_loop.run_until_complete.side_effect = \
                 self.event_loop.run_until_complete
 
-        mock_proc = asynctest.Mock(spec = asyncio.subprocess.Process)
-
-        mock_proc_func = asynctest.CoroutineMock()
-        mock_proc_func.return_value = mock_proc
+        mock_proc = self._mock_proc(
+            [
+                b'Starting server\n',
+                b'[Server thread/INFO]: Done (1.234s)! For help, type "help"\n',
+                b'',
+            ]
+        )
 
         mock_server = asynctest.Mock(spec = Server)
         mock_server.server_id = 'test'
+        mock_server.settings  = {}
         mock_server.start     = asynctest.CoroutineMock()
-        mock_server.start.return_value = mock_proc_func()
+        mock_server.start.return_value = mock_proc
 
         mock_instances = unittest.mock.MagicMock()
 
@@ -200,7 +384,8 @@ class TestManager(utils.EventLoopMixin, unittest.TestCase):
             self.root,
             event_loop = mock_event_loop,
         )
-        manager.instances = mock_instances
+        manager.procs.instances = mock_instances
+        mock_instances.get.return_value = mock_proc
 
         await manager.start_server_proc(mock_server)
 
@@ -210,6 +395,78 @@ class TestManager(utils.EventLoopMixin, unittest.TestCase):
         mock_instances.__setitem__.assert_called_with('test', mock_proc)
         mock_instances.__delitem__.assert_called_with('test')
 
+        self.assertNotIn(
+            'test',
+            manager.procs.consoles,
+            'Server console was not cleaned up',
+        )
+
+        self.assertListEqual(
+            [
+                'Starting server',
+                '[Server thread/INFO]: Done (1.234s)! For help, type "help"',
+            ],
+            [entry['line'] for entry in manager.procs.logs['test'].tail()],
+            'Server output was not captured',
+        )
+
+        self.assertFalse(
+            manager.status.ready['test'].is_set(),
+            'Server should not be ready once it has exited',
+        )
+
+        self.assertEqual(
+            'stopped',
+            manager.status.states['test']['state'],
+            'Server state was not updated',
+        )
+
+        self.assertEqual(
+            1,
+            manager.status.boot_times['test'].count,
+            'Boot time was not recorded',
+        )
+
+    @utils.run_async
+    async def test_start_server_proc_stopping(self):
+        """
+        Check that a server being stopped isn't marked as ready
+        """
+
+        mock_event_loop = asynctest.Mock(spec = asyncio.BaseEventLoop)
+
+        mock_proc = self._mock_proc(
+            [
+                b'[Server thread/INFO]: Done (1.234s)! For help, type "help"\n',
+                b'',
+            ]
+        )
+
+        manager = Manager(
+            self.host,
+            self.port,
+            self.root,
+            event_loop = mock_event_loop,
+        )
+
+        async def _start():
+            manager._set_state('test', Manager.STATE_STOPPING)
+
+            return mock_proc
+
+        mock_server = asynctest.Mock(spec = Server)
+        mock_server.server_id = 'test'
+        mock_server.settings  = {}
+        mock_server.start     = _start
+
+        await manager.start_server_proc(mock_server)
+
+        self.assertNotIn(
+            'test',
+            manager.status.boot_times,
+            'Server should not be ready while it is being stopped',
+        )
+
     @unittest.mock.patch('logging.error')
     @utils.run_async
     async def test_start_server_proc_crash(self, mock_error):
@@ -219,15 +476,14 @@ class TestManager(utils.EventLoopMixin, unittest.TestCase):
 
         mock_event_loop = asynctest.Mock(spec = asyncio.BaseEventLoop)
 
-        mock_proc = asynctest.Mock(spec = asyncio.subprocess.Process)
-
-        mock_proc_func = asynctest.CoroutineMock()
-        mock_proc_func.return_value = mock_proc
-        mock_proc_func.returncode   = 1
+        mock_proc = self._mock_proc([b''])
+        mock_proc.returncode = 1
 
         mock_server = asynctest.Mock(spec = Server)
         mock_server.server_id = 'test'
-        mock_server.start.return_value = mock_proc_func()
+        mock_server.settings  = {}
+        mock_server.start     = asynctest.CoroutineMock()
+        mock_server.start.return_value = mock_proc
 
         manager = Manager(
             self.host,
@@ -243,6 +499,150 @@ class TestManager(utils.EventLoopMixin, unittest.TestCase):
             'test',
         )
 
+        self.assertEqual(
+            'crashed',
+            manager.status.states['test']['state'],
+            'Server was not marked as crashed',
+        )
+
+    @utils.run_async
+    async def test_start_server_proc_restart(self):
+        """
+        Tests that a crashed server is scheduled to be restarted
+        """
+
+        mock_event_loop = asynctest.Mock(spec = asyncio.BaseEventLoop)
+
+        mock_proc = self._mock_proc([b''])
+        mock_proc.returncode = 1
+
+        mock_server = asynctest.Mock(spec = Server)
+        mock_server.server_id = 'test'
+        mock_server.settings  = {'restart': 'on-failure'}
+        mock_server.start     = asynctest.CoroutineMock()
+        mock_server.start.return_value = mock_proc
+
+        manager = Manager(
+            self.host,
+            self.port,
+            self.root,
+            event_loop = mock_event_loop,
+        )
+
+        await manager.start_server_proc(mock_server)
+
+        mock_event_loop.call_later.assert_called_with(
+            1,
+            manager._restart_server,
+            mock_server,
+        )
+
+        self.assertIn(
+            'test',
+            manager.status.pending_restarts,
+            'Restart was not recorded',
+        )
+
+        manager._restart_server(mock_server)
+
+        self.assertNotIn(
+            'test',
+            manager.status.pending_restarts,
+            'Pending restart was not cleared',
+        )
+
+        self.assertTrue(
+            mock_event_loop.create_task.called,
+            'Server was not restarted',
+        )
+
+    @utils.run_async
+    async def test_start_server_proc_stopped(self):
+        """
+        Tests that a server that was stopped on purpose isn't restarted
+        """
+
+        mock_event_loop = asynctest.Mock(spec = asyncio.BaseEventLoop)
+
+        mock_proc = self._mock_proc([b''])
+        mock_proc.returncode = 0
+
+        manager = Manager(
+            self.host,
+            self.port,
+            self.root,
+            event_loop = mock_event_loop,
+        )
+
+        async def _start():
+            manager._set_state('test', Manager.STATE_STOPPING)
+
+            return mock_proc
+
+        mock_server = asynctest.Mock(spec = Server)
+        mock_server.server_id = 'test'
+        mock_server.settings  = {'restart': 'always'}
+        mock_server.start     = _start
+
+        await manager.start_server_proc(mock_server)
+
+        self.assertFalse(
+            mock_event_loop.call_later.called,
+            'Stopped server should not have been restarted',
+        )
+
+        self.assertEqual(
+            'stopped',
+            manager.status.states['test']['state'],
+            'Server was not marked as stopped',
+        )
+
+    @utils.run_async
+    async def test_start_server_proc_replaced(self):
+        """
+        Tests that an old process doesn't clean up after its replacement
+        """
+
+        mock_event_loop = asynctest.Mock(spec = asyncio.BaseEventLoop)
+
+        mock_proc   = self._mock_proc([b''])
+        new_proc    = self._mock_proc([b''])
+        new_console = unittest.mock.Mock()
+
+        mock_server = asynctest.Mock(spec = Server)
+        mock_server.server_id = 'test'
+        mock_server.settings  = {'restart': 'always'}
+        mock_server.start     = asynctest.CoroutineMock()
+        mock_server.start.return_value = mock_proc
+
+        manager = Manager(
+            self.host,
+            self.port,
+            self.root,
+            event_loop = mock_event_loop,
+        )
+
+        async def _wait():
+            # The server is started again while this process is exiting
+            manager.procs.instances['test'] = new_proc
+            manager.procs.consoles['test']  = new_console
+
+        mock_proc.wait.side_effect = _wait
+
+        await manager.start_server_proc(mock_server)
+
+        self.assertIs(new_proc, manager.procs.instances['test'], 'Process was removed')
+        self.assertIs(
+            new_console,
+            manager.procs.consoles['test'],
+            'Console was removed',
+        )
+
+        self.assertFalse(
+            mock_event_loop.call_later.called,
+            'Replaced process should not be restarted',
+        )
+
     @utils.run_async
     async def test_rpc_method_handlers(self):
         """
@@ -258,19 +658,54 @@ class TestManager(utils.EventLoopMixin, unittest.TestCase):
         def _test_method(name, method):
             self.assertEqual(
                 method,
-                manager.rpc_dispatcher[name],
+                manager.rpc_server.dispatcher[name],
                 'Method handler was not correct',
             )
 
-        _test_method('list_servers',       manager.rpc_command_list_servers)
-        _test_method('server_create',      manager.rpc_command_server_create)
-        _test_method('server_restart',     manager.rpc_command_server_restart)
-        _test_method('server_restart_all', manager.rpc_command_server_restart_all)
-        _test_method('server_start',       manager.rpc_command_server_start)
-        _test_method('server_start_all',   manager.rpc_command_server_start_all)
-        _test_method('server_stop',        manager.rpc_command_server_stop)
-        _test_method('server_stop_all',    manager.rpc_command_server_stop_all)
-        _test_method('shutdown',           manager.rpc_command_shutdown)
+        _test_method('list_servers',          manager.rpc_command_list_servers)
+        _test_method('rpc_stats',             manager.rpc_command_rpc_stats)
+        _test_method('server_command',        manager.rpc_command_server_command)
+        _test_method('server_create',         manager.rpc_command_server_create)
+        _test_method('server_logs',           manager.rpc_command_server_logs)
+        _test_method('server_properties_get', manager.rpc_command_properties_get)
+        _test_method('server_properties_set', manager.rpc_command_properties_set)
+        _test_method('server_restart',        manager.rpc_command_server_restart)
+        _test_method('server_restart_all',    manager.rpc_command_server_restart_all)
+        _test_method('server_start',          manager.rpc_command_server_start)
+        _test_method('server_start_all',      manager.rpc_command_server_start_all)
+        _test_method('server_stats',          manager.rpc_command_server_stats)
+        _test_method('server_status',         manager.rpc_command_server_status)
+        _test_method('server_stop',           manager.rpc_command_server_stop)
+        _test_method('server_stop_all',       manager.rpc_command_server_stop_all)
+        _test_method('shutdown',              manager.rpc_command_shutdown)
+
+    @staticmethod
+    def _mock_autostart_server(server_id, priority):
+        return unittest.mock.Mock(
+            spec      = Server,
+            server_id = server_id,
+            settings  = {
+                'autostart':          True,
+                'autostart_priority': priority,
+            },
+        )
+
+    @staticmethod
+    def _mock_proc(output):
+        mock_proc = asynctest.Mock(spec = asyncio.subprocess.Process)
+
+        mock_proc.stdout = asynctest.Mock(spec = asyncio.StreamReader)
+        mock_proc.stdout.readline.side_effect = output
+
+        mock_proc.stderr = asynctest.Mock(spec = asyncio.StreamReader)
+        mock_proc.stderr.readline.return_value = b''
+
+        mock_proc.stdin = asynctest.Mock(spec = asyncio.StreamWriter)
+
+        # Exited cleanly unless a test says otherwise
+        mock_proc.returncode = 0
+
+        return mock_proc
 
 if __name__ == '__main__':
     unittest.main()
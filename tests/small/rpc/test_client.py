@@ -12,7 +12,13 @@ import nose
 
 from ... import utils
 
-from mymcadmin.rpc import JsonRpcError, RpcClient
+from mymcadmin.rpc import (
+    AsyncRpcClient,
+    BaseRpcClient,
+    JsonRpcError,
+    RpcClient,
+)
+from mymcadmin.rpc.base import MAX_MESSAGE_SIZE
 
 class TestRpcClient(utils.EventLoopMixin, unittest.TestCase):
     """
@@ -26,6 +32,14 @@ class TestRpcClient(utils.EventLoopMixin, unittest.TestCase):
         self.port   = 8080
         self.client = RpcClient(self.host, self.port)
 
+    @nose.tools.raises(TypeError)
+    def test_base_abstract(self):
+        """
+        Tests that a client has to say how requests are sent
+        """
+
+        BaseRpcClient(self.host, self.port)
+
     @asynctest.patch('asyncio.open_connection')
     def test_execute_rpc_method(self, open_connection):
         """
@@ -70,6 +84,13 @@ class TestRpcClient(utils.EventLoopMixin, unittest.TestCase):
 
         client.stop()
 
+        open_connection.assert_called_with(
+            self.host,
+            self.port,
+            limit = MAX_MESSAGE_SIZE,
+            loop  = client.event_loop,
+        )
+
         self.assertTrue(
             writer_future.done(),
             'Writer did not finish',
@@ -97,8 +118,119 @@ class TestRpcClient(utils.EventLoopMixin, unittest.TestCase):
             'Client did not return the right response',
         )
 
-        mock_writer.write_eof.assert_called_with()
+        self.assertFalse(
+            mock_writer.write_eof.called,
+            'Client should keep the connection open',
+        )
         mock_writer.drain.assert_called_with()
+        mock_writer.close.assert_called_with()
+
+    @asynctest.patch('asyncio.open_connection')
+    def test_execute_rpc_method_reuse(self, open_connection):
+        """
+        Tests that several methods can be executed over one connection
+        """
+
+        requests = []
+
+        mock_writer = asynctest.Mock(spec = asyncio.StreamWriter)
+        mock_writer.write.side_effect = lambda r: requests.append(
+            json.loads(r.decode())
+        )
+
+        mock_reader = asynctest.Mock(spec = asyncio.StreamReader)
+        mock_reader.readline.side_effect = [
+            json.dumps({'jsonrpc': '2.0', 'id': 1, 'result': 'first'}).encode(),
+            json.dumps({'jsonrpc': '2.0', 'id': 2, 'result': 'second'}).encode(),
+        ]
+
+        open_connection.return_value = (mock_reader, mock_writer)
+
+        client = RpcClient(self.host, self.port)
+        client.start()
+
+        results = [
+            client.execute_rpc_method('testification'),
+            client.execute_rpc_method('testification'),
+        ]
+
+        client.stop()
+
+        self.assertEqual(
+            1,
+            open_connection.call_count,
+            'Client did not reuse its connection',
+        )
+
+        self.assertListEqual(
+            [1, 2],
+            [req['id'] for req in requests],
+            'Client did not use a new ID for each request',
+        )
+
+        self.assertListEqual(
+            ['first', 'second'],
+            results,
+            'Client did not return the right responses',
+        )
+
+    @asynctest.patch('asyncio.open_connection')
+    @asynctest.patch('asyncio.open_unix_connection')
+    def test_execute_rpc_method_unix_socket(self, open_unix_connection,
+                                            open_connection):
+        """
+        Tests that the client connects to a Unix socket when there's no port
+        """
+
+        mock_writer = asynctest.Mock(spec = asyncio.StreamWriter)
+
+        mock_reader = asynctest.Mock(spec = asyncio.StreamReader)
+        mock_reader.readline.return_value = json.dumps(
+            {'jsonrpc': '2.0', 'id': 1, 'result': 'socket'}
+        ).encode()
+
+        open_unix_connection.return_value = (mock_reader, mock_writer)
+
+        client = RpcClient('mymcadmin.sock', None)
+        client.start()
+
+        response = client.execute_rpc_method('testification')
+
+        client.stop()
+
+        open_unix_connection.assert_called_with(
+            'mymcadmin.sock',
+            limit = MAX_MESSAGE_SIZE,
+            loop  = client.event_loop,
+        )
+
+        self.assertFalse(
+            open_connection.called,
+            'Client should not have used TCP',
+        )
+
+        self.assertEqual(
+            'socket',
+            response,
+            'Client did not return the right response',
+        )
+
+    @nose.tools.raises(JsonRpcError)
+    @asynctest.patch('asyncio.open_connection')
+    def test_execute_rpc_method_closed(self, open_connection):
+        """
+        Tests that we raise an error when the server closes the connection
+        """
+
+        mock_reader = asynctest.Mock(spec = asyncio.StreamReader)
+        mock_reader.readline.return_value = b''
+
+        mock_writer = asynctest.Mock(spec = asyncio.StreamWriter)
+
+        open_connection.return_value = (mock_reader, mock_writer)
+
+        self.client.start()
+        self.client.execute_rpc_method('testification')
 
     @nose.tools.raises(JsonRpcError)
     @asynctest.patch('asyncio.open_connection')
@@ -154,6 +286,27 @@ class TestRpcClient(utils.EventLoopMixin, unittest.TestCase):
             result = ['test0', 'test1', 'test2'],
         )
 
+    def test_rpc_stats(self):
+        """
+        Tests that the rpc_stats method works properly
+        """
+
+        self._test_method(
+            'rpc_stats',
+            result = {'slow_threshold': 1, 'methods': {}},
+        )
+
+    def test_server_command(self):
+        """
+        Tests that the server_command method works properly
+        """
+
+        self._test_method(
+            'server_command',
+            params = {'server_id': 'testification', 'command': 'save-all'},
+            result = 'testification',
+        )
+
     def test_server_create(self):
         """
         Tests that the server_create method works properly
@@ -182,6 +335,80 @@ class TestRpcClient(utils.EventLoopMixin, unittest.TestCase):
             result = 'test_server',
         )
 
+    def test_server_logs(self):
+        """
+        Tests that the server_logs method works properly
+        """
+
+        self._test_method(
+            'server_logs',
+            params = {'server_id': 'testification', 'lines': 10},
+            result = [],
+        )
+
+    def test_server_backup(self):
+        """
+        Tests that the server_backup method works properly
+        """
+
+        self._test_method(
+            'server_backup',
+            params = {'server_id': 'testification', 'timeout': 30},
+            result = {'name': '20161016T120000Z'},
+        )
+
+    def test_server_backups(self):
+        """
+        Tests that the server_backups method works properly
+        """
+
+        self._test_method(
+            'server_backups',
+            params = {'server_id': 'testification'},
+            result = ['20161016T120000Z'],
+        )
+
+    def test_server_properties_get(self):
+        """
+        Tests that the server_properties_get method works properly
+        """
+
+        self._test_method(
+            'server_properties_get',
+            params = {'server_id': 'testification', 'keys': ['motd']},
+            result = {'motd': 'A Minecraft Server'},
+        )
+
+    def test_server_properties_set(self):
+        """
+        Tests that the server_properties_set method works properly
+        """
+
+        self._test_method(
+            'server_properties_set',
+            params = {
+                'servers':    ['tag:survival'],
+                'properties': {'view-distance': 8},
+                'remove':     ['resource-pack'],
+            },
+            result = {
+                'success':   ['testification'],
+                'failure':   [],
+                'unchanged': [],
+            },
+        )
+
+    def test_server_restore(self):
+        """
+        Tests that the server_restore method works properly
+        """
+
+        self._test_method(
+            'server_restore',
+            params = {'server_id': 'testification', 'name': '20161016T120000Z'},
+            result = {'name': '20161016T120000Z', 'worlds': ['world']},
+        )
+
     def test_server_start(self):
         """
         Tests that the server_start method works properly
@@ -193,6 +420,50 @@ class TestRpcClient(utils.EventLoopMixin, unittest.TestCase):
             result = 'testification',
         )
 
+    def test_server_start_wait(self):
+        """
+        Tests that the server_start method can wait for the server
+        """
+
+        self._test_method(
+            'server_start',
+            params = {'server_id': 'testification', 'wait': True, 'timeout': 60},
+            result = 'testification',
+        )
+
+    def test_server_stats(self):
+        """
+        Tests that the server_stats method works properly
+        """
+
+        self._test_method(
+            'server_stats',
+            params = {'server_id': 'testification', 'samples': 10},
+            result = {'server_id': 'testification', 'samples': {}},
+        )
+
+    def test_server_status(self):
+        """
+        Tests that the server_status method works properly
+        """
+
+        self._test_method(
+            'server_status',
+            params = {'server_id': 'testification'},
+            result = {'server_id': 'testification', 'state': 'ready'},
+        )
+
+    def test_server_start_all_servers(self):
+        """
+        Tests that the server_start_all method passes on the server selectors
+        """
+
+        self._test_method(
+            'server_start_all',
+            params = {'servers': ['lobby-*'], 'wait': True, 'timeout': 60},
+            result = {'success': [], 'failure': [], 'skipped': []},
+        )
+
     def test_server_start_all(self):
         """
         Tests that the server_start_all method works properly
@@ -214,6 +485,17 @@ class TestRpcClient(utils.EventLoopMixin, unittest.TestCase):
             result = 'testification',
         )
 
+    def test_server_stop_all_servers(self):
+        """
+        Tests that the server_stop_all method passes on the server selectors
+        """
+
+        self._test_method(
+            'server_stop_all',
+            params = {'servers': ['lobby-*', 'tag:games']},
+            result = {'success': [], 'failure': [], 'skipped': []},
+        )
+
     def test_server_stop_all(self):
         """
         Tests that the server_stop_all method works properly
@@ -235,6 +517,17 @@ class TestRpcClient(utils.EventLoopMixin, unittest.TestCase):
             result = 'testification',
         )
 
+    def test_server_restart_all_servers(self):
+        """
+        Tests that the server_restart_all method passes on the server selectors
+        """
+
+        self._test_method(
+            'server_restart_all',
+            params = {'servers': ['lobby-*', 'tag:games']},
+            result = {'success': [], 'failure': [], 'skipped': []},
+        )
+
     def test_server_restart_all(self):
         """
         Tests that the server_restart_all method works properly
@@ -336,6 +629,324 @@ class TestRpcClient(utils.EventLoopMixin, unittest.TestCase):
                 'Client did not return the expected result',
             )
 
+class TestAsyncRpcClient(utils.EventLoopMixin, unittest.TestCase):
+    """
+    Tests for the asyncio JSON RPC client
+    """
+
+    def setUp(self):
+        super(TestAsyncRpcClient, self).setUp()
+
+        self.host     = 'localhost'
+        self.port     = 8080
+        self.requests = []
+
+    @utils.run_async
+    async def test_execute_rpc_method_concurrent(self):
+        """
+        Tests that several methods can be in flight at once and that the
+        responses are matched up by ID
+        """
+
+        client, reader = await self._start_client()
+
+        first  = asyncio.ensure_future(client.execute_rpc_method('first'))
+        second = asyncio.ensure_future(client.execute_rpc_method('second'))
+
+        await self._wait_for_requests(2)
+
+        self.assertListEqual(
+            ['first', 'second'],
+            [req['method'] for req in self.requests],
+            'Requests were not sent',
+        )
+
+        reader.feed_data(self._response(2, 'two'))
+        reader.feed_data(self._response(1, 'one'))
+
+        self.assertListEqual(
+            ['one', 'two'],
+            await asyncio.gather(first, second),
+            'Responses were not matched to their requests',
+        )
+
+        await client.stop()
+
+    @utils.run_async
+    async def test_execute_rpc_method_error(self):
+        """
+        Tests that an error response raises an error
+        """
+
+        client, reader = await self._start_client()
+
+        task = asyncio.ensure_future(client.execute_rpc_method('boom'))
+
+        await self._wait_for_requests(1)
+
+        reader.feed_data(
+            json.dumps(
+                {
+                    'jsonrpc': '2.0',
+                    'id':      1,
+                    'error':   {'code': -32000, 'message': 'Boom!'},
+                }
+            ).encode() + b'\n'
+        )
+
+        with self.assertRaises(JsonRpcError):
+            await task
+
+        await client.stop()
+
+    @utils.run_async
+    async def test_execute_rpc_method_timeout(self):
+        """
+        Tests that a method times out without affecting the connection
+        """
+
+        client, reader = await self._start_client()
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await client.execute_rpc_method('slow', timeout = 0.01)
+
+        task = asyncio.ensure_future(client.execute_rpc_method('fast'))
+
+        await self._wait_for_requests(2)
+
+        # The late response to the first request is ignored
+        reader.feed_data(self._response(1, 'late'))
+        reader.feed_data(self._response(2, 'fast'))
+
+        self.assertEqual(
+            'fast',
+            await task,
+            'Client did not recover from the timeout',
+        )
+
+        await client.stop()
+
+    @utils.run_async
+    async def test_execute_rpc_method_closed(self):
+        """
+        Tests that pending methods fail when the server closes the connection
+        """
+
+        client, reader = await self._start_client()
+
+        task = asyncio.ensure_future(client.execute_rpc_method('test'))
+
+        await self._wait_for_requests(1)
+
+        reader.feed_eof()
+
+        with self.assertRaises(JsonRpcError):
+            await task
+
+        with self.assertRaises(JsonRpcError):
+            await client.execute_rpc_method('test')
+
+        await client.stop()
+
+    @utils.run_async
+    async def test_execute_rpc_method_batch(self):
+        """
+        Tests that each response in a batch is matched to its request
+        """
+
+        client, reader = await self._start_client()
+
+        first  = asyncio.ensure_future(client.execute_rpc_method('first'))
+        second = asyncio.ensure_future(client.execute_rpc_method('second'))
+
+        await self._wait_for_requests(2)
+
+        batch = [
+            json.loads(self._response(2, 'two').decode()),
+            json.loads(self._response(1, 'one').decode()),
+        ]
+        reader.feed_data(json.dumps(batch).encode() + b'\n')
+
+        self.assertListEqual(
+            ['one', 'two'],
+            await asyncio.gather(first, second),
+            'Responses were not matched to their requests',
+        )
+
+        await client.stop()
+
+    @utils.run_async
+    async def test_execute_rpc_method_error_no_id(self):
+        """
+        Tests that a parse error, which isn't for a particular request, fails
+        every pending request without closing the connection
+        """
+
+        client, reader = await self._start_client()
+
+        first  = asyncio.ensure_future(client.execute_rpc_method('first'))
+        second = asyncio.ensure_future(client.execute_rpc_method('second'))
+
+        await self._wait_for_requests(2)
+
+        reader.feed_data(
+            json.dumps(
+                {
+                    'jsonrpc': '2.0',
+                    'id':      None,
+                    'error':   {'code': -32700, 'message': 'Parse error'},
+                }
+            ).encode() + b'\n'
+        )
+
+        for task in [first, second]:
+            with self.assertRaises(JsonRpcError):
+                await task
+
+        task = asyncio.ensure_future(client.execute_rpc_method('third'))
+
+        await self._wait_for_requests(3)
+
+        reader.feed_data(self._response(3, 'three'))
+
+        self.assertEqual(
+            'three',
+            await task,
+            'Client did not recover from the error',
+        )
+
+        await client.stop()
+
+    @utils.run_async
+    async def test_execute_rpc_method_error_no_id_other(self):
+        """
+        Tests that other errors without an ID don't fail pending requests
+        """
+
+        client, reader = await self._start_client()
+
+        task = asyncio.ensure_future(client.execute_rpc_method('test'))
+
+        await self._wait_for_requests(1)
+
+        reader.feed_data(
+            json.dumps(
+                {
+                    'jsonrpc': '2.0',
+                    'id':      None,
+                    'error':   {'code': -32600, 'message': 'Invalid Request'},
+                }
+            ).encode() + b'\n'
+        )
+        reader.feed_data(self._response(1, 'success'))
+
+        self.assertEqual(
+            'success',
+            await task,
+            'Pending request was failed by an unrelated error',
+        )
+
+        await client.stop()
+
+    @utils.run_async
+    async def test_execute_rpc_method_read_error(self):
+        """
+        Tests that pending methods fail when the connection can't be read
+        """
+
+        client, reader = await self._start_client()
+
+        task = asyncio.ensure_future(client.execute_rpc_method('test'))
+
+        await self._wait_for_requests(1)
+
+        reader.set_exception(ConnectionResetError())
+
+        with self.assertRaises(JsonRpcError):
+            await task
+
+        await client.stop()
+
+    @utils.run_async
+    async def test_methods(self):
+        """
+        Tests that the RPC methods are coroutines
+        """
+
+        client, reader = await self._start_client()
+
+        task = asyncio.ensure_future(
+            client.server_start('testification', wait = True)
+        )
+
+        await self._wait_for_requests(1)
+
+        self.assertDictEqual(
+            {'server_id': 'testification', 'wait': True},
+            self.requests[0]['params'],
+            'Params did not match',
+        )
+
+        reader.feed_data(self._response(1, 'testification'))
+
+        self.assertEqual(
+            'testification',
+            await task,
+            'Method did not return the result',
+        )
+
+        await client.stop()
+
+    @asynctest.patch('asyncio.open_unix_connection')
+    @utils.run_async
+    async def test_unix_socket(self, open_unix_connection):
+        """
+        Tests that the client connects to a Unix socket when there's no port
+        """
+
+        open_unix_connection.return_value = (
+            asyncio.StreamReader(),
+            asynctest.Mock(spec = asyncio.StreamWriter),
+        )
+
+        async with AsyncRpcClient('mymcadmin.sock', None) as client:
+            open_unix_connection.assert_called_with(
+                'mymcadmin.sock',
+                limit = MAX_MESSAGE_SIZE,
+                loop  = client.event_loop,
+            )
+
+    async def _start_client(self):
+        reader = asyncio.StreamReader()
+
+        writer = asynctest.Mock(spec = asyncio.StreamWriter)
+        writer.write.side_effect = lambda data: self.requests.append(
+            json.loads(data.decode())
+        )
+        writer.drain = asynctest.CoroutineMock()
+
+        with asynctest.patch('asyncio.open_connection') as open_connection:
+            open_connection.return_value = (reader, writer)
+
+            client = AsyncRpcClient(self.host, self.port)
+            await client.start()
+
+        return client, reader
+
+    async def _wait_for_requests(self, count):
+        while len(self.requests) < count:
+            await asyncio.sleep(0)
+
+    @staticmethod
+    def _response(request_id, result):
+        return json.dumps(
+            {
+                'jsonrpc': '2.0',
+                'id':      request_id,
+                'result':  result,
+            }
+        ).encode() + b'\n'
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -15,9 +15,12 @@ from mymcadmin.rpc import (
     JsonRpcBatchResponse,
     JsonRpcResponse,
     JsonRpcResponseManager,
+    RpcStats,
 )
 
+from mymcadmin.rpc.errors import JsonRpcInvalidRequestError
 from mymcadmin.rpc.response import (
+    JsonRpcInvalidRequestResponse,
     JsonRpcMethodNotFoundResponse,
     JsonRpcParseErrorResponse,
     JsonRpcServerErrorResponse,
@@ -120,6 +123,25 @@ class TestJsonRpcResponseManager(utils.EventLoopMixin, unittest.TestCase):
 
         mock_notify_handler.assert_called_with()
 
+    @utils.run_async
+    async def test_handle_batch_concurrent(self):
+        """
+        Tests that batch members run concurrently and keep their order
+        """
+
+        await self._run_concurrent_batch(limiter = None, expected_max = 3)
+
+    @utils.run_async
+    async def test_handle_batch_limiter(self):
+        """
+        Tests that the limiter caps how many batch members run at once
+        """
+
+        await self._run_concurrent_batch(
+            limiter      = asyncio.Semaphore(2),
+            expected_max = 2,
+        )
+
     @utils.run_async
     async def test_handle_notifications(self):
         """
@@ -218,6 +240,196 @@ class TestJsonRpcResponseManager(utils.EventLoopMixin, unittest.TestCase):
             'Error response was not the correct type',
         )
 
+    @utils.run_async
+    async def test_handle_method_error(self):
+        """
+        Tests that an error raised by a method is returned for its request
+        """
+
+        req = json.dumps(
+            {
+                'jsonrpc': '2.0',
+                'method':  'refuse',
+                'id':      42,
+            }
+        )
+
+        async def _refuse():
+            raise JsonRpcInvalidRequestError('Not right now')
+
+        dispatcher = Dispatcher(
+            methods = {'refuse': _refuse},
+        )
+
+        resp = await JsonRpcResponseManager.handle(req, dispatcher)
+
+        self.assertIsInstance(
+            resp,
+            JsonRpcInvalidRequestResponse,
+            'Error response was not the correct type',
+        )
+
+        self.assertEqual(
+            42,
+            resp.response_id,
+            'Error response was not for the request',
+        )
+
+        self.assertEqual(
+            'Not right now',
+            resp.error['message'],
+            'Error response did not have the error message',
+        )
+
+    @utils.run_async
+    async def test_handle_stats(self):
+        """
+        Tests that calls to known methods are recorded in the stats
+        """
+
+        req = json.dumps(
+            [
+                {
+                    'jsonrpc': '2.0',
+                    'method':  'ok',
+                    'id':      1,
+                },
+                {
+                    'jsonrpc': '2.0',
+                    'method':  'boom',
+                    'id':      2,
+                },
+                {
+                    'jsonrpc': '2.0',
+                    'method':  'missing',
+                    'id':      3,
+                },
+            ]
+        )
+
+        async def _ok():
+            return True
+
+        async def _boom():
+            raise RuntimeError('Boom!')
+
+        dispatcher = Dispatcher(
+            methods = {
+                'boom': _boom,
+                'ok':   _ok,
+            },
+        )
+
+        stats = RpcStats()
+
+        await JsonRpcResponseManager.handle(req, dispatcher, stats = stats)
+
+        self.assertDictEqual(
+            {'ok': 1, 'boom': 1},
+            stats.requests,
+            'Request counts did not match',
+        )
+
+        self.assertDictEqual(
+            {'ok': 0, 'boom': 1},
+            stats.errors,
+            'Error counts did not match',
+        )
+
+    @utils.run_async
+    async def test_handle_stats_queued(self):
+        """
+        Tests that the time spent waiting on the limiter is recorded
+        """
+
+        req = json.dumps(
+            [
+                {
+                    'jsonrpc': '2.0',
+                    'method':  'wait',
+                    'id':      request_id,
+                }
+                for request_id in range(2)
+            ]
+        )
+
+        async def _wait():
+            await asyncio.sleep(0.05)
+
+            return True
+
+        dispatcher = Dispatcher(methods = {'wait': _wait})
+
+        stats = RpcStats()
+
+        await JsonRpcResponseManager.handle(
+            req,
+            dispatcher,
+            limiter = asyncio.Semaphore(1),
+            stats   = stats,
+        )
+
+        self.assertGreaterEqual(
+            stats.queue_times['wait'].sum,
+            0.05,
+            'Queue time was not recorded',
+        )
+
+    async def _run_concurrent_batch(self, limiter, expected_max):
+        req = json.dumps(
+            [
+                {
+                    'jsonrpc': '2.0',
+                    'method':  'wait',
+                    'params':  {'delay': delay},
+                    'id':      request_id,
+                }
+                for request_id, delay in enumerate([3, 2, 1])
+            ]
+        )
+
+        running     = set()
+        max_running = 0
+
+        async def _wait(delay):
+            nonlocal max_running
+
+            running.add(delay)
+            max_running = max(max_running, len(running))
+
+            for _ in range(delay):
+                await asyncio.sleep(0)
+
+            running.remove(delay)
+
+            return delay
+
+        dispatcher = Dispatcher(methods = {'wait': _wait})
+
+        resp = await JsonRpcResponseManager.handle(
+            req,
+            dispatcher,
+            limiter = limiter,
+        )
+
+        self.assertEqual(
+            expected_max,
+            max_running,
+            'Batch did not run with the expected concurrency',
+        )
+
+        self.assertListEqual(
+            [0, 1, 2],
+            [r.response_id for r in resp],
+            'Responses were not in request order',
+        )
+
+        self.assertListEqual(
+            [3, 2, 1],
+            [r.result for r in resp],
+            'Response results did not match',
+        )
+
     async def _run_single_req(self, req, response_id):
         mock_handler = unittest.mock.Mock()
         mock_handler.return_value = {'mischief': 'managed'}
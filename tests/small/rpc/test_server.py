@@ -0,0 +1,396 @@
+"""
+Tests for the JSON RPC server
+"""
+
+import asyncio
+import json
+import os
+import os.path
+import socket
+import tempfile
+import unittest
+import unittest.mock
+
+import asynctest
+import nose
+
+from ... import utils
+
+from mymcadmin.errors import ManagerError
+from mymcadmin.rpc import Dispatcher, RpcServer, RpcStats
+from mymcadmin.rpc.base import MAX_MESSAGE_SIZE
+
+class TestRpcServer(utils.EventLoopMixin, unittest.TestCase):
+    """
+    Tests for the RpcServer class
+    """
+
+    def setUp(self):
+        super(TestRpcServer, self).setUp()
+
+        self.server = RpcServer(Dispatcher(), RpcStats())
+
+    @asynctest.patch('asyncio.start_unix_server')
+    @utils.run_async
+    async def test_start_unix_server(self, start_unix_server):
+        """
+        Check that the Unix socket replaces a stale one and is created with
+        the configured permissions
+        """
+
+        root        = tempfile.mkdtemp()
+        socket_path = os.path.join(root, 'mymcadmin.sock')
+
+        stale = socket.socket(socket.AF_UNIX)
+        stale.bind(socket_path)
+        stale.close()
+
+        umasks = []
+
+        async def _start_unix_server(*args, **kwargs):
+            umask = os.umask(0)
+            os.umask(umask)
+            umasks.append(umask)
+
+            self.assertFalse(
+                os.path.exists(socket_path),
+                'Stale socket was not removed',
+            )
+
+        start_unix_server.side_effect = _start_unix_server
+
+        mock_event_loop = asynctest.Mock(spec = asyncio.BaseEventLoop)
+
+        old_umask = os.umask(0o022)
+        try:
+            await self.server.start_unix_server(
+                socket_path,
+                0o600,
+                loop = mock_event_loop,
+            )
+
+            self.assertEqual(
+                0o022,
+                os.umask(0o022),
+                'Umask was not restored',
+            )
+        finally:
+            os.umask(old_umask)
+
+        start_unix_server.assert_called_with(
+            self.server.handle_connection,
+            path  = socket_path,
+            limit = MAX_MESSAGE_SIZE,
+            loop  = mock_event_loop,
+        )
+
+        self.assertListEqual(
+            [0o177],
+            umasks,
+            'Socket was not created with the right permissions',
+        )
+
+    @asynctest.patch('asyncio.start_server')
+    @utils.run_async
+    async def test_start_server(self, start_server):
+        """
+        Check that the TCP listener accepts large messages and is closed with
+        the server
+        """
+
+        mock_listener = unittest.mock.Mock()
+        start_server.return_value = mock_listener
+
+        mock_event_loop = asynctest.Mock(spec = asyncio.BaseEventLoop)
+
+        await self.server.start_server(
+            'localhost',
+            8080,
+            loop = mock_event_loop,
+        )
+
+        start_server.assert_called_with(
+            self.server.handle_connection,
+            'localhost',
+            8080,
+            limit = MAX_MESSAGE_SIZE,
+            loop  = mock_event_loop,
+        )
+
+        self.server.close()
+
+        mock_listener.close.assert_called_with()
+
+    @nose.tools.raises(ManagerError)
+    @utils.run_async
+    async def test_start_unix_server_not_socket(self):
+        """
+        Check that we don't remove a file that isn't a socket
+        """
+
+        root        = tempfile.mkdtemp()
+        socket_path = os.path.join(root, 'mymcadmin.sock')
+
+        with open(socket_path, 'w') as not_socket:
+            not_socket.write('Important')
+
+        await self.server.start_unix_server(socket_path, 0o600)
+
+    def test_remove_stale_socket_in_use(self):
+        """
+        Check that we don't remove a socket another daemon is listening on
+        """
+
+        root        = tempfile.mkdtemp()
+        socket_path = os.path.join(root, 'mymcadmin.sock')
+
+        listener = socket.socket(socket.AF_UNIX)
+        listener.bind(socket_path)
+        listener.listen(1)
+
+        try:
+            with self.assertRaises(ManagerError):
+                RpcServer.remove_stale_socket(socket_path)
+        finally:
+            listener.close()
+
+        self.assertTrue(
+            os.path.exists(socket_path),
+            'Socket in use was removed',
+        )
+
+    def test_remove_socket(self):
+        """
+        Check that the socket is removed on shutdown, even if it's gone already
+        """
+
+        root        = tempfile.mkdtemp()
+        socket_path = os.path.join(root, 'mymcadmin.sock')
+
+        listener = socket.socket(socket.AF_UNIX)
+        listener.bind(socket_path)
+        listener.close()
+
+        RpcServer.remove_socket(socket_path)
+
+        self.assertFalse(os.path.exists(socket_path), 'Socket was not removed')
+
+        RpcServer.remove_socket(socket_path)
+
+    @asynctest.patch('mymcadmin.rpc.server.JsonRpcResponseManager')
+    @utils.run_async
+    async def test_handle_connection(self, response_manager):
+        """
+        Check that the network handling handles all of the commands properly
+        """
+
+        mock_response = unittest.mock.Mock()
+        mock_response.json = json.dumps(
+            {
+                'jsonrpc': '2.0',
+                'id':      1,
+                'result':  {'mission': 'complete'},
+            }
+        )
+
+        response_manager.handle = asynctest.CoroutineMock()
+        response_manager.handle.return_value = mock_response
+
+        mock_reader = asynctest.Mock(spec = asyncio.StreamReader)
+
+        mock_writer = asynctest.Mock(spec = asyncio.StreamWriter)
+        mock_writer.get_extra_info.return_value = '127.0.0.1'
+
+        response_future = asyncio.Future()
+        mock_writer.write.side_effect = response_future.set_result
+
+        req = json.dumps(
+            {
+                'jsonrpc': '2.0',
+                'method':  'test',
+                'params':  {'im': 'a test'},
+                'id':      1,
+            }
+        ).encode()
+        mock_reader.readline.side_effect = [req + b'\n', b'']
+
+        await self.server.handle_connection(mock_reader, mock_writer)
+
+        response_manager.handle.assert_called_with(
+            req + b'\n',
+            self.server.dispatcher,
+            limiter = None,
+            stats   = self.server.stats,
+        )
+
+        self.assertTrue(
+            response_future.done(),
+            'Response was never sent',
+        )
+
+        resp = json.loads(response_future.result().decode())
+        self.assertDictEqual(
+            {
+                'jsonrpc': '2.0',
+                'id':      1,
+                'result':  {'mission': 'complete'},
+            },
+            resp,
+        )
+
+        self.assertFalse(
+            mock_writer.write_eof.called,
+            'Responses should not close the connection',
+        )
+        mock_writer.drain.assert_called_with()
+        mock_writer.close.assert_called_with()
+
+    @utils.run_async
+    async def test_handle_connection_pipelined(self):
+        """
+        Check that several requests can be sent over a single connection
+        """
+
+        requests = [
+            json.dumps(
+                {
+                    'jsonrpc': '2.0',
+                    'method':  'echo',
+                    'params':  {'value': i},
+                    'id':      i,
+                }
+            ).encode() + b'\n'
+            for i in range(3)
+        ]
+
+        notification = json.dumps(
+            {
+                'jsonrpc': '2.0',
+                'method':  'echo',
+                'params':  {'value': 'ignored'},
+            }
+        ).encode()
+
+        mock_reader = asynctest.Mock(spec = asyncio.StreamReader)
+        mock_reader.readline.side_effect = \
+                requests + [b'\n', notification, b'']
+
+        responses = []
+
+        mock_writer = asynctest.Mock(spec = asyncio.StreamWriter)
+        mock_writer.get_extra_info.return_value = '127.0.0.1'
+        mock_writer.write.side_effect = responses.append
+
+        async def _echo(value):
+            return value
+
+        self.server.dispatcher.add_method(_echo, name = 'echo')
+
+        await self.server.handle_connection(mock_reader, mock_writer)
+
+        self.assertTrue(
+            all(resp.endswith(b'\n') for resp in responses),
+            'Responses were not newline delimited',
+        )
+
+        responses = [json.loads(resp.decode()) for resp in responses]
+
+        self.assertListEqual(
+            [0, 1, 2],
+            sorted(resp['id'] for resp in responses),
+            'Every request did not get a response',
+        )
+
+        for resp in responses:
+            self.assertEqual(
+                resp['id'],
+                resp['result'],
+                'Response was not matched to its request',
+            )
+
+        mock_writer.close.assert_called_with()
+
+    @utils.run_async
+    async def test_handle_connection_too_large(self):
+        """
+        Check that a request that is too large gets an error before the
+        connection is closed
+        """
+
+        mock_reader = asynctest.Mock(spec = asyncio.StreamReader)
+        mock_reader.readline.side_effect = ValueError()
+
+        responses = []
+
+        mock_writer = asynctest.Mock(spec = asyncio.StreamWriter)
+        mock_writer.get_extra_info.return_value = '127.0.0.1'
+        mock_writer.write.side_effect = responses.append
+
+        await self.server.handle_connection(mock_reader, mock_writer)
+
+        self.assertEqual(1, len(responses), 'Error response was not sent')
+
+        resp = json.loads(responses[0].decode())
+        self.assertEqual(
+            -32700,
+            resp['error']['code'],
+            'Error response was not a parse error',
+        )
+
+        mock_writer.close.assert_called_with()
+
+    @utils.run_async
+    async def test_close(self):
+        """
+        Check that closing the server ends idle connections once their
+        requests have been answered
+        """
+
+        reader = asyncio.StreamReader()
+
+        responses = []
+
+        mock_writer = asynctest.Mock(spec = asyncio.StreamWriter)
+        mock_writer.get_extra_info.return_value = '127.0.0.1'
+        mock_writer.write.side_effect = responses.append
+
+        answer = asyncio.Event()
+
+        async def _slow():
+            await answer.wait()
+
+            return 'done'
+
+        self.server.dispatcher.add_method(_slow, name = 'slow')
+
+        connection = asyncio.ensure_future(
+            self.server.handle_connection(reader, mock_writer)
+        )
+
+        reader.feed_data(
+            json.dumps(
+                {
+                    'jsonrpc': '2.0',
+                    'method':  'slow',
+                    'id':      1,
+                }
+            ).encode() + b'\n'
+        )
+
+        await asyncio.sleep(0)
+
+        self.server.close()
+        answer.set()
+
+        await asyncio.wait_for(connection, 1)
+
+        self.assertEqual(
+            'done',
+            json.loads(responses[0].decode())['result'],
+            'Request was not answered before the connection closed',
+        )
+
+        mock_writer.close.assert_called_with()
+
+if __name__ == '__main__':
+    unittest.main()
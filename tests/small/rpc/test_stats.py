@@ -0,0 +1,115 @@
+"""
+Tests for the JSON RPC request statistics
+"""
+
+import unittest
+import unittest.mock
+
+from mymcadmin.rpc import RpcStats
+
+class TestRpcStats(unittest.TestCase):
+    """
+    Tests for the RpcStats class
+    """
+
+    def test_record(self):
+        """
+        Tests that calls are counted by method
+        """
+
+        stats = RpcStats()
+        stats.record('server_start', 0.5)
+        stats.record('server_start', 2, success = False)
+        stats.record('list_servers', 0.001)
+
+        self.assertDictEqual(
+            {'server_start': 2, 'list_servers': 1},
+            stats.requests,
+            'Request counts did not match',
+        )
+
+        self.assertDictEqual(
+            {'server_start': 1, 'list_servers': 0},
+            stats.errors,
+            'Error counts did not match',
+        )
+
+        self.assertEqual(
+            2,
+            stats.latencies['server_start'].count,
+            'Latencies were not recorded',
+        )
+
+        self.assertEqual(
+            2.5,
+            stats.latencies['server_start'].sum,
+            'Latencies did not match',
+        )
+
+    @unittest.mock.patch('logging.warning')
+    def test_record_slow(self, warning):
+        """
+        Tests that slow calls are counted and logged
+        """
+
+        stats = RpcStats(slow_threshold = 1)
+        stats.record('fast', 0.5)
+        stats.record(
+            'slow',
+            0.75,
+            queued = 0.5,
+            params = {'server_id': 'test'},
+        )
+
+        self.assertDictEqual(
+            {'fast': 0, 'slow': 1},
+            stats.slow,
+            'Slow counts did not match',
+        )
+
+        self.assertEqual(
+            0.5,
+            stats.queue_times['slow'].sum,
+            'Queue time was not recorded',
+        )
+
+        warning.assert_called_once_with(
+            unittest.mock.ANY,
+            'slow',
+            21,
+            1.25,
+            0.75,
+            0.5,
+        )
+
+    def test_as_dict(self):
+        """
+        Tests that the stats can be converted for JSON
+        """
+
+        stats = RpcStats(slow_threshold = 5)
+        stats.record('server_start', 0.5)
+        stats.record_write(0.01)
+
+        result = stats.as_dict()
+
+        self.assertEqual(
+            5,
+            result['slow_threshold'],
+            'Slow threshold did not match',
+        )
+
+        self.assertEqual(
+            1,
+            result['methods']['server_start']['requests'],
+            'Requests did not match',
+        )
+
+        self.assertEqual(
+            1,
+            result['write_time']['count'],
+            'Write times did not match',
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,7 +11,13 @@ import unittest.mock
 import nose
 import requests
 
-from mymcadmin.errors import MyMCAdminError, VersionDoesNotExistError
+from mymcadmin import cache, download
+from mymcadmin.artifacts import ArtifactStore
+from mymcadmin.errors import (
+    DownloadError,
+    MyMCAdminError,
+    VersionDoesNotExistError,
+)
 from mymcadmin.server import Server
 
 class TestServerClassMethods(unittest.TestCase):
@@ -19,6 +25,10 @@ class TestServerClassMethods(unittest.TestCase):
     Tests for the class methods of the Server class
     """
 
+    def setUp(self):
+        # Start each test with an empty in memory cache
+        cache.configure()
+
     @unittest.mock.patch('requests.get')
     def test_list_versions_default(self, requests_get):
         """
@@ -26,6 +36,8 @@ class TestServerClassMethods(unittest.TestCase):
         """
 
         mock_response = unittest.mock.Mock(spec = requests.Response)
+        mock_response.status_code = 200
+        mock_response.headers     = {}
         mock_response.ok = True
         mock_response.json.return_value = copy.deepcopy(SAMPLE_VERSIONS)
 
@@ -35,6 +47,7 @@ class TestServerClassMethods(unittest.TestCase):
 
         requests_get.assert_called_with(
             'https://launchermeta.mojang.com/mc/game/version_manifest.json',
+            headers = {},
         )
 
         self.assertDictEqual(
@@ -50,6 +63,8 @@ class TestServerClassMethods(unittest.TestCase):
         """
 
         mock_response = unittest.mock.Mock(spec = requests.Response)
+        mock_response.status_code = 200
+        mock_response.headers     = {}
         requests_get.return_value = mock_response
 
         for i in range(16):
@@ -125,6 +140,8 @@ class TestServerClassMethods(unittest.TestCase):
         """
 
         mock_response = unittest.mock.Mock(spec = requests.Response)
+        mock_response.status_code = 200
+        mock_response.headers     = {}
         mock_response.ok = False
 
         requests_get.return_value = mock_response
@@ -144,6 +161,8 @@ class TestServerClassMethods(unittest.TestCase):
         version_info = SAMPLE_VERSION
 
         mock_response = unittest.mock.Mock(spec = requests.Response)
+        mock_response.status_code = 200
+        mock_response.headers     = {}
         mock_response.ok = True
         mock_response.json.return_value = version_info
 
@@ -151,7 +170,10 @@ class TestServerClassMethods(unittest.TestCase):
 
         version = Server.get_version_info('my_release')
 
-        requests_get.assert_called_with('http://example.com/mc/my_release.json')
+        requests_get.assert_called_with(
+            'http://example.com/mc/my_release.json',
+            headers = {},
+        )
 
         self.assertDictEqual(
             version_info,
@@ -171,6 +193,8 @@ class TestServerClassMethods(unittest.TestCase):
         version_info = SAMPLE_VERSION
 
         mock_response = unittest.mock.Mock(spec = requests.Response)
+        mock_response.status_code = 200
+        mock_response.headers     = {}
         mock_response.ok = True
         mock_response.json.return_value = version_info
 
@@ -178,7 +202,10 @@ class TestServerClassMethods(unittest.TestCase):
 
         version = Server.get_version_info()
 
-        requests_get.assert_called_with('http://example.com/mc/my_release.json')
+        requests_get.assert_called_with(
+            'http://example.com/mc/my_release.json',
+            headers = {},
+        )
 
         self.assertDictEqual(
             version_info,
@@ -214,6 +241,8 @@ class TestServerClassMethods(unittest.TestCase):
         list_versions.return_value = copy.deepcopy(SAMPLE_VERSIONS)
 
         mock_response = unittest.mock.Mock(spec = requests.Response)
+        mock_response.status_code = 200
+        mock_response.headers     = {}
         mock_response.ok = False
 
         requests_get.return_value = mock_response
@@ -237,19 +266,16 @@ class TestServerClassMethods(unittest.TestCase):
 
     # pylint: disable=no-self-use
     @nose.tools.raises(MyMCAdminError)
-    @unittest.mock.patch('requests.get')
+    @unittest.mock.patch('mymcadmin.download.download_file')
     @unittest.mock.patch('mymcadmin.server.Server.get_version_info')
-    def test_download_server_response(self, get_version_info, requests_get):
+    def test_download_server_response(self, get_version_info, download_file):
         """
         Tests that we handle bad responses while downloading
         """
 
         get_version_info.return_value = SAMPLE_VERSION
 
-        mock_response = unittest.mock.Mock(spec = requests.Response)
-        mock_response.ok = False
-
-        requests_get.return_value = mock_response
+        download_file.side_effect = DownloadError('HTTP status 500')
 
         Server.download_server_jar('my_release')
     # pylint: enable=no-self-use
@@ -270,14 +296,11 @@ class TestServerClassMethods(unittest.TestCase):
         Server.download_server_jar('test')
     # pylint: enable=no-self-use
 
-    # pylint: disable=no-self-use
-    @nose.tools.raises(MyMCAdminError)
-    @unittest.mock.patch('builtins.open')
-    @unittest.mock.patch('requests.get')
+    @unittest.mock.patch('mymcadmin.download.download_file')
     @unittest.mock.patch('mymcadmin.server.Server.get_version_info')
-    def test_download_server_bad_sha(self, get_version_info, requests_get, mock_open):
+    def test_download_server_store(self, get_version_info, download_file):
         """
-        Tests that we handle when the jar download has an incorrect SHA
+        Tests that we use the artifact store when one is given
         """
 
         get_version_info.return_value = {
@@ -290,24 +313,34 @@ class TestServerClassMethods(unittest.TestCase):
             },
         }
 
-        mock_response = unittest.mock.Mock(spec = requests.Response)
-        mock_response.ok = True
-        mock_response.iter_content.return_value = io.BytesIO(
-            'Hello, world!'.encode(),
+        mock_store = unittest.mock.Mock(spec = ArtifactStore)
+
+        jar_path = Server.download_server_jar(
+            'test',
+            path  = 'home',
+            store = mock_store,
         )
 
-        requests_get.return_value = mock_response
+        self.assertEqual(
+            os.path.join('home', 'minecraft_server_test.jar'),
+            jar_path,
+            'Jar path did not match expected',
+        )
 
-        file_stream = io.BytesIO()
+        self.assertEqual(
+            1,
+            mock_store.fetch.call_count,
+            'Artifact store was not used',
+        )
 
-        mock_open.return_value = mock_open
-        mock_open.__enter__.return_value = file_stream
+        sha1, dest, _ = mock_store.fetch.call_args[0]
+        self.assertEqual('deadbeef', sha1, 'Wrong artifact was fetched')
+        self.assertEqual(jar_path, dest, 'Artifact was put in the wrong place')
 
-        Server.download_server_jar(
-            'test',
-            path = 'home',
+        self.assertFalse(
+            download_file.called,
+            'Jar should only be downloaded by the store',
         )
-    # pylint: enable=no-self-use
 
     def test_agree_to_eula_default(self):
         """
@@ -351,23 +384,9 @@ class TestServerClassMethods(unittest.TestCase):
         root = path if path is not None else os.getcwd()
 
         with unittest.mock.patch('mymcadmin.server.Server.get_version_info') as get_version_info, \
-             unittest.mock.patch('requests.get') as requests_get, \
-             unittest.mock.patch('builtins.open') as mock_open:
+             unittest.mock.patch('mymcadmin.download.download_file') as download_file:
             get_version_info.return_value = SAMPLE_VERSION
 
-            mock_response = unittest.mock.Mock(spec = requests.Response)
-            mock_response.ok = True
-            mock_response.iter_content.return_value = io.BytesIO(
-                'Hello, world!'.encode(),
-            )
-
-            requests_get.return_value = mock_response
-
-            file_stream = io.BytesIO()
-
-            mock_open.return_value = mock_open
-            mock_open.__enter__.return_value = file_stream
-
             jar_path = Server.download_server_jar(
                 version_id = target,
                 path       = path,
@@ -379,16 +398,13 @@ class TestServerClassMethods(unittest.TestCase):
                 'Jar file path did not match expected',
             )
 
-            mock_open.assert_called_with(
-                jar_path,
-                'wb',
-            )
-
             get_version_info.assert_called_with(target)
 
-            requests_get.assert_called_with(
+            download_file.assert_called_with(
                 'http://example.com/download/myrelease/server',
-                stream = True,
+                jar_path,
+                sha1     = '943a702d06f34599aee1f8da8ef9f7296031d699',
+                segments = download.DEFAULT_SEGMENTS,
             )
 
     # pylint: disable=no-self-use
@@ -4,14 +4,19 @@ Tests the methods of the Server class
 
 import asyncio
 import io
+import os
 import os.path
+import shutil
+import tempfile
 import unittest
 import unittest.mock
 
 import asynctest
+import nose
 
 from ... import utils
 
+from mymcadmin.errors import ServerError
 from mymcadmin.server import Server
 
 class TestServerMethods(unittest.TestCase):
@@ -92,6 +97,56 @@ class TestServerMethods(unittest.TestCase):
             'Settings file did not match expected',
         )
 
+    def test_update_properties(self):
+        """
+        Tests that we can change the server properties
+        """
+
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+
+        properties_file = os.path.join(root, Server.PROPERTIES_FILE)
+        with open(properties_file, 'w') as file_handle:
+            file_handle.write('#Comment\nview-distance=10\npvp=true\n')
+
+        server = Server(root)
+
+        self.assertEqual(10, server.properties['view-distance'])
+
+        self.assertTrue(
+            server.update_properties(
+                changes = {'view-distance': 6},
+                remove  = ['pvp'],
+            ),
+            'Properties should have been changed',
+        )
+
+        self.assertDictEqual(
+            {'view-distance': 6},
+            server.properties,
+            'Changed properties were not read back',
+        )
+
+        with open(properties_file, 'r') as file_handle:
+            self.assertEqual(
+                '#Comment\nview-distance=6\n',
+                file_handle.read(),
+                'Properties file did not match expected',
+            )
+
+        self.assertFalse(
+            server.update_properties(changes = {'view-distance': 6}),
+            'Properties should not have been changed',
+        )
+
+    @nose.tools.raises(ServerError)
+    def test_update_properties_missing(self):
+        """
+        Tests that we handle when the properties file is missing
+        """
+
+        self.server.update_properties(changes = {'view-distance': 6})
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -2,9 +2,11 @@
 Tests for the properties of the Server class
 """
 
-import io
 import json
+import os
 import os.path
+import shutil
+import tempfile
 import unittest
 import unittest.mock
 
@@ -205,16 +207,16 @@ class TestServerProperties(unittest.TestCase):
                 'Unsafe command was executed',
             )
 
-    @unittest.mock.patch('builtins.open')
-    def test_get_properties(self, mock_open):
+    def test_get_properties(self):
         """
         Tests that we can get the properties property
         """
 
-        stream = io.StringIO(SAMPLE_PROPERTIES)
-
-        mock_open.return_value = mock_open
-        mock_open.__enter__.return_value = stream
+        server = self._make_server(
+            {
+                Server.PROPERTIES_FILE: SAMPLE_PROPERTIES,
+            }
+        )
 
         self.assertDictEqual(
             {
@@ -255,23 +257,48 @@ class TestServerProperties(unittest.TestCase):
                 'motd':                          'A Test Minecraft Server',
                 'enable-rcon':                   False,
             },
-            self.server.properties,
+            server.properties,
             'Properties did not match expected',
         )
 
+    def test_get_properties_cached(self):
+        """
+        Tests that the properties are only parsed again after they change
+        """
+
+        server = self._make_server(
+            {
+                Server.PROPERTIES_FILE: 'motd=Hello\n',
+            }
+        )
+
+        properties = server.properties
+        self.assertIs(
+            properties,
+            Server(server.path).properties,
+            'Unchanged properties were parsed again',
+        )
+
+        self._write_file(
+            os.path.join(server.path, Server.PROPERTIES_FILE),
+            'motd=Hello again\n',
+        )
+
+        self.assertEqual(
+            'Hello again',
+            server.properties['motd'],
+            'Changed properties were not parsed again',
+        )
+
     @nose.tools.raises(ServerError)
-    @unittest.mock.patch('builtins.open')
-    def test_get_properties_missing(self, mock_open):
+    def test_get_properties_missing(self):
         """
         Tests that we handle when the properties file is missing
         """
 
-        mock_open.side_effect = FileNotFoundError('Nope.nope')
-
-        _ = self.server.properties
+        _ = self._make_server({}).properties
 
-    @unittest.mock.patch('builtins.open')
-    def test_get_settings(self, mock_open):
+    def test_get_settings(self):
         """
         Tests that we can get the settings property
         """
@@ -281,31 +308,125 @@ class TestServerProperties(unittest.TestCase):
             'args': ['-test'],
         }
 
-        stream = io.StringIO(
-            json.dumps(
-                settings,
-            )
+        server = self._make_server(
+            {
+                Server.SETTINGS_FILE: json.dumps(settings),
+            }
         )
 
-        mock_open.return_value = mock_open
-        mock_open.__enter__.return_value = stream
-
         self.assertEqual(
             settings,
-            self.server.settings,
+            server.settings,
             'Settings did not match expected',
         )
 
+    def test_get_settings_changed(self):
+        """
+        Tests that changes to the settings file are picked up
+        """
+
+        server = self._make_server(
+            {
+                Server.SETTINGS_FILE: json.dumps({'java': 'java'}),
+            }
+        )
+
+        self.assertEqual('java', server.java, 'Java binary did not match')
+
+        self._write_file(
+            os.path.join(server.path, Server.SETTINGS_FILE),
+            json.dumps({'java': '/opt/java/bin/java'}),
+        )
+
+        self.assertEqual(
+            '/opt/java/bin/java',
+            server.java,
+            'Changed settings were not picked up',
+        )
+
+    def test_save_settings(self):
+        """
+        Tests that saved settings are read back
+        """
+
+        server = self._make_server(
+            {
+                Server.SETTINGS_FILE: json.dumps({'java': 'java'}),
+            }
+        )
+
+        server.settings['jar'] = 'forge.jar'
+        server.save_settings()
+
+        self.assertDictEqual(
+            {'java': 'java', 'jar': 'forge.jar'},
+            Server(server.path).settings,
+            'Saved settings did not match',
+        )
+
     @nose.tools.raises(ServerSettingsError)
-    @unittest.mock.patch('builtins.open')
-    def test_get_settings_missing(self, mock_open):
+    def test_get_settings_missing(self):
         """
         Tests that we handle when there's no settings file
         """
 
-        mock_open.side_effect = FileNotFoundError('Nope.nope')
+        _ = self._make_server({}).settings
+
+    def test_get_worlds(self):
+        """
+        Tests that we can find the world directories of a server
+        """
+
+        server = self._make_server(
+            {
+                Server.PROPERTIES_FILE: 'level-name=survival\n',
+            }
+        )
+
+        self.assertListEqual([], server.worlds, 'There should be no worlds')
+
+        for name in ('survival', 'survival_the_end', 'world'):
+            os.mkdir(os.path.join(server.path, name))
+
+        self.assertListEqual(
+            ['survival', 'survival_the_end'],
+            server.worlds,
+            'Worlds did not match expected',
+        )
+
+    def test_get_worlds_default(self):
+        """
+        Tests that the default world is used without a properties file
+        """
+
+        server = self._make_server({})
+        os.mkdir(os.path.join(server.path, 'world'))
+        os.mkdir(os.path.join(server.path, 'world_nether'))
+
+        self.assertListEqual(
+            ['world', 'world_nether'],
+            server.worlds,
+            'Worlds did not match expected',
+        )
+
+    def _make_server(self, files):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+
+        for name, contents in files.items():
+            self._write_file(os.path.join(root, name), contents)
+
+        return Server(root)
+
+    @staticmethod
+    def _write_file(path, contents):
+        # Write a new file so the change is seen even within the same tick
+        # of the file system clock
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as file_handle:
+            file_handle.write(contents)
 
-        _ = self.server.settings
+        os.replace(tmp_path, path)
 
 SAMPLE_PROPERTIES = """#Minecraft server properties
 #Sat Feb 06 16:13:59 CST 2016
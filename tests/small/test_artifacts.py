@@ -0,0 +1,193 @@
+"""
+Tests for the mymcadmin.artifacts module
+"""
+
+import os
+import os.path
+import shutil
+import tempfile
+import threading
+import unittest
+import unittest.mock
+
+from mymcadmin.artifacts import ArtifactStore
+
+class TestArtifactStore(unittest.TestCase):
+    """
+    Tests for the ArtifactStore class
+    """
+
+    def setUp(self):
+        self.root  = tempfile.mkdtemp()
+        self.store = ArtifactStore(os.path.join(self.root, 'store'))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_fetch(self):
+        """
+        Tests that the first fetch downloads and later fetches are shared
+        """
+
+        download = unittest.mock.Mock(side_effect = self._write('jar data'))
+
+        dest0 = os.path.join(self.root, 'server0.jar')
+        dest1 = os.path.join(self.root, 'server1.jar')
+
+        self.store.fetch('abcdef', dest0, download)
+        self.store.fetch('abcdef', dest1, download)
+
+        download.assert_called_once_with(dest0)
+
+        self.assertTrue(self.store.contains('abcdef'), 'Artifact was not stored')
+
+        with open(dest1, 'r') as file_handle:
+            self.assertEqual(
+                'jar data',
+                file_handle.read(),
+                'Artifact was not linked from the store',
+            )
+
+        self.assertTrue(
+            os.path.samefile(dest0, dest1),
+            'Servers should share a single copy of the artifact',
+        )
+
+    def test_fetch_concurrent(self):
+        """
+        Tests that concurrent fetches of the same artifact download it once
+        """
+
+        started = threading.Event()
+        release = threading.Event()
+
+        def _download(path):
+            started.set()
+            release.wait(5)
+
+            self._write('jar data')(path)
+
+        download = unittest.mock.Mock(side_effect = _download)
+        dests    = [
+            os.path.join(self.root, 'server{}.jar'.format(i))
+            for i in range(3)
+        ]
+
+        threads = [
+            threading.Thread(
+                target = self.store.fetch,
+                args   = ('abcdef', dest, download),
+            )
+            for dest in dests
+        ]
+
+        threads[0].start()
+        started.wait(5)
+
+        for thread in threads[1:]:
+            thread.start()
+
+        release.set()
+
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(1, download.call_count, 'Artifact was downloaded twice')
+
+        for dest in dests[1:]:
+            self.assertTrue(
+                os.path.samefile(dests[0], dest),
+                'Servers should share a single copy of the artifact',
+            )
+
+    def test_fetch_failed_download(self):
+        """
+        Tests that failed downloads aren't added to the store
+        """
+
+        download = unittest.mock.Mock(side_effect = RuntimeError('Boom!'))
+
+        with self.assertRaises(RuntimeError):
+            self.store.fetch(
+                'abcdef',
+                os.path.join(self.root, 'server.jar'),
+                download,
+            )
+
+        self.assertFalse(
+            self.store.contains('abcdef'),
+            'Failed downloads should not be stored',
+        )
+
+    def test_link_missing(self):
+        """
+        Tests that linking an unknown artifact does nothing
+        """
+
+        self.assertFalse(
+            self.store.link('abcdef', os.path.join(self.root, 'server.jar')),
+            'Unknown artifacts should not be linked',
+        )
+
+    def test_eviction(self):
+        """
+        Tests that the least recently used artifacts are evicted
+        """
+
+        self.store.max_size = 10
+
+        for i, sha1 in enumerate(['aa0000', 'bb0000', 'cc0000']):
+            path = os.path.join(self.root, sha1)
+            self._write('12345')(path)
+
+            self.store.add(sha1, path)
+
+            # The servers using the artifacts have been deleted
+            os.remove(path)
+
+            # Make the access order explicit rather than relying on timing
+            os.utime(self.store._artifact_path(sha1), (i, i))
+
+        # Adding an artifact is what triggers eviction
+        path = os.path.join(self.root, 'dd0000')
+        self._write('12345')(path)
+        self.store.add('dd0000', path)
+
+        self.assertFalse(
+            self.store.contains('aa0000'),
+            'Least recently used artifact was not evicted',
+        )
+
+        self.assertTrue(self.store.contains('bb0000'), 'Artifact was evicted')
+        self.assertTrue(self.store.contains('cc0000'), 'Artifact was evicted')
+        self.assertEqual(10, self.store.size, 'Store size did not match')
+
+    def test_eviction_linked(self):
+        """
+        Tests that artifacts still linked into a server aren't evicted
+        """
+
+        self.store.max_size = 0
+
+        path = os.path.join(self.root, 'server.jar')
+        self._write('12345')(path)
+
+        self.store.add('aa0000', path)
+
+        self.assertTrue(
+            self.store.contains('aa0000'),
+            'Artifact in use by a server was evicted',
+        )
+
+        self.assertEqual(0, self.store.size, 'Linked artifact was counted')
+
+    @staticmethod
+    def _write(data):
+        def _write_file(path):
+            with open(path, 'w') as file_handle:
+                file_handle.write(data)
+
+        return _write_file
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,647 @@
+"""
+Tests for the mymcadmin.backup module
+"""
+
+import io
+import os
+import os.path
+import shutil
+import struct
+import tempfile
+import time
+import unittest
+import unittest.mock
+
+import nose
+
+from mymcadmin import backup, regions
+from mymcadmin.backup import (
+    NAME_FORMAT,
+    BackupStore,
+    ChunkStore,
+    RetentionPolicy,
+)
+from mymcadmin.errors import BackupError, ServerSettingsError
+
+class TestRetentionPolicy(unittest.TestCase):
+    """
+    Tests for the RetentionPolicy class
+    """
+
+    def test_from_settings(self):
+        """
+        Tests that the policy is read from the server settings
+        """
+
+        policy = RetentionPolicy.from_settings(
+            {
+                'backup_keep_last':   4,
+                'backup_keep_hourly': 24,
+                'backup_keep_daily':  7,
+                'backup_keep_weekly': 4,
+            }
+        )
+
+        self.assertEqual(4, policy.keep_last, 'Keep last did not match')
+        self.assertEqual(24, policy.keep_hourly, 'Keep hourly did not match')
+        self.assertEqual(7, policy.keep_daily, 'Keep daily did not match')
+        self.assertEqual(4, policy.keep_weekly, 'Keep weekly did not match')
+
+    @nose.tools.raises(ServerSettingsError)
+    def test_from_settings_bad(self):
+        """
+        Tests that we reject limits that aren't positive integers
+        """
+
+        RetentionPolicy.from_settings({'backup_keep_daily': 'lots'})
+
+    def test_keep_all(self):
+        """
+        Tests that every backup is kept by default
+        """
+
+        names = _names('2016-10-01 00:00', '2016-10-02 00:00')
+
+        self.assertSetEqual(
+            set(names),
+            RetentionPolicy().select(names),
+            'Backups should not have been removed',
+        )
+
+    def test_keep_last(self):
+        """
+        Tests that the most recent backups are kept
+        """
+
+        names = _names(
+            '2016-10-01 00:00',
+            '2016-10-01 01:00',
+            '2016-10-01 02:00',
+        )
+
+        self.assertSetEqual(
+            set(names[1:]),
+            RetentionPolicy(keep_last = 2).select(names),
+            'Wrong backups were kept',
+        )
+
+    def test_keep_periods(self):
+        """
+        Tests that the newest backup in each period is kept
+        """
+
+        names = _names(
+            '2016-10-01 10:00',
+            '2016-10-01 23:00',
+            '2016-10-02 10:00',
+            '2016-10-02 11:00',
+            '2016-10-02 11:30',
+            '2016-10-03 09:00',
+        )
+
+        self.assertSetEqual(
+            set(_names('2016-10-02 11:30', '2016-10-03 09:00')),
+            RetentionPolicy(keep_hourly = 2).select(names),
+            'Wrong hourly backups were kept',
+        )
+
+        self.assertSetEqual(
+            set(_names(
+                '2016-10-01 23:00',
+                '2016-10-02 11:30',
+                '2016-10-03 09:00',
+            )),
+            RetentionPolicy(keep_daily = 3).select(names),
+            'Wrong daily backups were kept',
+        )
+
+        # Weeks start on Monday and the 2nd was a Sunday
+        self.assertSetEqual(
+            set(_names('2016-10-02 11:30', '2016-10-03 09:00')),
+            RetentionPolicy(keep_weekly = 5).select(names),
+            'Wrong weekly backups were kept',
+        )
+
+class TestBackupStore(unittest.TestCase):
+    """
+    Tests for the BackupStore class
+    """
+
+    def setUp(self):
+        self.root   = tempfile.mkdtemp()
+        self.server = os.path.join(self.root, 'server')
+        self.store  = BackupStore(os.path.join(self.root, 'backups'))
+
+        self._write('world/level.dat', 'level')
+        self._write('world/region/r.0.0.mca', 'region 0')
+        self._write('world/region/r.0.1.mca', 'region 1')
+        self._write('server.properties', 'level-name=world\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_create(self):
+        """
+        Tests that the first backup copies everything
+        """
+
+        result = self.store.create(self.server, ['world'], now = 0)
+
+        self.assertDictEqual(
+            {
+                'name':         '19700101T000000Z',
+                'files':        3,
+                'copied':       3,
+                'linked':       0,
+                'bytes_copied': 21,
+            },
+            result,
+            'Backup result did not match',
+        )
+
+        self.assertListEqual(['19700101T000000Z'], self.store.list())
+
+        backup_path = os.path.join(self.store.path, '19700101T000000Z')
+        self.assertEqual(
+            'region 1',
+            self._read(os.path.join(backup_path, 'world/region/r.0.1.mca')),
+            'Region file was not backed up',
+        )
+
+        self.assertFalse(
+            os.path.exists(os.path.join(backup_path, 'server.properties')),
+            'Only the listed directories should have been backed up',
+        )
+
+    def test_create_incremental(self):
+        """
+        Tests that only changed files are copied by later backups
+        """
+
+        first = self.store.create(self.server, ['world'], now = 0)['name']
+
+        self._write('world/region/r.0.1.mca', 'region 1 changed')
+        self._write('world/region/r.1.1.mca', 'region 2')
+
+        result = self.store.create(self.server, ['world'], now = 60)
+
+        self.assertEqual(4, result['files'], 'Wrong number of files')
+        self.assertEqual(2, result['copied'], 'Wrong number of copies')
+        self.assertEqual(2, result['linked'], 'Wrong number of links')
+
+        first_path  = os.path.join(self.store.path, first)
+        second_path = os.path.join(self.store.path, result['name'])
+
+        self.assertTrue(
+            os.path.samefile(
+                os.path.join(first_path, 'world/region/r.0.0.mca'),
+                os.path.join(second_path, 'world/region/r.0.0.mca'),
+            ),
+            'Unchanged region should have been linked',
+        )
+
+        self.assertEqual(
+            'region 1',
+            self._read(os.path.join(first_path, 'world/region/r.0.1.mca')),
+            'Older backup was changed',
+        )
+
+        self.assertEqual(
+            'region 1 changed',
+            self._read(os.path.join(second_path, 'world/region/r.0.1.mca')),
+            'Changed region was not copied',
+        )
+
+        self.assertFalse(
+            os.path.samefile(
+                os.path.join(self.server, 'world/region/r.0.0.mca'),
+                os.path.join(second_path, 'world/region/r.0.0.mca'),
+            ),
+            'World files should never be linked into a backup',
+        )
+
+    def test_create_same_second(self):
+        """
+        Tests that backups made within the same second get unique names
+        """
+
+        self.store.create(self.server, ['world'], now = 0)
+        result = self.store.create(self.server, ['world'], now = 0)
+
+        self.assertEqual('19700101T000000Z.1', result['name'])
+        self.assertEqual(2, len(self.store.list()), 'Backup was overwritten')
+
+    def test_create_failed(self):
+        """
+        Tests that a failed backup is cleaned up
+        """
+
+        with unittest.mock.patch('shutil.copy2') as copy2:
+            copy2.side_effect = OSError('Disk full')
+
+            with self.assertRaises(OSError):
+                self.store.create(self.server, ['world'])
+
+        self.assertListEqual([], self.store.list(), 'Failed backup was kept')
+        self.assertListEqual(
+            [],
+            os.listdir(self.store.path),
+            'Partial backup was left behind',
+        )
+
+    def test_prune(self):
+        """
+        Tests that the backups the policy doesn't keep are removed
+        """
+
+        for now in (0, 60, 120):
+            self.store.create(self.server, ['world'], now = now)
+
+        removed = self.store.prune(RetentionPolicy(keep_last = 1))
+
+        self.assertListEqual(
+            ['19700101T000000Z', '19700101T000100Z'],
+            removed,
+            'Wrong backups were removed',
+        )
+
+        self.assertListEqual(['19700101T000200Z'], self.store.list())
+
+        self.assertEqual(
+            'region 0',
+            self._read(
+                os.path.join(
+                    self.store.path,
+                    '19700101T000200Z',
+                    'world/region/r.0.0.mca',
+                )
+            ),
+            'Linked files were lost when older backups were removed',
+        )
+
+    def test_restore(self):
+        """
+        Tests that a backup is copied rather than linked when restored
+        """
+
+        name = self.store.create(self.server, ['world'], now = 0)['name']
+        dest = os.path.join(self.root, 'restored')
+        os.mkdir(dest)
+
+        self.assertListEqual(['world'], self.store.restore(name, dest))
+
+        restored = os.path.join(dest, 'world/region/r.0.0.mca')
+        self.assertEqual('region 0', self._read(restored))
+        self.assertFalse(
+            os.path.samefile(
+                restored,
+                os.path.join(self.store.path, name, 'world/region/r.0.0.mca'),
+            ),
+            'Restored world should not share files with the backup',
+        )
+
+    @nose.tools.raises(BackupError)
+    def test_restore_missing(self):
+        """
+        Tests that we report backups that don't exist
+        """
+
+        self.store.restore('19700101T000000Z', self.root)
+
+    def _write(self, path, contents):
+        path = os.path.join(self.server, path)
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+
+        with open(path, 'w') as file_handle:
+            file_handle.write(contents)
+
+    @staticmethod
+    def _read(path):
+        with open(path, 'r') as file_handle:
+            return file_handle.read()
+
+class TestChunkStore(unittest.TestCase):
+    """
+    Tests for the ChunkStore class
+    """
+
+    def setUp(self):
+        self.root   = tempfile.mkdtemp()
+        self.server = os.path.join(self.root, 'server')
+        self.store  = ChunkStore(os.path.join(self.root, 'backups'))
+
+        self._write('world/level.dat', b'level')
+        self._write_region(
+            'world/region/r.0.0.mca',
+            [(0, 100, b'spawn'), (1, 100, b'village')],
+        )
+        self._write_region(
+            'world/region/r.0.1.mca',
+            [(0, 100, b'ocean'), (5, 100, b'spawn')],
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_create(self):
+        """
+        Tests that chunks are only stored once
+        """
+
+        result = self.store.create(self.server, ['world'], now = 0)
+
+        self.assertDictEqual(
+            {
+                'name':            '19700101T000000Z',
+                'files':           3,
+                'unchanged':       0,
+                'chunks':          4,
+                'objects_written': 4,
+                'bytes_written':   37,
+            },
+            result,
+            'Backup result did not match',
+        )
+
+        self.assertListEqual(['19700101T000000Z'], self.store.list())
+
+    def test_create_incremental(self):
+        """
+        Tests that later backups only store the chunks that changed
+        """
+
+        self.store.create(self.server, ['world'], now = 0)
+
+        self._write_region(
+            'world/region/r.0.1.mca',
+            [(0, 200, b'ocean'), (5, 200, b'spawn'), (6, 200, b'desert')],
+        )
+
+        result = self.store.create(self.server, ['world'], now = 60)
+
+        self.assertEqual(2, result['unchanged'], 'Wrong number unchanged')
+        self.assertEqual(3, result['chunks'], 'Wrong number of chunks')
+        self.assertEqual(1, result['objects_written'], 'Wrong number stored')
+
+    def test_create_damaged_region(self):
+        """
+        Tests that region files that can't be read are stored whole
+        """
+
+        self._write('world/region/r.1.1.mca', b'not a region')
+
+        result = self.store.create(self.server, ['world'], now = 0)
+
+        self.assertEqual(4, result['files'], 'Damaged region was skipped')
+        self.assertEqual(5, result['objects_written'], 'Wrong number stored')
+
+    def test_restore(self):
+        """
+        Tests that the worlds in a backup are rebuilt exactly
+        """
+
+        name = self.store.create(self.server, ['world'], now = 0)['name']
+        self._write('world/level.dat', b'changed')
+
+        dest = os.path.join(self.root, 'restored')
+        os.mkdir(dest)
+
+        self.assertListEqual(['world'], self.store.restore(name, dest))
+
+        for path, contents in (
+                ('world/level.dat', b'level'),
+                ('world/region/r.0.1.mca', self._read('world/region/r.0.1.mca')),
+        ):
+            with open(os.path.join(dest, path), 'rb') as file_handle:
+                self.assertEqual(contents, file_handle.read(), path)
+
+    @nose.tools.raises(BackupError)
+    def test_restore_corrupt(self):
+        """
+        Tests that we notice objects that were changed after being stored
+        """
+
+        name = self.store.create(self.server, ['world'], now = 0)['name']
+
+        objects_path = self.store.objects_path
+        for prefix in os.listdir(objects_path):
+            for digest in os.listdir(os.path.join(objects_path, prefix)):
+                with open(os.path.join(objects_path, prefix, digest), 'ab') as obj:
+                    obj.write(b'!')
+
+        self.store.restore(name, self.root)
+
+    def test_prune(self):
+        """
+        Tests that objects are removed once no backup uses them
+        """
+
+        self.store.create(self.server, ['world'], now = 0)
+
+        self._write_region('world/region/r.0.0.mca', [(0, 200, b'spawn')])
+
+        self.store.create(self.server, ['world'], now = 60)
+
+        removed = self.store.prune(RetentionPolicy(keep_last = 1))
+
+        self.assertListEqual(['19700101T000000Z'], removed)
+        self.assertListEqual(['19700101T000100Z'], self.store.list())
+
+        objects = [
+            digest
+            for prefix in os.listdir(self.store.objects_path)
+            for digest in os.listdir(os.path.join(self.store.objects_path, prefix))
+        ]
+
+        self.assertEqual(3, len(objects), 'Unused objects were not removed')
+
+    def test_prune_orphans(self):
+        """
+        Tests that objects left behind by an unfinished backup are removed
+        even if every backup is kept
+        """
+
+        self.store.create(self.server, ['world'], now = 0)
+
+        objects = self._objects()
+
+        orphan_path = os.path.join(self.store.objects_path, 'ff', 'ff' * 32)
+        os.makedirs(os.path.dirname(orphan_path), exist_ok = True)
+        with open(orphan_path, 'wb') as orphan:
+            orphan.write(b'orphan')
+
+        self.assertListEqual([], self.store.prune(RetentionPolicy()))
+        self.assertListEqual(objects, self._objects(), 'Orphan was not removed')
+
+    def test_create_failed(self):
+        """
+        Tests that the objects stored by a failed backup are removed
+        """
+
+        self.store.create(self.server, ['world'], now = 0)
+
+        objects = self._objects()
+
+        self._write_region('world/region/r.0.0.mca', [(0, 200, b'castle')])
+
+        with unittest.mock.patch('json.dump') as dump:
+            dump.side_effect = OSError('Disk full')
+
+            with self.assertRaises(OSError):
+                self.store.create(self.server, ['world'], now = 60)
+
+        self.assertListEqual(['19700101T000000Z'], self.store.list())
+        self.assertListEqual(
+            objects,
+            self._objects(),
+            'Objects from the failed backup were left behind',
+        )
+        self.assertListEqual(
+            [ChunkStore.OBJECTS_DIR, '19700101T000000Z.json'],
+            sorted(os.listdir(self.store.path)),
+            'Partial manifest was left behind',
+        )
+
+    @nose.tools.raises(BackupError)
+    def test_restore_outside_store(self):
+        """
+        Tests that backup names can't refer to manifests outside the store
+        """
+
+        self.store.create(self.server, ['world'], now = 0)
+
+        shutil.copy(
+            os.path.join(self.store.path, '19700101T000000Z.json'),
+            os.path.join(self.root, 'outside.json'),
+        )
+
+        dest = os.path.join(self.root, 'restored')
+        os.mkdir(dest)
+
+        self.store.restore('../outside', dest)
+
+    def _objects(self):
+        return sorted(
+            digest
+            for prefix in os.listdir(self.store.objects_path)
+            for digest in os.listdir(os.path.join(self.store.objects_path, prefix))
+        )
+
+    def _write(self, path, contents):
+        path = os.path.join(self.server, path)
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+
+        with open(path, 'wb') as file_handle:
+            file_handle.write(contents)
+
+    def _write_region(self, path, chunks):
+        file_handle = io.BytesIO()
+        regions.write_region(
+            file_handle,
+            [
+                (index, timestamp, struct.pack('>IB', len(payload) + 1, 2) + payload)
+                for index, timestamp, payload in chunks
+            ],
+        )
+
+        self._write(path, file_handle.getvalue())
+
+    def _read(self, path):
+        with open(os.path.join(self.server, path), 'rb') as file_handle:
+            return file_handle.read()
+
+class TestBackup(unittest.TestCase):
+    """
+    Tests for the helper functions of the backup module
+    """
+
+    def setUp(self):
+        self.root   = tempfile.mkdtemp()
+        self.server = os.path.join(self.root, 'server')
+        self.store  = BackupStore(os.path.join(self.root, 'backups'))
+
+        self._write('world/level.dat', 'old level')
+        self.name = self.store.create(self.server, ['world'])['name']
+        self._write('world/level.dat', 'new level')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_open_store(self):
+        """
+        Tests that the engine is chosen by the server settings
+        """
+
+        self.assertIsInstance(backup.open_store(self.root, {}), BackupStore)
+        self.assertIsInstance(
+            backup.open_store(self.root, {'backup_engine': 'chunks'}),
+            ChunkStore,
+        )
+
+    @nose.tools.raises(ServerSettingsError)
+    def test_open_store_bad_engine(self):
+        """
+        Tests that we reject unknown engines
+        """
+
+        backup.open_store(self.root, {'backup_engine': 'tape'})
+
+    def test_restore_worlds(self):
+        """
+        Tests that the worlds of a server are replaced by a backup
+        """
+
+        self.assertListEqual(
+            ['world'],
+            backup.restore_worlds(self.store, self.name, self.server),
+        )
+
+        with open(os.path.join(self.server, 'world/level.dat')) as level:
+            self.assertEqual('old level', level.read())
+
+        self.assertListEqual(
+            ['world'],
+            os.listdir(self.server),
+            'Restore files were left behind',
+        )
+
+    def test_restore_worlds_failed(self):
+        """
+        Tests that the worlds are put back if they can't be replaced
+        """
+
+        real_rename = os.rename
+
+        def _rename(src, dst):
+            if src == os.path.join(self.server, '.restore', 'world'):
+                raise OSError('Disk full')
+
+            real_rename(src, dst)
+
+        with unittest.mock.patch('os.rename', side_effect = _rename):
+            with self.assertRaises(OSError):
+                backup.restore_worlds(self.store, self.name, self.server)
+
+        with open(os.path.join(self.server, 'world/level.dat')) as level:
+            self.assertEqual('new level', level.read(), 'World was not put back')
+
+        self.assertListEqual(['world'], os.listdir(self.server))
+
+    def _write(self, path, contents):
+        path = os.path.join(self.server, path)
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+
+        with open(path, 'w') as file_handle:
+            file_handle.write(contents)
+
+def _names(*times):
+    return [
+        time.strftime(
+            NAME_FORMAT,
+            time.strptime(timestamp, '%Y-%m-%d %H:%M'),
+        )
+        for timestamp in times
+    ]
+
+if __name__ == '__main__':
+    unittest.main()
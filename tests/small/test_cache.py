@@ -0,0 +1,184 @@
+"""
+Tests for the mymcadmin.cache module
+"""
+
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+import nose
+import requests
+
+from mymcadmin.cache import JsonCache
+from mymcadmin.errors import DownloadError
+
+class TestJsonCache(unittest.TestCase):
+    """
+    Tests for the JsonCache class
+    """
+
+    URL = 'http://example.com/manifest.json'
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    @unittest.mock.patch('requests.get')
+    def test_get(self, requests_get):
+        """
+        Tests that documents are only fetched once while they're fresh
+        """
+
+        requests_get.return_value = self._response(200, {'the': 'thing'})
+
+        json_cache = JsonCache(self.path)
+
+        first  = json_cache.get(self.URL)
+        second = json_cache.get(self.URL)
+
+        self.assertDictEqual({'the': 'thing'}, first, 'Document did not match')
+        self.assertDictEqual({'the': 'thing'}, second, 'Document did not match')
+
+        requests_get.assert_called_once_with(self.URL, headers = {})
+
+    @unittest.mock.patch('requests.get')
+    def test_get_copy(self, requests_get):
+        """
+        Tests that callers can't modify the cached document
+        """
+
+        requests_get.return_value = self._response(200, {'the': 'thing'})
+
+        json_cache = JsonCache()
+        json_cache.get(self.URL)['the'] = 'other thing'
+
+        self.assertDictEqual(
+            {'the': 'thing'},
+            json_cache.get(self.URL),
+            'Cached document was modified',
+        )
+
+    @unittest.mock.patch('requests.get')
+    def test_get_disk(self, requests_get):
+        """
+        Tests that documents are shared between cache instances through disk
+        """
+
+        requests_get.return_value = self._response(200, {'the': 'thing'})
+
+        JsonCache(self.path).get(self.URL)
+
+        requests_get.reset_mock()
+
+        self.assertDictEqual(
+            {'the': 'thing'},
+            JsonCache(self.path).get(self.URL),
+            'Document was not loaded from disk',
+        )
+
+        self.assertFalse(requests_get.called, 'Document was fetched again')
+
+    @unittest.mock.patch('requests.get')
+    def test_get_revalidate(self, requests_get):
+        """
+        Tests that expired documents are revalidated with the server
+        """
+
+        requests_get.return_value = self._response(
+            200,
+            {'the': 'thing'},
+            headers = {
+                'ETag':          '"abc"',
+                'Last-Modified': 'Sat, 01 Oct 2016 00:00:00 GMT',
+            },
+        )
+
+        json_cache = JsonCache(self.path, ttl = 0)
+        json_cache.get(self.URL)
+
+        requests_get.return_value = self._response(304)
+
+        self.assertDictEqual(
+            {'the': 'thing'},
+            json_cache.get(self.URL),
+            'Cached document was not used',
+        )
+
+        requests_get.assert_called_with(
+            self.URL,
+            headers = {
+                'If-None-Match':     '"abc"',
+                'If-Modified-Since': 'Sat, 01 Oct 2016 00:00:00 GMT',
+            },
+        )
+
+    @unittest.mock.patch('requests.get')
+    def test_get_stale(self, requests_get):
+        """
+        Tests that stale documents are used when the network is down
+        """
+
+        requests_get.return_value = self._response(200, {'the': 'thing'})
+
+        json_cache = JsonCache(ttl = 0)
+        json_cache.get(self.URL)
+
+        requests_get.side_effect = requests.ConnectionError('No network')
+
+        self.assertDictEqual(
+            {'the': 'thing'},
+            json_cache.get(self.URL),
+            'Stale document was not used',
+        )
+
+    @nose.tools.raises(DownloadError)
+    @unittest.mock.patch('requests.get')
+    def test_get_error(self, requests_get):
+        """
+        Tests that we raise an error when there's no copy to fall back on
+        """
+
+        requests_get.return_value = self._response(500)
+
+        JsonCache().get(self.URL)
+
+    @unittest.mock.patch('requests.get')
+    def test_get_offline(self, requests_get):
+        """
+        Tests that offline mode never touches the network
+        """
+
+        requests_get.return_value = self._response(200, {'the': 'thing'})
+
+        JsonCache(self.path).get(self.URL)
+
+        requests_get.reset_mock()
+
+        json_cache = JsonCache(self.path, ttl = 0, offline = True)
+
+        self.assertDictEqual(
+            {'the': 'thing'},
+            json_cache.get(self.URL),
+            'Cached document was not used',
+        )
+
+        self.assertFalse(requests_get.called, 'Network was used while offline')
+
+        with self.assertRaises(DownloadError):
+            json_cache.get('http://example.com/other.json')
+
+    @staticmethod
+    def _response(status_code, data = None, headers = None):
+        mock_response = unittest.mock.Mock(spec = requests.Response)
+        mock_response.status_code = status_code
+        mock_response.ok          = status_code < 400
+        mock_response.headers     = headers or {}
+        mock_response.json.return_value = data
+
+        return mock_response
+
+if __name__ == '__main__':
+    unittest.main()
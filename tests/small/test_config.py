@@ -11,7 +11,7 @@ import unittest.mock
 import nose
 
 from mymcadmin import errors
-from mymcadmin.config import Config
+from mymcadmin.config import Config, DaemonOptions
 
 class TestConfig(unittest.TestCase):
     """
@@ -134,6 +134,78 @@ class TestConfig(unittest.TestCase):
             'Default config value is not None',
         )
 
+class TestDaemonOptions(unittest.TestCase):
+    """
+    Tests for the DaemonOptions class
+    """
+
+    def test_getattr(self):
+        """
+        Tests that options that weren't given are None
+        """
+
+        options = DaemonOptions({'max_parallel_ops': 4}, socket_path = None)
+
+        self.assertEqual(
+            4,
+            options.max_parallel_ops,
+            'Option did not match',
+        )
+
+        self.assertIsNone(options.socket_path, 'Missing option was not None')
+        self.assertIsNone(options.metrics_port, 'Missing option was not None')
+
+    def test_with_defaults(self):
+        """
+        Tests that defaults only fill in the options that weren't given
+        """
+
+        options = DaemonOptions(max_parallel_ops = 4, socket_path = None)
+
+        result = options.with_defaults(
+            {
+                'max_parallel_ops': 8,
+                'socket_mode':      0o660,
+            }
+        )
+
+        self.assertEqual(
+            DaemonOptions(max_parallel_ops = 4, socket_mode = 0o660),
+            result,
+            'Options did not match',
+        )
+
+        self.assertEqual(
+            DaemonOptions(max_parallel_ops = 4),
+            options,
+            'Original options were changed',
+        )
+
+    def test_replace(self):
+        """
+        Tests that replaced options override the ones that were given
+        """
+
+        options = DaemonOptions(max_parallel_ops = 4, socket_mode = 0o660)
+
+        result = options.replace(max_parallel_ops = 8, port = 2323)
+
+        self.assertEqual(
+            DaemonOptions(
+                max_parallel_ops = 8,
+                port             = 2323,
+                socket_mode      = 0o660,
+            ),
+            result,
+            'Options did not match',
+        )
+
+        self.assertEqual(
+            DaemonOptions(max_parallel_ops = 4, socket_mode = 0o660),
+            options,
+            'Original options were changed',
+        )
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,297 @@
+"""
+Tests for the mymcadmin.console module
+"""
+
+import asyncio
+import unittest
+
+import asynctest
+import nose
+
+from .. import utils
+
+from mymcadmin.console import (
+    READY_PATTERN,
+    SAVED_PATTERN,
+    CommandWriter,
+    OutputBuffer,
+    drain_stream,
+)
+from mymcadmin.errors import ServerError
+
+class TestOutputBuffer(unittest.TestCase):
+    """
+    Tests for the OutputBuffer class
+    """
+
+    def test_tail(self):
+        """
+        Tests that the buffer returns lines oldest first
+        """
+
+        output = OutputBuffer()
+        output.append('stdout', 'line0')
+        output.append('stderr', 'line1')
+
+        tail = output.tail()
+
+        self.assertListEqual(
+            ['line0', 'line1'],
+            [entry['line'] for entry in tail],
+            'Lines were not returned in order',
+        )
+
+        self.assertListEqual(
+            ['stdout', 'stderr'],
+            [entry['stream'] for entry in tail],
+            'Streams were not recorded',
+        )
+
+    def test_tail_count(self):
+        """
+        Tests that we can limit the number of lines returned
+        """
+
+        output = OutputBuffer()
+        for i in range(5):
+            output.append('stdout', 'line{}'.format(i))
+
+        self.assertListEqual(
+            ['line3', 'line4'],
+            [entry['line'] for entry in output.tail(2)],
+            'Only the most recent lines should be returned',
+        )
+
+        self.assertListEqual(
+            [],
+            output.tail(0),
+            'No lines should be returned',
+        )
+
+    def test_max_lines(self):
+        """
+        Tests that the oldest lines are evicted when there are too many
+        """
+
+        output = OutputBuffer(max_lines = 3)
+        for i in range(5):
+            output.append('stdout', 'line{}'.format(i))
+
+        self.assertEqual(3, len(output), 'Buffer was not capped')
+        self.assertEqual(
+            'line2',
+            output.tail()[0]['line'],
+            'Oldest lines were not evicted',
+        )
+
+    def test_max_bytes(self):
+        """
+        Tests that the oldest lines are evicted when the buffer is too large
+        """
+
+        output = OutputBuffer(max_bytes = 10)
+        output.append('stdout', 'aaaa')
+        output.append('stdout', 'bbbb')
+        output.append('stdout', 'cccc')
+
+        self.assertEqual(8, output.size, 'Buffer size was not tracked')
+        self.assertListEqual(
+            ['bbbb', 'cccc'],
+            [entry['line'] for entry in output.tail()],
+            'Oldest lines were not evicted',
+        )
+
+    def test_long_line(self):
+        """
+        Tests that a single line can't overflow the buffer
+        """
+
+        output = OutputBuffer(max_bytes = 4)
+        output.append('stdout', 'abcdefgh')
+
+        self.assertEqual('abcd', output.tail()[0]['line'], 'Line was not cut')
+
+    @nose.tools.raises(ValueError)
+    def test_bad_max_lines(self):
+        """
+        Tests that the buffer has to hold at least one line
+        """
+
+        OutputBuffer(max_lines = 0)
+
+    def test_subscribe(self):
+        """
+        Tests that listeners see every line until they unsubscribe
+        """
+
+        lines = []
+
+        def _listener(stream, line):
+            lines.append((stream, line))
+
+        output = OutputBuffer()
+        output.subscribe(_listener)
+        output.append('stdout', 'line0')
+        output.unsubscribe(_listener)
+        output.append('stdout', 'line1')
+
+        self.assertListEqual(
+            [('stdout', 'line0')],
+            lines,
+            'Listener did not receive the expected lines',
+        )
+
+    def test_ready_pattern(self):
+        """
+        Tests that we recognize the line a server logs once it's ready
+        """
+
+        self.assertIsNotNone(
+            READY_PATTERN.search(
+                '[12:00:00] [Server thread/INFO]: Done (12.345s)! ' +
+                'For help, type "help" or "?"',
+            ),
+            'Ready line was not recognized',
+        )
+
+        self.assertIsNotNone(
+            READY_PATTERN.search(
+                '[12:00:00] [Server thread/INFO] ' +
+                '[minecraft/DedicatedServer]: Done (12.345s)! ' +
+                'For help, type "help" or "?"',
+            ),
+            'Forge ready line was not recognized',
+        )
+
+        self.assertIsNone(
+            READY_PATTERN.search('[12:00:00] [Server thread/INFO]: Done'),
+            'Other lines should not be recognized',
+        )
+
+        self.assertIsNone(
+            READY_PATTERN.search(
+                '[12:00:00] [Server thread/INFO]: <Steve> Done (1.0s)!',
+            ),
+            'Chat should not be recognized',
+        )
+
+    def test_saved_pattern(self):
+        """
+        Tests that we recognize the line a server logs once it has saved
+        """
+
+        self.assertIsNotNone(
+            SAVED_PATTERN.search(
+                '[12:00:00] [Server thread/INFO]: Saved the game',
+            ),
+            'Saved line was not recognized',
+        )
+
+        self.assertIsNone(
+            SAVED_PATTERN.search(
+                '[12:00:00] [Server thread/INFO]: <Steve> Saved the game',
+            ),
+            'Chat should not be recognized',
+        )
+
+class TestCommandWriter(utils.EventLoopMixin, unittest.TestCase):
+    """
+    Tests for the CommandWriter class
+    """
+
+    def setUp(self):
+        super(TestCommandWriter, self).setUp()
+
+        self.stream = asynctest.Mock(spec = asyncio.StreamWriter)
+
+    @utils.run_async
+    async def test_run(self):
+        """
+        Tests that queued commands are written in a single batch
+        """
+
+        commands = CommandWriter(self.stream)
+        commands.send('save-all')
+        commands.send('say hello')
+        commands.close()
+
+        await commands.run()
+
+        self.stream.write.assert_called_once_with(b'save-all\nsay hello\n')
+        self.stream.drain.assert_called_with()
+
+    @utils.run_async
+    async def test_run_broken_pipe(self):
+        """
+        Tests that the writer stops when the server's stdin goes away
+        """
+
+        self.stream.drain.side_effect = BrokenPipeError()
+
+        commands = CommandWriter(self.stream)
+        commands.send('stop')
+
+        await commands.run()
+
+        with self.assertRaises(ServerError):
+            commands.send('stop')
+
+    @nose.tools.raises(ServerError)
+    def test_send_closed(self):
+        """
+        Tests that we can't send commands after the writer is closed
+        """
+
+        commands = CommandWriter(self.stream)
+        commands.close()
+        commands.send('stop')
+
+    @nose.tools.raises(ServerError)
+    def test_send_multiple_lines(self):
+        """
+        Tests that a command can't smuggle in extra commands
+        """
+
+        CommandWriter(self.stream).send('say hi\nop someone')
+
+    @nose.tools.raises(ServerError)
+    def test_send_full(self):
+        """
+        Tests that we apply backpressure when too many commands are waiting
+        """
+
+        commands = CommandWriter(self.stream, max_queued = 1)
+        commands.send('save-all')
+        commands.send('save-all')
+
+class TestDrainStream(utils.EventLoopMixin, unittest.TestCase):
+    """
+    Tests for the drain_stream function
+    """
+
+    @utils.run_async
+    async def test_drain_stream(self):
+        """
+        Tests that lines are read until the stream closes
+        """
+
+        stream = asynctest.Mock(spec = asyncio.StreamReader)
+        stream.readline.side_effect = [
+            b'line0\n',
+            ValueError('Line too long'),
+            b'line1\r\n',
+            b'',
+        ]
+
+        output = OutputBuffer()
+
+        await drain_stream(stream, output, 'stdout')
+
+        self.assertListEqual(
+            ['line0', 'line1'],
+            [entry['line'] for entry in output.tail()],
+            'Stream was not drained into the buffer',
+        )
+
+if __name__ == '__main__':
+    unittest.main()
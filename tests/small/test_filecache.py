@@ -0,0 +1,124 @@
+"""
+Tests for the mymcadmin.filecache module
+"""
+
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+import nose
+
+from mymcadmin import filecache
+from mymcadmin.filecache import FileCache
+
+class TestFileCache(unittest.TestCase):
+    """
+    Tests for the FileCache class
+    """
+
+    def setUp(self):
+        self.root  = tempfile.mkdtemp()
+        self.path  = os.path.join(self.root, 'data.txt')
+        self.cache = FileCache()
+        self.parse = unittest.mock.Mock(side_effect = self._read)
+
+        self._write('first')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_get(self):
+        """
+        Tests that an unchanged file is only parsed once
+        """
+
+        self.assertEqual('first', self.cache.get(self.path, self.parse))
+        self.assertEqual('first', self.cache.get(self.path, self.parse))
+
+        self.parse.assert_called_once_with(self.path)
+        self.assertEqual(1, len(self.cache), 'File was not cached')
+
+    def test_get_changed(self):
+        """
+        Tests that a changed file is parsed again
+        """
+
+        self.cache.get(self.path, self.parse)
+
+        self._write('second')
+
+        self.assertEqual(
+            'second',
+            self.cache.get(self.path, self.parse),
+            'Changed file was not parsed again',
+        )
+
+        self.assertEqual(2, self.parse.call_count, 'Wrong number of parses')
+
+    @nose.tools.raises(FileNotFoundError)
+    def test_get_missing(self):
+        """
+        Tests that missing files are reported and forgotten
+        """
+
+        self.cache.get(self.path, self.parse)
+
+        os.remove(self.path)
+
+        try:
+            self.cache.get(self.path, self.parse)
+        finally:
+            self.assertEqual(0, len(self.cache), 'Missing file was cached')
+
+    def test_invalidate(self):
+        """
+        Tests that invalidated files are parsed again
+        """
+
+        self.cache.get(self.path, self.parse)
+        self.cache.invalidate(self.path)
+        self.cache.get(self.path, self.parse)
+
+        self.assertEqual(2, self.parse.call_count, 'File was not parsed again')
+
+    def test_clear(self):
+        """
+        Tests that we can empty the cache
+        """
+
+        self.cache.get(self.path, self.parse)
+        self.cache.clear()
+
+        self.assertEqual(0, len(self.cache), 'Cache was not cleared')
+
+    def test_default_cache(self):
+        """
+        Tests the functions for using the default cache
+        """
+
+        filecache.get(self.path, self.parse)
+        filecache.get(self.path, self.parse)
+        filecache.invalidate(self.path)
+        filecache.get(self.path, self.parse)
+
+        self.assertEqual(2, self.parse.call_count, 'Wrong number of parses')
+
+        filecache.clear()
+
+    def _write(self, contents):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as file_handle:
+            file_handle.write(contents)
+
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _read(path):
+        with open(path, 'r') as file_handle:
+            return file_handle.read()
+
+if __name__ == '__main__':
+    unittest.main()
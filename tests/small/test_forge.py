@@ -10,7 +10,7 @@ import unittest.mock
 import nose
 import requests
 
-from mymcadmin.errors import ForgeError
+from mymcadmin.errors import DownloadError, ForgeError
 from mymcadmin.forge import (
     get_forge_for_mc_version,
     get_forge_mc_versions,
@@ -176,9 +176,10 @@ class TestForge(unittest.TestCase):
 
     # pylint: disable=no-self-use
     @nose.tools.raises(ForgeError)
+    @unittest.mock.patch('mymcadmin.download.download_file')
     @unittest.mock.patch('requests.get')
     @unittest.mock.patch('mymcadmin.forge.get_forge_mc_versions')
-    def test_get_forge_ver_network2(self, versions, requests_get):
+    def test_get_forge_ver_network2(self, versions, requests_get, download_file):
         """
         Tests that we handle when theres a network problem getting the jar
         """
@@ -189,13 +190,9 @@ class TestForge(unittest.TestCase):
         mock_list_response.ok      = True
         mock_list_response.content = SAMPLE_DOWNLOADS_PAGE.format('LATEST')
 
-        mock_jar_response = unittest.mock.Mock(spec = requests.Response)
-        mock_jar_response.ok = False
+        requests_get.return_value = mock_list_response
 
-        requests_get.side_effect = [
-            mock_list_response,
-            mock_jar_response,
-        ]
+        download_file.side_effect = DownloadError('HTTP status 500')
 
         get_forge_version('1.8.9', '10.10.10.10')
     # pylint: enable=no-self-use
@@ -239,9 +236,10 @@ class TestForge(unittest.TestCase):
 
     # pylint: disable=no-self-use
     @nose.tools.raises(ForgeError)
+    @unittest.mock.patch('mymcadmin.download.download_file')
     @unittest.mock.patch('requests.get')
     @unittest.mock.patch('mymcadmin.forge.get_forge_mc_versions')
-    def test_get_forge_for_mc_network2(self, versions, requests_get):
+    def test_get_forge_for_mc_network2(self, versions, requests_get, download_file):
         """
         Tests that we handle when there's a networking problem getting the jar
         """
@@ -252,13 +250,9 @@ class TestForge(unittest.TestCase):
         mock_list_response.ok      = True
         mock_list_response.content = SAMPLE_DOWNLOADS_PAGE.format('LATEST')
 
-        mock_jar_response = unittest.mock.Mock(spec = requests.Response)
-        mock_jar_response.ok = False
+        requests_get.return_value = mock_list_response
 
-        requests_get.side_effect = [
-            mock_list_response,
-            mock_jar_response,
-        ]
+        download_file.side_effect = DownloadError('HTTP status 500')
 
         get_forge_for_mc_version('1.8.9')
     # pylint: enable=no-self-use
@@ -282,24 +276,14 @@ class TestForge(unittest.TestCase):
 
         with unittest.mock.patch('mymcadmin.forge.get_forge_mc_versions') as forge_versions, \
              unittest.mock.patch('requests.get') as requests_get, \
-             unittest.mock.patch('mymcadmin.utils.download_file') as download_file:
+             unittest.mock.patch('mymcadmin.download.download_file') as download_file:
             forge_versions.return_value = ['1.8.9']
 
             mock_version_response = unittest.mock.Mock(spec = requests.Response)
             mock_version_response.ok      = True
             mock_version_response.content = SAMPLE_DOWNLOADS_PAGE.format(release)
 
-            mock_inst_jar_response = unittest.mock.Mock(spec = requests.Response)
-            mock_inst_jar_response.ok = True
-
-            mock_uni_jar_response = unittest.mock.Mock(spec = requests.Response)
-            mock_uni_jar_response.ok = True
-
-            requests_get.side_effect = [
-                mock_version_response,
-                mock_inst_jar_response,
-                mock_uni_jar_response,
-            ]
+            requests_get.return_value = mock_version_response
 
             inst_jar_path, uni_jar_path = get_forge_for_mc_version(
                 version_id,
@@ -319,37 +303,27 @@ class TestForge(unittest.TestCase):
             )
 
             # pylint: disable=line-too-long
-            requests_get.assert_has_calls(
-                [
-                    unittest.mock.call(
-                        'http://files.minecraftforge.net/maven/net/minecraftforge/forge/index_1.8.9.html',
-                    ),
-                    unittest.mock.call(
-                        'http://example.com/10.10.10.10/forge-1.8.9-10.10.10.10-installer.jar',
-                        stream = True,
-                    ),
-                    unittest.mock.call(
-                        'http://example.com/10.10.10.10/forge-1.8.9-10.10.10.10-universal.jar',
-                        stream = True,
-                    ),
-                ]
+            requests_get.assert_called_with(
+                'http://files.minecraftforge.net/maven/net/minecraftforge/forge/index_1.8.9.html',
             )
             # pylint: enable=line-too-long
 
+        # pylint: disable=line-too-long
         download_file.assert_has_calls(
             [
                 unittest.mock.call(
-                    mock_inst_jar_response,
+                    'http://example.com/10.10.10.10/forge-1.8.9-10.10.10.10-installer.jar',
                     inst_jar_path,
-                    '943a702d06f34599aee1f8da8ef9f7296031d699',
+                    sha1 = '943a702d06f34599aee1f8da8ef9f7296031d699',
                 ),
                 unittest.mock.call(
-                    mock_uni_jar_response,
+                    'http://example.com/10.10.10.10/forge-1.8.9-10.10.10.10-universal.jar',
                     uni_jar_path,
-                    '943a702d06f34599aee1f8da8ef9f7296031d699',
+                    sha1 = '943a702d06f34599aee1f8da8ef9f7296031d699',
                 )
             ]
         )
+        # pylint: enable=line-too-long
 
     def _do_forge_version(self, path = None):
         root       = path if path is not None else os.getcwd()
@@ -357,24 +331,14 @@ class TestForge(unittest.TestCase):
 
         with unittest.mock.patch('mymcadmin.forge.get_forge_mc_versions') as forge_versions, \
              unittest.mock.patch('requests.get') as requests_get, \
-             unittest.mock.patch('mymcadmin.utils.download_file') as download_file:
+             unittest.mock.patch('mymcadmin.download.download_file') as download_file:
             forge_versions.return_value = ['1.8.9']
 
             mock_version_response = unittest.mock.Mock(spec = requests.Response)
             mock_version_response.ok      = True
             mock_version_response.content = SAMPLE_DOWNLOADS_PAGE.format('LATEST')
 
-            mock_inst_jar_response = unittest.mock.Mock(spec = requests.Response)
-            mock_inst_jar_response.ok = True
-
-            mock_uni_jar_response = unittest.mock.Mock(spec = requests.Response)
-            mock_uni_jar_response.ok = True
-
-            requests_get.side_effect = [
-                mock_version_response,
-                mock_inst_jar_response,
-                mock_uni_jar_response,
-            ]
+            requests_get.return_value = mock_version_response
 
             inst_jar, uni_jar = get_forge_version(
                 version_id,
@@ -395,37 +359,27 @@ class TestForge(unittest.TestCase):
             )
 
             # pylint: disable=line-too-long
-            requests_get.assert_has_calls(
-                [
-                    unittest.mock.call(
-                        'http://files.minecraftforge.net/maven/net/minecraftforge/forge/index_1.8.9.html',
-                    ),
-                    unittest.mock.call(
-                        'http://example.com/10.10.10.10/forge-1.8.9-10.10.10.10-installer.jar',
-                        stream = True,
-                    ),
-                    unittest.mock.call(
-                        'http://example.com/10.10.10.10/forge-1.8.9-10.10.10.10-universal.jar',
-                        stream = True,
-                    ),
-                ]
+            requests_get.assert_called_with(
+                'http://files.minecraftforge.net/maven/net/minecraftforge/forge/index_1.8.9.html',
             )
             # pylint: enable=line-too-long
 
-            download_file.assert_has_calls(
+            # pylint: disable=line-too-long
+        download_file.assert_has_calls(
                 [
                     unittest.mock.call(
-                        mock_inst_jar_response,
+                        'http://example.com/10.10.10.10/forge-1.8.9-10.10.10.10-installer.jar',
                         inst_jar,
-                        '943a702d06f34599aee1f8da8ef9f7296031d699',
+                        sha1 = '943a702d06f34599aee1f8da8ef9f7296031d699',
                     ),
                     unittest.mock.call(
-                        mock_uni_jar_response,
+                        'http://example.com/10.10.10.10/forge-1.8.9-10.10.10.10-universal.jar',
                         uni_jar,
-                        '943a702d06f34599aee1f8da8ef9f7296031d699',
+                        sha1 = '943a702d06f34599aee1f8da8ef9f7296031d699',
                     ),
                 ]
             )
+            # pylint: enable=line-too-long
 
 SAMPLE_DOWNLOADS_PAGE = """
 <html>
@@ -0,0 +1,220 @@
+"""
+Tests for the management process metrics
+"""
+
+import asyncio
+import unittest
+import unittest.mock
+
+import asynctest
+import nose
+
+from .. import utils
+
+from mymcadmin.metrics import Exposition, Histogram, handle_connection
+
+class TestHistogram(unittest.TestCase):
+    """
+    Tests for the Histogram class
+    """
+
+    @nose.tools.raises(ValueError)
+    def test_no_buckets(self):
+        """
+        Tests that a histogram needs at least one bucket
+        """
+
+        Histogram([])
+
+    def test_observe(self):
+        """
+        Tests that values are counted in the right buckets
+        """
+
+        histogram = Histogram([10, 1, 5])
+
+        for value in [0.5, 1, 3, 5, 7, 20]:
+            histogram.observe(value)
+
+        self.assertListEqual(
+            [(1, 2), (5, 4), (10, 5), (float('inf'), 6)],
+            histogram.cumulative(),
+            'Cumulative counts did not match',
+        )
+
+        self.assertEqual(6, histogram.count, 'Count did not match')
+        self.assertEqual(36.5, histogram.sum, 'Sum did not match')
+
+    def test_as_dict(self):
+        """
+        Tests that the histogram can be converted for JSON
+        """
+
+        histogram = Histogram([1, 5])
+        histogram.observe(2)
+
+        self.assertDictEqual(
+            {
+                'buckets': [
+                    {'le': 1, 'count': 0},
+                    {'le': 5, 'count': 1},
+                ],
+                'count':   1,
+                'sum':     2,
+            },
+            histogram.as_dict(),
+            'Histogram did not match',
+        )
+
+class TestExposition(unittest.TestCase):
+    """
+    Tests for the Exposition class
+    """
+
+    def test_add(self):
+        """
+        Tests that metrics are rendered in the text format
+        """
+
+        page = Exposition()
+        page.add(
+            'test_total',
+            'counter',
+            'A test counter',
+            [
+                ({'method': 'b', 'kind': 'x'}, 2),
+                ({}, 1.5),
+            ],
+        )
+
+        self.assertEqual(
+            '# HELP test_total A test counter\n' +
+            '# TYPE test_total counter\n' +
+            'test_total{kind="x",method="b"} 2\n' +
+            'test_total 1.5\n',
+            page.render(),
+            'Page did not match',
+        )
+
+    def test_add_histograms(self):
+        """
+        Tests that histograms are rendered with their buckets, sum and count
+        """
+
+        histogram = Histogram([1, 5])
+        histogram.observe(2)
+        histogram.observe(10)
+
+        page = Exposition()
+        page.add_histograms(
+            'test_seconds',
+            'A test histogram',
+            [({'server_id': 'test'}, histogram)],
+        )
+
+        self.assertEqual(
+            '# HELP test_seconds A test histogram\n' +
+            '# TYPE test_seconds histogram\n' +
+            'test_seconds_bucket{le="1",server_id="test"} 0\n' +
+            'test_seconds_bucket{le="5",server_id="test"} 1\n' +
+            'test_seconds_bucket{le="+Inf",server_id="test"} 2\n' +
+            'test_seconds_sum{server_id="test"} 12\n' +
+            'test_seconds_count{server_id="test"} 2\n',
+            page.render(),
+            'Page did not match',
+        )
+
+    def test_escape_labels(self):
+        """
+        Tests that label values are escaped
+        """
+
+        page = Exposition()
+        page.add('test', 'gauge', 'A test gauge', [({'id': 'a"b\\c'}, 1)])
+
+        self.assertIn(
+            'test{id="a\\"b\\\\c"} 1\n',
+            page.render(),
+            'Label was not escaped',
+        )
+
+class TestHandleConnection(utils.EventLoopMixin, unittest.TestCase):
+    """
+    Tests for serving the metrics over HTTP
+    """
+
+    @utils.run_async
+    async def test_handle_connection(self):
+        """
+        Check that the metrics page is served over HTTP
+        """
+
+        mock_reader = asynctest.Mock(spec = asyncio.StreamReader)
+        mock_reader.readline.side_effect = [
+            b'GET /metrics HTTP/1.1\r\n',
+            b'Host: example.com\r\n',
+            b'\r\n',
+        ]
+
+        mock_writer = asynctest.Mock(spec = asyncio.StreamWriter)
+
+        render = unittest.mock.Mock(return_value = 'mymcadmin_test 1\n')
+
+        await handle_connection(mock_reader, mock_writer, render)
+
+        response = b''.join(
+            call[0][0]
+            for call in mock_writer.write.call_args_list
+        )
+
+        headers, body = response.split(b'\r\n\r\n', 1)
+
+        self.assertTrue(
+            headers.startswith(b'HTTP/1.0 200 OK'),
+            'Metrics were not served',
+        )
+
+        self.assertIn(
+            b'Content-Length: 17',
+            headers,
+            'Content length did not match',
+        )
+
+        self.assertEqual(b'mymcadmin_test 1\n', body, 'Body did not match')
+
+        mock_writer.close.assert_called_with()
+
+    @utils.run_async
+    async def test_handle_connection_not_found(self):
+        """
+        Check that paths other than /metrics are not found
+        """
+
+        mock_reader = asynctest.Mock(spec = asyncio.StreamReader)
+        mock_reader.readline.side_effect = [
+            b'GET / HTTP/1.1\r\n',
+            b'\r\n',
+        ]
+
+        mock_writer = asynctest.Mock(spec = asyncio.StreamWriter)
+
+        render = unittest.mock.Mock()
+
+        await handle_connection(mock_reader, mock_writer, render)
+
+        response = mock_writer.write.call_args_list[0][0][0]
+
+        self.assertTrue(
+            response.startswith(b'HTTP/1.0 404 Not Found'),
+            'Unknown path was not rejected',
+        )
+
+        self.assertFalse(
+            render.called,
+            'Metrics should not have been collected',
+        )
+
+        mock_writer.close.assert_called_with()
+
+if __name__ == '__main__':
+    unittest.main()
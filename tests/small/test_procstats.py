@@ -0,0 +1,158 @@
+"""
+Tests for the mymcadmin.procstats module
+"""
+
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+import nose
+
+from mymcadmin.procstats import CLOCK_TICKS, ProcessSampler, TimeSeries
+
+class TestTimeSeries(unittest.TestCase):
+    """
+    Tests for the TimeSeries class
+    """
+
+    def test_as_dict(self):
+        """
+        Tests that samples are returned oldest first
+        """
+
+        series = TimeSeries(5)
+        for i in range(3):
+            series.append({'time': i, 'cpu': i * 10})
+
+        samples = series.as_dict()
+
+        self.assertListEqual([0, 1, 2], samples['time'], 'Times did not match')
+        self.assertListEqual([0, 10, 20], samples['cpu'], 'CPU did not match')
+        self.assertListEqual(
+            [None, None, None],
+            samples['rss'],
+            'Missing values should be unknown',
+        )
+
+    def test_wrap(self):
+        """
+        Tests that the oldest samples are overwritten when the series is full
+        """
+
+        series = TimeSeries(3)
+        for i in range(5):
+            series.append({'time': i})
+
+        self.assertEqual(3, len(series), 'Series grew past its size')
+        self.assertListEqual(
+            [2, 3, 4],
+            series.as_dict()['time'],
+            'Oldest samples were not overwritten',
+        )
+
+        self.assertListEqual(
+            [3, 4],
+            series.as_dict(2)['time'],
+            'Most recent samples were not returned',
+        )
+
+    @nose.tools.raises(ValueError)
+    def test_bad_size(self):
+        """
+        Tests that a series must hold at least one sample
+        """
+
+        TimeSeries(0)
+
+class TestProcessSampler(unittest.TestCase):
+    """
+    Tests for the ProcessSampler class
+    """
+
+    def setUp(self):
+        self.proc_root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.proc_root)
+
+    def test_sample(self):
+        """
+        Tests that we read the process stats from /proc
+        """
+
+        self._write_proc(100, cpu_ticks = 0)
+
+        sampler = ProcessSampler(history = 10, proc_root = self.proc_root)
+        proc    = unittest.mock.Mock(pid = 100)
+
+        with unittest.mock.patch('time.time') as mock_time:
+            mock_time.return_value = 1000
+            sampler.sample({'test': proc})
+
+            self._write_proc(100, cpu_ticks = CLOCK_TICKS * 5)
+
+            mock_time.return_value = 1010
+            sampler.sample({'test': proc})
+
+        samples = sampler.series['test'].as_dict()
+
+        self.assertListEqual([1000, 1010], samples['time'], 'Wrong times')
+        self.assertListEqual(
+            [None, 50],
+            samples['cpu'],
+            'CPU usage was not calculated',
+        )
+        self.assertListEqual([42, 42], samples['threads'], 'Wrong threads')
+        self.assertListEqual(
+            [2048 * 1024, 2048 * 1024],
+            samples['rss'],
+            'Wrong RSS',
+        )
+        self.assertListEqual([0, 0], samples['swap'], 'Wrong swap')
+        self.assertListEqual(
+            [4096, 4096],
+            samples['read_bytes'],
+            'Wrong read bytes',
+        )
+        self.assertListEqual(
+            [8192, 8192],
+            samples['write_bytes'],
+            'Wrong write bytes',
+        )
+
+    def test_sample_missing(self):
+        """
+        Tests that processes that have gone away are skipped
+        """
+
+        sampler = ProcessSampler(proc_root = self.proc_root)
+        sampler.sample({'test': unittest.mock.Mock(pid = 100)})
+
+        self.assertDictEqual({}, sampler.series, 'No samples should be taken')
+
+    def _write_proc(self, pid, cpu_ticks):
+        proc_path = os.path.join(self.proc_root, str(pid))
+        os.makedirs(proc_path, exist_ok = True)
+
+        fields = ['0'] * 50
+        fields[0]  = 'S'
+        fields[11] = str(cpu_ticks // 2)
+        fields[12] = str(cpu_ticks - cpu_ticks // 2)
+        fields[17] = '42'
+
+        with open(os.path.join(proc_path, 'stat'), 'w') as stat_file:
+            stat_file.write(
+                '{} (java server) {}\n'.format(pid, ' '.join(fields)),
+            )
+
+        with open(os.path.join(proc_path, 'status'), 'w') as status_file:
+            status_file.write('Name:\tjava\nVmRSS:\t    2048 kB\nVmSwap:\t       0 kB\n')
+
+        with open(os.path.join(proc_path, 'io'), 'w') as io_file:
+            io_file.write('rchar: 1\nread_bytes: 4096\nwrite_bytes: 8192\n')
+
+if __name__ == '__main__':
+    unittest.main()
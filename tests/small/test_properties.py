@@ -0,0 +1,199 @@
+"""
+Tests for the mymcadmin.properties module
+"""
+
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+
+import nose
+
+from mymcadmin.errors import ServerPropertiesError
+from mymcadmin.properties import PropertiesDocument
+
+class TestPropertiesDocument(unittest.TestCase):
+    """
+    Tests for the PropertiesDocument class
+    """
+
+    def setUp(self):
+        self.document = PropertiesDocument(SAMPLE_PROPERTIES.splitlines())
+
+    def test_items(self):
+        """
+        Tests that the properties are read in order
+        """
+
+        self.assertListEqual(
+            [
+                ('motd', 'A Minecraft Server'),
+                ('view-distance', '10'),
+                ('level-seed', ''),
+                ('pvp', 'true'),
+            ],
+            self.document.items(),
+            'Properties did not match',
+        )
+
+        self.assertEqual('10', self.document.get('view-distance'))
+        self.assertIsNone(self.document.get('missing'))
+
+    def test_render_unchanged(self):
+        """
+        Tests that an unchanged document is written back as it was read
+        """
+
+        self.assertEqual(
+            SAMPLE_PROPERTIES,
+            self.document.render(),
+            'Unchanged document was not preserved',
+        )
+
+    def test_update(self):
+        """
+        Tests that changes keep the comments and order of the file
+        """
+
+        changed = self.document.update(
+            properties = {
+                'view-distance': 6,
+                'pvp':           False,
+                'level-seed':    None,
+                'max-players':   40,
+            },
+            remove = ['motd'],
+        )
+
+        self.assertTrue(changed, 'Document should have been changed')
+        self.assertEqual(
+            """#Minecraft server properties
+#Sat Feb 06 16:13:59 CST 2016
+
+view-distance=6 # chunks
+level-seed=
+pvp=false
+max-players=40
+""",
+            self.document.render(),
+            'Changed document did not match',
+        )
+
+    def test_update_unchanged(self):
+        """
+        Tests that setting the current values doesn't change the document
+        """
+
+        self.assertFalse(
+            self.document.update(
+                properties = {'view-distance': 10, 'pvp': True},
+                remove     = ['missing'],
+            ),
+            'Document should not have been changed',
+        )
+
+    def test_dotted_keys(self):
+        """
+        Tests that keys with dots in them, such as rcon.port, can be read and
+        changed
+        """
+
+        document = PropertiesDocument(['rcon.port=25575', 'query.port=25565'])
+
+        self.assertListEqual(
+            [('rcon.port', '25575'), ('query.port', '25565')],
+            document.items(),
+            'Dotted properties were not read',
+        )
+
+        document.update(
+            properties = {
+                'rcon.port':     25576,
+                'rcon.password': 'secret',
+            },
+        )
+
+        self.assertEqual(
+            'rcon.port=25576\nquery.port=25565\nrcon.password=secret\n',
+            document.render(),
+            'Dotted properties were not changed',
+        )
+
+    @nose.tools.raises(ServerPropertiesError)
+    def test_update_bad_key(self):
+        """
+        Tests that we reject invalid property names
+        """
+
+        self.document.update(properties = {'bad key': 'value'})
+
+    @nose.tools.raises(ServerPropertiesError)
+    def test_update_bad_value(self):
+        """
+        Tests that we reject values that can't be read back
+        """
+
+        self.document.update(properties = {'motd': 'line one\nline two'})
+
+    @nose.tools.raises(ServerPropertiesError)
+    def test_update_bad_type(self):
+        """
+        Tests that we reject values that aren't scalars
+        """
+
+        self.document.update(properties = {'motd': ['one', 'two']})
+
+    def test_update_validates_first(self):
+        """
+        Tests that nothing is changed if any of the changes are invalid
+        """
+
+        with self.assertRaises(ServerPropertiesError):
+            self.document.update(
+                properties = {'view-distance': 6},
+                remove     = ['view-distance'],
+            )
+
+        self.assertEqual(
+            SAMPLE_PROPERTIES,
+            self.document.render(),
+            'Document was partially changed',
+        )
+
+    def test_save(self):
+        """
+        Tests that we can write a document to disk and read it back
+        """
+
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+
+        path = os.path.join(root, 'server.properties')
+
+        self.document.set('view-distance', 8)
+        self.document.save(path)
+
+        self.assertListEqual(
+            ['server.properties'],
+            os.listdir(root),
+            'Temporary file was left behind',
+        )
+
+        self.assertEqual(
+            '8',
+            PropertiesDocument.load(path).get('view-distance'),
+            'Saved document did not match',
+        )
+
+SAMPLE_PROPERTIES = """#Minecraft server properties
+#Sat Feb 06 16:13:59 CST 2016
+motd=A Minecraft Server
+
+view-distance=10 # chunks
+level-seed=
+pvp=true
+"""
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Tests for the mymcadmin.regions module
+"""
+
+import io
+import struct
+import unittest
+
+import nose
+
+from mymcadmin import regions
+from mymcadmin.errors import RegionFileError
+
+class TestRegions(unittest.TestCase):
+    """
+    Tests for reading and writing region files
+    """
+
+    def test_is_region_file(self):
+        """
+        Tests that region files are recognized by their extension
+        """
+
+        self.assertTrue(regions.is_region_file('world/region/r.0.0.mca'))
+        self.assertTrue(regions.is_region_file('world/region/r.0.0.mcr'))
+        self.assertFalse(regions.is_region_file('world/level.dat'))
+
+    def test_round_trip(self):
+        """
+        Tests that the chunks written to a region file are read back
+        """
+
+        chunks = [
+            (0, 1476633600, _chunk(b'a' * 5000)),
+            (33, 1476637200, _chunk(b'b' * 10)),
+        ]
+
+        data = _region(chunks)
+
+        self.assertEqual(
+            0,
+            len(data) % regions.SECTOR_SIZE,
+            'Region file was not padded to whole sectors',
+        )
+
+        self.assertEqual(
+            regions.HEADER_SIZE + 3 * regions.SECTOR_SIZE,
+            len(data),
+            'Chunks were not packed together',
+        )
+
+        self.assertListEqual(
+            chunks,
+            regions.read_chunks(data),
+            'Chunks did not match',
+        )
+
+    def test_read_chunks_empty(self):
+        """
+        Tests that a region file without chunks has none
+        """
+
+        self.assertListEqual(
+            [],
+            regions.read_chunks(bytes(regions.HEADER_SIZE)),
+            'Empty region should not have chunks',
+        )
+
+    @nose.tools.raises(RegionFileError)
+    def test_read_chunks_short(self):
+        """
+        Tests that we reject region files without a full header
+        """
+
+        regions.read_chunks(b'\0' * 100)
+
+    @nose.tools.raises(RegionFileError)
+    def test_read_chunks_bad_location(self):
+        """
+        Tests that we reject chunks that point into the header
+        """
+
+        data = bytearray(_region([(0, 0, _chunk(b'a'))]))
+        struct.pack_into('>I', data, 0, 1 << 8 | 1)
+
+        regions.read_chunks(bytes(data))
+
+    @nose.tools.raises(RegionFileError)
+    def test_read_chunks_bad_length(self):
+        """
+        Tests that we reject chunks longer than their sectors
+        """
+
+        data = bytearray(_region([(0, 0, _chunk(b'a'))]))
+        struct.pack_into('>I', data, regions.HEADER_SIZE, regions.SECTOR_SIZE)
+
+        regions.read_chunks(bytes(data))
+
+    @nose.tools.raises(RegionFileError)
+    def test_write_region_too_large(self):
+        """
+        Tests that we reject chunks that don't fit in a region file
+        """
+
+        _region([(0, 0, _chunk(b'a' * regions.MAX_SECTORS * regions.SECTOR_SIZE))])
+
+def _chunk(payload):
+    # Zlib compressed chunks are marked with a 2
+    return struct.pack('>IB', len(payload) + 1, 2) + payload
+
+def _region(chunks):
+    file_handle = io.BytesIO()
+    regions.write_region(file_handle, chunks)
+
+    return file_handle.getvalue()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+"""
+Tests for the mymcadmin.registry module
+"""
+
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+import nose
+
+from mymcadmin.errors import ServerDoesNotExistError
+from mymcadmin.registry import ServerRegistry
+from mymcadmin.server import Server
+
+class TestServerRegistry(unittest.TestCase):
+    """
+    Tests for the ServerRegistry class
+    """
+
+    def setUp(self):
+        self.root     = tempfile.mkdtemp()
+        self.registry = ServerRegistry(self.root, poll_interval = 0)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_server_ids(self):
+        """
+        Tests that only visible directories are listed
+        """
+
+        self._make_servers('lobby', 'creative', '.artifacts')
+
+        with open(os.path.join(self.root, 'notes.txt'), 'w'):
+            pass
+
+        self.assertListEqual(
+            ['creative', 'lobby'],
+            self.registry.server_ids(),
+            'Server IDs did not match',
+        )
+
+        self.assertIn('lobby', self.registry, 'Server was not registered')
+        self.assertNotIn('.artifacts', self.registry, 'Hidden directory was listed')
+        self.assertEqual(2, len(self.registry), 'Wrong number of servers')
+
+    def test_servers(self):
+        """
+        Tests that the same Server is returned until the server is removed
+        """
+
+        self._make_servers('lobby')
+
+        srv = self.registry.get('lobby')
+
+        self.assertIsInstance(srv, Server, 'Lookup did not return a Server')
+        self.assertEqual(
+            os.path.join(self.root, 'lobby'),
+            srv.path,
+            'Server path did not match',
+        )
+
+        self._make_servers('creative')
+
+        self.assertIs(
+            srv,
+            self.registry.servers()[1],
+            'Server was rebuilt by a rescan',
+        )
+
+    def test_refresh_added_removed(self):
+        """
+        Tests that added and removed servers are picked up
+        """
+
+        self._make_servers('lobby', 'creative')
+        self.registry.server_ids()
+
+        os.rmdir(os.path.join(self.root, 'creative'))
+        self._make_servers('survival')
+
+        self.assertListEqual(
+            ['lobby', 'survival'],
+            self.registry.server_ids(),
+            'Changes to the root were not picked up',
+        )
+
+    def test_refresh_unchanged(self):
+        """
+        Tests that the root is only rescanned when it has changed
+        """
+
+        self._make_servers('lobby')
+
+        with unittest.mock.patch('os.scandir', wraps = os.scandir) as scandir:
+            self.registry.server_ids()
+            self.registry.server_ids()
+            self.registry.get('lobby')
+
+        self.assertEqual(1, scandir.call_count, 'Unchanged root was rescanned')
+
+    def test_refresh_throttled(self):
+        """
+        Tests that the root is checked at most once per poll interval
+        """
+
+        registry = ServerRegistry(self.root, poll_interval = 60)
+
+        self._make_servers('lobby')
+        self.assertListEqual(['lobby'], registry.server_ids())
+
+        self._make_servers('creative')
+        self.assertListEqual(
+            ['lobby'],
+            registry.server_ids(),
+            'Root should not have been checked again yet',
+        )
+
+        registry.refresh(force = True)
+        self.assertListEqual(
+            ['creative', 'lobby'],
+            registry.server_ids(),
+            'Forced refresh did not rescan the root',
+        )
+
+    def test_get_new_server(self):
+        """
+        Tests that a server created since the last check can be looked up
+        """
+
+        registry = ServerRegistry(self.root, poll_interval = 60)
+        registry.server_ids()
+
+        self._make_servers('lobby')
+
+        self.assertEqual(
+            'lobby',
+            registry.get('lobby').server_id,
+            'New server was not found',
+        )
+
+    def test_add(self):
+        """
+        Tests that created servers can be registered straight away
+        """
+
+        registry = ServerRegistry(self.root, poll_interval = 60)
+        registry.server_ids()
+
+        self._make_servers('lobby')
+
+        srv = Server(os.path.join(self.root, 'lobby'))
+        registry.add(srv)
+
+        self.assertIs(srv, registry.get('lobby'), 'Server was not registered')
+        self.assertListEqual(['lobby'], registry.server_ids())
+
+    @nose.tools.raises(ServerDoesNotExistError)
+    def test_get_bad_id(self):
+        """
+        Tests that we check for a valid server ID
+        """
+
+        self.registry.get('bad')
+
+    @nose.tools.raises(ServerDoesNotExistError)
+    def test_get_hidden(self):
+        """
+        Tests that the manager's own directories can't be looked up
+        """
+
+        self._make_servers('.artifacts')
+
+        self.registry.get('.artifacts')
+
+    @nose.tools.raises(ServerDoesNotExistError)
+    def test_get_outside_root(self):
+        """
+        Tests that server IDs can't point outside of the root
+        """
+
+        self.registry.get(os.path.join('..', os.path.basename(self.root)))
+
+    def _make_servers(self, *server_ids):
+        for server_id in server_ids:
+            os.mkdir(os.path.join(self.root, server_id))
+
+if __name__ == '__main__':
+    unittest.main()
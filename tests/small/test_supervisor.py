@@ -0,0 +1,216 @@
+"""
+Tests for the server restart policies
+"""
+
+import unittest
+
+import nose
+
+from mymcadmin.errors import ServerSettingsError
+from mymcadmin.supervisor import Backoff, CrashLoop, RestartPolicy
+
+class TestRestartPolicy(unittest.TestCase):
+    """
+    Tests for the RestartPolicy class
+    """
+
+    def test_defaults(self):
+        """
+        Tests that servers aren't restarted by default
+        """
+
+        policy = RestartPolicy()
+
+        policy.record_start(now = 0)
+        self.assertIsNone(
+            policy.record_exit(1, now = 10),
+            'Server should not have been restarted',
+        )
+
+        self.assertFalse(policy.parked, 'Server should not have been parked')
+
+    def test_from_settings(self):
+        """
+        Tests that the policy is read from the server settings
+        """
+
+        policy = RestartPolicy.from_settings(
+            {
+                'restart':             'always',
+                'restart_max_retries': 3,
+                'restart_backoff':     2,
+                'restart_max_backoff': 30,
+                'crash_loop_limit':    4,
+                'crash_loop_window':   120,
+            }
+        )
+
+        self.assertEqual('always', policy.mode, 'Mode did not match')
+        self.assertEqual(
+            3,
+            policy.backoff.max_retries,
+            'Max retries did not match',
+        )
+        self.assertEqual(2, policy.backoff.initial, 'Backoff did not match')
+        self.assertEqual(
+            30,
+            policy.backoff.maximum,
+            'Max backoff did not match',
+        )
+        self.assertEqual(
+            4,
+            policy.crash_loop.limit,
+            'Crash loop limit did not match',
+        )
+        self.assertEqual(
+            120,
+            policy.crash_loop.window,
+            'Crash loop window did not match',
+        )
+
+    @nose.tools.raises(ServerSettingsError)
+    def test_bad_mode(self):
+        """
+        Tests that we reject unknown restart modes
+        """
+
+        RestartPolicy.from_settings({'restart': 'sometimes'})
+
+    def test_on_failure(self):
+        """
+        Tests that on-failure only restarts crashed servers
+        """
+
+        policy = RestartPolicy(mode = RestartPolicy.ON_FAILURE)
+
+        self.assertIsNone(
+            policy.record_exit(0, now = 0),
+            'Clean exit should not have been restarted',
+        )
+
+        self.assertEqual(
+            1,
+            policy.record_exit(1, now = 1),
+            'Crash should have been restarted',
+        )
+
+    def test_always(self):
+        """
+        Tests that always restarts servers that exit cleanly
+        """
+
+        policy = RestartPolicy(mode = RestartPolicy.ALWAYS)
+
+        self.assertEqual(
+            1,
+            policy.record_exit(0, now = 0),
+            'Clean exit should have been restarted',
+        )
+
+    def test_backoff(self):
+        """
+        Tests that the delay between restarts grows up to the maximum
+        """
+
+        policy = RestartPolicy(
+            mode       = RestartPolicy.ALWAYS,
+            backoff    = Backoff(initial = 1, maximum = 5),
+            crash_loop = CrashLoop(limit = 100),
+        )
+
+        delays = []
+        for now in range(5):
+            policy.record_start(now = now)
+            delays.append(policy.record_exit(1, now = now))
+
+        self.assertListEqual(
+            [1, 2, 4, 5, 5],
+            delays,
+            'Restart delays did not back off',
+        )
+
+    def test_max_retries(self):
+        """
+        Tests that we give up after the maximum number of retries
+        """
+
+        policy = RestartPolicy(
+            mode       = RestartPolicy.ALWAYS,
+            backoff    = Backoff(max_retries = 2),
+            crash_loop = CrashLoop(limit = 100),
+        )
+
+        self.assertIsNotNone(policy.record_exit(1, now = 0))
+        self.assertIsNotNone(policy.record_exit(1, now = 1))
+        self.assertIsNone(
+            policy.record_exit(1, now = 2),
+            'Server should not have been restarted again',
+        )
+
+        self.assertTrue(policy.parked, 'Server should have been parked')
+
+    def test_crash_loop(self):
+        """
+        Tests that a server crashing too often within the window is parked
+        """
+
+        policy = RestartPolicy(
+            mode       = RestartPolicy.ON_FAILURE,
+            crash_loop = CrashLoop(limit = 3, window = 60),
+        )
+
+        self.assertIsNotNone(policy.record_exit(1, now = 0))
+        self.assertIsNotNone(policy.record_exit(1, now = 10))
+        self.assertIsNone(
+            policy.record_exit(1, now = 20),
+            'Crash looping server should not have been restarted',
+        )
+
+        self.assertTrue(policy.parked, 'Server should have been parked')
+
+    def test_crash_loop_window(self):
+        """
+        Tests that crashes outside of the window are forgotten
+        """
+
+        policy = RestartPolicy(
+            mode       = RestartPolicy.ON_FAILURE,
+            crash_loop = CrashLoop(limit = 3, window = 60),
+        )
+
+        for now in (0, 100, 200, 300):
+            policy.record_start(now = now - 30)
+
+            self.assertIsNotNone(
+                policy.record_exit(1, now = now),
+                'Infrequent crashes should have been restarted',
+            )
+
+        self.assertFalse(policy.parked, 'Server should not have been parked')
+
+    def test_recovery(self):
+        """
+        Tests that a server that stays up resets the retry count
+        """
+
+        policy = RestartPolicy(
+            mode       = RestartPolicy.ON_FAILURE,
+            backoff    = Backoff(initial = 1),
+            crash_loop = CrashLoop(window = 60),
+        )
+
+        policy.record_start(now = 0)
+        self.assertEqual(1, policy.record_exit(1, now = 1))
+
+        policy.record_start(now = 2)
+        self.assertEqual(2, policy.record_exit(1, now = 3))
+
+        policy.record_start(now = 4)
+        self.assertEqual(
+            1,
+            policy.record_exit(1, now = 100),
+            'Retries were not reset after a long run',
+        )
+
+if __name__ == '__main__':
+    unittest.main()